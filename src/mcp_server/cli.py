@@ -3,17 +3,18 @@ Command-line interface for the MCP server.
 
 This module provides a CLI for starting and managing the MCP server.
 """
+
 import os
 import sys
+from typing import List, Optional
 
 import typer
-from dotenv import load_dotenv
+import uvicorn
 
+import src.mcp_server.config.config as config_module
+from src.mcp_server.config.config import CONFIG_FILE_ENV, ServerConfig, load_config
 from src.mcp_server.utils.logging import setup_logging
 
-# Load environment variables
-load_dotenv()
-
 # Create Typer app
 app = typer.Typer(
     name="mcp-server",
@@ -27,26 +28,113 @@ logger = setup_logging()
 
 @app.command()
 def start(
-    host: str = typer.Option(os.getenv("HOST", "0.0.0.0"), "--host", "-h", help="Host to bind the server to"),
-    port: int = typer.Option(int(os.getenv("PORT", "8000")), "--port", "-p", help="Port to bind the server to"),
-    debug: bool = typer.Option(os.getenv("DEBUG", "").lower() == "true", "--debug", "-d", help="Enable debug mode"),
-    log_level: str = typer.Option(os.getenv("LOG_LEVEL", "INFO"), "--log-level", "-l", help="Log level (DEBUG, INFO, WARNING, ERROR, CRITICAL)"),
+    host: Optional[str] = typer.Option(
+        None,
+        "--host",
+        "-h",
+        help="Host to bind the server to [default: HOST or 0.0.0.0]",
+    ),
+    port: Optional[int] = typer.Option(
+        None, "--port", "-p", help="Port to bind the server to [default: PORT or 8000]"
+    ),
+    debug: Optional[bool] = typer.Option(
+        None,
+        "--debug/--no-debug",
+        "-d",
+        help="Enable debug mode [default: DEBUG or off]",
+    ),
+    log_level: Optional[str] = typer.Option(
+        None,
+        "--log-level",
+        "-l",
+        help=(
+            "Log level (DEBUG, INFO, WARNING, ERROR, CRITICAL) [default: LOG_LEVEL or "
+            "INFO]"
+        ),
+    ),
+    workers: Optional[int] = typer.Option(
+        None,
+        "--workers",
+        "-w",
+        help="Number of worker processes sharing the port [default: WORKERS or 1]",
+    ),
+    graceful_timeout: Optional[int] = typer.Option(
+        None,
+        "--graceful-timeout",
+        help=(
+            "Seconds to let in-flight requests finish on shutdown or reload [default: "
+            "GRACEFUL_TIMEOUT or 30]"
+        ),
+    ),
+    config_file: Optional[str] = typer.Option(
+        None,
+        "--config",
+        "-c",
+        help=(
+            "TOML or YAML configuration file, reloaded when it changes [default: "
+            f"{CONFIG_FILE_ENV}]"
+        ),
+    ),
 ):
     """
     Start the MCP server with the specified configuration.
+
+    Flags take precedence over environment variables, which take precedence
+    over the configuration file.
     """
     try:
-        # Dynamically import the MCP server to prevent circular imports
-        from src.mcp_server.main import mcp
+        # Flags are exported as environment variables, so worker processes and reloads
+        # see them too
+        if config_file:
+            os.environ[CONFIG_FILE_ENV] = config_file
+        flags = {
+            "HOST": host,
+            "PORT": port,
+            "DEBUG": debug,
+            "LOG_LEVEL": log_level,
+            "WORKERS": workers,
+            "GRACEFUL_TIMEOUT": graceful_timeout,
+        }
+        for variable, value in flags.items():
+            if value is not None:
+                os.environ[variable] = (
+                    str(value).lower() if isinstance(value, bool) else str(value)
+                )
+
+        # Load the configuration layers again with the flags applied, before the server
+        # module reads them
+        app_config = config_module.config = load_config()
+        server_config = app_config.server
 
         # Apply CLI configuration
-        logger.info(f"Starting MCP server on {host}:{port} with debug={debug}")
-        logger.info(f"Log level set to {log_level}")
+        logger.info(
+            f"Starting MCP server on {server_config.host}:{server_config.port} with "
+            f"debug={server_config.debug}"
+        )
+        logger.info(f"Log level set to {app_config.logging.level}")
+
+        if server_config.workers > 1:
+            run_workers(server_config, app_config.logging.level)
+        else:
+            # Dynamically import the MCP server to prevent circular imports
+            from src.mcp_server.main import get_http_middleware, mcp
 
-        # Start the MCP server
-        mcp.start(host=host, port=port)
+            # Start the MCP server
+            mcp.run(
+                transport="streamable-http",
+                host=server_config.host,
+                port=server_config.port,
+                log_level=app_config.logging.level.lower(),
+                middleware=get_http_middleware(),
+                uvicorn_config={
+                    "timeout_graceful_shutdown": server_config.graceful_timeout
+                },
+            )
     except ImportError:
-        logger.error("Failed to import the MCP server. Make sure the main module is correctly set up.")
+        logger.error(
+            "Failed to import the MCP server. Make sure the main module is correctly "
+            "set up."
+        )
         sys.exit(1)
     except Exception as e:
         logger.error(f"Failed to start MCP server: {e}")
@@ -55,12 +143,432 @@ def start(
         sys.exit(1)
 
 
+def run_workers(server_config: ServerConfig, log_level: str):
+    """
+    Run several server processes behind one listening socket.
+
+    The parent process binds the port and supervises the workers: it pings
+    them for health, restarts workers that die or hang, reloads them one by
+    one on SIGHUP and shuts them down gracefully on SIGINT/SIGTERM. Each
+    worker imports the application and builds its own app through
+    create_http_app.
+
+    Args:
+        server_config: Server configuration, including the number of workers
+        log_level: Log level for the workers
+    """
+    logger.info(f"Starting {server_config.workers} worker processes")
+    uvicorn.run(
+        "src.mcp_server.main:create_http_app",
+        factory=True,
+        host=server_config.host,
+        port=server_config.port,
+        workers=server_config.workers,
+        timeout_graceful_shutdown=server_config.graceful_timeout,
+        log_level=log_level.lower(),
+    )
+
+
+@app.command()
+def bench(
+    tools: Optional[List[str]] = typer.Option(
+        None,
+        "--tool",
+        "-t",
+        help=(
+            "Tool to benchmark (repeatable). Defaults to hello-world, Echo Message and "
+            "Ping"
+        ),
+    ),
+    concurrency: int = typer.Option(
+        10, "--concurrency", "-c", help="Number of concurrent client sessions"
+    ),
+    requests: int = typer.Option(
+        100, "--requests", "-n", help="Number of measured calls per tool"
+    ),
+    payload_size: int = typer.Option(
+        16,
+        "--payload-size",
+        "-s",
+        help="Size of the string payload for tools that accept one",
+    ),
+    warmup: int = typer.Option(
+        1, "--warmup", help="Unmeasured calls per session before measuring"
+    ),
+    api_key: Optional[str] = typer.Option(
+        os.getenv("MCP_API_KEY"),
+        "--api-key",
+        "-k",
+        help="API key, if the server requires one",
+    ),
+    output: Optional[str] = typer.Option(
+        None, "--output", "-o", help="Write the JSON report to this file"
+    ),
+):
+    """
+    Benchmark the MCP server in-process over streamable HTTP, through its production
+    HTTP middleware.
+    """
+    from src.mcp_server.utils.benchmark import run_benchmark
+
+    headers = {"Authorization": f"Bearer {api_key}"} if api_key else None
+    try:
+        report = run_benchmark(
+            tools=tools or None,
+            concurrency=concurrency,
+            requests=requests,
+            payload_size=payload_size,
+            warmup=warmup,
+            headers=headers,
+        )
+    except Exception as e:
+        logger.error(f"Benchmark failed: {e}")
+        raise typer.Exit(code=1)
+    report_json = report.model_dump_json(indent=2)
+    if output:
+        with open(output, "w") as f:
+            f.write(report_json)
+        logger.info(f"Benchmark report written to {output}")
+    typer.echo(report_json)
+
+
+@app.command()
+def replay(
+    recording: str = typer.Argument(
+        ..., help="Recording of tool calls, see RECORDING_ENABLED"
+    ),
+    url: Optional[str] = typer.Option(
+        None,
+        "--url",
+        "-u",
+        help=(
+            "Streamable-HTTP endpoint of a running server. Defaults to booting the "
+            "server in-process"
+        ),
+    ),
+    speed: float = typer.Option(
+        1.0,
+        "--speed",
+        "-s",
+        help="Replay speed: 1 keeps the recorded pacing, 10 replays ten times faster",
+    ),
+    sessions: int = typer.Option(
+        100,
+        "--sessions",
+        help="Most client sessions opened; further recorded clients share them",
+    ),
+    tools: Optional[List[str]] = typer.Option(
+        None, "--tool", "-t", help="Only replay the calls of this tool (repeatable)"
+    ),
+    api_key: Optional[str] = typer.Option(
+        os.getenv("MCP_API_KEY"),
+        "--api-key",
+        "-k",
+        help="API key, if the server requires one",
+    ),
+    output: Optional[str] = typer.Option(
+        None, "--output", "-o", help="Write the JSON report to this file"
+    ),
+):
+    """
+    Replay recorded tool calls and compare their latencies with the recording.
+    """
+    from src.mcp_server.utils.replay import run_replay
+
+    headers = {"Authorization": f"Bearer {api_key}"} if api_key else None
+    try:
+        report = run_replay(
+            recording,
+            url=url,
+            speed=speed,
+            max_sessions=sessions,
+            tools=tools or None,
+            headers=headers,
+        )
+    except (OSError, ValueError) as e:
+        logger.error(f"Failed to replay {recording}: {e}")
+        raise typer.Exit(code=1)
+    report_json = report.model_dump_json(indent=2)
+    if output:
+        with open(output, "w") as f:
+            f.write(report_json)
+        logger.info(f"Replay report written to {output}")
+    typer.echo(report_json)
+
+
+@app.command("bench-serialization")
+def bench_serialization(
+    iterations: int = typer.Option(
+        1000, "--iterations", "-n", help="Operations timed per measurement"
+    ),
+    backends: Optional[List[str]] = typer.Option(
+        None,
+        "--backend",
+        "-b",
+        help=(
+            "JSON backend to benchmark (repeatable). Defaults to every installed "
+            "backend"
+        ),
+    ),
+    rows: int = typer.Option(200, "--rows", help="Number of rows in the large payload"),
+):
+    """
+    Benchmark the JSON backends and tool argument validation.
+    """
+    from src.mcp_server.utils.benchmark import run_serialization_benchmark
+
+    try:
+        report = run_serialization_benchmark(
+            iterations=iterations, backends=backends or None, rows=rows
+        )
+    except ValueError as e:
+        logger.error(str(e))
+        raise typer.Exit(code=1)
+    typer.echo(report.model_dump_json(indent=2))
+
+
+@app.command()
+def plugins(
+    rebuild: bool = typer.Option(
+        False, "--rebuild", help="Rescan installed packages and recompile the manifest"
+    ),
+):
+    """
+    List installed tool plugins and the tools they provide.
+    """
+    from src.mcp_server.tools.plugins import build_manifest, is_plugin_enabled
+
+    config = config_module.config
+    manifest = build_manifest(config.plugins, rebuild=rebuild)
+    if not manifest.plugins:
+        typer.echo(f"No plugins installed in entry point group '{manifest.group}'")
+        return
+
+    for plugin in manifest.plugins:
+        status = (
+            "enabled" if is_plugin_enabled(plugin.name, config.plugins) else "disabled"
+        )
+        source = (
+            f"{plugin.distribution} {plugin.version}"
+            if plugin.distribution
+            else plugin.value
+        )
+        typer.echo(f"{plugin.name} ({source}) [{status}]")
+        if plugin.error:
+            typer.echo(f"  error: {plugin.error}")
+        for tool in plugin.tools or []:
+            typer.echo(f"  - {tool.name}")
+
+
+@app.command("hash-key")
+def hash_key(
+    key_id: str = typer.Argument(
+        ..., help="Name identifying the key in logs and metrics"
+    ),
+    key: Optional[str] = typer.Option(
+        None, "--key", "-k", help="Key to hash. A random key is generated if omitted"
+    ),
+):
+    """
+    Print an API key and its line for the API keys file.
+    """
+    from src.mcp_server.middleware.auth import generate_key
+    from src.mcp_server.middleware.auth import hash_key as hash_api_key
+
+    if key is None:
+        key = generate_key()
+        typer.echo(f"API key: {key}", err=True)
+    typer.echo(f"{key_id} {hash_api_key(key)}")
+
+
+# Run in a fresh interpreter by startup-profile: imports the server and reports timings
+_STARTUP_PROFILE_SCRIPT = """
+import json, time
+started = time.perf_counter()
+import src.mcp_server.main as main
+imported = time.perf_counter() - started
+from src.mcp_server.tools.registry import LazyTool
+from src.mcp_server.utils.startup import get_startup_timings
+lazy_tools = {}
+for tool in main.mcp._tool_manager.list_tools():
+    if isinstance(tool, LazyTool):
+        started = time.perf_counter()
+        tool.resolve()
+        lazy_tools[tool.name] = time.perf_counter() - started
+report = {
+    "import_seconds": imported,
+    "phases": get_startup_timings(),
+    "lazy_tools": lazy_tools,
+}
+print(json.dumps(report))
+"""
+
+
+@app.command("startup-profile")
+def startup_profile(
+    top: int = typer.Option(
+        15, "--top", "-n", help="Number of slowest imports to report"
+    ),
+):
+    """
+    Report import and tool registration timings of a cold server start.
+    """
+    import json
+    import subprocess
+
+    from src.mcp_server.utils.startup import parse_import_times
+
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _STARTUP_PROFILE_SCRIPT],
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        logger.error(f"Failed to import the MCP server:\n{result.stderr}")
+        sys.exit(1)
+
+    timings = json.loads(result.stdout.strip().splitlines()[-1])
+    imports = parse_import_times(result.stderr)
+    packages = {}
+    for entry in imports:
+        package = entry["module"].split(".")[0]
+        packages[package] = packages.get(package, 0.0) + entry["self_seconds"]
+
+    report = {
+        "import_seconds": timings["import_seconds"],
+        "phases": timings["phases"],
+        "lazy_tool_import_seconds": timings["lazy_tools"],
+        "packages": dict(
+            sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]
+        ),
+        "slowest_imports": sorted(
+            imports, key=lambda entry: entry["self_seconds"], reverse=True
+        )[:top],
+    }
+    typer.echo(json.dumps(report, indent=2))
+
+
+@app.command("tool-manifest")
+def tool_manifest(
+    path: Optional[str] = typer.Argument(
+        None, help="Manifest to regenerate. Defaults to the utility tools manifest"
+    ),
+    check: bool = typer.Option(
+        False, "--check", help="Only report whether the manifest is up to date"
+    ),
+):
+    """
+    Regenerate the description and input schema of lazily registered tools from their
+    functions.
+    """
+    from src.mcp_server.tools.registry import (
+        UTILITY_TOOLS_MANIFEST,
+        dump_tool_manifest,
+        generate_tool_specs,
+        load_tool_manifest,
+    )
+
+    path = path or UTILITY_TOOLS_MANIFEST
+    with open(path) as f:
+        current = f.read()
+    generated = dump_tool_manifest(generate_tool_specs(load_tool_manifest(path)))
+    if generated == current:
+        typer.echo(f"{path} is up to date")
+        return
+    if check:
+        logger.error(f"{path} is out of date, run `mcp-server tool-manifest`")
+        sys.exit(1)
+    with open(path, "w") as f:
+        f.write(generated)
+    typer.echo(f"Regenerated {path}")
+
+
+@app.command()
+def profile(
+    url: str = typer.Option(
+        f"http://127.0.0.1:{config_module.config.server.port}",
+        "--url",
+        "-u",
+        help="Base URL of the running server",
+    ),
+    seconds: float = typer.Option(
+        10.0, "--seconds", "-s", help="Length of the profiling window"
+    ),
+    api_key: Optional[str] = typer.Option(
+        os.getenv("MCP_API_KEY"),
+        "--api-key",
+        "-k",
+        help="Admin API key, if the server requires one",
+    ),
+    cpu: bool = typer.Option(True, "--cpu/--no-cpu", help="Sample CPU stacks"),
+    memory: bool = typer.Option(True, "--memory/--no-memory", help="Trace allocations"),
+    include_idle: bool = typer.Option(
+        False, "--include-idle", help="Keep samples of threads waiting for work"
+    ),
+    output: Optional[str] = typer.Option(
+        None,
+        "--output",
+        "-o",
+        help="Write the collapsed CPU stacks to this file, for a flame graph tool",
+    ),
+    path: str = typer.Option(
+        config_module.config.profiling.path,
+        "--path",
+        help="Route prefix of the profiling routes",
+    ),
+):
+    """
+    Profile a running server's CPU and allocations for a bounded window.
+    """
+    import json
+    import time
+
+    import httpx
+
+    headers = {"Authorization": f"Bearer {api_key}"} if api_key else {}
+    params = {
+        "seconds": seconds,
+        "cpu": str(cpu).lower(),
+        "memory": str(memory).lower(),
+        "include_idle": str(include_idle).lower(),
+    }
+    try:
+        with httpx.Client(
+            base_url=url, headers=headers, timeout=seconds + 30
+        ) as client:
+            response = client.post(f"{path}/start", params=params)
+            if response.status_code != 202:
+                logger.error(
+                    f"Failed to start profiling ({response.status_code}): "
+                    f"{response.text}"
+                )
+                sys.exit(1)
+            logger.info(f"Profiling {url} for {seconds:g}s")
+            time.sleep(seconds)
+            response = client.post(f"{path}/stop")
+            response.raise_for_status()
+    except httpx.HTTPError as e:
+        logger.error(f"Failed to profile the server: {e}")
+        sys.exit(1)
+
+    result = response.json()
+    collapsed = result.get("cpu", {}).pop("collapsed", "")
+    if output and "cpu" in result:
+        with open(output, "w") as f:
+            f.write(collapsed)
+        logger.info(f"Collapsed stacks written to {output}")
+    elif collapsed:
+        result["cpu"]["top_stacks"] = collapsed.splitlines()[:20]
+    typer.echo(json.dumps(result, indent=2))
+
+
 @app.command()
 def version():
     """
     Display the version of the MCP server.
     """
     from src.mcp_server import __version__
+
     typer.echo(f"MCP Server Template v{__version__}")
 
 
@@ -2,90 +2,1105 @@
 Configuration handling for the MCP server.
 
 This module provides centralized configuration management for the MCP server.
+Settings are layered, each layer taking precedence over the previous one:
+
+1. The defaults of the configuration models below
+2. A TOML or YAML file named by MCP_CONFIG_FILE (or `mcp-server start --config`)
+3. Environment variables, including those loaded from .env
+4. Command-line flags
+
+The merged settings are validated by the Pydantic models. See
+config/reload.py for reloading them while the server runs.
 """
+
 import os
-from typing import Dict, Any, Optional
+import tomllib
+from typing import Any, Callable, Dict, List, Literal, Mapping, Optional, Tuple, Type
 
 from dotenv import load_dotenv
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 
 # Load environment variables
 load_dotenv()
 
+# Environment variable naming the configuration file
+CONFIG_FILE_ENV = "MCP_CONFIG_FILE"
+
 
 class ServerConfig(BaseModel):
     """Server configuration model."""
+
     host: str = Field(default="0.0.0.0", description="Host to bind the server to")
     port: int = Field(default=8000, description="Port to bind the server to")
     debug: bool = Field(default=False, description="Enable debug mode")
+    workers: int = Field(
+        default=1, ge=1, description="Number of worker processes sharing the port"
+    )
+    graceful_timeout: int = Field(
+        default=30,
+        ge=0,
+        description="Seconds to let in-flight requests finish on shutdown or reload",
+    )
+    max_body_bytes: int = Field(
+        default=10485760,
+        ge=0,
+        description=(
+            "Largest tool-call request body accepted, in bytes (0 is unlimited)"
+        ),
+    )
 
 
 class LoggingConfig(BaseModel):
     """Logging configuration model."""
+
     level: str = Field(default="INFO", description="Log level")
     format: str = Field(
         default="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-        description="Log format"
+        description="Log format",
     )
     file_enabled: bool = Field(default=True, description="Enable logging to file")
     file_dir: str = Field(default="logs", description="Directory for log files")
+    async_enabled: bool = Field(
+        default=False, description="Write log records on a background thread"
+    )
+    queue_size: int = Field(
+        default=10000,
+        description="Maximum number of records buffered for the background writer",
+    )
+    overflow_policy: Literal["drop", "block"] = Field(
+        default="drop",
+        description=(
+            "What to do when the log buffer is full: drop the record or block the "
+            "caller"
+        ),
+    )
+    batch_size: int = Field(
+        default=256, description="Maximum number of records written per batch"
+    )
+    json_enabled: bool = Field(
+        default=False,
+        description="Write one JSON object per record instead of the text format",
+    )
+    sample_initial: int = Field(
+        default=0,
+        ge=0,
+        description=(
+            "Records of one message kept per sampling interval before sampling starts "
+            "(0 disables sampling)"
+        ),
+    )
+    sample_thereafter: int = Field(
+        default=100,
+        ge=0,
+        description=(
+            "Once sampling starts, one record of every N is kept (0 drops the rest)"
+        ),
+    )
+    sample_interval: float = Field(
+        default=1.0, gt=0, description="Seconds after which sampling starts over"
+    )
+    tool_levels: Dict[str, str] = Field(
+        default_factory=dict,
+        description="Log levels by tool name, for records logged while the tool runs",
+    )
+
+    @model_validator(mode="after")
+    def _check_tool_levels(self) -> "LoggingConfig":
+        self.tool_levels = {
+            tool: level.upper() for tool, level in self.tool_levels.items()
+        }
+        for tool, level in self.tool_levels.items():
+            if level not in ("DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"):
+                raise ValueError(f"Unknown log level {level!r} for tool {tool!r}")
+        return self
 
 
 class SecurityConfig(BaseModel):
     """Security configuration model."""
-    api_key_enabled: bool = Field(default=False, description="Enable API key authentication")
-    api_key: Optional[str] = Field(default=None, description="API key for authentication")
+
+    api_key_enabled: bool = Field(
+        default=False, description="Enable API key authentication"
+    )
+    api_key: Optional[str] = Field(
+        default=None, description="API key for authentication"
+    )
+    api_keys_file: Optional[str] = Field(
+        default=None, description="File of hashed API keys, reloaded when it changes"
+    )
+    api_key_header: str = Field(
+        default="x-api-key",
+        description="Header carrying the API key (bearer tokens are also accepted)",
+    )
+    api_keys_reload_interval: float = Field(
+        default=5.0,
+        description="Minimum seconds between checks of the key file for changes",
+    )
+    auth_exempt_paths: list[str] = Field(
+        default_factory=list, description="Paths served without authentication"
+    )
     cors_enabled: bool = Field(default=True, description="Enable CORS")
     cors_origins: list[str] = Field(default=["*"], description="Allowed CORS origins")
 
 
+class CacheConfig(BaseModel):
+    """Tool result cache configuration model."""
+
+    enabled: bool = Field(default=True, description="Enable caching of tool results")
+    max_size: int = Field(
+        default=1024, description="Maximum number of cached results per tool"
+    )
+    ttl_seconds: float = Field(
+        default=300.0,
+        description="Seconds a cached result stays valid (0 disables expiry)",
+    )
+
+
+class ExecutorConfig(BaseModel):
+    """Tool execution configuration model."""
+
+    max_threads: Optional[int] = Field(
+        default=None,
+        description="Thread pool size for sync tools (None uses the Python default)",
+    )
+    process_pool_enabled: bool = Field(
+        default=False, description="Run CPU-bound tools in a process pool"
+    )
+    max_processes: Optional[int] = Field(
+        default=None, description="Process pool size (None uses the CPU count)"
+    )
+    default_concurrency: Optional[int] = Field(
+        default=None,
+        description="Default per-tool concurrency limit (None is unlimited)",
+    )
+
+
+class RateLimitConfig(BaseModel):
+    """Rate limiting configuration model."""
+
+    enabled: bool = Field(
+        default=False, description="Enable rate limiting of tool calls"
+    )
+    requests_per_second: float = Field(
+        default=10.0, description="Tokens added to each client's bucket per second"
+    )
+    burst: float = Field(default=20.0, description="Capacity of each client's bucket")
+    tool_costs: Dict[str, float] = Field(
+        default_factory=dict,
+        description="Tokens charged per call, by tool name (default 1)",
+    )
+    tool_rates: Dict[str, float] = Field(
+        default_factory=dict,
+        description="Per-client calls per second allowed for individual tools",
+    )
+    max_clients: int = Field(
+        default=100000, description="Maximum number of client buckets kept in memory"
+    )
+    api_key_header: str = Field(
+        default="x-api-key", description="Header identifying the client"
+    )
+
+
+class MetricsConfig(BaseModel):
+    """Metrics configuration model."""
+
+    enabled: bool = Field(
+        default=True, description="Record tool metrics and expose them over HTTP"
+    )
+    path: str = Field(
+        default="/metrics", description="HTTP route serving Prometheus metrics"
+    )
+    argument_sample_rate: float = Field(
+        default=0.1,
+        ge=0,
+        le=1,
+        description=(
+            "Share of tool calls whose argument size is measured, which serializes the "
+            "arguments again"
+        ),
+    )
+
+
+class TracingConfig(BaseModel):
+    """Request tracing configuration model."""
+
+    enabled: bool = Field(
+        default=True, description="Record spans for sampled tool calls"
+    )
+    sample_rate: float = Field(
+        default=0.01,
+        ge=0,
+        le=1,
+        description=(
+            "Share of tool calls traced; a traceparent header from the client "
+            "overrides it"
+        ),
+    )
+    slow_threshold_ms: float = Field(
+        default=1000.0,
+        ge=0,
+        description=(
+            "Calls slower than this are recorded even when not sampled, without their "
+            "phases (0 disables)"
+        ),
+    )
+    buffer_size: int = Field(
+        default=1000, ge=1, description="Traces kept in memory for the traces route"
+    )
+    path: str = Field(
+        default="/debug/traces", description="HTTP route serving recent traces"
+    )
+    admin_keys: List[str] = Field(
+        default_factory=list,
+        description=(
+            "API key ids allowed to read traces (empty allows loopback clients only)"
+        ),
+    )
+    exporter: Literal["none", "file", "otlp"] = Field(
+        default="none", description="Where finished spans are exported"
+    )
+    file_path: str = Field(
+        default="logs/traces.jsonl",
+        description="File the file exporter appends spans to, one JSON object per line",
+    )
+    otlp_endpoint: str = Field(
+        default="http://localhost:4318/v1/traces",
+        description="OTLP/HTTP endpoint of the otlp exporter",
+    )
+    export_interval: float = Field(
+        default=5.0, gt=0, description="Seconds between exports"
+    )
+
+
+class ProfilingConfig(BaseModel):
+    """On-demand profiling configuration model."""
+
+    enabled: bool = Field(default=False, description="Serve the admin profiling route")
+    path: str = Field(
+        default="/debug/profile",
+        description="HTTP route starting and stopping profiles",
+    )
+    admin_keys: List[str] = Field(
+        default_factory=list,
+        description=(
+            "API key ids allowed to profile (empty allows loopback clients only)"
+        ),
+    )
+    max_duration: float = Field(
+        default=60.0, gt=0, description="Longest profiling window, in seconds"
+    )
+    sample_interval: float = Field(
+        default=0.005, gt=0, description="Seconds between CPU stack samples"
+    )
+    memory_frames: int = Field(
+        default=16, ge=1, description="Stack frames tracemalloc keeps per allocation"
+    )
+    top_allocators: int = Field(
+        default=25, ge=1, description="Allocation sites reported"
+    )
+
+
+class HealthConfig(BaseModel):
+    """Health endpoint configuration model."""
+
+    enabled: bool = Field(
+        default=True, description="Serve the liveness and readiness endpoints"
+    )
+    liveness_path: str = Field(
+        default="/healthz", description="HTTP route of the liveness probe"
+    )
+    readiness_path: str = Field(
+        default="/readyz", description="HTTP route of the readiness probe"
+    )
+    cache_ttl: float = Field(
+        default=1.0, ge=0, description="Seconds a readiness result is reused"
+    )
+    check_timeout: float = Field(
+        default=2.0, gt=0, description="Seconds a readiness check may take"
+    )
+    max_executor_queue_depth: int = Field(
+        default=0,
+        ge=0,
+        description=(
+            "Offloaded calls waiting for a slot above which the server is not ready (0 "
+            "disables the check)"
+        ),
+    )
+
+
+class ResourceConfig(BaseModel):
+    """Resource monitoring and load shedding configuration model."""
+
+    enabled: bool = Field(
+        default=True, description="Sample resource usage in the background"
+    )
+    sample_interval: float = Field(
+        default=1.0, gt=0, description="Seconds between resource samples"
+    )
+    log_interval: float = Field(
+        default=60.0,
+        ge=0,
+        description="Seconds between resource usage log lines (0 disables them)",
+    )
+    max_rss_mb: float = Field(
+        default=0,
+        ge=0,
+        description=(
+            "Resident memory, in MiB, above which tool calls are shed (0 disables)"
+        ),
+    )
+    max_cpu_percent: float = Field(
+        default=0,
+        ge=0,
+        description="Process CPU usage above which tool calls are shed (0 disables)",
+    )
+    max_open_fds: int = Field(
+        default=0,
+        ge=0,
+        description=(
+            "Open file descriptors above which tool calls are shed (0 disables)"
+        ),
+    )
+    max_event_loop_lag_ms: float = Field(
+        default=0,
+        ge=0,
+        description=(
+            "Event-loop lag, in milliseconds, above which tool calls are shed (0 "
+            "disables)"
+        ),
+    )
+    max_in_flight_calls: int = Field(
+        default=0,
+        ge=0,
+        description="Running tool calls above which new ones are shed (0 disables)",
+    )
+    retry_after: int = Field(
+        default=1,
+        ge=1,
+        description="Seconds shed clients are told to wait before retrying",
+    )
+
+
+class SessionConfig(BaseModel):
+    """Streamable-HTTP session store configuration model."""
+
+    enabled: bool = Field(
+        default=True, description="Bound and expire streamable-HTTP sessions"
+    )
+    max_sessions: int = Field(
+        default=10000,
+        ge=1,
+        description=(
+            "Sessions kept per process before the least recently used is closed"
+        ),
+    )
+    idle_ttl: float = Field(
+        default=1800.0,
+        gt=0,
+        description="Seconds a session may stay idle before it is closed",
+    )
+    sweep_interval: float = Field(
+        default=30.0,
+        gt=0,
+        description="Minimum seconds between sweeps for idle sessions",
+    )
+    backend: Literal["memory", "sqlite"] = Field(
+        default="memory",
+        description=(
+            "Session store; sqlite lets workers on one host resume each other's "
+            "sessions"
+        ),
+    )
+    sqlite_path: str = Field(
+        default=".mcp_server/sessions.db",
+        description="Database file of the sqlite session store",
+    )
+
+
+class IdempotencyConfig(BaseModel):
+    """Idempotent tool call configuration model."""
+
+    enabled: bool = Field(
+        default=True, description="Deduplicate tool calls carrying an idempotency key"
+    )
+    ttl: float = Field(
+        default=300.0,
+        gt=0,
+        description="Seconds a completed call's result is replayed to retries",
+    )
+    max_entries: int = Field(
+        default=10000,
+        ge=1,
+        description="Results kept by the in-memory store before the oldest is dropped",
+    )
+    backend: Literal["memory", "sqlite"] = Field(
+        default="memory",
+        description="Result store; sqlite deduplicates across the workers of one host",
+    )
+    sqlite_path: str = Field(
+        default=".mcp_server/idempotency.db",
+        description="Database file of the sqlite store",
+    )
+    lease: float = Field(
+        default=60.0,
+        gt=0,
+        description=(
+            "Seconds a call in flight on another worker is waited for before it is "
+            "presumed lost"
+        ),
+    )
+
+
+class SchedulingConfig(BaseModel):
+    """Tool call scheduling configuration model."""
+
+    enabled: bool = Field(
+        default=False, description="Admit tool calls through the priority scheduler"
+    )
+    max_concurrency: int = Field(
+        default=64,
+        ge=1,
+        description="Tool calls running at once; further calls wait in the queue",
+    )
+    max_queue: int = Field(
+        default=1000,
+        ge=0,
+        description="Calls waiting to run before new calls are rejected",
+    )
+    queue_timeout: float = Field(
+        default=30.0,
+        ge=0,
+        description=(
+            "Seconds a call may wait to run before it is dropped (0 waits indefinitely)"
+        ),
+    )
+    class_weights: Dict[str, float] = Field(
+        default_factory=lambda: {"interactive": 8.0, "default": 4.0, "background": 1.0},
+        description=(
+            "Share of the queue each priority class is served, relative to the others"
+        ),
+    )
+    default_class: str = Field(
+        default="default", description="Priority class of tools that do not declare one"
+    )
+    tool_classes: Dict[str, str] = Field(
+        default_factory=dict,
+        description="Priority classes by tool name, overriding the declared ones",
+    )
+
+    @model_validator(mode="after")
+    def _check_classes(self) -> "SchedulingConfig":
+        for name, weight in self.class_weights.items():
+            if weight <= 0:
+                raise ValueError(f"Weight of priority class {name!r} must be positive")
+        for priority_class in [self.default_class, *self.tool_classes.values()]:
+            if priority_class not in self.class_weights:
+                raise ValueError(f"Unknown priority class {priority_class!r}")
+        return self
+
+
+class TimeoutConfig(BaseModel):
+    """Tool call timeout and cancellation configuration model."""
+
+    enabled: bool = Field(
+        default=False,
+        description="Bound how long tool calls run and cancel abandoned calls",
+    )
+    default_timeout: float = Field(
+        default=300.0, ge=0, description="Seconds a tool call may run (0 is unbounded)"
+    )
+    tool_timeouts: Dict[str, float] = Field(
+        default_factory=dict,
+        description="Seconds each named tool may run, overriding the declared timeouts",
+    )
+    cancel_on_disconnect: bool = Field(
+        default=True, description="Cancel tool calls whose HTTP client went away"
+    )
+
+
+class RecordingConfig(BaseModel):
+    """Tool call recording configuration model."""
+
+    enabled: bool = Field(
+        default=False,
+        description="Record tool calls for replay with `mcp-server replay`",
+    )
+    path: str = Field(
+        default="recordings/calls.jsonl",
+        description="File the calls are appended to, one JSON object per line",
+    )
+    sample_rate: float = Field(
+        default=1.0, ge=0, le=1, description="Share of tool calls recorded"
+    )
+    tools: Optional[List[str]] = Field(
+        default=None,
+        description="Tools whose calls are recorded (None records every tool)",
+    )
+    flush_interval: float = Field(
+        default=1.0, gt=0, description="Seconds between writes of the recorded calls"
+    )
+    max_pending: int = Field(
+        default=10000,
+        ge=1,
+        description=(
+            "Recorded calls buffered between writes; calls beyond it are not recorded"
+        ),
+    )
+
+
+class PoolConfig(BaseModel):
+    """Connection pool configuration model."""
+
+    enabled: bool = Field(
+        default=True, description="Start and stop tool connection pools with the server"
+    )
+    min_size: int = Field(
+        default=0,
+        ge=0,
+        description="Connections opened at startup and kept open, per pool",
+    )
+    max_size: int = Field(default=10, ge=1, description="Maximum connections per pool")
+    max_sizes: Dict[str, int] = Field(
+        default_factory=dict,
+        description="Maximum connections of individual pools, by pool name",
+    )
+    idle_timeout: float = Field(
+        default=300.0,
+        gt=0,
+        description="Seconds an unused connection above min_size is kept open",
+    )
+    acquire_timeout: float = Field(
+        default=10.0, gt=0, description="Seconds a tool waits for a free connection"
+    )
+    reap_interval: float = Field(
+        default=30.0, gt=0, description="Seconds between checks for idle connections"
+    )
+
+
+class BatchConfig(BaseModel):
+    """Batched tool-call endpoint configuration model."""
+
+    enabled: bool = Field(
+        default=True, description="Serve the batched tool-call endpoint"
+    )
+    path: str = Field(
+        default="/batch", description="HTTP route accepting batches of tool calls"
+    )
+    max_concurrency: int = Field(
+        default=16, ge=1, description="Maximum calls of one batch running at once"
+    )
+    max_calls: int = Field(
+        default=1000, ge=1, description="Maximum number of calls in one batch"
+    )
+
+
+class CompressionConfig(BaseModel):
+    """HTTP response compression configuration model."""
+
+    enabled: bool = Field(
+        default=True, description="Compress responses for clients that accept it"
+    )
+    minimum_size: int = Field(
+        default=1024, description="Smallest response body compressed, in bytes"
+    )
+    gzip_level: int = Field(default=6, ge=1, le=9, description="gzip compression level")
+    zstd_level: int = Field(
+        default=3,
+        ge=1,
+        le=22,
+        description="zstd compression level (needs the zstandard package)",
+    )
+
+
+class StreamingConfig(BaseModel):
+    """Streaming tool result configuration model."""
+
+    max_result_bytes: int = Field(
+        default=10485760,
+        description=(
+            "Largest aggregated result of a streaming tool, in bytes (0 is unlimited)"
+        ),
+    )
+
+
+class SerializationConfig(BaseModel):
+    """JSON serialization configuration model."""
+
+    backend: Literal["auto", "orjson", "msgspec", "stdlib", "pydantic"] = Field(
+        default="auto",
+        description="JSON backend (auto picks orjson, msgspec, then stdlib)",
+    )
+
+
+class PluginConfig(BaseModel):
+    """Tool plugin configuration model."""
+
+    enabled: bool = Field(default=True, description="Load tools from installed plugins")
+    entry_point_group: str = Field(
+        default="mcp_server.tools",
+        description="Entry point group plugins register under",
+    )
+    manifest_path: str = Field(
+        default=".mcp_server/plugins.json",
+        description="File caching the discovered plugins and their tool schemas",
+    )
+    allow: Optional[List[str]] = Field(
+        default=None,
+        description="Plugins to load (None loads every plugin not disabled)",
+    )
+    disabled: List[str] = Field(
+        default_factory=list, description="Plugins never to load"
+    )
+
+
 class AppConfig(BaseModel):
     """Main application configuration model."""
+
     app_name: str = Field(default="mcp_server", description="Application name")
-    server: ServerConfig = Field(default_factory=ServerConfig, description="Server configuration")
-    logging: LoggingConfig = Field(default_factory=LoggingConfig, description="Logging configuration")
-    security: SecurityConfig = Field(default_factory=SecurityConfig, description="Security configuration")
+    config_reload_interval: float = Field(
+        default=2.0,
+        ge=0,
+        description=(
+            "Seconds between checks of the configuration file for changes (0 disables "
+            "reloading)"
+        ),
+    )
+    server: ServerConfig = Field(
+        default_factory=ServerConfig, description="Server configuration"
+    )
+    logging: LoggingConfig = Field(
+        default_factory=LoggingConfig, description="Logging configuration"
+    )
+    security: SecurityConfig = Field(
+        default_factory=SecurityConfig, description="Security configuration"
+    )
+    cache: CacheConfig = Field(
+        default_factory=CacheConfig, description="Tool result cache configuration"
+    )
+    executor: ExecutorConfig = Field(
+        default_factory=ExecutorConfig, description="Tool execution configuration"
+    )
+    rate_limit: RateLimitConfig = Field(
+        default_factory=RateLimitConfig, description="Rate limiting configuration"
+    )
+    metrics: MetricsConfig = Field(
+        default_factory=MetricsConfig, description="Metrics configuration"
+    )
+    health: HealthConfig = Field(
+        default_factory=HealthConfig, description="Health endpoint configuration"
+    )
+    tracing: TracingConfig = Field(
+        default_factory=TracingConfig, description="Request tracing configuration"
+    )
+    profiling: ProfilingConfig = Field(
+        default_factory=ProfilingConfig, description="On-demand profiling configuration"
+    )
+    sessions: SessionConfig = Field(
+        default_factory=SessionConfig,
+        description="Streamable-HTTP session store configuration",
+    )
+    resources: ResourceConfig = Field(
+        default_factory=ResourceConfig,
+        description="Resource monitoring and load shedding configuration",
+    )
+    idempotency: IdempotencyConfig = Field(
+        default_factory=IdempotencyConfig,
+        description="Idempotent tool call configuration",
+    )
+    scheduling: SchedulingConfig = Field(
+        default_factory=SchedulingConfig,
+        description="Tool call scheduling configuration",
+    )
+    timeouts: TimeoutConfig = Field(
+        default_factory=TimeoutConfig,
+        description="Tool call timeout and cancellation configuration",
+    )
+    recording: RecordingConfig = Field(
+        default_factory=RecordingConfig, description="Tool call recording configuration"
+    )
+    pools: PoolConfig = Field(
+        default_factory=PoolConfig, description="Connection pool configuration"
+    )
+    plugins: PluginConfig = Field(
+        default_factory=PluginConfig, description="Tool plugin configuration"
+    )
+    batch: BatchConfig = Field(
+        default_factory=BatchConfig,
+        description="Batched tool-call endpoint configuration",
+    )
+    compression: CompressionConfig = Field(
+        default_factory=CompressionConfig,
+        description="Response compression configuration",
+    )
+    streaming: StreamingConfig = Field(
+        default_factory=StreamingConfig,
+        description="Streaming tool result configuration",
+    )
+    serialization: SerializationConfig = Field(
+        default_factory=SerializationConfig,
+        description="JSON serialization configuration",
+    )
 
 
-def load_config() -> AppConfig:
+def _parse_float_mapping(value: str) -> Dict[str, float]:
     """
-    Load configuration from environment variables.
+    Parse a "name:value,name:value" mapping from an environment variable.
+
+    Args:
+        value: The raw environment variable value
 
     Returns:
-        AppConfig: Application configuration
+        Dict[str, float]: The parsed mapping
     """
-    # Server configuration
-    server_config = ServerConfig(
-        host=os.getenv("HOST", "0.0.0.0"),
-        port=int(os.getenv("PORT", "8000")),
-        debug=os.getenv("DEBUG", "").lower() == "true",
-    )
+    mapping = {}
+    for item in value.split(","):
+        name, sep, number = item.rpartition(":")
+        if sep and name.strip():
+            mapping[name.strip()] = float(number)
+    return mapping
 
-    # Logging configuration
-    logging_config = LoggingConfig(
-        level=os.getenv("LOG_LEVEL", "INFO"),
-        format=os.getenv("LOG_FORMAT", "%(asctime)s - %(name)s - %(levelname)s - %(message)s"),
-        file_enabled=os.getenv("LOG_FILE_ENABLED", "true").lower() == "true",
-        file_dir=os.getenv("LOG_FILE_DIR", "logs"),
-    )
 
-    # Security configuration
-    security_config = SecurityConfig(
-        api_key_enabled=os.getenv("API_KEY_ENABLED", "").lower() == "true",
-        api_key=os.getenv("API_KEY"),
-        cors_enabled=os.getenv("CORS_ENABLED", "true").lower() == "true",
-        cors_origins=os.getenv("CORS_ORIGINS", "*").split(","),
-    )
+def _parse_list(value: str) -> List[str]:
+    """
+    Parse a comma-separated list from an environment variable.
 
-    # Main application configuration
-    app_config = AppConfig(
-        app_name=os.getenv("APP_NAME", "mcp_server"),
-        server=server_config,
-        logging=logging_config,
-        security=security_config,
-    )
+    Args:
+        value: The raw environment variable value
+
+    Returns:
+        List[str]: The non-empty items
+    """
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+def _parse_bool(value: str) -> bool:
+    """Parse an environment variable that is true only when set to "true"."""
+    return value.lower() == "true"
+
+
+def _parse_lower(value: str) -> str:
+    """Parse a case-insensitive choice from an environment variable."""
+    return value.lower()
+
+
+def _parse_optional_int(value: str) -> Optional[int]:
+    """Parse an environment variable where 0 means unset."""
+    return int(value) or None
+
+
+def _parse_int_mapping(value: str) -> Dict[str, int]:
+    """
+    Parse a "name:value,name:value" mapping of integers from an environment variable.
+    """
+    return {name: int(number) for name, number in _parse_float_mapping(value).items()}
+
+
+def _parse_str_mapping(value: str) -> Dict[str, str]:
+    """
+    Parse a "name:value,name:value" mapping of strings from an environment variable.
+    """
+    mapping = {}
+    for item in value.split(","):
+        name, sep, text = item.rpartition(":")
+        if sep and name.strip():
+            mapping[name.strip()] = text.strip()
+    return mapping
+
+
+def _parse_split(value: str) -> List[str]:
+    """Split a comma-separated environment variable without trimming the items."""
+    return value.split(",")
+
+
+# Environment variables, as (variable, section, field, parser); "" is the top level
+ENV_VARS: List[Tuple[str, str, str, Callable[[str], Any]]] = [
+    ("APP_NAME", "", "app_name", str),
+    ("CONFIG_RELOAD_INTERVAL", "", "config_reload_interval", float),
+    # Server
+    ("HOST", "server", "host", str),
+    ("PORT", "server", "port", int),
+    ("DEBUG", "server", "debug", _parse_bool),
+    ("WORKERS", "server", "workers", int),
+    ("GRACEFUL_TIMEOUT", "server", "graceful_timeout", int),
+    ("MAX_BODY_BYTES", "server", "max_body_bytes", int),
+    # Logging
+    ("LOG_LEVEL", "logging", "level", str),
+    ("LOG_FORMAT", "logging", "format", str),
+    ("LOG_FILE_ENABLED", "logging", "file_enabled", _parse_bool),
+    ("LOG_FILE_DIR", "logging", "file_dir", str),
+    ("LOG_ASYNC_ENABLED", "logging", "async_enabled", _parse_bool),
+    ("LOG_QUEUE_SIZE", "logging", "queue_size", int),
+    ("LOG_OVERFLOW_POLICY", "logging", "overflow_policy", _parse_lower),
+    ("LOG_BATCH_SIZE", "logging", "batch_size", int),
+    ("LOG_JSON", "logging", "json_enabled", _parse_bool),
+    ("LOG_SAMPLE_INITIAL", "logging", "sample_initial", int),
+    ("LOG_SAMPLE_THEREAFTER", "logging", "sample_thereafter", int),
+    ("LOG_SAMPLE_INTERVAL", "logging", "sample_interval", float),
+    ("LOG_TOOL_LEVELS", "logging", "tool_levels", _parse_str_mapping),
+    # Security
+    ("API_KEY_ENABLED", "security", "api_key_enabled", _parse_bool),
+    ("API_KEY", "security", "api_key", str),
+    ("API_KEYS_FILE", "security", "api_keys_file", str),
+    ("API_KEY_HEADER", "security", "api_key_header", str),
+    ("API_KEYS_RELOAD_INTERVAL", "security", "api_keys_reload_interval", float),
+    ("AUTH_EXEMPT_PATHS", "security", "auth_exempt_paths", _parse_list),
+    ("CORS_ENABLED", "security", "cors_enabled", _parse_bool),
+    ("CORS_ORIGINS", "security", "cors_origins", _parse_split),
+    # Cache
+    ("CACHE_ENABLED", "cache", "enabled", _parse_bool),
+    ("CACHE_MAX_SIZE", "cache", "max_size", int),
+    ("CACHE_TTL_SECONDS", "cache", "ttl_seconds", float),
+    # Executor
+    ("EXECUTOR_MAX_THREADS", "executor", "max_threads", _parse_optional_int),
+    ("EXECUTOR_PROCESS_POOL_ENABLED", "executor", "process_pool_enabled", _parse_bool),
+    ("EXECUTOR_MAX_PROCESSES", "executor", "max_processes", _parse_optional_int),
+    (
+        "EXECUTOR_DEFAULT_CONCURRENCY",
+        "executor",
+        "default_concurrency",
+        _parse_optional_int,
+    ),
+    # Rate limiting
+    ("RATE_LIMIT_ENABLED", "rate_limit", "enabled", _parse_bool),
+    ("RATE_LIMIT_REQUESTS_PER_SECOND", "rate_limit", "requests_per_second", float),
+    ("RATE_LIMIT_BURST", "rate_limit", "burst", float),
+    ("RATE_LIMIT_TOOL_COSTS", "rate_limit", "tool_costs", _parse_float_mapping),
+    ("RATE_LIMIT_TOOL_RATES", "rate_limit", "tool_rates", _parse_float_mapping),
+    ("RATE_LIMIT_MAX_CLIENTS", "rate_limit", "max_clients", int),
+    ("API_KEY_HEADER", "rate_limit", "api_key_header", str),
+    # Metrics
+    ("METRICS_ENABLED", "metrics", "enabled", _parse_bool),
+    ("METRICS_PATH", "metrics", "path", str),
+    ("METRICS_ARGUMENT_SAMPLE_RATE", "metrics", "argument_sample_rate", float),
+    # Health endpoints
+    ("HEALTH_ENABLED", "health", "enabled", _parse_bool),
+    ("HEALTH_LIVENESS_PATH", "health", "liveness_path", str),
+    ("HEALTH_READINESS_PATH", "health", "readiness_path", str),
+    ("HEALTH_CACHE_TTL", "health", "cache_ttl", float),
+    ("HEALTH_CHECK_TIMEOUT", "health", "check_timeout", float),
+    ("HEALTH_MAX_EXECUTOR_QUEUE_DEPTH", "health", "max_executor_queue_depth", int),
+    # Tracing
+    ("TRACING_ENABLED", "tracing", "enabled", _parse_bool),
+    ("TRACING_SAMPLE_RATE", "tracing", "sample_rate", float),
+    ("TRACING_SLOW_THRESHOLD_MS", "tracing", "slow_threshold_ms", float),
+    ("TRACING_BUFFER_SIZE", "tracing", "buffer_size", int),
+    ("TRACING_PATH", "tracing", "path", str),
+    ("TRACING_ADMIN_KEYS", "tracing", "admin_keys", _parse_list),
+    ("TRACING_EXPORTER", "tracing", "exporter", _parse_lower),
+    ("TRACING_FILE_PATH", "tracing", "file_path", str),
+    ("TRACING_OTLP_ENDPOINT", "tracing", "otlp_endpoint", str),
+    ("TRACING_EXPORT_INTERVAL", "tracing", "export_interval", float),
+    # Profiling
+    ("PROFILING_ENABLED", "profiling", "enabled", _parse_bool),
+    ("PROFILING_PATH", "profiling", "path", str),
+    ("PROFILING_ADMIN_KEYS", "profiling", "admin_keys", _parse_list),
+    ("PROFILING_MAX_DURATION", "profiling", "max_duration", float),
+    ("PROFILING_SAMPLE_INTERVAL", "profiling", "sample_interval", float),
+    ("PROFILING_MEMORY_FRAMES", "profiling", "memory_frames", int),
+    ("PROFILING_TOP_ALLOCATORS", "profiling", "top_allocators", int),
+    # Resource monitoring
+    ("RESOURCE_MONITOR_ENABLED", "resources", "enabled", _parse_bool),
+    ("RESOURCE_SAMPLE_INTERVAL", "resources", "sample_interval", float),
+    ("RESOURCE_LOG_INTERVAL", "resources", "log_interval", float),
+    ("RESOURCE_MAX_RSS_MB", "resources", "max_rss_mb", float),
+    ("RESOURCE_MAX_CPU_PERCENT", "resources", "max_cpu_percent", float),
+    ("RESOURCE_MAX_OPEN_FDS", "resources", "max_open_fds", int),
+    ("RESOURCE_MAX_EVENT_LOOP_LAG_MS", "resources", "max_event_loop_lag_ms", float),
+    ("RESOURCE_MAX_IN_FLIGHT_CALLS", "resources", "max_in_flight_calls", int),
+    ("RESOURCE_RETRY_AFTER", "resources", "retry_after", int),
+    # Session store
+    ("SESSIONS_ENABLED", "sessions", "enabled", _parse_bool),
+    ("SESSIONS_MAX", "sessions", "max_sessions", int),
+    ("SESSIONS_IDLE_TTL", "sessions", "idle_ttl", float),
+    ("SESSIONS_SWEEP_INTERVAL", "sessions", "sweep_interval", float),
+    ("SESSIONS_BACKEND", "sessions", "backend", _parse_lower),
+    ("SESSIONS_SQLITE_PATH", "sessions", "sqlite_path", str),
+    # Idempotency keys
+    ("IDEMPOTENCY_ENABLED", "idempotency", "enabled", _parse_bool),
+    ("IDEMPOTENCY_TTL", "idempotency", "ttl", float),
+    ("IDEMPOTENCY_MAX_ENTRIES", "idempotency", "max_entries", int),
+    ("IDEMPOTENCY_BACKEND", "idempotency", "backend", _parse_lower),
+    ("IDEMPOTENCY_SQLITE_PATH", "idempotency", "sqlite_path", str),
+    ("IDEMPOTENCY_LEASE", "idempotency", "lease", float),
+    # Scheduling
+    ("SCHEDULING_ENABLED", "scheduling", "enabled", _parse_bool),
+    ("SCHEDULING_MAX_CONCURRENCY", "scheduling", "max_concurrency", int),
+    ("SCHEDULING_MAX_QUEUE", "scheduling", "max_queue", int),
+    ("SCHEDULING_QUEUE_TIMEOUT", "scheduling", "queue_timeout", float),
+    ("SCHEDULING_CLASS_WEIGHTS", "scheduling", "class_weights", _parse_float_mapping),
+    ("SCHEDULING_DEFAULT_CLASS", "scheduling", "default_class", str),
+    ("SCHEDULING_TOOL_CLASSES", "scheduling", "tool_classes", _parse_str_mapping),
+    # Timeouts
+    ("TIMEOUTS_ENABLED", "timeouts", "enabled", _parse_bool),
+    ("TOOL_TIMEOUT", "timeouts", "default_timeout", float),
+    ("TOOL_TIMEOUTS", "timeouts", "tool_timeouts", _parse_float_mapping),
+    ("CANCEL_ON_DISCONNECT", "timeouts", "cancel_on_disconnect", _parse_bool),
+    # Recording
+    ("RECORDING_ENABLED", "recording", "enabled", _parse_bool),
+    ("RECORDING_PATH", "recording", "path", str),
+    ("RECORDING_SAMPLE_RATE", "recording", "sample_rate", float),
+    ("RECORDING_TOOLS", "recording", "tools", _parse_list),
+    ("RECORDING_FLUSH_INTERVAL", "recording", "flush_interval", float),
+    ("RECORDING_MAX_PENDING", "recording", "max_pending", int),
+    # Connection pools
+    ("POOLS_ENABLED", "pools", "enabled", _parse_bool),
+    ("POOL_MIN_SIZE", "pools", "min_size", int),
+    ("POOL_MAX_SIZE", "pools", "max_size", int),
+    ("POOL_MAX_SIZES", "pools", "max_sizes", _parse_int_mapping),
+    ("POOL_IDLE_TIMEOUT", "pools", "idle_timeout", float),
+    ("POOL_ACQUIRE_TIMEOUT", "pools", "acquire_timeout", float),
+    ("POOL_REAP_INTERVAL", "pools", "reap_interval", float),
+    # Plugins
+    ("PLUGINS_ENABLED", "plugins", "enabled", _parse_bool),
+    ("PLUGINS_ENTRY_POINT_GROUP", "plugins", "entry_point_group", str),
+    ("PLUGINS_MANIFEST_PATH", "plugins", "manifest_path", str),
+    ("PLUGINS_ALLOW", "plugins", "allow", _parse_list),
+    ("PLUGINS_DISABLED", "plugins", "disabled", _parse_list),
+    # Batch endpoint
+    ("BATCH_ENABLED", "batch", "enabled", _parse_bool),
+    ("BATCH_PATH", "batch", "path", str),
+    ("BATCH_MAX_CONCURRENCY", "batch", "max_concurrency", int),
+    ("BATCH_MAX_CALLS", "batch", "max_calls", int),
+    # Compression
+    ("COMPRESSION_ENABLED", "compression", "enabled", _parse_bool),
+    ("COMPRESSION_MINIMUM_SIZE", "compression", "minimum_size", int),
+    ("COMPRESSION_GZIP_LEVEL", "compression", "gzip_level", int),
+    ("COMPRESSION_ZSTD_LEVEL", "compression", "zstd_level", int),
+    # Streaming
+    ("STREAMING_MAX_RESULT_BYTES", "streaming", "max_result_bytes", int),
+    # Serialization
+    ("JSON_BACKEND", "serialization", "backend", _parse_lower),
+]
+
+
+def read_config_file(path: str) -> Dict[str, Any]:
+    """
+    Read a TOML or YAML configuration file.
 
-    return app_config
+    The file holds one table per configuration section, named like the
+    AppConfig fields, for example [logging] or [rate_limit]. Unknown sections
+    and fields are rejected, so typos do not go unnoticed.
+
+    Args:
+        path: Path of a .toml, .yaml or .yml file
+
+    Returns:
+        Dict[str, Any]: The settings in the file, by section
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".toml":
+        with open(path, "rb") as f:
+            data = tomllib.load(f)
+    elif extension in (".yaml", ".yml"):
+        try:
+            import yaml
+        except ImportError:
+            raise ValueError(f"Reading {path} needs the pyyaml package") from None
+        with open(path) as f:
+            try:
+                data = yaml.safe_load(f) or {}
+            except yaml.YAMLError as e:
+                raise ValueError(f"Invalid YAML in {path}: {e}") from e
+    else:
+        raise ValueError(
+            f"Unsupported configuration file {path!r}, expected .toml, .yaml or .yml"
+        )
+    if not isinstance(data, dict):
+        raise ValueError(f"Configuration file {path} must hold a mapping of sections")
+    _check_fields(data, AppConfig, path)
+    return data
+
+
+def _check_fields(data: Dict[str, Any], model: Type[BaseModel], where: str) -> None:
+    """
+    Reject keys that are not fields of a configuration model, recursing into sections.
+    """
+    for key, value in data.items():
+        field = model.model_fields.get(key)
+        if field is None:
+            raise ValueError(f"Unknown configuration setting {key!r} in {where}")
+        annotation = field.annotation
+        if (
+            isinstance(value, dict)
+            and isinstance(annotation, type)
+            and issubclass(annotation, BaseModel)
+        ):
+            _check_fields(value, annotation, f"{where} [{key}]")
+
+
+def read_env(environ: Optional[Mapping[str, str]] = None) -> Dict[str, Any]:
+    """
+    Collect the settings given by environment variables.
+
+    Only variables that are set are included, so the layers below them keep
+    their values for the others.
+
+    Args:
+        environ: Environment to read. Defaults to os.environ
+
+    Returns:
+        Dict[str, Any]: The parsed settings, by section
+    """
+    environ = os.environ if environ is None else environ
+    settings: Dict[str, Any] = {}
+    for variable, section, field, parse in ENV_VARS:
+        value = environ.get(variable)
+        if value is None:
+            continue
+        target = settings.setdefault(section, {}) if section else settings
+        target[field] = parse(value)
+    return settings
+
+
+def merge_settings(*layers: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Merge layers of settings, later layers taking precedence.
+
+    Sections are merged field by field; any other value is replaced.
+
+    Args:
+        layers: Settings by section, from the lowest to the highest precedence
+
+    Returns:
+        Dict[str, Any]: The merged settings
+    """
+    merged: Dict[str, Any] = {}
+    for layer in layers:
+        for key, value in layer.items():
+            if (
+                isinstance(value, dict)
+                and isinstance(merged.get(key), dict)
+                and key in AppConfig.model_fields
+            ):
+                merged[key] = {**merged[key], **value}
+            else:
+                merged[key] = value
+    return merged
+
+
+def load_config(
+    config_file: Optional[str] = None, overrides: Optional[Dict[str, Any]] = None
+) -> AppConfig:
+    """
+    Load configuration from its layers.
+
+    Each layer takes precedence over the previous one: the model defaults,
+    the configuration file, environment variables, then the overrides given
+    by the caller, such as command-line flags.
+
+    Args:
+        config_file: TOML or YAML configuration file. Defaults to the MCP_CONFIG_FILE
+            environment variable
+        overrides: Settings by section taking precedence over every other layer
+
+    Returns:
+        AppConfig: Application configuration
+    """
+    config_file = config_file or os.getenv(CONFIG_FILE_ENV)
+    layers = [read_config_file(config_file)] if config_file else []
+    layers.append(read_env())
+    if overrides:
+        layers.append(overrides)
+    return AppConfig.model_validate(merge_settings(*layers))
 
 
 # Create a global config instance
@@ -0,0 +1,214 @@
+"""
+Reloading the configuration while the server runs.
+
+ConfigManager holds the current configuration snapshot. When a configuration
+file is in use, the manager watches it. After a change it loads every layer
+again and validates the result. Then it swaps in the new snapshot as a whole.
+Components that can apply new settings while running subscribe to their
+section:
+
+    manager.subscribe(limiter.configure, section="rate_limit")
+
+Subscribers receive the new section. Calls already running keep the
+settings they started with. A file that fails to parse or validate is
+logged, and the current snapshot stays in place. Changed sections that have
+no subscriber, such as the listening port, take effect at the next restart.
+"""
+
+import asyncio
+import logging
+import os
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from src.mcp_server.config.config import CONFIG_FILE_ENV, AppConfig, config, load_config
+
+logger = logging.getLogger(config.app_name)
+
+# Receives the new section, or the whole configuration when subscribed to every change
+ConfigSubscriber = Callable[[Any], None]
+
+
+class ConfigManager:
+    """
+    Current configuration snapshot, reloaded when the configuration file changes.
+    """
+
+    def __init__(
+        self,
+        current: Optional[AppConfig] = None,
+        config_file: Optional[str] = None,
+        overrides: Optional[Dict[str, Any]] = None,
+        reload_interval: Optional[float] = None,
+    ):
+        """
+        Args:
+            current: The configuration in use. Defaults to loading it
+            config_file: Configuration file to watch. Defaults to the MCP_CONFIG_FILE
+                environment variable
+            overrides: Settings taking precedence over the file and the environment,
+                such as CLI flags
+            reload_interval: Seconds between checks of the file. Defaults to the
+                configured interval
+        """
+        self.config_file = config_file or os.getenv(CONFIG_FILE_ENV)
+        self.overrides = overrides
+        self._current = current or load_config(self.config_file, overrides)
+        self.reload_interval = (
+            self._current.config_reload_interval
+            if reload_interval is None
+            else reload_interval
+        )
+        self.reloads = 0
+        self.failures = 0
+        self._subscribers: List[Tuple[Optional[str], ConfigSubscriber]] = []
+        self._file_mtime = self._mtime()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def current(self) -> AppConfig:
+        """The configuration snapshot in use. Treat it as read-only."""
+        return self._current
+
+    def subscribe(
+        self, callback: ConfigSubscriber, section: Optional[str] = None
+    ) -> Callable[[], None]:
+        """
+        Call a function whenever the configuration changes.
+
+        Args:
+            callback: Function receiving the new section, or the new configuration if no
+                section is given
+            section: Configuration section to follow, such as "logging"
+
+        Returns:
+            A function removing the subscription
+        """
+        if section is not None and section not in AppConfig.model_fields:
+            raise ValueError(f"Unknown configuration section {section!r}")
+        entry = (section, callback)
+        self._subscribers.append(entry)
+        return lambda: self._subscribers.remove(entry)
+
+    def reload(self) -> List[str]:
+        """
+        Load and validate the configuration again, and apply it if it changed.
+
+        Returns:
+            The sections that changed
+
+        Raises:
+            ValueError: The configuration file is invalid
+            OSError: The configuration file cannot be read
+        """
+        self._file_mtime = self._mtime()
+        new = load_config(self.config_file, self.overrides)
+        old = self._current
+        changed = [
+            name
+            for name in AppConfig.model_fields
+            if getattr(old, name) != getattr(new, name)
+        ]
+        if not changed:
+            return []
+
+        self._current = new
+        self.reloads += 1
+        applied = set()
+        for section, callback in list(self._subscribers):
+            if section is not None and section not in changed:
+                continue
+            try:
+                callback(new if section is None else getattr(new, section))
+            except Exception:
+                logger.exception(
+                    "Failed to apply the new %s configuration", section or "application"
+                )
+            applied.add(section)
+        logger.info("Configuration reloaded, changed: %s", ", ".join(changed))
+        pending = [
+            name for name in changed if name not in applied and None not in applied
+        ]
+        if pending:
+            logger.warning(
+                "Changes to %s take effect after a restart", ", ".join(pending)
+            )
+        return changed
+
+    def check(self) -> List[str]:
+        """
+        Reload the configuration if the file changed since it was last read.
+
+        Invalid files are logged and leave the current configuration in place.
+
+        Returns:
+            The sections that changed
+        """
+        if self.config_file is None or self._mtime() == self._file_mtime:
+            return []
+        try:
+            return self.reload()
+        except (OSError, ValueError) as e:
+            self.failures += 1
+            logger.error(
+                "Keeping the current configuration, %s is invalid: %s",
+                self.config_file,
+                e,
+            )
+            return []
+
+    def _mtime(self) -> Optional[float]:
+        """Get the modification time of the configuration file, if it exists."""
+        if self.config_file is None:
+            return None
+        try:
+            return os.stat(self.config_file).st_mtime
+        except OSError:
+            return None
+
+    async def run(self) -> None:
+        """Check the configuration file for changes until cancelled."""
+        while True:
+            await asyncio.sleep(self.reload_interval)
+            try:
+                self.check()
+            except Exception:
+                # Keep watching: the next change to the file may fix it
+                logger.exception("Failed to check %s for changes", self.config_file)
+
+    async def start(self) -> None:
+        """
+        Start watching the configuration file, if one is in use and reloading is
+        enabled.
+        """
+        if (
+            self.config_file
+            and self.reload_interval
+            and (self._task is None or self._task.done())
+        ):
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        """Stop watching the configuration file."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+_manager: Optional[ConfigManager] = None
+
+
+def get_config_manager() -> ConfigManager:
+    """
+    Get the shared configuration manager, starting from the loaded configuration.
+
+    Returns:
+        ConfigManager: The shared manager
+    """
+    global _manager
+    if _manager is None:
+        _manager = ConfigManager(current=config)
+    return _manager
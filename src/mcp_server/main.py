@@ -1,26 +1,53 @@
 """
 Main entry point for the MCP server application.
 """
-import os
-from dotenv import load_dotenv
-from fastmcp import FastMCP
 
-# Import utility modules
-from src.mcp_server.utils.logging import setup_logging
-from src.mcp_server.tools.utility import register_utility_tools
+from fastmcp import FastMCP
+from starlette.middleware import Middleware
 
-# Load environment variables
-load_dotenv()
+# Import utility modules. Optional features are imported below only when enabled
+from src.mcp_server.config.config import config
+from src.mcp_server.config.reload import get_config_manager
+from src.mcp_server.middleware.jsonrpc import ToolCallBodyMiddleware
+from src.mcp_server.middleware.lifespan import LifespanMiddleware
+from src.mcp_server.middleware.tool_calls import (
+    CallOriginMiddleware,
+    add_tool_call_middleware,
+)
+from src.mcp_server.tools.registry import (
+    UTILITY_TOOLS_MANIFEST,
+    load_tool_manifest,
+    precompile_tools,
+    register_lazy_tools,
+)
+from src.mcp_server.utils.logging import log_tool_context, setup_logging
+from src.mcp_server.utils.serialization import tool_serializer
+from src.mcp_server.utils.startup import startup_phase
 
-# Configure logging
-logger = setup_logging()
+# Configure logging. Environment variables were loaded from .env by the config module
+with startup_phase("logging"):
+    logger = setup_logging(config.app_name, config.logging)
 
 # Initialize MCP server
-app_name = os.getenv("APP_NAME", "mcp_server")
-mcp = FastMCP(app_name,
-    log_level = "DEBUG",
+app_name = config.app_name
+with startup_phase("server"):
+    mcp = FastMCP(
+        app_name,
+        log_level="DEBUG",
+        tool_serializer=tool_serializer,
     )
 
+# Apply configuration file changes without a restart; components subscribe by section
+config_manager = get_config_manager()
+config_manager.subscribe(
+    lambda logging_config: setup_logging(app_name, logging_config), section="logging"
+)
+
+# Utility tools are declared in a manifest and imported on their first call.
+# Regenerate it with `mcp-server tool-manifest` after changing a utility tool
+UTILITY_TOOLS = load_tool_manifest(UTILITY_TOOLS_MANIFEST)
+
+
 # Register the hello_world tool
 @mcp.tool("hello-world")
 def hello_world(name: str = "World") -> str:
@@ -33,16 +60,331 @@ def hello_world(name: str = "World") -> str:
     Returns:
         str: A greeting message.
     """
-    logger.info(f"Hello World tool called with name: {name}")
+    logger.info("Hello World tool called with name: %s", name)
     return f"Hello, {name}!"
 
-# # Register all utility tools
-register_utility_tools(mcp)
+
+# Register all utility tools
+with startup_phase("tools"):
+    register_lazy_tools(mcp, UTILITY_TOOLS)
+
+# Register tools from installed plugins
+if config.plugins.enabled:
+    from src.mcp_server.tools.plugins import register_plugin_tools
+
+    with startup_phase("plugins"):
+        register_plugin_tools(mcp, config.plugins)
+
+# Build argument validators now rather than on the first call of each tool
+with startup_phase("precompile"):
+    precompile_tools(mcp)
+
+# Trace sampled tool calls; registered first so traces cover the other middleware
+tracer = None
+if config.tracing.enabled:
+    from src.mcp_server.middleware.tracing import register_tracing
+
+    tracer = register_tracing(
+        mcp, path=config.tracing.path, admin_keys=config.tracing.admin_keys
+    )
+    config_manager.subscribe(tracer.configure, section="tracing")
+
+# Tag records logged during a tool call with the tool, for JSON logs and per-tool levels
+add_tool_call_middleware(mcp, log_tool_context)
+
+# Append tool calls to a recording for `mcp-server replay`
+recorder = None
+if config.recording.enabled:
+    from src.mcp_server.middleware.recording import register_recording
+
+    recorder = register_recording(mcp)
+    config_manager.subscribe(recorder.configure, section="recording")
+
+# Admin routes profiling the live server on demand
+if config.profiling.enabled:
+    from src.mcp_server.middleware.profiling import register_profiling
+
+    register_profiling(
+        mcp, path=config.profiling.path, admin_keys=config.profiling.admin_keys
+    )
+
+# Record tool metrics and serve them next to the MCP endpoint
+metrics_registry = None
+if config.metrics.enabled:
+    from src.mcp_server.middleware.metrics import register_metrics
+
+    with startup_phase("metrics"):
+        metrics_registry = register_metrics(
+            mcp,
+            path=config.metrics.path,
+            argument_sample_rate=config.metrics.argument_sample_rate,
+        )
+
+# Serve liveness and readiness probes outside the MCP protocol
+health_registry = None
+if config.health.enabled:
+    from src.mcp_server.middleware.health import (
+        executor_queue_check,
+        register_health_routes,
+    )
+
+    health_registry = register_health_routes(
+        mcp,
+        liveness_path=config.health.liveness_path,
+        readiness_path=config.health.readiness_path,
+    )
+    if config.health.max_executor_queue_depth:
+        health_registry.add_check(
+            "executor", executor_queue_check(config.health.max_executor_queue_depth)
+        )
+
+# Run each idempotency key once, replaying its result to retries
+idempotency = None
+if config.idempotency.enabled:
+    from src.mcp_server.middleware.idempotency import IdempotencyMiddleware
+
+    idempotency = IdempotencyMiddleware.from_config(config.idempotency)
+    add_tool_call_middleware(mcp, idempotency)
+    if metrics_registry is not None:
+        metrics_registry.add_collector(
+            lambda: idempotency.collect_metrics(metrics_registry.prefix)
+        )
+
+# Bound the tool calls running at once, admitting queued calls by class and client
+scheduler = None
+if config.scheduling.enabled:
+    from src.mcp_server.middleware.scheduling import register_scheduling
+
+    scheduler = register_scheduling(mcp)
+    config_manager.subscribe(scheduler.configure, section="scheduling")
+    if metrics_registry is not None:
+        metrics_registry.add_collector(
+            lambda: scheduler.collect_metrics(metrics_registry.prefix)
+        )
+
+# Bound how long tool calls run and cancel calls whose client gave up on them
+timeouts = None
+if config.timeouts.enabled:
+    from src.mcp_server.middleware.timeouts import register_timeouts
+
+    timeouts = register_timeouts(mcp)
+    config_manager.subscribe(timeouts.configure, section="timeouts")
+    if metrics_registry is not None:
+        metrics_registry.add_collector(
+            lambda: timeouts.collect_metrics(metrics_registry.prefix)
+        )
+
+# Monitor resource usage and shed tool calls while the server is overloaded
+resource_monitor = None
+if config.resources.enabled:
+    from src.mcp_server.utils.resources import get_resource_monitor
+
+    resource_monitor = get_resource_monitor(config.resources)
+    add_tool_call_middleware(mcp, resource_monitor.count_call)
+    config_manager.subscribe(resource_monitor.configure, section="resources")
+    if metrics_registry is not None:
+        metrics_registry.add_collector(
+            lambda: resource_monitor.collect_metrics(metrics_registry.prefix)
+        )
+    if health_registry is not None:
+
+        def resources_check() -> bool:
+            reason = resource_monitor.overload_reason()
+            if reason:
+                raise RuntimeError(reason)
+            return True
+
+        health_registry.add_check("resources", resources_check)
+
+# Close idle sessions and bound how many each process keeps
+session_tracker = None
+if config.sessions.enabled:
+    from src.mcp_server.middleware.sessions import SessionTracker
+
+    session_tracker = SessionTracker.from_config(config.sessions)
+    if metrics_registry is not None:
+        metrics_registry.add_collector(
+            lambda: session_tracker.collect_metrics(metrics_registry.prefix)
+        )
+
+# Pooled connections for tools, warmed up at startup and closed at shutdown
+pool_manager = None
+if config.pools.enabled:
+    from src.mcp_server.utils.pools import get_pool_manager
+
+    pool_manager = get_pool_manager(config.pools)
+    # Shared HTTP client for tools: @inject(client="http")
+    pool_manager.http_client("http")
+    if metrics_registry is not None:
+        metrics_registry.add_collector(
+            lambda: pool_manager.collect_metrics(metrics_registry.prefix)
+        )
+    if health_registry is not None:
+
+        async def pools_check() -> bool:
+            await pool_manager.warm()
+            return True
+
+        health_registry.add_check("pools", pools_check)
+
+# Authenticate HTTP requests with API keys
+authenticator = None
+if config.security.api_key_enabled:
+    from src.mcp_server.middleware.auth import APIKeyAuthenticator
+
+    authenticator = APIKeyAuthenticator.from_config(config.security)
+    if not authenticator.keys:
+        logger.warning("API key authentication is enabled but no keys are configured")
+    if metrics_registry is not None:
+        metrics_registry.add_collector(
+            lambda: authenticator.collect_metrics(metrics_registry.prefix)
+        )
+
+# Charge tool calls against per-client quotas before they are dispatched
+rate_limiter = None
+if config.rate_limit.enabled:
+    from src.mcp_server.middleware.rate_limit import RateLimiter
+
+    rate_limiter = RateLimiter.from_config(config.rate_limit)
+    config_manager.subscribe(rate_limiter.configure, section="rate_limit")
+
+# Accept batches of tool calls in one request
+if config.batch.enabled:
+    from src.mcp_server.middleware.batch import register_batch_route
+
+    register_batch_route(
+        mcp,
+        path=config.batch.path,
+        max_concurrency=config.batch.max_concurrency,
+        max_calls=config.batch.max_calls,
+        api_key_header=config.rate_limit.api_key_header,
+        max_body_bytes=config.server.max_body_bytes,
+    )
+
+
+def get_http_middleware():
+    """
+    Build the HTTP middleware placed in front of the MCP endpoint.
+
+    Returns:
+        list[Middleware]: Middleware enabled by the application configuration
+    """
+    middleware = []
+    # Watch the configuration file, if any, while the server runs
+    startup, shutdown = [config_manager.start], [config_manager.stop]
+    if pool_manager is not None:
+        startup.append(pool_manager.start)
+        shutdown.append(pool_manager.stop)
+    if resource_monitor is not None:
+        startup.append(resource_monitor.start)
+        shutdown.append(resource_monitor.stop)
+    if session_tracker is not None:
+        shutdown.append(session_tracker.store.close)
+    if idempotency is not None:
+        shutdown.append(idempotency.store.close)
+    if tracer is not None:
+        shutdown.append(tracer.stop)
+    if recorder is not None:
+        shutdown.append(recorder.stop)
+    middleware.append(
+        Middleware(LifespanMiddleware, startup=startup, shutdown=shutdown)
+    )
+    # Tell apart the tool calls of each session and request, for the middleware
+    # announcing calls
+    middleware.append(Middleware(CallOriginMiddleware))
+    if authenticator is not None:
+        from src.mcp_server.middleware.auth import APIKeyAuthMiddleware
+
+        exempt_paths = list(config.security.auth_exempt_paths)
+        if health_registry is not None:
+            # Load balancers probe without credentials
+            exempt_paths += [config.health.liveness_path, config.health.readiness_path]
+        middleware.append(
+            Middleware(
+                APIKeyAuthMiddleware,
+                authenticator=authenticator,
+                api_key_header=config.security.api_key_header,
+                exempt_paths=exempt_paths,
+            )
+        )
+    call_paths = [mcp.settings.streamable_http_path]
+    if config.batch.enabled:
+        call_paths.append(config.batch.path)
+    # Read tool-call bodies once, within the size limit, for the middleware below
+    middleware.append(
+        Middleware(
+            ToolCallBodyMiddleware,
+            max_body_bytes=config.server.max_body_bytes,
+            paths=call_paths,
+        )
+    )
+    # After authentication, so unauthenticated clients cannot force sampling
+    if tracer is not None:
+        from src.mcp_server.middleware.tracing import TracingMiddleware
+
+        middleware.append(
+            Middleware(TracingMiddleware, tracer=tracer, paths=call_paths)
+        )
+    if resource_monitor is not None:
+        from src.mcp_server.middleware.load_shedding import LoadSheddingMiddleware
+
+        middleware.append(
+            Middleware(
+                LoadSheddingMiddleware,
+                monitor=resource_monitor,
+                retry_after=config.resources.retry_after,
+            )
+        )
+    if session_tracker is not None:
+        from src.mcp_server.middleware.sessions import SessionMiddleware
+
+        middleware.append(Middleware(SessionMiddleware, tracker=session_tracker))
+    if rate_limiter is not None:
+        from src.mcp_server.middleware.rate_limit import RateLimitMiddleware
+
+        middleware.append(
+            Middleware(
+                RateLimitMiddleware,
+                limiter=rate_limiter,
+                api_key_header=config.rate_limit.api_key_header,
+            )
+        )
+    if timeouts is not None and config.timeouts.cancel_on_disconnect:
+        from src.mcp_server.middleware.timeouts import DisconnectMiddleware
+
+        middleware.append(
+            Middleware(DisconnectMiddleware, timeouts=timeouts, paths=call_paths)
+        )
+    if config.compression.enabled:
+        from src.mcp_server.middleware.compression import CompressionMiddleware
+
+        middleware.append(
+            Middleware(
+                CompressionMiddleware,
+                minimum_size=config.compression.minimum_size,
+                gzip_level=config.compression.gzip_level,
+                zstd_level=config.compression.zstd_level,
+            )
+        )
+    return middleware
+
+
+def create_http_app():
+    """
+    Create the streamable-HTTP ASGI application.
+
+    Used as the application factory by multi-worker mode, where every worker
+    process imports this module and builds its own app.
+
+    Returns:
+        The Starlette application serving the MCP endpoint
+    """
+    return mcp.http_app(transport="streamable-http", middleware=get_http_middleware())
+
 
 # Log server initialization
-logger.info(f"MCP server '{app_name}' initialized and ready to start")
+logger.info("MCP server '%s' initialized and ready to start", app_name)
 
 
 if __name__ == "__main__":
-    mcp.run(transport="streamable-http")
-
+    mcp.run(transport="streamable-http", middleware=get_http_middleware())
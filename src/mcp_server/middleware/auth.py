@@ -0,0 +1,351 @@
+"""
+API key authentication.
+
+APIKeyAuthMiddleware rejects HTTP requests that do not carry a known API key,
+in the API key header or as a bearer token, with HTTP 401.
+
+Keys are stored as SHA-256 hashes in a key file, one key per line:
+
+    # key id   sha256 of the key
+    ci-runner  sha256:9f86d081884c7d659a2feaa0c55ad015a3bf4f1b2b0b822cd15d6c15b0f00a08
+
+`mcp-server hash-key` generates keys and their lines. The file is indexed by
+digest when loaded, so verifying a key is one hash, one dict lookup and a
+constant-time comparison. Presented keys are never kept. The file is reloaded
+when it changes, without a restart, and every key counts the requests made
+with it.
+"""
+
+import hashlib
+import hmac
+import os
+import secrets
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from src.mcp_server.config.config import SecurityConfig
+from src.mcp_server.middleware.jsonrpc import get_header, send_error
+from src.mcp_server.middleware.tool_calls import authenticate_origin
+from src.mcp_server.utils.metrics import MetricFamily
+
+# JSON-RPC error code returned for unauthenticated requests
+UNAUTHORIZED_ERROR_CODE = -32001
+
+# Prefix of the hashes in the key file
+HASH_PREFIX = "sha256:"
+
+
+def hash_key(key: str) -> str:
+    """
+    Hash an API key for the key file.
+
+    Args:
+        key: The API key
+
+    Returns:
+        The hash, as "sha256:<hex digest>"
+    """
+    return HASH_PREFIX + hashlib.sha256(key.encode()).hexdigest()
+
+
+def generate_key() -> str:
+    """
+    Generate a random API key.
+
+    Returns:
+        A URL-safe key with 256 bits of entropy
+    """
+    return secrets.token_urlsafe(32)
+
+
+class APIKey:
+    """
+    A known API key and its usage counters.
+    """
+
+    __slots__ = ("key_id", "digest", "requests", "last_used")
+
+    def __init__(self, key_id: str, digest: bytes):
+        """
+        Args:
+            key_id: Name identifying the key in logs and metrics
+            digest: SHA-256 digest of the key
+        """
+        self.key_id = key_id
+        self.digest = digest
+        self.requests = 0
+        self.last_used: Optional[float] = None
+
+
+def parse_key_file(lines: Iterable[str]) -> List[Tuple[str, bytes]]:
+    """
+    Parse the lines of a key file.
+
+    Args:
+        lines: Lines of "<key id> sha256:<hex digest>"; blank lines and # comments are
+            skipped
+
+    Returns:
+        (key id, digest) pairs
+    """
+    keys = []
+    for number, line in enumerate(lines, start=1):
+        line = line.split("#", 1)[0].strip()
+        if not line:
+            continue
+        parts = line.split()
+        if len(parts) != 2 or not parts[1].startswith(HASH_PREFIX):
+            raise ValueError(
+                f"Invalid key file line {number}: expected '<key id> "
+                f"{HASH_PREFIX}<hex>'"
+            )
+        try:
+            digest = bytes.fromhex(parts[1][len(HASH_PREFIX) :])
+        except ValueError:
+            raise ValueError(
+                f"Invalid key file line {number}: hash is not hexadecimal"
+            ) from None
+        if len(digest) != hashlib.sha256().digest_size:
+            raise ValueError(
+                f"Invalid key file line {number}: hash has the wrong length"
+            )
+        keys.append((parts[0], digest))
+    return keys
+
+
+class APIKeyAuthenticator:
+    """
+    Verify API keys against an index of hashed keys.
+    """
+
+    def __init__(
+        self,
+        keys_file: Optional[str] = None,
+        keys: Optional[Dict[str, str]] = None,
+        reload_interval: float = 5.0,
+    ):
+        """
+        Args:
+            keys_file: Key file to load and watch for changes
+            keys: Additional plain-text keys, by key id
+            reload_interval: Minimum seconds between checks of the key file for changes
+        """
+        self.keys_file = keys_file
+        self.reload_interval = reload_interval
+        self.failures = 0
+        self.reloads = 0
+        self._static_keys = [
+            (key_id, hashlib.sha256(key.encode()).digest())
+            for key_id, key in (keys or {}).items()
+        ]
+        self._index: Dict[bytes, APIKey] = {}
+        self._file_mtime: Optional[float] = None
+        self._checked_at = 0.0
+        self.reload()
+
+    @classmethod
+    def from_config(cls, security_config: SecurityConfig) -> "APIKeyAuthenticator":
+        """
+        Create an authenticator from configuration.
+
+        Args:
+            security_config: Security configuration
+
+        Returns:
+            APIKeyAuthenticator: The configured authenticator
+        """
+        return cls(
+            keys_file=security_config.api_keys_file,
+            keys=(
+                {"default": security_config.api_key}
+                if security_config.api_key
+                else None
+            ),
+            reload_interval=security_config.api_keys_reload_interval,
+        )
+
+    @property
+    def keys(self) -> List[APIKey]:
+        """The known keys."""
+        return list(self._index.values())
+
+    def reload(self) -> None:
+        """
+        Rebuild the key index from the key file.
+
+        Usage counters of keys that are still present are kept.
+
+        Raises:
+            OSError: If the key file cannot be read
+            ValueError: If the key file is malformed
+        """
+        entries = list(self._static_keys)
+        mtime = None
+        if self.keys_file:
+            mtime = os.stat(self.keys_file).st_mtime
+            with open(self.keys_file) as f:
+                entries.extend(parse_key_file(f))
+
+        index = {}
+        for key_id, digest in entries:
+            previous = self._index.get(digest)
+            index[digest] = (
+                previous
+                if previous and previous.key_id == key_id
+                else APIKey(key_id, digest)
+            )
+
+        self._index = index
+        self._file_mtime = mtime
+        self.reloads += 1
+
+    def _maybe_reload(self, now: float) -> None:
+        """
+        Reload the key file if it changed, checking at most once per reload interval.
+
+        A key file that is missing or malformed while being edited leaves the
+        current keys in use.
+        """
+        if not self.keys_file or now - self._checked_at < self.reload_interval:
+            return
+        self._checked_at = now
+        try:
+            if os.stat(self.keys_file).st_mtime != self._file_mtime:
+                self.reload()
+        except (OSError, ValueError):
+            return
+
+    def verify(self, credential: Optional[str]) -> Optional[APIKey]:
+        """
+        Verify a presented key.
+
+        Args:
+            credential: The key sent by the client
+
+        Returns:
+            The matching key, or None if the key is unknown
+        """
+        now = time.monotonic()
+        self._maybe_reload(now)
+        if not credential:
+            self.failures += 1
+            return None
+
+        digest = hashlib.sha256(credential.encode()).digest()
+        api_key = self._index.get(digest)
+        if api_key is None or not hmac.compare_digest(api_key.digest, digest):
+            self.failures += 1
+            return None
+
+        api_key.requests += 1
+        api_key.last_used = time.time()
+        return api_key
+
+    def stats(self) -> Dict[str, Dict[str, object]]:
+        """
+        Get the usage counters of every key.
+
+        Returns:
+            Requests and last use time by key id
+        """
+        return {
+            api_key.key_id: {
+                "requests": api_key.requests,
+                "last_used": api_key.last_used,
+            }
+            for api_key in self._index.values()
+        }
+
+    def collect_metrics(self, prefix: str = "mcp") -> Iterable[MetricFamily]:
+        """
+        Collect the authentication counters for a MetricsRegistry.
+
+        Args:
+            prefix: Metric name prefix
+
+        Returns:
+            Metric families for requests per key and failed authentications
+        """
+        keys = sorted(self._index.values(), key=lambda api_key: api_key.key_id)
+        return [
+            (
+                f"{prefix}_auth_requests_total",
+                "counter",
+                "Authenticated requests by API key.",
+                [({"key": api_key.key_id}, api_key.requests) for api_key in keys],
+            ),
+            (
+                f"{prefix}_auth_failures_total",
+                "counter",
+                "Requests rejected for a missing or unknown API key.",
+                [({}, self.failures)],
+            ),
+        ]
+
+
+def get_credential(scope: Scope, api_key_header: str = "x-api-key") -> Optional[str]:
+    """
+    Get the API key sent with a request.
+
+    Args:
+        scope: ASGI HTTP scope
+        api_key_header: Header carrying the API key
+
+    Returns:
+        The key from the API key header or a bearer token, if any
+    """
+    credential = get_header(scope, api_key_header)
+    if credential is None:
+        authorization = get_header(scope, "authorization")
+        if authorization and authorization.lower().startswith("bearer "):
+            credential = authorization[7:].strip()
+    return credential
+
+
+class APIKeyAuthMiddleware:
+    """
+    ASGI middleware rejecting requests without a valid API key with HTTP 401.
+
+    The id of the verified key is stored in the request state as api_key_id.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        authenticator: APIKeyAuthenticator,
+        api_key_header: str = "x-api-key",
+        exempt_paths: Iterable[str] = (),
+    ):
+        """
+        Args:
+            app: The downstream ASGI application
+            authenticator: Authenticator verifying the keys
+            api_key_header: Header carrying the API key
+            exempt_paths: Paths served without authentication
+        """
+        self.app = app
+        self.authenticator = authenticator
+        self.api_key_header = api_key_header.lower()
+        self.exempt_paths = frozenset(exempt_paths)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] in self.exempt_paths:
+            await self.app(scope, receive, send)
+            return
+
+        api_key = self.authenticator.verify(get_credential(scope, self.api_key_header))
+        if api_key is None:
+            await send_error(
+                send,
+                401,
+                UNAUTHORIZED_ERROR_CODE,
+                "Missing or invalid API key",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+            return
+
+        scope.setdefault("state", {})["api_key_id"] = api_key.key_id
+        authenticate_origin(api_key.key_id)
+        await self.app(scope, receive, send)
@@ -0,0 +1,205 @@
+"""
+Batched tool-call endpoint.
+
+Clients that fan out many small tool calls can POST them as one JSON-RPC batch
+of tools/call requests instead of paying a round trip per call:
+
+    POST /batch
+    [{"jsonrpc": "2.0", "id": 1, "method": "tools/call",
+      "params": {"name": "Ping", "arguments": {}}}, ...]
+
+The calls run concurrently up to a parallelism cap, through the same
+tool-call middleware as MCP requests, and each JSON-RPC response is streamed
+back as soon as its call completes: as server-sent events when the client
+accepts text/event-stream (the framing of the streamable-HTTP transport),
+otherwise as newline-delimited JSON.
+"""
+
+import asyncio
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from fastmcp import FastMCP
+from mcp.types import CallToolResult, TextContent
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response, StreamingResponse
+
+from src.mcp_server.middleware.jsonrpc import (
+    BodyTooLarge,
+    ToolCallRequest,
+    parse_tool_calls,
+    read_body,
+)
+from src.mcp_server.middleware.rate_limit import client_identity
+from src.mcp_server.middleware.tool_calls import call_tool
+from src.mcp_server.utils import serialization
+
+# JSON-RPC error codes
+PARSE_ERROR_CODE = -32700
+INVALID_REQUEST_CODE = -32600
+
+
+async def run_call(
+    mcp_instance: FastMCP, call: ToolCallRequest, client: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Run one call of a batch.
+
+    Tool errors are reported in the result with isError set, as the MCP
+    server reports them for tools/call requests.
+
+    Args:
+        mcp_instance: The FastMCP instance owning the tools
+        call: The tool call
+        client: Identity of the client that sent the batch
+
+    Returns:
+        The JSON-RPC response message
+    """
+    try:
+        content = await call_tool(
+            mcp_instance,
+            call.name,
+            call.arguments,
+            request_id=call.request_id,
+            meta=call.meta,
+            client=client,
+        )
+        result = CallToolResult(content=content, isError=False)
+    except Exception as e:
+        result = CallToolResult(
+            content=[TextContent(type="text", text=str(e))], isError=True
+        )
+    return {
+        "jsonrpc": "2.0",
+        "id": call.request_id,
+        "result": result.model_dump(mode="json", by_alias=True, exclude_none=True),
+    }
+
+
+async def run_batch(
+    mcp_instance: FastMCP,
+    calls: List[ToolCallRequest],
+    max_concurrency: int,
+    client: Optional[str] = None,
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Run a batch of tool calls concurrently.
+
+    Args:
+        mcp_instance: The FastMCP instance owning the tools
+        calls: The tool calls
+        max_concurrency: Maximum number of calls running at once
+        client: Identity of the client that sent the batch
+
+    Yields:
+        JSON-RPC response messages in completion order
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def limited(call: ToolCallRequest) -> Dict[str, Any]:
+        async with semaphore:
+            return await run_call(mcp_instance, call, client)
+
+    tasks = [asyncio.create_task(limited(call)) for call in calls]
+    try:
+        for completed in asyncio.as_completed(tasks):
+            yield await completed
+    finally:
+        # Stop the remaining calls if the client goes away
+        for task in tasks:
+            task.cancel()
+
+
+def _error(status_code: int, code: int, message: str) -> JSONResponse:
+    """Build a JSON-RPC error response for a rejected batch."""
+    return JSONResponse(
+        {"jsonrpc": "2.0", "id": None, "error": {"code": code, "message": message}},
+        status_code=status_code,
+    )
+
+
+def register_batch_route(
+    mcp_instance: FastMCP,
+    path: str = "/batch",
+    max_concurrency: int = 16,
+    max_calls: int = 1000,
+    api_key_header: str = "x-api-key",
+    max_body_bytes: int = 10485760,
+) -> None:
+    """
+    Serve batched tool calls next to the MCP endpoint.
+
+    Clients can lower the parallelism of a batch with the concurrency query
+    parameter; it never exceeds max_concurrency.
+
+    Args:
+        mcp_instance: The FastMCP instance owning the tools
+        path: Route accepting the batches
+        max_concurrency: Maximum calls of one batch running at once
+        max_calls: Maximum number of calls in one batch
+        api_key_header: Header carrying the API key, identifying the client as the rate
+            limiter does
+        max_body_bytes: Largest batch accepted, in bytes (0 is unlimited)
+    """
+
+    @mcp_instance.custom_route(path, methods=["POST"], include_in_schema=False)
+    async def batch(request: Request) -> Response:
+        try:
+            body = await read_body(request.receive, max_body_bytes)
+        except BodyTooLarge:
+            return _error(
+                413,
+                INVALID_REQUEST_CODE,
+                f"A batch may be at most {max_body_bytes} bytes",
+            )
+        try:
+            payload = serialization.loads(body)
+        except (ValueError, UnicodeDecodeError):
+            return _error(400, PARSE_ERROR_CODE, "Parse error")
+
+        messages = payload if isinstance(payload, list) else [payload]
+        calls = parse_tool_calls(body)
+        if not calls or len(calls) != len(messages):
+            return _error(
+                400,
+                INVALID_REQUEST_CODE,
+                "A batch must contain only tools/call requests",
+            )
+        if len(calls) > max_calls:
+            return _error(
+                413,
+                INVALID_REQUEST_CODE,
+                f"A batch may contain at most {max_calls} calls",
+            )
+
+        # Calls without an id are answered with their position in the batch
+        calls = [
+            call if call.request_id is not None else call._replace(request_id=index)
+            for index, call in enumerate(calls)
+        ]
+        request_ids = [serialization.dumps(call.request_id) for call in calls]
+        if len(set(request_ids)) != len(request_ids):
+            return _error(
+                400, INVALID_REQUEST_CODE, "Request ids must be unique within a batch"
+            )
+
+        try:
+            concurrency = int(request.query_params.get("concurrency", max_concurrency))
+        except ValueError:
+            concurrency = max_concurrency
+        concurrency = min(max(concurrency, 1), max_concurrency)
+
+        if "text/event-stream" in request.headers.get("accept", ""):
+            media_type = "text/event-stream"
+            frame = "event: message\ndata: {}\n\n"
+        else:
+            media_type = "application/x-ndjson"
+            frame = "{}\n"
+
+        client = client_identity(request.scope, api_key_header)
+
+        async def stream() -> AsyncIterator[str]:
+            async for message in run_batch(mcp_instance, calls, concurrency, client):
+                yield frame.format(serialization.dumps(message).decode())
+
+        return StreamingResponse(stream(), media_type=media_type)
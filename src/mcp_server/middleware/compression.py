@@ -0,0 +1,249 @@
+"""
+HTTP response compression.
+
+CompressionMiddleware compresses responses with zstd or gzip, whichever the
+client accepts and the server supports, once they reach a minimum size.
+Complete bodies are compressed in one piece. Streamed bodies, such as the
+server-sent events of the streamable-HTTP transport and the batch endpoint,
+are compressed chunk by chunk and flushed after every chunk, so events are
+never held back waiting for more data.
+
+zstd needs the optional zstandard package; without it only gzip is offered.
+"""
+
+import zlib
+from abc import ABC, abstractmethod
+from typing import List, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - depends on the environment
+    zstandard = None
+
+# Content types that are already compressed
+_INCOMPRESSIBLE_PREFIXES = (
+    "image/",
+    "audio/",
+    "video/",
+    "application/zip",
+    "application/gzip",
+)
+
+
+class Encoder(ABC):
+    """
+    Incremental compressor for one response body.
+    """
+
+    @abstractmethod
+    def compress(self, data: bytes) -> bytes:
+        """Compress a chunk and flush it so the client can decode it right away."""
+
+    @abstractmethod
+    def finish(self, data: bytes = b"") -> bytes:
+        """Compress the last chunk and end the stream."""
+
+
+class GzipEncoder(Encoder):
+    """gzip encoder built on zlib."""
+
+    def __init__(self, level: int = 6):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(
+            zlib.Z_SYNC_FLUSH
+        )
+
+    def finish(self, data: bytes = b"") -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_FINISH)
+
+
+class ZstdEncoder(Encoder):
+    """zstd encoder built on the zstandard package."""
+
+    def __init__(self, level: int = 3):
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(
+            zstandard.COMPRESSOBJ_FLUSH_BLOCK
+        )
+
+    def finish(self, data: bytes = b"") -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush()
+
+
+def supported_encodings() -> List[str]:
+    """
+    Get the encodings the server can produce, in order of preference.
+
+    Returns:
+        The encoding names
+    """
+    return ["zstd", "gzip"] if zstandard is not None else ["gzip"]
+
+
+def negotiate_encoding(accept_encoding: str, encodings: List[str]) -> Optional[str]:
+    """
+    Choose the response encoding from an Accept-Encoding header.
+
+    Args:
+        accept_encoding: The header value
+        encodings: Encodings the server supports, in order of preference
+
+    Returns:
+        The encoding to use, or None to send the body as is
+    """
+    accepted = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip().lower()] = quality
+
+    wildcard = accepted.get("*", 0.0)
+    candidates = [
+        (accepted.get(encoding, wildcard), -index, encoding)
+        for index, encoding in enumerate(encodings)
+    ]
+    quality, _, encoding = max(candidates, default=(0.0, 0, None))
+    return encoding if quality > 0 else None
+
+
+class CompressionMiddleware:
+    """
+    ASGI middleware compressing responses the client accepts compressed.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        zstd_level: int = 3,
+    ):
+        """
+        Args:
+            app: The downstream ASGI application
+            minimum_size: Smallest body compressed, in bytes
+            gzip_level: gzip compression level
+            zstd_level: zstd compression level
+        """
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.zstd_level = zstd_level
+        self.encodings = supported_encodings()
+
+    def encoder(self, encoding: str) -> Encoder:
+        """
+        Create an encoder.
+
+        Args:
+            encoding: Name of the encoding
+
+        Returns:
+            Encoder: A fresh encoder
+        """
+        if encoding == "zstd":
+            return ZstdEncoder(self.zstd_level)
+        return GzipEncoder(self.gzip_level)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate_encoding(
+            Headers(scope=scope).get("accept-encoding", ""), self.encodings
+        )
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        await _CompressedResponse(self, encoding, send).run(scope, receive)
+
+
+class _CompressedResponse:
+    """Send wrapper compressing one response."""
+
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, send: Send):
+        self.middleware = middleware
+        self.encoding = encoding
+        self.send = send
+        self.start: Optional[Message] = None
+        self.encoder: Optional[Encoder] = None
+        self.passthrough = False
+
+    async def run(self, scope: Scope, receive: Receive) -> None:
+        await self.middleware.app(scope, receive, self.wrapped_send)
+
+    def _compressible(self, headers: Headers) -> bool:
+        """Check whether the response may be compressed at all."""
+        if "content-encoding" in headers:
+            return False
+        content_type = headers.get("content-type", "")
+        return not content_type.startswith(_INCOMPRESSIBLE_PREFIXES)
+
+    def _encoded_start(self, content_length: Optional[int]) -> Message:
+        """Build the response start message announcing the encoding."""
+        headers = MutableHeaders(raw=list(self.start["headers"]))
+        headers["Content-Encoding"] = self.encoding
+        headers.add_vary_header("Accept-Encoding")
+        if content_length is None:
+            del headers["Content-Length"]
+        else:
+            headers["Content-Length"] = str(content_length)
+        return {**self.start, "headers": headers.raw}
+
+    async def wrapped_send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self.start = message
+            headers = Headers(raw=message["headers"])
+            self.passthrough = not self._compressible(headers)
+            if self.passthrough:
+                await self.send(message)
+            return
+
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.encoder is None:
+            # First body message: decide whether to compress
+            content_length = Headers(raw=self.start["headers"]).get("content-length")
+            size = (
+                len(body)
+                if not more_body
+                else int(content_length) if content_length else None
+            )
+            if size is not None and size < self.middleware.minimum_size:
+                self.passthrough = True
+                await self.send(self.start)
+                await self.send(message)
+                return
+
+            self.encoder = self.middleware.encoder(self.encoding)
+            if not more_body:
+                compressed = self.encoder.finish(body)
+                await self.send(self._encoded_start(len(compressed)))
+                await self.send({"type": "http.response.body", "body": compressed})
+                return
+            await self.send(self._encoded_start(None))
+
+        chunk = self.encoder.compress(body) if more_body else self.encoder.finish(body)
+        await self.send(
+            {"type": "http.response.body", "body": chunk, "more_body": more_body}
+        )
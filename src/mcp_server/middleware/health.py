@@ -0,0 +1,245 @@
+"""
+Health, readiness and liveness endpoints.
+
+register_health_routes serves two plain HTTP routes next to the MCP endpoint,
+so probes do not need an MCP session:
+
+- /healthz answers 200 as long as the process serves HTTP (liveness).
+- /readyz runs the registered readiness checks and answers 200 when they all
+  pass, 503 otherwise, with the outcome of every check as JSON.
+
+Tools and plugins register readiness checks, such as pool warm-up state or
+queue depth:
+
+    @readiness_check("search index")
+    async def index_loaded() -> bool:
+        return index.loaded
+
+Check results are cached for a short interval and concurrent probes share one
+run of the checks, so frequent load-balancer probes cost a dict lookup.
+"""
+
+import asyncio
+import inspect
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple, Union
+
+from fastmcp import FastMCP
+from starlette.requests import Request
+from starlette.responses import Response
+
+from src.mcp_server.config.config import HealthConfig, config
+from src.mcp_server.utils import serialization
+from src.mcp_server.utils.executor import get_executor
+
+# A readiness check returns whether its component is ready, or raises
+ReadinessCheck = Callable[[], Union[bool, Awaitable[bool]]]
+
+# Body of every liveness response
+_LIVE_BODY = b'{"status":"ok"}'
+
+
+class HealthRegistry:
+    """
+    Readiness checks and their cached outcome.
+    """
+
+    def __init__(self, cache_ttl: float = 1.0, check_timeout: float = 2.0):
+        """
+        Args:
+            cache_ttl: Seconds a readiness result is reused (0 runs the checks on every
+                probe)
+            check_timeout: Seconds an async check may take before it counts as failed
+        """
+        self.cache_ttl = cache_ttl
+        self.check_timeout = check_timeout
+        self._checks: Dict[str, ReadinessCheck] = {}
+        self._cached: Optional[Tuple[float, int, bytes]] = None
+        self._pending: Optional[asyncio.Future] = None
+
+    @classmethod
+    def from_config(cls, health_config: HealthConfig) -> "HealthRegistry":
+        """
+        Create a registry from configuration.
+
+        Args:
+            health_config: Health endpoint configuration
+
+        Returns:
+            HealthRegistry: The configured registry
+        """
+        return cls(
+            cache_ttl=health_config.cache_ttl, check_timeout=health_config.check_timeout
+        )
+
+    def add_check(self, name: str, check: ReadinessCheck) -> None:
+        """
+        Register a readiness check, replacing any check of the same name.
+
+        Checks are called on the event loop, so synchronous checks must be cheap.
+
+        Args:
+            name: Name reported for the check
+            check: Function or coroutine function returning whether the component is
+                ready
+        """
+        self._checks[name] = check
+        self._cached = None
+
+    def remove_check(self, name: str) -> None:
+        """
+        Unregister a readiness check.
+
+        Args:
+            name: Name of the check
+        """
+        self._checks.pop(name, None)
+        self._cached = None
+
+    async def _run_check(self, check: ReadinessCheck) -> Dict[str, Any]:
+        """Run one check, turning exceptions and timeouts into failures."""
+        try:
+            result = check()
+            if inspect.isawaitable(result):
+                result = await asyncio.wait_for(result, self.check_timeout)
+        except asyncio.TimeoutError:
+            return {"ready": False, "error": f"Timed out after {self.check_timeout}s"}
+        except Exception as e:
+            return {"ready": False, "error": str(e) or type(e).__name__}
+        return {"ready": bool(result)}
+
+    async def run_checks(self) -> Dict[str, Any]:
+        """
+        Run every readiness check.
+
+        Returns:
+            The overall status and the outcome of every check
+        """
+        names = list(self._checks)
+        outcomes = await asyncio.gather(
+            *(self._run_check(self._checks[name]) for name in names)
+        )
+        checks = dict(zip(names, outcomes))
+        ready = all(outcome["ready"] for outcome in outcomes)
+        return {"status": "ready" if ready else "not ready", "checks": checks}
+
+    async def _refresh(self) -> Tuple[float, int, bytes]:
+        """Run the checks and cache the response."""
+        report = await self.run_checks()
+        status_code = 200 if report["status"] == "ready" else 503
+        self._cached = (
+            time.monotonic() + self.cache_ttl,
+            status_code,
+            serialization.dumps(report),
+        )
+        return self._cached
+
+    async def readiness(self) -> Tuple[int, bytes]:
+        """
+        Get the readiness response, running the checks if the cached one expired.
+
+        Returns:
+            (HTTP status code, JSON body)
+        """
+        cached = self._cached
+        if cached is not None and cached[0] > time.monotonic():
+            return cached[1], cached[2]
+
+        # Probes arriving while the checks run wait for the same run
+        if self._pending is None or self._pending.done():
+            self._pending = asyncio.ensure_future(self._refresh())
+        _, status_code, body = await asyncio.shield(self._pending)
+        return status_code, body
+
+
+# Registry used when none is passed to register_health_routes
+default_health = HealthRegistry.from_config(config.health)
+
+
+def readiness_check(
+    name: str, registry: Optional[HealthRegistry] = None
+) -> Callable[[ReadinessCheck], ReadinessCheck]:
+    """
+    Register the decorated function as a readiness check.
+
+    Args:
+        name: Name reported for the check
+        registry: Registry to add the check to. Defaults to default_health
+
+    Returns:
+        A decorator returning the function unchanged
+    """
+
+    def decorator(check: ReadinessCheck) -> ReadinessCheck:
+        (registry or default_health).add_check(name, check)
+        return check
+
+    return decorator
+
+
+def executor_queue_check(max_queue_depth: int) -> ReadinessCheck:
+    """
+    Build a check failing while too many offloaded tool calls wait for a slot.
+
+    Args:
+        max_queue_depth: Largest number of waiting calls, across all tools, that is
+            still ready
+
+    Returns:
+        The readiness check
+    """
+
+    def check() -> bool:
+        waiting = sum(stats["waiting"] for stats in get_executor().stats().values())
+        if waiting > max_queue_depth:
+            raise RuntimeError(
+                f"{waiting} calls waiting for the executor, limit {max_queue_depth}"
+            )
+        return True
+
+    return check
+
+
+def register_health_routes(
+    mcp_instance: FastMCP,
+    registry: Optional[HealthRegistry] = None,
+    liveness_path: str = "/healthz",
+    readiness_path: str = "/readyz",
+) -> HealthRegistry:
+    """
+    Serve the liveness and readiness routes next to the MCP endpoint.
+
+    Args:
+        mcp_instance: The FastMCP instance serving the routes
+        registry: Registry holding the readiness checks. Defaults to default_health
+        liveness_path: Route of the liveness probe
+        readiness_path: Route of the readiness probe
+
+    Returns:
+        HealthRegistry: The registry in use
+    """
+    registry = registry or default_health
+
+    @mcp_instance.custom_route(
+        liveness_path, methods=["GET", "HEAD"], include_in_schema=False
+    )
+    async def healthz(request: Request) -> Response:
+        return Response(
+            _LIVE_BODY,
+            media_type="application/json",
+            headers={"Cache-Control": "no-store"},
+        )
+
+    @mcp_instance.custom_route(
+        readiness_path, methods=["GET", "HEAD"], include_in_schema=False
+    )
+    async def readyz(request: Request) -> Response:
+        status_code, body = await registry.readiness()
+        return Response(
+            body,
+            status_code=status_code,
+            media_type="application/json",
+            headers={"Cache-Control": "no-store"},
+        )
+
+    return registry
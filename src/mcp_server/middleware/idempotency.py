@@ -0,0 +1,477 @@
+"""
+Idempotency keys for retried tool calls.
+
+Clients retrying a tool call after a timeout would otherwise run the tool
+again, adding load when the server is already slow. A client that sends an
+idempotency key in the _meta field of a tools/call request
+
+    {
+        "name": "Create Ticket",
+        "arguments": {...},
+        "_meta": {"idempotencyKey": "9b1d..."},
+    }
+
+gets at most one execution per key. While the first call is in flight,
+duplicates wait for it and share its outcome. After it succeeds, its result
+is stored and replayed to duplicates for the configured TTL. Failed calls are
+not stored, so a retry runs the tool again.
+
+Reusing a key for another tool or other arguments is an error. Keys are not
+scoped to a client, so clients should use random keys such as UUIDs.
+
+Results are kept in an IdempotencyStore. The in-memory store is bounded and
+per process. SQLiteIdempotencyStore is shared by the workers of one host:
+a duplicate arriving on another worker waits for the call in flight there,
+until its lease runs out.
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from fastmcp.exceptions import ToolError
+from pydantic import TypeAdapter
+
+from src.mcp_server.config.config import IdempotencyConfig, config
+from src.mcp_server.middleware.tool_calls import Content, ToolCall, ToolCallHandler
+from src.mcp_server.utils import serialization
+from src.mcp_server.utils.executor import get_executor
+from src.mcp_server.utils.metrics import MetricFamily
+
+logger = logging.getLogger(config.app_name)
+
+# _meta field carrying the idempotency key of a call
+IDEMPOTENCY_META_KEY = "idempotencyKey"
+
+# Longest accepted idempotency key
+MAX_KEY_LENGTH = 255
+
+_content_adapter: TypeAdapter = TypeAdapter(Content)
+
+
+@dataclass(slots=True)
+class StoredCall:
+    """A call as kept in an IdempotencyStore."""
+
+    key: str
+    fingerprint: str
+    # Unix time the lease of a call in flight, or the stored result, expires
+    expires_at: float
+    # None while the call is in flight
+    content: Optional[Content] = None
+
+
+class IdempotencyStore(ABC):
+    """
+    Storage for calls in flight and their results.
+
+    Implement this interface on top of a shared store to deduplicate calls
+    across workers. Times are Unix timestamps, so they compare across
+    processes.
+    """
+
+    @abstractmethod
+    async def claim(
+        self, key: str, fingerprint: str, lease_until: float
+    ) -> Optional[StoredCall]:
+        """
+        Claim a key for a new execution, unless a live call holds it.
+
+        Expired calls and results are replaced.
+
+        Args:
+            key: The idempotency key
+            fingerprint: Hash of the tool name and arguments
+            lease_until: Time the claim expires if the call never completes
+
+        Returns:
+            None if the key was claimed, otherwise the call holding it
+        """
+
+    @abstractmethod
+    async def complete(self, key: str, content: Content, expires_at: float) -> None:
+        """
+        Store the result of a claimed call.
+
+        Args:
+            key: The idempotency key
+            content: The tool result
+            expires_at: Time the result stops being replayed
+        """
+
+    @abstractmethod
+    async def release(self, key: str) -> None:
+        """
+        Give up a claim after the call failed.
+
+        Args:
+            key: The idempotency key
+        """
+
+    @abstractmethod
+    async def purge(self, now: float) -> int:
+        """
+        Forget expired calls and results.
+
+        Args:
+            now: The current time
+
+        Returns:
+            The number of entries forgotten
+        """
+
+    async def close(self) -> None:
+        """
+        Release the store's connections. Called once the application has shut down.
+        """
+
+
+class InMemoryIdempotencyStore(IdempotencyStore):
+    """
+    Per-process store bounded to a maximum number of entries.
+
+    When the bound is reached the oldest entry is dropped.
+    """
+
+    def __init__(self, max_entries: int = 10000):
+        """
+        Args:
+            max_entries: Maximum number of entries kept in memory
+        """
+        self.max_entries = max_entries
+        self._calls: "OrderedDict[str, StoredCall]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    async def claim(
+        self, key: str, fingerprint: str, lease_until: float
+    ) -> Optional[StoredCall]:
+        existing = self._calls.get(key)
+        if existing is not None and existing.expires_at > time.time():
+            return existing
+        self._calls[key] = StoredCall(key, fingerprint, lease_until)
+        self._calls.move_to_end(key)
+        while len(self._calls) > self.max_entries:
+            self._calls.popitem(last=False)
+        return None
+
+    async def complete(self, key: str, content: Content, expires_at: float) -> None:
+        stored = self._calls.get(key)
+        if stored is not None:
+            stored.content = content
+            stored.expires_at = expires_at
+
+    async def release(self, key: str) -> None:
+        stored = self._calls.get(key)
+        if stored is not None and stored.content is None:
+            del self._calls[key]
+
+    async def purge(self, now: float) -> int:
+        expired = [
+            key for key, stored in self._calls.items() if stored.expires_at <= now
+        ]
+        for key in expired:
+            del self._calls[key]
+        return len(expired)
+
+
+class SQLiteIdempotencyStore(IdempotencyStore):
+    """
+    Store in a SQLite database shared by the workers of one host.
+
+    Queries run in the executor's threads, one at a time, so a busy database
+    does not block the event loop.
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: Database file, created if needed
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._db = sqlite3.connect(
+            path, timeout=5.0, isolation_level=None, check_same_thread=False
+        )
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS idempotent_calls ("
+            "key TEXT PRIMARY KEY, fingerprint TEXT, expires_at REAL, content TEXT)"
+        )
+        self._db.execute(
+            "CREATE INDEX IF NOT EXISTS idempotent_calls_expires_at ON "
+            "idempotent_calls (expires_at)"
+        )
+        self._lock = threading.Lock()
+
+    def _locked(self, fn: Callable[..., Any], *args: Any) -> Any:
+        with self._lock:
+            return fn(*args)
+
+    async def _run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        return await asyncio.get_running_loop().run_in_executor(
+            get_executor().thread_pool, self._locked, fn, *args
+        )
+
+    async def claim(
+        self, key: str, fingerprint: str, lease_until: float
+    ) -> Optional[StoredCall]:
+        return await self._run(self._claim, key, fingerprint, lease_until)
+
+    def _claim(
+        self, key: str, fingerprint: str, lease_until: float
+    ) -> Optional[StoredCall]:
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            row = self._db.execute(
+                "SELECT fingerprint, expires_at, content FROM idempotent_calls WHERE "
+                "key = ?",
+                (key,),
+            ).fetchone()
+            if row is not None and row[1] > time.time():
+                content = (
+                    _content_adapter.validate_json(row[2])
+                    if row[2] is not None
+                    else None
+                )
+                return StoredCall(key, row[0], row[1], content)
+            self._db.execute(
+                "INSERT OR REPLACE INTO idempotent_calls VALUES (?, ?, ?, NULL)",
+                (key, fingerprint, lease_until),
+            )
+            return None
+        finally:
+            self._db.execute("COMMIT")
+
+    async def complete(self, key: str, content: Content, expires_at: float) -> None:
+        await self._run(
+            self._db.execute,
+            "UPDATE idempotent_calls SET content = ?, expires_at = ? WHERE key = ?",
+            (_content_adapter.dump_json(content), expires_at, key),
+        )
+
+    async def release(self, key: str) -> None:
+        await self._run(
+            self._db.execute,
+            "DELETE FROM idempotent_calls WHERE key = ? AND content IS NULL",
+            (key,),
+        )
+
+    async def purge(self, now: float) -> int:
+        cursor = await self._run(
+            self._db.execute,
+            "DELETE FROM idempotent_calls WHERE expires_at <= ?",
+            (now,),
+        )
+        return cursor.rowcount
+
+    async def close(self) -> None:
+        """Close the database connection once running queries finish."""
+        await self._run(self._db.close)
+
+
+class _Abandoned(Exception):
+    """
+    The call duplicates were waiting for was cancelled; one of them runs it instead.
+    """
+
+
+@dataclass(slots=True)
+class _Flight:
+    """A call in flight in this process."""
+
+    fingerprint: str
+    future: asyncio.Future
+
+
+def call_fingerprint(call: ToolCall) -> str:
+    """
+    Hash the tool name and arguments of a call.
+
+    Args:
+        call: The tool call
+
+    Returns:
+        A hex digest identical for calls of the same tool with the same arguments
+    """
+    return hashlib.sha256(
+        serialization.dumps([call.name, call.arguments], sort_keys=True)
+    ).hexdigest()
+
+
+class IdempotencyMiddleware:
+    """
+    Tool-call middleware running each idempotency key at most once.
+    """
+
+    def __init__(
+        self,
+        store: Optional[IdempotencyStore] = None,
+        ttl: float = 300.0,
+        lease: float = 60.0,
+        poll_interval: float = 0.05,
+    ):
+        """
+        Args:
+            store: Store keeping calls in flight and their results. Defaults to an
+                in-memory store
+            ttl: Seconds a result is replayed to duplicates
+            lease: Seconds a call in flight on another worker is waited for before it is
+                presumed lost
+            poll_interval: Seconds between checks on a call in flight on another worker
+        """
+        self.store = store if store is not None else InMemoryIdempotencyStore()
+        self.ttl = ttl
+        self.lease = lease
+        self.poll_interval = poll_interval
+        self.executed = 0
+        self.replayed = 0
+        self.attached = 0
+        self.conflicts = 0
+        self._inflight: Dict[str, _Flight] = {}
+        self._swept_at = time.time()
+
+    @classmethod
+    def from_config(
+        cls, idempotency_config: IdempotencyConfig
+    ) -> "IdempotencyMiddleware":
+        """
+        Create the middleware from configuration.
+
+        Args:
+            idempotency_config: Idempotency configuration
+
+        Returns:
+            IdempotencyMiddleware: The configured middleware
+        """
+        if idempotency_config.backend == "sqlite":
+            store: IdempotencyStore = SQLiteIdempotencyStore(
+                idempotency_config.sqlite_path
+            )
+        else:
+            store = InMemoryIdempotencyStore(max_entries=idempotency_config.max_entries)
+        return cls(
+            store=store, ttl=idempotency_config.ttl, lease=idempotency_config.lease
+        )
+
+    async def __call__(self, call: ToolCall, call_next: ToolCallHandler) -> Content:
+        key = call.meta.get(IDEMPOTENCY_META_KEY)
+        if key is None:
+            return await call_next(call)
+        if not isinstance(key, str) or not 0 < len(key) <= MAX_KEY_LENGTH:
+            raise ToolError(
+                f"{IDEMPOTENCY_META_KEY} must be a string of 1 to {MAX_KEY_LENGTH} "
+                "characters"
+            )
+
+        fingerprint = call_fingerprint(call)
+        await self._sweep()
+        while True:
+            flight = self._inflight.get(key)
+            if flight is not None:
+                self._check(flight.fingerprint, fingerprint, key)
+                self.attached += 1
+                try:
+                    return await asyncio.shield(flight.future)
+                except _Abandoned:
+                    continue
+
+            existing = await self.store.claim(
+                key, fingerprint, time.time() + self.lease
+            )
+            if existing is None:
+                return await self._execute(key, fingerprint, call, call_next)
+            self._check(existing.fingerprint, fingerprint, key)
+            if existing.content is not None:
+                self.replayed += 1
+                return existing.content
+            # In flight on another worker; the claim is taken over if its lease runs out
+            await asyncio.sleep(self.poll_interval)
+
+    def _check(self, stored: str, fingerprint: str, key: str) -> None:
+        """Reject a key reused for another tool or other arguments."""
+        if stored != fingerprint:
+            self.conflicts += 1
+            raise ToolError(
+                f"Idempotency key {key!r} was already used for a different call"
+            )
+
+    async def _execute(
+        self, key: str, fingerprint: str, call: ToolCall, call_next: ToolCallHandler
+    ) -> Content:
+        """
+        Run a claimed call, share its outcome with duplicates and store its result.
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = _Flight(fingerprint, future)
+        self.executed += 1
+        try:
+            content = await call_next(call)
+            await self.store.complete(key, content, time.time() + self.ttl)
+        except BaseException as e:
+            await self.store.release(key)
+            future.set_exception(
+                _Abandoned() if isinstance(e, asyncio.CancelledError) else e
+            )
+            # Mark the exception retrieved, in case no duplicate was waiting
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+        future.set_result(content)
+        return content
+
+    async def _sweep(self) -> None:
+        """Purge expired entries from the store, at most once per tenth of the TTL."""
+        now = time.time()
+        if now - self._swept_at >= self.ttl / 10:
+            self._swept_at = now
+            await self.store.purge(now)
+
+    def collect_metrics(self, prefix: str = "mcp") -> Iterable[MetricFamily]:
+        """
+        Collect the idempotency counters for a MetricsRegistry.
+
+        Args:
+            prefix: Metric name prefix
+
+        Returns:
+            Metric families for executed, replayed, attached and conflicting calls
+        """
+        return [
+            (
+                f"{prefix}_idempotent_calls_executed_total",
+                "counter",
+                "Calls with an idempotency key that ran the tool.",
+                [({}, self.executed)],
+            ),
+            (
+                f"{prefix}_idempotent_calls_replayed_total",
+                "counter",
+                "Duplicate calls answered with a stored result.",
+                [({}, self.replayed)],
+            ),
+            (
+                f"{prefix}_idempotent_calls_attached_total",
+                "counter",
+                "Duplicate calls that waited for the call in flight.",
+                [({}, self.attached)],
+            ),
+            (
+                f"{prefix}_idempotent_calls_conflicts_total",
+                "counter",
+                "Idempotency keys reused for a different call.",
+                [({}, self.conflicts)],
+            ),
+        ]
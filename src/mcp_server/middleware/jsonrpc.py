@@ -0,0 +1,274 @@
+"""
+JSON-RPC helpers shared by the HTTP middleware.
+
+The MCP streamable-HTTP endpoint receives JSON-RPC messages in POST bodies.
+These helpers let ASGI middleware peek at the tool calls in a request before
+the MCP stack sees it, and answer with a JSON-RPC error without running any
+tool.
+
+ToolCallBodyMiddleware reads each body once, within a size limit, so that
+the middleware after it share the body and its tool calls through
+read_tool_calls instead of reading and parsing it again.
+"""
+
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.mcp_server.utils import serialization
+
+# JSON-RPC error code of bodies over the size limit
+INVALID_REQUEST_CODE = -32600
+
+# Request state keys holding the body read by ToolCallBodyMiddleware and its tool calls
+BODY_STATE = "jsonrpc_body"
+TOOL_CALLS_STATE = "jsonrpc_tool_calls"
+
+
+class BodyTooLarge(ValueError):
+    """Raised when a request body exceeds the size limit."""
+
+
+class ToolCallRequest(NamedTuple):
+    """A tools/call request found in an HTTP body."""
+
+    request_id: Any
+    name: str
+    arguments: Dict[str, Any]
+    meta: Dict[str, Any]
+
+
+async def read_body(receive: Receive, max_body_bytes: int = 0) -> bytes:
+    """
+    Read the complete body of an HTTP request.
+
+    Args:
+        receive: ASGI receive callable
+        max_body_bytes: Largest body accepted, in bytes (0 is unlimited)
+
+    Returns:
+        The request body
+
+    Raises:
+        BodyTooLarge: If the body is larger than max_body_bytes
+    """
+    chunks = []
+    size = 0
+    more_body = True
+    while more_body:
+        message = await receive()
+        if message["type"] != "http.request":
+            break
+        chunk = message.get("body", b"")
+        size += len(chunk)
+        if max_body_bytes and size > max_body_bytes:
+            raise BodyTooLarge(f"Request body exceeds {max_body_bytes} bytes")
+        chunks.append(chunk)
+        more_body = message.get("more_body", False)
+    return b"".join(chunks)
+
+
+def replay_receive(body: bytes, receive: Receive) -> Receive:
+    """
+    Build a receive callable that yields an already-read body first.
+
+    Args:
+        body: The body read with read_body
+        receive: The original receive callable, used once the body is replayed
+
+    Returns:
+        A receive callable for the downstream application
+    """
+    replayed = False
+
+    async def wrapped() -> Message:
+        nonlocal replayed
+        if not replayed:
+            replayed = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        return await receive()
+
+    return wrapped
+
+
+def parse_tool_calls(body: bytes) -> List[ToolCallRequest]:
+    """
+    Extract the tools/call requests from a JSON-RPC message or batch.
+
+    Bodies that are not valid JSON-RPC yield no tool calls; the MCP stack
+    reports those errors itself.
+
+    Args:
+        body: The request body
+
+    Returns:
+        The tool calls in the body, in order
+    """
+    try:
+        payload = serialization.loads(body)
+    except (ValueError, UnicodeDecodeError):
+        return []
+
+    messages = payload if isinstance(payload, list) else [payload]
+    calls = []
+    for message in messages:
+        if not isinstance(message, dict) or message.get("method") != "tools/call":
+            continue
+        params = message.get("params")
+        if not isinstance(params, dict) or not isinstance(params.get("name"), str):
+            continue
+        arguments = params.get("arguments")
+        meta = params.get("_meta")
+        calls.append(
+            ToolCallRequest(
+                request_id=message.get("id"),
+                name=params["name"],
+                arguments=arguments if isinstance(arguments, dict) else {},
+                meta=meta if isinstance(meta, dict) else {},
+            )
+        )
+    return calls
+
+
+async def read_tool_calls(
+    scope: Scope, receive: Receive
+) -> Tuple[List[ToolCallRequest], Receive]:
+    """
+    Get the tool calls of an HTTP request, reading and parsing its body at most once.
+
+    The body read by ToolCallBodyMiddleware, or by an earlier call, is reused
+    from the request state; otherwise it is read here.
+
+    Args:
+        scope: ASGI HTTP scope
+        receive: ASGI receive callable
+
+    Returns:
+        The tool calls in the body, and the receive callable to pass downstream
+    """
+    state = scope.setdefault("state", {})
+    if BODY_STATE not in state:
+        state[BODY_STATE] = await read_body(receive)
+        receive = replay_receive(state[BODY_STATE], receive)
+    if TOOL_CALLS_STATE not in state:
+        state[TOOL_CALLS_STATE] = parse_tool_calls(state[BODY_STATE])
+    return state[TOOL_CALLS_STATE], receive
+
+
+def get_header(scope: Scope, name: str) -> Optional[str]:
+    """
+    Get a request header from an ASGI scope.
+
+    Args:
+        scope: ASGI HTTP scope
+        name: Lower-case header name
+
+    Returns:
+        The header value, or None if it is not present
+    """
+    encoded = name.encode("latin-1")
+    for key, value in scope.get("headers", []):
+        if key == encoded:
+            return value.decode("latin-1")
+    return None
+
+
+async def send_error(
+    send: Send,
+    status_code: int,
+    code: int,
+    message: str,
+    request_id: Any = None,
+    headers: Optional[Dict[str, str]] = None,
+) -> None:
+    """
+    Send a JSON-RPC error response.
+
+    Args:
+        send: ASGI send callable
+        status_code: HTTP status code
+        code: JSON-RPC error code
+        message: Error message
+        request_id: Id of the request being answered
+        headers: Additional response headers
+    """
+    body = serialization.dumps(
+        {
+            "jsonrpc": "2.0",
+            "id": request_id,
+            "error": {"code": code, "message": message},
+        }
+    )
+    response_headers = [
+        (b"content-type", b"application/json"),
+        (b"content-length", str(len(body)).encode()),
+    ]
+    for key, value in (headers or {}).items():
+        response_headers.append(
+            (key.lower().encode("latin-1"), value.encode("latin-1"))
+        )
+
+    await send(
+        {
+            "type": "http.response.start",
+            "status": status_code,
+            "headers": response_headers,
+        }
+    )
+    await send({"type": "http.response.body", "body": body})
+
+
+class ToolCallBodyMiddleware:
+    """
+    ASGI middleware reading the bodies of tool-call requests once, rejecting large ones
+    with HTTP 413.
+    """
+
+    def __init__(
+        self, app: ASGIApp, max_body_bytes: int = 0, paths: Iterable[str] = ("/mcp",)
+    ):
+        """
+        Args:
+            app: The downstream ASGI application
+            max_body_bytes: Largest body accepted, in bytes (0 is unlimited)
+            paths: Path prefixes receiving tool calls, such as the MCP and batch
+                endpoints
+        """
+        self.app = app
+        self.max_body_bytes = max_body_bytes
+        self.paths = tuple(paths)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or scope["method"] != "POST"
+            or not scope["path"].startswith(self.paths)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        # Refuse bodies announced as too large without reading them
+        content_length = get_header(scope, "content-length")
+        too_large = (
+            self.max_body_bytes
+            and content_length is not None
+            and content_length.isdigit()
+            and int(content_length) > self.max_body_bytes
+        )
+        if not too_large:
+            try:
+                body = await read_body(receive, self.max_body_bytes)
+            except BodyTooLarge:
+                too_large = True
+        if too_large:
+            await send_error(
+                send,
+                413,
+                INVALID_REQUEST_CODE,
+                f"Request body exceeds {self.max_body_bytes} bytes",
+                headers={"Connection": "close"},
+            )
+            return
+
+        scope.setdefault("state", {})[BODY_STATE] = body
+        await self.app(scope, replay_receive(body, receive), send)
@@ -0,0 +1,69 @@
+"""
+Startup and shutdown hooks for the HTTP application.
+
+FastMCP builds its own Starlette lifespan to run the session manager, and
+the lifespan of the low-level MCP server runs once per session rather than
+once per process. LifespanMiddleware hooks into the ASGI lifespan protocol
+instead, so it works for both mcp.run and the multi-worker application
+factory: startup hooks run before the application starts and shutdown
+hooks after it has stopped, once every session is closed.
+"""
+
+import logging
+from typing import Awaitable, Callable, Iterable
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.mcp_server.config.config import config
+
+logger = logging.getLogger(config.app_name)
+
+# A startup or shutdown hook
+Hook = Callable[[], Awaitable[None]]
+
+
+class LifespanMiddleware:
+    """
+    ASGI middleware running hooks at application startup and shutdown.
+    """
+
+    def __init__(
+        self, app: ASGIApp, startup: Iterable[Hook] = (), shutdown: Iterable[Hook] = ()
+    ):
+        """
+        Args:
+            app: The downstream ASGI application
+            startup: Coroutine functions awaited, in order, before the application
+                starts
+            shutdown: Coroutine functions awaited, in order, after the application stops
+        """
+        self.app = app
+        self.startup = list(startup)
+        self.shutdown = list(shutdown)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "lifespan":
+            await self.app(scope, receive, send)
+            return
+
+        async def wrapped_receive() -> Message:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                # A failing hook fails the startup of the application
+                for hook in self.startup:
+                    await hook()
+            return message
+
+        async def wrapped_send(message: Message) -> None:
+            if message["type"] == "lifespan.shutdown.complete":
+                for hook in self.shutdown:
+                    try:
+                        await hook()
+                    except Exception:
+                        logger.exception(
+                            "Shutdown hook %s failed",
+                            getattr(hook, "__qualname__", hook),
+                        )
+            await send(message)
+
+        await self.app(scope, wrapped_receive, wrapped_send)
@@ -0,0 +1,74 @@
+"""
+Load shedding for tool calls.
+
+LoadSheddingMiddleware rejects tools/call requests with HTTP 503 and a
+Retry-After header while the ResourceMonitor reports the server overloaded,
+so a saturated server answers new work quickly instead of queueing it behind
+slow calls. Other MCP messages, such as initialization and notifications,
+are still served. Requests are only read when the server is overloaded, so
+the middleware costs nothing otherwise.
+"""
+
+from typing import Iterable
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from src.mcp_server.middleware.jsonrpc import read_tool_calls, send_error
+from src.mcp_server.utils.resources import ResourceMonitor
+
+# JSON-RPC error code returned for shed calls
+OVERLOADED_ERROR_CODE = -32003
+
+
+class LoadSheddingMiddleware:
+    """
+    ASGI middleware shedding tool calls with HTTP 503 while the server is overloaded.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        monitor: ResourceMonitor,
+        retry_after: int = 1,
+        exempt_paths: Iterable[str] = (),
+    ):
+        """
+        Args:
+            app: The downstream ASGI application
+            monitor: Monitor deciding whether the server is overloaded
+            retry_after: Seconds shed clients are told to wait
+            exempt_paths: Paths never shed
+        """
+        self.app = app
+        self.monitor = monitor
+        self.retry_after = str(retry_after)
+        self.exempt_paths = frozenset(exempt_paths)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or scope["method"] != "POST"
+            or scope["path"] in self.exempt_paths
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        reason = self.monitor.overload_reason()
+        if reason is None:
+            await self.app(scope, receive, send)
+            return
+
+        calls, receive = await read_tool_calls(scope, receive)
+        if calls:
+            self.monitor.shed += len(calls)
+            await send_error(
+                send,
+                503,
+                OVERLOADED_ERROR_CODE,
+                f"Server overloaded: {reason}",
+                request_id=calls[0].request_id,
+                headers={"Retry-After": self.retry_after},
+            )
+            return
+
+        await self.app(scope, receive, send)
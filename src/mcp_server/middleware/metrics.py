@@ -0,0 +1,194 @@
+"""
+Tool-call metrics and the /metrics endpoint.
+
+register_metrics wraps every tool call of a FastMCP server to record call and
+error counts, in-flight calls, latency and argument/result sizes, and serves
+them in the Prometheus text format on an HTTP route next to the MCP endpoint.
+Argument sizes are measured on a sample of calls, as the arguments have to be
+serialized again to measure them.
+"""
+
+import random
+import time
+from typing import Iterable, Optional
+
+from fastmcp import FastMCP
+from mcp.types import EmbeddedResource, ImageContent, TextContent
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse
+
+from src.mcp_server.middleware.tool_calls import (
+    Content,
+    ToolCall,
+    ToolCallHandler,
+    add_tool_call_middleware,
+)
+from src.mcp_server.utils import serialization
+from src.mcp_server.utils.cache import get_cache_stats
+from src.mcp_server.utils.executor import get_executor
+from src.mcp_server.utils.metrics import MetricFamily, MetricsRegistry
+
+# Content type of the Prometheus text exposition format
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Registry used when none is passed to register_metrics
+default_registry = MetricsRegistry()
+
+
+def content_size(content: Content) -> int:
+    """
+    Get the size of a tool result as sent to the client.
+
+    Args:
+        content: Content returned by the tool manager
+
+    Returns:
+        Size of the UTF-8 text or encoded data in bytes
+    """
+    size = 0
+    for item in content:
+        if isinstance(item, TextContent):
+            size += len(item.text.encode())
+        elif isinstance(item, ImageContent):
+            size += len(item.data)
+        elif isinstance(item, EmbeddedResource):
+            resource = item.resource
+            text = getattr(resource, "text", None)
+            size += (
+                len(text.encode())
+                if text is not None
+                else len(getattr(resource, "blob", ""))
+            )
+    return size
+
+
+class MetricsMiddleware:
+    """
+    Tool-call middleware recording per-tool metrics.
+    """
+
+    def __init__(self, registry: MetricsRegistry, argument_sample_rate: float = 0.1):
+        """
+        Args:
+            registry: Registry to record into
+            argument_sample_rate: Share of calls whose argument size is measured
+        """
+        self.registry = registry
+        self.argument_sample_rate = argument_sample_rate
+
+    async def __call__(self, call: ToolCall, call_next: ToolCallHandler) -> Content:
+        stats = self.registry.tool(call.name)
+        stats.calls += 1
+        stats.in_flight += 1
+        rate = self.argument_sample_rate
+        if rate >= 1 or (rate > 0 and random.random() < rate):
+            stats.argument_bytes.observe(len(serialization.dumps(call.arguments)))
+        started = time.perf_counter()
+        try:
+            result = await call_next(call)
+        except BaseException:
+            stats.errors += 1
+            raise
+        finally:
+            stats.latency.observe(time.perf_counter() - started)
+            stats.in_flight -= 1
+        stats.result_bytes.observe(content_size(result))
+        return result
+
+
+def collect_cache_metrics(prefix: str = "mcp") -> Iterable[MetricFamily]:
+    """
+    Collect the counters of the tool result caches.
+
+    Args:
+        prefix: Metric name prefix
+
+    Returns:
+        Metric families for cache hits, misses, evictions and size
+    """
+    caches = sorted(get_cache_stats().items())
+    return [
+        (
+            f"{prefix}_cache_hits_total",
+            "counter",
+            "Tool cache hits.",
+            [({"cache": name}, stats["hits"]) for name, stats in caches],
+        ),
+        (
+            f"{prefix}_cache_misses_total",
+            "counter",
+            "Tool cache misses.",
+            [({"cache": name}, stats["misses"]) for name, stats in caches],
+        ),
+        (
+            f"{prefix}_cache_evictions_total",
+            "counter",
+            "Tool cache LRU evictions.",
+            [({"cache": name}, stats["evictions"]) for name, stats in caches],
+        ),
+        (
+            f"{prefix}_cache_entries",
+            "gauge",
+            "Entries in the tool cache.",
+            [({"cache": name}, stats["size"]) for name, stats in caches],
+        ),
+    ]
+
+
+def collect_executor_metrics(prefix: str = "mcp") -> Iterable[MetricFamily]:
+    """
+    Collect the queue depth and running calls of offloaded tools.
+
+    Args:
+        prefix: Metric name prefix
+
+    Returns:
+        Metric families for running and queued executor calls
+    """
+    tools = sorted(get_executor().stats().items())
+    return [
+        (
+            f"{prefix}_executor_running",
+            "gauge",
+            "Offloaded tool calls running.",
+            [({"tool": name}, stats["running"]) for name, stats in tools],
+        ),
+        (
+            f"{prefix}_executor_queued",
+            "gauge",
+            "Offloaded tool calls waiting for a slot.",
+            [({"tool": name}, stats["waiting"]) for name, stats in tools],
+        ),
+    ]
+
+
+def register_metrics(
+    mcp_instance: FastMCP,
+    registry: Optional[MetricsRegistry] = None,
+    path: str = "/metrics",
+    argument_sample_rate: float = 0.1,
+) -> MetricsRegistry:
+    """
+    Record metrics for every tool call and expose them over HTTP.
+
+    Args:
+        mcp_instance: The FastMCP instance to instrument
+        registry: Registry to record into. Defaults to default_registry
+        path: Route serving the metrics
+        argument_sample_rate: Share of calls whose argument size is measured
+
+    Returns:
+        MetricsRegistry: The registry in use
+    """
+    registry = registry or default_registry
+    registry.add_collector(lambda: collect_cache_metrics(registry.prefix))
+    registry.add_collector(lambda: collect_executor_metrics(registry.prefix))
+    add_tool_call_middleware(
+        mcp_instance, MetricsMiddleware(registry, argument_sample_rate)
+    )
+
+    @mcp_instance.custom_route(path, methods=["GET"], include_in_schema=False)
+    async def metrics(request: Request) -> PlainTextResponse:
+        return PlainTextResponse(registry.render(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+    return registry
@@ -0,0 +1,141 @@
+"""
+Admin routes profiling the running server.
+
+register_profiling serves three routes next to the MCP endpoint:
+
+    POST /debug/profile/start?seconds=30&cpu=true&memory=true
+    POST /debug/profile/stop
+    GET  /debug/profile?format=collapsed
+
+Starting returns immediately; the profile stops by itself after the window
+or earlier on stop, which answers with the result. GET describes the
+running profile and returns the latest result, or with format=collapsed
+just its stacks as text, ready for a flame graph tool.
+
+The routes are for administrators only. When admin key ids are configured,
+requests must be authenticated with one of those API keys. Otherwise only
+clients on the loopback interface are served.
+"""
+
+import asyncio
+from typing import Iterable, Optional
+
+from fastmcp import FastMCP
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse, Response
+
+from src.mcp_server.utils import serialization
+from src.mcp_server.utils.executor import get_executor
+from src.mcp_server.utils.profiling import (
+    ProfileInProgressError,
+    Profiler,
+    get_profiler,
+)
+
+# Client addresses served when no admin keys are configured
+_LOOPBACK_HOSTS = frozenset({"127.0.0.1", "::1"})
+
+
+def _json(body: object, status_code: int = 200) -> Response:
+    """Build an uncached JSON response."""
+    return Response(
+        serialization.dumps(body),
+        status_code=status_code,
+        media_type="application/json",
+        headers={"Cache-Control": "no-store"},
+    )
+
+
+def _flag(value: Optional[str], default: bool) -> bool:
+    """Read a boolean query parameter."""
+    if value is None:
+        return default
+    return value.lower() in ("1", "true", "yes")
+
+
+def is_admin(request: Request, admin_keys: Iterable[str]) -> bool:
+    """
+    Check whether a request may use the admin routes.
+
+    Args:
+        request: The incoming request
+        admin_keys: API key ids of administrators; empty allows loopback clients only
+
+    Returns:
+        Whether the request is from an administrator
+    """
+    admin_keys = frozenset(admin_keys)
+    if admin_keys:
+        return request.scope.get("state", {}).get("api_key_id") in admin_keys
+    return request.client is not None and request.client.host in _LOOPBACK_HOSTS
+
+
+def register_profiling(
+    mcp_instance: FastMCP,
+    profiler: Optional[Profiler] = None,
+    path: str = "/debug/profile",
+    admin_keys: Iterable[str] = (),
+) -> Profiler:
+    """
+    Serve the admin routes starting and stopping profiles.
+
+    Args:
+        mcp_instance: The FastMCP instance serving the routes
+        profiler: Profiler to drive. Defaults to the shared profiler
+        path: Route prefix of the profiling routes
+        admin_keys: API key ids allowed to profile; empty allows loopback clients only
+
+    Returns:
+        Profiler: The profiler in use
+    """
+    profiler = profiler or get_profiler()
+    admin_keys = frozenset(admin_keys)
+    forbidden = {"error": "Profiling is restricted to administrators"}
+
+    @mcp_instance.custom_route(
+        f"{path}/start", methods=["POST"], include_in_schema=False
+    )
+    async def start_profile(request: Request) -> Response:
+        if not is_admin(request, admin_keys):
+            return _json(forbidden, 403)
+        params = request.query_params
+        try:
+            status = profiler.start(
+                float(params.get("seconds", "10")),
+                cpu=_flag(params.get("cpu"), True),
+                memory=_flag(params.get("memory"), True),
+                include_idle=_flag(params.get("include_idle"), False),
+            )
+        except ProfileInProgressError as e:
+            return _json({"error": str(e), **profiler.status()}, 409)
+        except ValueError as e:
+            return _json({"error": str(e)}, 400)
+        return _json(status, 202)
+
+    @mcp_instance.custom_route(
+        f"{path}/stop", methods=["POST"], include_in_schema=False
+    )
+    async def stop_profile(request: Request) -> Response:
+        if not is_admin(request, admin_keys):
+            return _json(forbidden, 403)
+        result = await asyncio.get_running_loop().run_in_executor(
+            get_executor().thread_pool, profiler.stop
+        )
+        if result is None:
+            return _json({"error": "No profile has been recorded"}, 404)
+        return _json(result)
+
+    @mcp_instance.custom_route(path, methods=["GET"], include_in_schema=False)
+    async def get_profile(request: Request) -> Response:
+        if not is_admin(request, admin_keys):
+            return _json(forbidden, 403)
+        result = profiler.result
+        if request.query_params.get("format") == "collapsed":
+            if result is None or "cpu" not in result:
+                return _json({"error": "No CPU profile has been recorded"}, 404)
+            return PlainTextResponse(
+                result["cpu"]["collapsed"], headers={"Cache-Control": "no-store"}
+            )
+        return _json({**profiler.status(), "result": result})
+
+    return profiler
@@ -0,0 +1,358 @@
+"""
+Token-bucket rate limiting for tool calls.
+
+RateLimitMiddleware sits in front of the MCP endpoint and rejects tools/call
+requests that exceed the caller's quota with HTTP 429 before any tool work is
+done. Each client (identified by API key, bearer token or address) has a
+token bucket, tools can cost more than one token, and tools can have their
+own per-client rate. Buckets live in a RateLimitBackend; the in-memory backend
+serves a single process and a shared backend lets workers share quotas.
+"""
+
+import hashlib
+import math
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from src.mcp_server.config.config import RateLimitConfig
+from src.mcp_server.middleware.jsonrpc import (
+    get_header,
+    read_tool_calls,
+    send_error,
+)
+
+# JSON-RPC error code returned for rejected calls
+RATE_LIMITED_ERROR_CODE = -32029
+
+
+class TokenBucket:
+    """
+    Token bucket refilled lazily on access, so every operation is O(1).
+    """
+
+    __slots__ = ("rate", "capacity", "tokens", "updated_at")
+
+    def __init__(self, rate: float, capacity: float, now: float):
+        """
+        Args:
+            rate: Tokens added per second
+            capacity: Maximum number of tokens (the burst size)
+            now: Current monotonic time
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = now
+
+    def consume(self, cost: float, now: float) -> float:
+        """
+        Take tokens from the bucket if enough are available.
+
+        Args:
+            cost: Number of tokens to take
+            now: Current monotonic time
+
+        Returns:
+            0.0 if the tokens were taken, otherwise the seconds until they will be
+            available
+        """
+        elapsed = now - self.updated_at
+        if elapsed > 0:
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+            self.updated_at = now
+
+        if self.tokens >= cost:
+            self.tokens -= cost
+            return 0.0
+        if self.rate <= 0:
+            return math.inf
+        return (cost - self.tokens) / self.rate
+
+    def refund(self, cost: float) -> None:
+        """
+        Return tokens taken for calls that were rejected after all.
+
+        Args:
+            cost: Number of tokens to return
+        """
+        self.tokens = min(self.capacity, self.tokens + cost)
+
+
+class RateLimitBackend(ABC):
+    """
+    Storage for token buckets.
+
+    Implement this interface on top of a shared store to enforce quotas across
+    several worker processes.
+    """
+
+    @abstractmethod
+    async def consume(
+        self, key: str, cost: float, rate: float, capacity: float
+    ) -> float:
+        """
+        Take tokens from the bucket stored under a key, creating it full if needed.
+
+        Args:
+            key: Bucket key
+            cost: Number of tokens to take
+            rate: Refill rate of the bucket in tokens per second
+            capacity: Capacity of the bucket
+
+        Returns:
+            0.0 if the tokens were taken, otherwise the seconds until they will be
+            available
+        """
+
+    @abstractmethod
+    async def refund(self, key: str, cost: float) -> None:
+        """
+        Return tokens to the bucket stored under a key, up to its capacity.
+
+        Args:
+            key: Bucket key
+            cost: Number of tokens to return
+        """
+
+
+class InMemoryRateLimitBackend(RateLimitBackend):
+    """
+    Per-process bucket store bounded to a maximum number of buckets.
+
+    When the bound is reached the least recently used bucket is dropped; a
+    dropped bucket is recreated full, which only ever errs towards admitting.
+    """
+
+    def __init__(self, max_buckets: int = 100000):
+        """
+        Args:
+            max_buckets: Maximum number of buckets kept in memory
+        """
+        self.max_buckets = max_buckets
+        self._buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    async def consume(
+        self, key: str, cost: float, rate: float, capacity: float
+    ) -> float:
+        now = time.monotonic()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = TokenBucket(rate, capacity, now)
+            if len(self._buckets) > self.max_buckets:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+        return bucket.consume(cost, now)
+
+    async def refund(self, key: str, cost: float) -> None:
+        bucket = self._buckets.get(key)
+        if bucket is not None:
+            bucket.refund(cost)
+
+
+class RateLimiter:
+    """
+    Apply per-client and per-tool quotas to tool calls.
+    """
+
+    def __init__(
+        self,
+        requests_per_second: float = 10.0,
+        burst: float = 20.0,
+        tool_costs: Optional[Dict[str, float]] = None,
+        tool_rates: Optional[Dict[str, float]] = None,
+        backend: Optional[RateLimitBackend] = None,
+    ):
+        """
+        Args:
+            requests_per_second: Tokens added to each client bucket per second
+            burst: Capacity of each client bucket
+            tool_costs: Tokens charged per call for each tool. Defaults to 1
+            tool_rates: Optional per-client call rate for individual tools
+            backend: Bucket storage. Defaults to an in-memory backend
+        """
+        self.requests_per_second = requests_per_second
+        self.burst = burst
+        self.tool_costs = tool_costs or {}
+        self.tool_rates = tool_rates or {}
+        self.backend = backend if backend is not None else InMemoryRateLimitBackend()
+        self.allowed = 0
+        self.rejected = 0
+
+    @classmethod
+    def from_config(
+        cls,
+        rate_limit_config: RateLimitConfig,
+        backend: Optional[RateLimitBackend] = None,
+    ) -> "RateLimiter":
+        """
+        Create a rate limiter from configuration.
+
+        Args:
+            rate_limit_config: Rate limit configuration
+            backend: Bucket storage. Defaults to an in-memory backend
+
+        Returns:
+            RateLimiter: The configured limiter
+        """
+        return cls(
+            requests_per_second=rate_limit_config.requests_per_second,
+            burst=rate_limit_config.burst,
+            tool_costs=rate_limit_config.tool_costs,
+            tool_rates=rate_limit_config.tool_rates,
+            backend=(
+                backend
+                if backend is not None
+                else InMemoryRateLimitBackend(rate_limit_config.max_clients)
+            ),
+        )
+
+    def configure(self, rate_limit_config: RateLimitConfig) -> None:
+        """
+        Apply new rates and costs, keeping the tokens left in every bucket.
+
+        Args:
+            rate_limit_config: The new rate limit configuration
+        """
+        self.requests_per_second = rate_limit_config.requests_per_second
+        self.burst = rate_limit_config.burst
+        self.tool_costs = rate_limit_config.tool_costs
+        self.tool_rates = rate_limit_config.tool_rates
+
+    def cost(self, tool_name: str) -> float:
+        """
+        Get the token cost of a tool.
+
+        Args:
+            tool_name: Name of the tool
+
+        Returns:
+            The number of tokens charged per call
+        """
+        return self.tool_costs.get(tool_name, 1.0)
+
+    async def check(self, client: str, tool_names: Tuple[str, ...]) -> float:
+        """
+        Charge a client for a set of tool calls.
+
+        Either every bucket is charged or, when one rejects the calls, the
+        tokens already taken from the others are returned.
+
+        Args:
+            client: Client identity
+            tool_names: Names of the tools called in the request
+
+        Returns:
+            0.0 if the calls are admitted, otherwise the seconds to wait before retrying
+        """
+        charged: List[str] = []
+        for tool_name in tool_names:
+            rate = self.tool_rates.get(tool_name)
+            if rate is None:
+                continue
+            key = f"{client}|tool:{tool_name}"
+            retry_after = await self.backend.consume(key, 1.0, rate, max(rate, 1.0))
+            if retry_after:
+                return await self._reject(charged, retry_after)
+            charged.append(key)
+
+        total_cost = sum(self.cost(tool_name) for tool_name in tool_names)
+        if total_cost > 0:
+            retry_after = await self.backend.consume(
+                client, total_cost, self.requests_per_second, self.burst
+            )
+            if retry_after:
+                return await self._reject(charged, retry_after)
+
+        self.allowed += 1
+        return 0.0
+
+    async def _reject(self, charged: List[str], retry_after: float) -> float:
+        """Refund the per-tool buckets charged for rejected calls."""
+        for key in charged:
+            await self.backend.refund(key, 1.0)
+        self.rejected += 1
+        return retry_after
+
+
+def client_identity(scope: Scope, api_key_header: str = "x-api-key") -> str:
+    """
+    Identify the client of a request.
+
+    Requests authenticated by APIKeyAuthMiddleware are identified by their
+    key id. Otherwise API keys and bearer tokens are hashed so raw credentials
+    are never used as bucket keys.
+
+    Args:
+        scope: ASGI HTTP scope
+        api_key_header: Header carrying the API key
+
+    Returns:
+        A stable identity string for the client
+    """
+    key_id = scope.get("state", {}).get("api_key_id")
+    if key_id is not None:
+        return f"key:{key_id}"
+
+    credential = get_header(scope, api_key_header)
+    if credential is None:
+        authorization = get_header(scope, "authorization")
+        if authorization and authorization.lower().startswith("bearer "):
+            credential = authorization[7:]
+    if credential:
+        return "key:" + hashlib.sha256(credential.encode()).hexdigest()[:16]
+
+    client = scope.get("client")
+    return f"addr:{client[0]}" if client else "addr:unknown"
+
+
+class RateLimitMiddleware:
+    """
+    ASGI middleware rejecting tool calls over quota with HTTP 429.
+    """
+
+    def __init__(
+        self, app: ASGIApp, limiter: RateLimiter, api_key_header: str = "x-api-key"
+    ):
+        """
+        Args:
+            app: The downstream ASGI application
+            limiter: Rate limiter to charge calls against
+            api_key_header: Header carrying the client's API key
+        """
+        self.app = app
+        self.limiter = limiter
+        self.api_key_header = api_key_header.lower()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] != "POST":
+            await self.app(scope, receive, send)
+            return
+
+        calls, receive = await read_tool_calls(scope, receive)
+        if calls:
+            client = client_identity(scope, self.api_key_header)
+            retry_after = await self.limiter.check(
+                client, tuple(call.name for call in calls)
+            )
+            if retry_after:
+                await send_error(
+                    send,
+                    429,
+                    RATE_LIMITED_ERROR_CODE,
+                    "Rate limit exceeded",
+                    request_id=calls[0].request_id,
+                    headers={
+                        "Retry-After": str(max(1, math.ceil(min(retry_after, 3600))))
+                    },
+                )
+                return
+
+        await self.app(scope, receive, send)
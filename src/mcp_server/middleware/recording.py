@@ -0,0 +1,284 @@
+"""
+Recording of tool calls for replay.
+
+CallRecorder appends each tool call to a file, one JSON object per line:
+when it started, the tool, its arguments and client, how long it ran, the
+size of its result and the error it raised, if any. Calls are buffered and
+written every flush interval on the executor's threads, so recording adds
+no disk I/O to the calls themselves.
+
+`mcp-server replay` drives a recording against a server and compares the
+latencies with the recorded ones. Recordings hold the arguments of the
+calls: keep RECORDING_TOOLS to tools whose arguments may be stored.
+"""
+
+import asyncio
+import logging
+import os
+import random
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastmcp import FastMCP
+
+from src.mcp_server.config.config import RecordingConfig, config
+from src.mcp_server.middleware.metrics import content_size
+from src.mcp_server.middleware.tool_calls import (
+    Content,
+    ToolCall,
+    ToolCallHandler,
+    add_tool_call_middleware,
+)
+from src.mcp_server.utils import serialization
+from src.mcp_server.utils.executor import get_executor
+
+logger = logging.getLogger(config.app_name)
+
+
+@dataclass(slots=True)
+class RecordedCall:
+    """A tool call read from a recording."""
+
+    started_at: float
+    tool: str
+    arguments: Dict[str, Any]
+    duration_ms: float
+    result_bytes: int = 0
+    client: Optional[str] = None
+    error: Optional[str] = None
+
+
+def read_recording(path: str) -> Tuple[List[RecordedCall], int]:
+    """
+    Read the calls of a recording, in the order they started.
+
+    Args:
+        path: File written by CallRecorder
+
+    Returns:
+        The calls, and the number of lines that could not be read, such as
+        a line cut short when the server stopped
+    """
+    calls = []
+    skipped = 0
+    with open(path, "rb") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                entry = serialization.loads(line)
+                calls.append(
+                    RecordedCall(
+                        started_at=float(entry["ts"]),
+                        tool=entry["tool"],
+                        arguments=entry.get("arguments") or {},
+                        duration_ms=float(entry["duration_ms"]),
+                        result_bytes=int(entry.get("result_bytes", 0)),
+                        client=entry.get("client"),
+                        error=entry.get("error"),
+                    )
+                )
+            except (ValueError, KeyError, TypeError):
+                skipped += 1
+    calls.sort(key=lambda call: call.started_at)
+    return calls, skipped
+
+
+class CallRecorder:
+    """
+    Tool-call middleware appending the calls it sees to a recording.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        sample_rate: float = 1.0,
+        tools: Optional[List[str]] = None,
+        flush_interval: float = 1.0,
+        max_pending: int = 10000,
+    ):
+        """
+        Args:
+            path: File to append to; its directory is created if needed
+            sample_rate: Share of tool calls recorded
+            tools: Tools whose calls are recorded. None records every tool
+            flush_interval: Seconds between writes
+            max_pending: Calls buffered between writes; calls beyond it are dropped
+        """
+        self.path = path
+        self.sample_rate = sample_rate
+        self.tools = set(tools) if tools is not None else None
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.recorded = 0
+        self.dropped = 0
+        self.write_errors = 0
+        self._pending: List[bytes] = []
+        self._task: Optional[asyncio.Task] = None
+
+    @classmethod
+    def from_config(cls, recording_config: RecordingConfig) -> "CallRecorder":
+        """
+        Create the recorder from configuration.
+
+        Args:
+            recording_config: Recording configuration
+
+        Returns:
+            CallRecorder: The configured recorder
+        """
+        return cls(
+            recording_config.path,
+            sample_rate=recording_config.sample_rate,
+            tools=recording_config.tools,
+            flush_interval=recording_config.flush_interval,
+            max_pending=recording_config.max_pending,
+        )
+
+    def configure(self, recording_config: RecordingConfig) -> None:
+        """
+        Apply a new sample rate and tool list. The file is kept until restart.
+
+        Args:
+            recording_config: Recording configuration
+        """
+        self.sample_rate = recording_config.sample_rate
+        self.tools = (
+            set(recording_config.tools) if recording_config.tools is not None else None
+        )
+        self.flush_interval = recording_config.flush_interval
+        self.max_pending = recording_config.max_pending
+
+    def should_record(self, tool_name: str) -> bool:
+        """
+        Decide whether to record a call.
+
+        Args:
+            tool_name: Name of the called tool
+
+        Returns:
+            Whether the call is recorded
+        """
+        if self.tools is not None and tool_name not in self.tools:
+            return False
+        return self.sample_rate >= 1.0 or random.random() < self.sample_rate
+
+    async def __call__(self, call: ToolCall, call_next: ToolCallHandler) -> Content:
+        if not self.should_record(call.name):
+            return await call_next(call)
+
+        started_at = time.time()
+        started = time.perf_counter()
+        result = None
+        error = None
+        try:
+            result = await call_next(call)
+            return result
+        except BaseException as e:
+            error = type(e).__name__
+            raise
+        finally:
+            entry = {
+                "ts": round(started_at, 6),
+                "tool": call.name,
+                "arguments": call.arguments,
+                "duration_ms": round((time.perf_counter() - started) * 1000, 3),
+                "result_bytes": content_size(result) if result is not None else 0,
+            }
+            if call.client is not None:
+                entry["client"] = call.client
+            if error is not None:
+                entry["error"] = error
+            self._append(entry)
+
+    def _append(self, entry: Dict[str, Any]) -> None:
+        if len(self._pending) >= self.max_pending:
+            self.dropped += 1
+            return
+        try:
+            # Encoded now, so a tool changing its arguments afterwards does not change
+            # the record
+            self._pending.append(serialization.dumps(entry) + b"\n")
+        except (TypeError, ValueError):
+            self.dropped += 1
+            return
+        self.recorded += 1
+        self.ensure_running()
+
+    def _write(self, data: bytes) -> None:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.path, "ab") as f:
+            f.write(data)
+
+    async def flush(self) -> None:
+        """Write the buffered calls."""
+        if not self._pending:
+            return
+        lines, self._pending = self._pending, []
+        try:
+            await asyncio.get_running_loop().run_in_executor(
+                get_executor().thread_pool, self._write, b"".join(lines)
+            )
+        except Exception as e:
+            self.write_errors += 1
+            logger.warning(
+                "Failed to write %d recorded calls to %s: %s", len(lines), self.path, e
+            )
+
+    async def run(self) -> None:
+        """Write buffered calls every flush interval until cancelled."""
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    def ensure_running(self) -> None:
+        """Start the writer loop on the running event loop if it is not running."""
+        if self._task is None or self._task.done():
+            try:
+                self._task = asyncio.get_running_loop().create_task(self.run())
+            except RuntimeError:
+                # No running loop; calls are written once one starts the loop
+                pass
+
+    async def stop(self) -> None:
+        """Stop the writer loop, writing what is buffered."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        await self.flush()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get the recorder counters.
+
+        Returns:
+            Dictionary with the calls recorded, dropped, still buffered and failed
+            writes
+        """
+        return {
+            "recorded": self.recorded,
+            "dropped": self.dropped,
+            "pending": len(self._pending),
+            "write_errors": self.write_errors,
+        }
+
+
+def register_recording(
+    mcp_instance: FastMCP, recorder: Optional[CallRecorder] = None
+) -> CallRecorder:
+    """
+    Record the tool calls of a FastMCP server.
+
+    Args:
+        mcp_instance: The FastMCP instance whose tool calls are recorded
+        recorder: The recorder. Defaults to one built from the application config
+
+    Returns:
+        CallRecorder: The recorder in use
+    """
+    recorder = recorder or CallRecorder.from_config(config.recording)
+    add_tool_call_middleware(mcp_instance, recorder)
+    return recorder
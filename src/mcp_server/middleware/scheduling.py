@@ -0,0 +1,404 @@
+"""
+Priority scheduling and admission control for tool calls.
+
+ToolScheduler bounds how many tool calls run at once. Calls arriving while
+every slot is taken wait in a queue, and a call is rejected outright when the
+queue is full. Queued calls are admitted by weighted fair queuing: each
+client's calls of each priority class form a flow. Flows are served in
+proportion to the weight of their class, so under load a cheap interactive
+call does not wait behind a client's backlog of heavy ones, and a client
+flooding the server cannot starve the others. When the server is not
+saturated, calls run immediately in arrival order.
+
+Tools declare their class with a tag when they are registered:
+
+    mcp_instance.tool("Ping", tags={priority_tag("interactive")})(ping)
+
+The tool_classes setting overrides declared classes by tool name. Clients are
+API keys when requests are authenticated, so opening more sessions does not
+earn a larger share, and otherwise MCP sessions or the HTTP client of a batch.
+
+A client can give a call a deadline, as a Unix time in seconds, in the _meta
+field of the tools/call request:
+
+    {"name": "Search", "arguments": {...}, "_meta": {"deadline": 1767225600.5}}
+
+Calls whose deadline passes, or that wait longer than the queue timeout, are
+dropped before they run.
+"""
+
+import asyncio
+import heapq
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from fastmcp import FastMCP
+from fastmcp.exceptions import ToolError
+
+from src.mcp_server.config.config import SchedulingConfig, config
+from src.mcp_server.middleware.tool_calls import (
+    Content,
+    ToolCall,
+    ToolCallHandler,
+    add_tool_call_middleware,
+)
+from src.mcp_server.utils.metrics import MetricFamily
+
+# Prefix of the tool tag declaring a priority class
+PRIORITY_TAG_PREFIX = "priority:"
+
+# _meta field carrying the deadline of a call
+DEADLINE_META_KEY = "deadline"
+
+
+def priority_tag(priority_class: str) -> str:
+    """
+    Build the tool tag declaring a priority class.
+
+    Args:
+        priority_class: Name of the class, such as "interactive"
+
+    Returns:
+        The tag to register the tool with
+    """
+    return PRIORITY_TAG_PREFIX + priority_class
+
+
+@dataclass(slots=True)
+class _Waiter:
+    """A call waiting in the queue."""
+
+    priority_class: str
+    future: asyncio.Future
+    deadline: Optional[float]
+    # Virtual time the call's service starts
+    start: float
+    queued: bool = True
+
+
+@dataclass(slots=True)
+class _ClassCounters:
+    """Outcomes of the calls of one priority class."""
+
+    admitted: int = 0
+    rejected: int = 0
+    expired: int = 0
+    queued: int = 0
+    wait_seconds: float = 0.0
+
+
+class ToolScheduler:
+    """
+    Tool-call middleware admitting calls by priority class and client.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 64,
+        max_queue: int = 1000,
+        queue_timeout: float = 30.0,
+        class_weights: Optional[Dict[str, float]] = None,
+        default_class: str = "default",
+        tool_classes: Optional[Dict[str, str]] = None,
+    ):
+        """
+        Args:
+            max_concurrency: Tool calls running at once
+            max_queue: Calls waiting to run before new calls are rejected
+            queue_timeout: Seconds a call may wait to run. 0 waits indefinitely
+            class_weights: Relative share of each priority class
+            default_class: Class of tools that do not declare one
+            tool_classes: Classes by tool name, overriding the declared ones
+        """
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.class_weights = dict(
+            class_weights or {"interactive": 8.0, "default": 4.0, "background": 1.0}
+        )
+        self.default_class = default_class
+        self.tool_classes = dict(tool_classes or {})
+        self.running = 0
+        self.tool_manager = None
+        self._counters: Dict[str, _ClassCounters] = {}
+        self._queue: List[Tuple[float, int, _Waiter]] = []
+        self._queued = 0
+        self._sequence = 0
+        self._virtual_time = 0.0
+        # Virtual time the last queued call of each (class, client) flow finishes
+        self._flows: Dict[Tuple[str, Optional[str]], float] = {}
+
+    @classmethod
+    def from_config(cls, scheduling_config: SchedulingConfig) -> "ToolScheduler":
+        """
+        Create a scheduler from configuration.
+
+        Args:
+            scheduling_config: Scheduling configuration
+
+        Returns:
+            ToolScheduler: The configured scheduler
+        """
+        scheduler = cls()
+        scheduler.configure(scheduling_config)
+        return scheduler
+
+    def configure(self, scheduling_config: SchedulingConfig) -> None:
+        """
+        Apply new settings. Queued calls are admitted if the limit was raised.
+
+        Args:
+            scheduling_config: Scheduling configuration
+        """
+        self.max_concurrency = scheduling_config.max_concurrency
+        self.max_queue = scheduling_config.max_queue
+        self.queue_timeout = scheduling_config.queue_timeout
+        self.class_weights = dict(scheduling_config.class_weights)
+        self.default_class = scheduling_config.default_class
+        self.tool_classes = dict(scheduling_config.tool_classes)
+        self._dispatch()
+
+    @property
+    def queued(self) -> int:
+        """Number of calls waiting to run."""
+        return self._queued
+
+    def priority_class(self, tool_name: str) -> str:
+        """
+        Get the priority class of a tool.
+
+        Args:
+            tool_name: Name of the tool
+
+        Returns:
+            The configured class, else the class declared by the tool's tags,
+            else the default class
+        """
+        priority_class = self.tool_classes.get(tool_name)
+        if priority_class is None and self.tool_manager is not None:
+            tool = self.tool_manager._tools.get(tool_name)
+            for tag in tool.tags if tool is not None else ():
+                if tag.startswith(PRIORITY_TAG_PREFIX):
+                    priority_class = tag[len(PRIORITY_TAG_PREFIX) :]
+                    break
+        if priority_class not in self.class_weights:
+            return self.default_class
+        return priority_class
+
+    def _counter(self, priority_class: str) -> _ClassCounters:
+        counters = self._counters.get(priority_class)
+        if counters is None:
+            counters = self._counters[priority_class] = _ClassCounters()
+        return counters
+
+    async def acquire(
+        self,
+        priority_class: str,
+        client: Optional[str] = None,
+        deadline: Optional[float] = None,
+    ) -> None:
+        """
+        Wait for a slot to run a call.
+
+        Args:
+            priority_class: Class of the call
+            client: Identity of the caller
+            deadline: Unix time after which the call is dropped
+
+        Raises:
+            ToolError: The queue is full, or the deadline passed before a slot was free
+        """
+        counters = self._counter(priority_class)
+        now = time.time()
+        if self.queue_timeout:
+            deadline = (
+                min(deadline, now + self.queue_timeout)
+                if deadline is not None
+                else now + self.queue_timeout
+            )
+        if deadline is not None and deadline <= now:
+            counters.expired += 1
+            raise ToolError("Call dropped: its deadline passed before it could run")
+        if self.running < self.max_concurrency and not self._queued:
+            self.running += 1
+            counters.admitted += 1
+            return
+        if self._queued >= self.max_queue:
+            counters.rejected += 1
+            raise ToolError("Server busy: too many tool calls are waiting to run")
+
+        flow = (priority_class, client)
+        start = max(self._virtual_time, self._flows.get(flow, 0.0))
+        finish = start + 1.0 / self.class_weights.get(priority_class, 1.0)
+        self._flows[flow] = finish
+        loop = asyncio.get_running_loop()
+        waiter = _Waiter(priority_class, loop.create_future(), deadline, start)
+        self._sequence += 1
+        heapq.heappush(self._queue, (finish, self._sequence, waiter))
+        self._queued += 1
+        counters.queued += 1
+        timer = (
+            loop.call_later(deadline - now, self._expire, waiter)
+            if deadline is not None
+            else None
+        )
+        try:
+            admitted = await waiter.future
+        except asyncio.CancelledError:
+            future = waiter.future
+            if future.done() and not future.cancelled() and future.result():
+                # The slot was handed to us just before cancellation; pass it on
+                self.release()
+            else:
+                self._leave(waiter)
+            raise
+        finally:
+            if timer is not None:
+                timer.cancel()
+            counters.wait_seconds += time.time() - now
+        if not admitted:
+            counters.expired += 1
+            raise ToolError("Call dropped: its deadline passed before it could run")
+        counters.admitted += 1
+
+    def release(self) -> None:
+        """Free the slot of a finished call and admit the next queued call."""
+        self.running -= 1
+        self._dispatch()
+
+    def _leave(self, waiter: _Waiter) -> None:
+        """
+        Take a waiter out of the queue counts; its heap entry is skipped when popped.
+        """
+        if waiter.queued:
+            waiter.queued = False
+            self._queued -= 1
+            self._counter(waiter.priority_class).queued -= 1
+
+    def _expire(self, waiter: _Waiter) -> None:
+        """Drop a queued call whose deadline passed."""
+        if waiter.queued:
+            self._leave(waiter)
+            if not waiter.future.done():
+                waiter.future.set_result(False)
+
+    def _dispatch(self) -> None:
+        """Admit queued calls in finish-time order while slots are free."""
+        while self._queue and self.running < self.max_concurrency:
+            _, _, waiter = heapq.heappop(self._queue)
+            if not waiter.queued:
+                continue
+            self._leave(waiter)
+            self._virtual_time = max(self._virtual_time, waiter.start)
+            if waiter.deadline is not None and waiter.deadline <= time.time():
+                waiter.future.set_result(False)
+                continue
+            self.running += 1
+            waiter.future.set_result(True)
+        if not self._queued:
+            # Every flow is idle; forget them
+            self._queue.clear()
+            self._flows.clear()
+        elif len(self._flows) > 2 * self._queued + 1024:
+            # Flows whose calls have all been served start afresh anyway
+            self._flows = {
+                flow: finish
+                for flow, finish in self._flows.items()
+                if finish > self._virtual_time
+            }
+
+    async def __call__(self, call: ToolCall, call_next: ToolCallHandler) -> Content:
+        deadline = call.meta.get(DEADLINE_META_KEY)
+        if deadline is not None and (
+            isinstance(deadline, bool) or not isinstance(deadline, (int, float))
+        ):
+            raise ToolError(f"{DEADLINE_META_KEY} must be a Unix time in seconds")
+        await self.acquire(self.priority_class(call.name), call.client, deadline)
+        try:
+            return await call_next(call)
+        finally:
+            self.release()
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """
+        Get per-class counters.
+
+        Returns:
+            Dictionary mapping priority classes to their admitted, rejected,
+            expired and queued calls and their total wait in seconds
+        """
+        return {
+            name: {
+                "admitted": counters.admitted,
+                "rejected": counters.rejected,
+                "expired": counters.expired,
+                "queued": counters.queued,
+                "wait_seconds": counters.wait_seconds,
+            }
+            for name, counters in self._counters.items()
+        }
+
+    def collect_metrics(self, prefix: str = "mcp") -> Iterable[MetricFamily]:
+        """
+        Collect the scheduler gauges and counters for a MetricsRegistry.
+
+        Args:
+            prefix: Metric name prefix
+
+        Returns:
+            Metric families for running and queued calls and call outcomes by class
+        """
+        classes = sorted(self._counters.items())
+        return [
+            (
+                f"{prefix}_scheduler_running_calls",
+                "gauge",
+                "Tool calls holding a scheduler slot.",
+                [({}, self.running)],
+            ),
+            (
+                f"{prefix}_scheduler_queued_calls",
+                "gauge",
+                "Tool calls waiting for a scheduler slot.",
+                [({"class": name}, counters.queued) for name, counters in classes],
+            ),
+            (
+                f"{prefix}_scheduler_calls_total",
+                "counter",
+                "Tool calls by priority class and outcome.",
+                [
+                    ({"class": name, "outcome": outcome}, getattr(counters, outcome))
+                    for name, counters in classes
+                    for outcome in ("admitted", "rejected", "expired")
+                ],
+            ),
+            (
+                f"{prefix}_scheduler_wait_seconds_total",
+                "counter",
+                "Time tool calls spent waiting for a slot.",
+                [
+                    ({"class": name}, counters.wait_seconds)
+                    for name, counters in classes
+                ],
+            ),
+        ]
+
+
+def register_scheduling(
+    mcp_instance: FastMCP, scheduler: Optional[ToolScheduler] = None
+) -> ToolScheduler:
+    """
+    Admit the tool calls of a FastMCP server through a scheduler.
+
+    Args:
+        mcp_instance: The FastMCP instance whose tool calls are scheduled
+        scheduler: The scheduler. Defaults to one built from the application config
+
+    Returns:
+        ToolScheduler: The scheduler in use
+    """
+    scheduler = scheduler or ToolScheduler.from_config(config.scheduling)
+    scheduler.tool_manager = mcp_instance._tool_manager
+    add_tool_call_middleware(mcp_instance, scheduler)
+    return scheduler
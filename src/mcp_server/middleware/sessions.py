@@ -0,0 +1,626 @@
+"""
+Bounded streamable-HTTP sessions.
+
+The MCP SDK keeps a transport in memory for every streamable-HTTP session
+until the server stops, so clients that never close their sessions grow the
+process without bound. SessionMiddleware tracks the sessions of the process
+and closes them when they stay idle longer than the idle TTL, and closes the
+least recently used one when the process holds more than max_sessions.
+Requests for a closed session are answered with HTTP 404, which tells MCP
+clients to start a new session.
+
+Activity is written to the store at most ten times per idle TTL, so a session
+busy on one worker may look idle to the others slightly early; it is then no
+longer resumed elsewhere but keeps serving where it is open.
+
+Sessions are also recorded in a SessionStore. With a store shared by several
+workers, such as SQLiteSessionStore for workers on one host, a request for a
+session opened on another worker resumes it on the worker that receives it,
+without a new initialization handshake. A resumed session does not know the
+capabilities the client announced at initialization, so it does not send the
+client requests that depend on them.
+
+The SDK has no public API to close or resume a session, so the tracker uses
+private attributes of the session manager and its transports, present in the
+SDK versions pinned in pyproject.toml. With an SDK lacking them the middleware
+leaves sessions to the SDK, unbounded and not resumed, and logs a warning.
+"""
+
+import asyncio
+import inspect
+import logging
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, Optional
+
+import anyio
+from anyio.abc import TaskStatus
+from mcp.server.streamable_http import (
+    MCP_SESSION_ID_HEADER,
+    StreamableHTTPServerTransport,
+)
+from mcp.server.streamable_http_manager import StreamableHTTPSessionManager
+from starlette.datastructures import Headers
+from starlette.routing import Mount
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.mcp_server.config.config import SessionConfig, config
+from src.mcp_server.middleware.jsonrpc import get_header, send_error
+from src.mcp_server.utils.executor import get_executor
+from src.mcp_server.utils.metrics import MetricFamily
+
+logger = logging.getLogger(config.app_name)
+
+# JSON-RPC error code returned for unknown sessions
+INVALID_REQUEST_CODE = -32600
+
+# Activity is written to the store at most this many times per idle TTL
+_TOUCH_FRACTION = 10
+
+# Private attributes of the SDK the tracker closes and resumes sessions with
+_MANAGER_INTERNALS = ("_task_group", "_server_instances")
+_TRANSPORT_INTERNALS = ("_terminate_session",)
+
+
+@dataclass(slots=True)
+class SessionRecord:
+    """A session as kept in a SessionStore."""
+
+    session_id: str
+    created_at: float
+    last_seen: float
+    worker: int
+
+
+class SessionStore(ABC):
+    """
+    Storage for session records.
+
+    Implement this interface on top of a shared store to let workers resume
+    each other's sessions. Times are Unix timestamps, so they compare across
+    processes.
+    """
+
+    @abstractmethod
+    async def save(self, record: SessionRecord) -> None:
+        """
+        Create or replace a record.
+
+        Args:
+            record: The session record
+        """
+
+    @abstractmethod
+    async def load(self, session_id: str) -> Optional[SessionRecord]:
+        """
+        Get a record.
+
+        Args:
+            session_id: The session id
+
+        Returns:
+            The record, or None if the session is unknown
+        """
+
+    @abstractmethod
+    async def touch(self, session_id: str, last_seen: float) -> None:
+        """
+        Record activity on a session.
+
+        Args:
+            session_id: The session id
+            last_seen: Time of the activity
+        """
+
+    @abstractmethod
+    async def delete(self, session_id: str) -> None:
+        """
+        Forget a session.
+
+        Args:
+            session_id: The session id
+        """
+
+    @abstractmethod
+    async def purge(self, idle_before: float) -> int:
+        """
+        Forget the sessions idle since before a time.
+
+        Args:
+            idle_before: Sessions last seen before this time are forgotten
+
+        Returns:
+            The number of sessions forgotten
+        """
+
+    async def close(self) -> None:
+        """
+        Release the store's connections. Called once the application has shut down.
+        """
+
+
+class InMemorySessionStore(SessionStore):
+    """
+    Per-process session store bounded to a maximum number of records.
+
+    When the bound is reached the least recently used record is dropped.
+    """
+
+    def __init__(self, max_records: int = 100000):
+        """
+        Args:
+            max_records: Maximum number of records kept in memory
+        """
+        self.max_records = max_records
+        self._records: "OrderedDict[str, SessionRecord]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    async def save(self, record: SessionRecord) -> None:
+        self._records[record.session_id] = record
+        self._records.move_to_end(record.session_id)
+        if len(self._records) > self.max_records:
+            self._records.popitem(last=False)
+
+    async def load(self, session_id: str) -> Optional[SessionRecord]:
+        return self._records.get(session_id)
+
+    async def touch(self, session_id: str, last_seen: float) -> None:
+        record = self._records.get(session_id)
+        if record is not None:
+            record.last_seen = last_seen
+            self._records.move_to_end(session_id)
+
+    async def delete(self, session_id: str) -> None:
+        self._records.pop(session_id, None)
+
+    async def purge(self, idle_before: float) -> int:
+        expired = [
+            sid
+            for sid, record in self._records.items()
+            if record.last_seen < idle_before
+        ]
+        for sid in expired:
+            del self._records[sid]
+        return len(expired)
+
+
+class SQLiteSessionStore(SessionStore):
+    """
+    Session store in a SQLite database shared by the workers of one host.
+
+    Queries run in the executor's threads, one at a time, so a busy database
+    does not block the event loop.
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: Database file, created if needed
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._db = sqlite3.connect(
+            path, timeout=5.0, isolation_level=None, check_same_thread=False
+        )
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            "session_id TEXT PRIMARY KEY, created_at REAL, last_seen REAL, worker "
+            "INTEGER)"
+        )
+        self._db.execute(
+            "CREATE INDEX IF NOT EXISTS sessions_last_seen ON sessions (last_seen)"
+        )
+        self._lock = threading.Lock()
+
+    def _locked(self, fn: Callable[..., Any], *args: Any) -> Any:
+        with self._lock:
+            return fn(*args)
+
+    async def _run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        return await asyncio.get_running_loop().run_in_executor(
+            get_executor().thread_pool, self._locked, fn, *args
+        )
+
+    async def save(self, record: SessionRecord) -> None:
+        await self._run(
+            self._db.execute,
+            "INSERT OR REPLACE INTO sessions VALUES (?, ?, ?, ?)",
+            (record.session_id, record.created_at, record.last_seen, record.worker),
+        )
+
+    async def load(self, session_id: str) -> Optional[SessionRecord]:
+        row = await self._run(self._fetch, session_id)
+        return SessionRecord(*row) if row else None
+
+    def _fetch(self, session_id: str) -> Optional[tuple]:
+        return self._db.execute(
+            "SELECT session_id, created_at, last_seen, worker FROM sessions WHERE "
+            "session_id = ?",
+            (session_id,),
+        ).fetchone()
+
+    async def touch(self, session_id: str, last_seen: float) -> None:
+        await self._run(
+            self._db.execute,
+            "UPDATE sessions SET last_seen = ? WHERE session_id = ?",
+            (last_seen, session_id),
+        )
+
+    async def delete(self, session_id: str) -> None:
+        await self._run(
+            self._db.execute, "DELETE FROM sessions WHERE session_id = ?", (session_id,)
+        )
+
+    async def purge(self, idle_before: float) -> int:
+        cursor = await self._run(
+            self._db.execute, "DELETE FROM sessions WHERE last_seen < ?", (idle_before,)
+        )
+        return cursor.rowcount
+
+    async def close(self) -> None:
+        """Close the database connection once running queries finish."""
+        await self._run(self._db.close)
+
+
+def find_session_manager(app: ASGIApp) -> Optional[StreamableHTTPSessionManager]:
+    """
+    Find the session manager of a FastMCP streamable-HTTP application.
+
+    FastMCP does not expose it, so it is looked up in the closure of the
+    handler mounted on the MCP path.
+
+    Args:
+        app: The Starlette application built by FastMCP.http_app
+
+    Returns:
+        The session manager, or None if the application serves no streamable-HTTP
+        endpoint
+    """
+    for route in getattr(app, "routes", []):
+        if not isinstance(route, Mount) or not inspect.isfunction(route.app):
+            continue
+        for value in inspect.getclosurevars(route.app).nonlocals.values():
+            if isinstance(value, StreamableHTTPSessionManager):
+                return value
+    return None
+
+
+def supports_session_control(manager: StreamableHTTPSessionManager) -> bool:
+    """
+    Check the SDK exposes the internals sessions are closed and resumed with.
+
+    Args:
+        manager: The session manager
+
+    Returns:
+        Whether SessionTracker can manage the sessions of this manager
+    """
+    return (
+        all(hasattr(manager, name) for name in _MANAGER_INTERNALS)
+        and isinstance(manager._server_instances, dict)
+        and all(
+            hasattr(StreamableHTTPServerTransport, name)
+            for name in _TRANSPORT_INTERNALS
+        )
+    )
+
+
+class SessionTracker:
+    """
+    Bounds, expires and resumes the sessions of one process.
+    """
+
+    def __init__(
+        self,
+        store: Optional[SessionStore] = None,
+        max_sessions: int = 10000,
+        idle_ttl: float = 1800.0,
+        sweep_interval: float = 30.0,
+    ):
+        """
+        Args:
+            store: Store recording the sessions. Defaults to an in-memory store
+            max_sessions: Sessions kept in this process before the least recently used
+                is closed
+            idle_ttl: Seconds a session may stay idle before it is closed
+            sweep_interval: Minimum seconds between sweeps for idle sessions
+        """
+        self.store = store if store is not None else InMemorySessionStore()
+        self.max_sessions = max_sessions
+        self.idle_ttl = idle_ttl
+        self.sweep_interval = sweep_interval
+        self.manager: Optional[StreamableHTTPSessionManager] = None
+        self.evicted = 0
+        self.expired = 0
+        self.resumed = 0
+        # Session id -> last activity, least recently used first
+        self._active: "OrderedDict[str, float]" = OrderedDict()
+        self._stored_at: Dict[str, float] = {}
+        self._swept_at = time.time()
+        self._resume_lock = asyncio.Lock()
+
+    @classmethod
+    def from_config(cls, session_config: SessionConfig) -> "SessionTracker":
+        """
+        Create a tracker from configuration.
+
+        Args:
+            session_config: Session store configuration
+
+        Returns:
+            SessionTracker: The configured tracker
+        """
+        if session_config.backend == "sqlite":
+            store: SessionStore = SQLiteSessionStore(session_config.sqlite_path)
+        else:
+            store = InMemorySessionStore(max_records=session_config.max_sessions * 10)
+        return cls(
+            store=store,
+            max_sessions=session_config.max_sessions,
+            idle_ttl=session_config.idle_ttl,
+            sweep_interval=session_config.sweep_interval,
+        )
+
+    def __len__(self) -> int:
+        return len(self._active)
+
+    def __contains__(self, session_id: str) -> bool:
+        return session_id in self._active
+
+    async def opened(self, session_id: str) -> None:
+        """
+        Track a session the SDK just created, closing the least recently used if over
+        the cap.
+
+        Args:
+            session_id: The new session id
+        """
+        now = time.time()
+        self._active[session_id] = now
+        self._stored_at[session_id] = now
+        await self.store.save(SessionRecord(session_id, now, now, os.getpid()))
+        while len(self._active) > self.max_sessions:
+            oldest = next(iter(self._active))
+            self.evicted += 1
+            logger.info(
+                "Closing least recently used session %s (limit %d)",
+                oldest,
+                self.max_sessions,
+            )
+            await self.close(oldest)
+
+    async def seen(self, session_id: str) -> bool:
+        """
+        Record a request on a session, resuming it if another worker opened it.
+
+        Args:
+            session_id: Session id sent by the client
+
+        Returns:
+            Whether the session can serve the request
+        """
+        now = time.time()
+        if session_id in self._active:
+            self._active[session_id] = now
+            self._active.move_to_end(session_id)
+            # The store is written at most _TOUCH_FRACTION times per idle TTL
+            if (
+                now - self._stored_at.get(session_id, 0.0)
+                > self.idle_ttl / _TOUCH_FRACTION
+            ):
+                self._stored_at[session_id] = now
+                await self.store.touch(session_id, now)
+            return True
+        return await self._resume(session_id, now)
+
+    async def _resume(self, session_id: str, now: float) -> bool:
+        """Recreate the transport of a session recorded in the store."""
+        manager = self.manager
+        if manager is None or manager._task_group is None:
+            return False
+        async with self._resume_lock:
+            if session_id in self._active:
+                return True
+            record = await self.store.load(session_id)
+            if record is None or record.last_seen < now - self.idle_ttl:
+                return False
+
+            transport = StreamableHTTPServerTransport(
+                mcp_session_id=session_id,
+                is_json_response_enabled=manager.json_response,
+                event_store=manager.event_store,
+            )
+
+            async def run_server(
+                *, task_status: TaskStatus[None] = anyio.TASK_STATUS_IGNORED
+            ) -> None:
+                async with transport.connect() as (read_stream, write_stream):
+                    task_status.started()
+                    # The client initialized the session elsewhere
+                    await manager.app.run(
+                        read_stream,
+                        write_stream,
+                        manager.app.create_initialization_options(),
+                        stateless=True,
+                    )
+
+            await manager._task_group.start(run_server)
+            manager._server_instances[session_id] = transport
+            self._active[session_id] = now
+            self._stored_at[session_id] = now
+            await self.store.touch(session_id, now)
+            self.resumed += 1
+            logger.info(
+                "Resumed session %s opened by worker %d", session_id, record.worker
+            )
+            return True
+
+    async def close(self, session_id: str, forget: bool = True) -> None:
+        """
+        Close a session and free its transport.
+
+        Args:
+            session_id: The session id
+            forget: Also remove the session from the store, so no worker can resume it
+        """
+        self._active.pop(session_id, None)
+        self._stored_at.pop(session_id, None)
+        if forget:
+            await self.store.delete(session_id)
+        if self.manager is not None:
+            transport = self.manager._server_instances.pop(session_id, None)
+            if transport is not None and not getattr(transport, "_terminated", False):
+                await transport._terminate_session()
+
+    async def sweep(self, now: Optional[float] = None) -> int:
+        """
+        Close the sessions idle for longer than the idle TTL.
+
+        Args:
+            now: Current Unix time
+
+        Returns:
+            The number of sessions closed in this process
+        """
+        now = time.time() if now is None else now
+        self._swept_at = now
+        idle_before = now - self.idle_ttl
+        expired = []
+        for session_id, last_seen in self._active.items():
+            if last_seen >= idle_before:
+                break
+            expired.append(session_id)
+        for session_id in expired:
+            self.expired += 1
+            # Other workers may still serve it; the store forgets it once idle
+            await self.close(session_id, forget=False)
+        await self.store.purge(idle_before)
+        return len(expired)
+
+    async def maybe_sweep(self) -> None:
+        """Sweep for idle sessions if the sweep interval has passed."""
+        now = time.time()
+        if now - self._swept_at >= self.sweep_interval:
+            await self.sweep(now)
+
+    def collect_metrics(self, prefix: str = "mcp") -> Iterable[MetricFamily]:
+        """
+        Collect the session counters for a MetricsRegistry.
+
+        Args:
+            prefix: Metric name prefix
+
+        Returns:
+            Metric families for open, evicted, expired and resumed sessions
+        """
+        return [
+            (
+                f"{prefix}_sessions",
+                "gauge",
+                "Open streamable-HTTP sessions.",
+                [({}, len(self._active))],
+            ),
+            (
+                f"{prefix}_sessions_evicted_total",
+                "counter",
+                "Sessions closed to stay under the session limit.",
+                [({}, self.evicted)],
+            ),
+            (
+                f"{prefix}_sessions_expired_total",
+                "counter",
+                "Sessions closed after being idle.",
+                [({}, self.expired)],
+            ),
+            (
+                f"{prefix}_sessions_resumed_total",
+                "counter",
+                "Sessions resumed from the session store.",
+                [({}, self.resumed)],
+            ),
+        ]
+
+
+class SessionMiddleware:
+    """
+    ASGI middleware bounding and expiring the streamable-HTTP sessions.
+    """
+
+    def __init__(self, app: ASGIApp, tracker: SessionTracker):
+        """
+        Args:
+            app: The downstream ASGI application
+            tracker: Tracker of the sessions of this process
+        """
+        self.app = app
+        self.tracker = tracker
+        self._path: Optional[str] = None
+
+    def _bind(self, scope: Scope) -> bool:
+        """
+        Find the session manager on the first request; return whether sessions are
+        tracked.
+        """
+        if self._path is None:
+            app = scope.get("app")
+            manager = find_session_manager(app)
+            if manager is not None and not supports_session_control(manager):
+                logger.warning(
+                    "This MCP SDK version does not expose the session internals "
+                    "SessionMiddleware "
+                    "relies on; sessions are neither bounded nor resumed"
+                )
+                manager = None
+            self.tracker.manager = manager
+            self._path = (
+                getattr(app.state, "path", "/mcp").rstrip("/")
+                if app is not None
+                else "/mcp"
+            )
+        manager = self.tracker.manager
+        return manager is not None and not manager.stateless
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or not self._bind(scope)
+            or not scope["path"].startswith(self._path)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        await self.tracker.maybe_sweep()
+        session_id = get_header(scope, MCP_SESSION_ID_HEADER)
+        if session_id is None:
+            await self.app(scope, receive, self._capture_session(send))
+            return
+
+        if not await self.tracker.seen(session_id):
+            await send_error(send, 404, INVALID_REQUEST_CODE, "Session not found")
+            return
+
+        await self.app(scope, receive, send)
+        if scope["method"] == "DELETE":
+            await self.tracker.close(session_id)
+
+    def _capture_session(self, send: Send) -> Send:
+        """Wrap send to track the session the response opens, if any."""
+
+        async def wrapped(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                session_id = Headers(raw=message["headers"]).get(MCP_SESSION_ID_HEADER)
+                if session_id is not None and session_id not in self.tracker:
+                    await self.tracker.opened(session_id)
+            await send(message)
+
+        return wrapped
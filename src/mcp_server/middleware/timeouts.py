@@ -0,0 +1,399 @@
+"""
+Tool call timeouts and cancellation.
+
+CallTimeouts bounds how long each tool call runs. A tool declares its timeout
+with a tag when it is registered:
+
+    mcp_instance.tool("Build Report", tags={timeout_tag(120)})(build_report)
+
+The tool_timeouts setting overrides declared timeouts by tool name, and tools
+declaring none get the default timeout. A client can shorten the timeout of
+a call, in seconds, with _meta.timeout; its _meta.deadline bounds the call
+as well.
+
+A call is cancelled when it times out, when the client sends a
+notifications/cancelled message for it, or when its HTTP client goes away.
+DisconnectMiddleware watches the HTTP requests carrying tool calls and
+reports disconnects; it needs CallOriginMiddleware in front of it, so the
+calls of a request are told apart from those of other sessions. Cancellation
+reaches async tools at their next await, and tools running in the executor's
+threads through their CancellationToken.
+Cancelled and timed-out calls are counted with the seconds they ran, so the
+wasted work shows in the metrics.
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from fastmcp import FastMCP
+from fastmcp.exceptions import ToolError
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.mcp_server.config.config import TimeoutConfig, config
+from src.mcp_server.middleware.jsonrpc import read_tool_calls
+from src.mcp_server.middleware.scheduling import DEADLINE_META_KEY
+from src.mcp_server.middleware.tool_calls import (
+    Content,
+    ToolCall,
+    ToolCallHandler,
+    add_tool_call_middleware,
+    current_origin,
+)
+from src.mcp_server.utils.cancellation import CancellationToken, current_cancellation
+from src.mcp_server.utils.metrics import MetricFamily
+
+# Prefix of the tool tag declaring a timeout
+TIMEOUT_TAG_PREFIX = "timeout:"
+
+# _meta field carrying the timeout of a call, in seconds
+TIMEOUT_META_KEY = "timeout"
+
+# Calls announced by the HTTP layer and not yet claimed, at most
+_MAX_EXPECTED = 10000
+
+
+def timeout_tag(seconds: float) -> str:
+    """
+    Build the tool tag declaring a timeout.
+
+    Args:
+        seconds: Seconds the tool may run. 0 is unbounded
+
+    Returns:
+        The tag to register the tool with
+    """
+    return f"{TIMEOUT_TAG_PREFIX}{seconds:g}"
+
+
+@dataclass(slots=True)
+class _ToolCounters:
+    """Calls of one tool that did not run to completion."""
+
+    timed_out: int = 0
+    cancelled: int = 0
+    disconnected: int = 0
+    wasted_seconds: float = 0.0
+
+
+class CallTimeouts:
+    """
+    Tool-call middleware enforcing timeouts and propagating cancellation.
+    """
+
+    def __init__(
+        self,
+        default_timeout: float = 300.0,
+        tool_timeouts: Optional[Dict[str, float]] = None,
+    ):
+        """
+        Args:
+            default_timeout: Seconds a tool call may run. 0 is unbounded
+            tool_timeouts: Seconds each named tool may run, overriding the declared
+                timeouts
+        """
+        self.default_timeout = default_timeout
+        self.tool_timeouts = dict(tool_timeouts or {})
+        self.tool_manager = None
+        self._counters: Dict[str, _ToolCounters] = {}
+        self._expected: "OrderedDict[Tuple[str, Any, str], CancellationToken]" = (
+            OrderedDict()
+        )
+
+    @classmethod
+    def from_config(cls, timeout_config: TimeoutConfig) -> "CallTimeouts":
+        """
+        Create the middleware from configuration.
+
+        Args:
+            timeout_config: Timeout configuration
+
+        Returns:
+            CallTimeouts: The configured middleware
+        """
+        return cls(
+            default_timeout=timeout_config.default_timeout,
+            tool_timeouts=timeout_config.tool_timeouts,
+        )
+
+    def configure(self, timeout_config: TimeoutConfig) -> None:
+        """
+        Apply new timeouts to calls starting from now on.
+
+        Args:
+            timeout_config: Timeout configuration
+        """
+        self.default_timeout = timeout_config.default_timeout
+        self.tool_timeouts = dict(timeout_config.tool_timeouts)
+
+    def tool_timeout(self, tool_name: str) -> float:
+        """
+        Get the timeout of a tool.
+
+        Args:
+            tool_name: Name of the tool
+
+        Returns:
+            The configured timeout, else the timeout declared by the tool's
+            tags, else the default timeout. 0 is unbounded
+        """
+        timeout = self.tool_timeouts.get(tool_name)
+        if timeout is None and self.tool_manager is not None:
+            tool = self.tool_manager._tools.get(tool_name)
+            for tag in tool.tags if tool is not None else ():
+                if tag.startswith(TIMEOUT_TAG_PREFIX):
+                    try:
+                        timeout = float(tag[len(TIMEOUT_TAG_PREFIX) :])
+                    except ValueError:
+                        continue
+                    break
+        return self.default_timeout if timeout is None else timeout
+
+    def call_timeout(self, call: ToolCall) -> Optional[float]:
+        """
+        Get the seconds a call may run, from its tool's timeout and its _meta timeout
+        and deadline.
+
+        Args:
+            call: The tool call
+
+        Returns:
+            The timeout, or None if the call is unbounded
+
+        Raises:
+            ToolError: The _meta timeout or deadline is not a number
+        """
+        limits = []
+        tool_timeout = self.tool_timeout(call.name)
+        if tool_timeout > 0:
+            limits.append(tool_timeout)
+        for key in (TIMEOUT_META_KEY, DEADLINE_META_KEY):
+            value = call.meta.get(key)
+            if value is None:
+                continue
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                raise ToolError(f"{key} must be a number of seconds")
+            limits.append(value - time.time() if key == DEADLINE_META_KEY else value)
+        return max(min(limits), 0.0) if limits else None
+
+    def expect(self, origin: str, request_id: Any, name: str) -> CancellationToken:
+        """
+        Announce a call received by the HTTP layer.
+
+        Args:
+            origin: Session or request the call comes from, see current_origin
+            request_id: JSON-RPC id of the call
+            name: Name of the tool
+
+        Returns:
+            The token to cancel if the client goes away
+        """
+        token = self._expected[(origin, request_id, name)] = CancellationToken()
+        if len(self._expected) > _MAX_EXPECTED:
+            self._expected.popitem(last=False)
+        return token
+
+    def forget(
+        self, origin: str, request_id: Any, name: str, token: CancellationToken
+    ) -> None:
+        """
+        Drop an announced call that never reached its tool.
+
+        Args:
+            origin: Session or request the call comes from
+            request_id: JSON-RPC id of the call
+            name: Name of the tool
+            token: The token announced for it, so a later call with the same id is kept
+        """
+        if self._expected.get((origin, request_id, name)) is token:
+            del self._expected[(origin, request_id, name)]
+
+    def _counter(self, tool_name: str) -> _ToolCounters:
+        counters = self._counters.get(tool_name)
+        if counters is None:
+            counters = self._counters[tool_name] = _ToolCounters()
+        return counters
+
+    async def __call__(self, call: ToolCall, call_next: ToolCallHandler) -> Content:
+        timeout = self.call_timeout(call)
+        token = None
+        if self._expected and call.request_id is not None:
+            origin = current_origin()
+            if origin is not None:
+                token = self._expected.pop((origin, call.request_id, call.name), None)
+        if token is None:
+            token = CancellationToken()
+        elif token.cancelled:
+            self._counter(call.name).disconnected += 1
+            raise ToolError("Call cancelled: the client went away")
+
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        context_token = current_cancellation.set(token)
+        try:
+            async with asyncio.timeout(timeout) as scope:
+                # A disconnect ends the call as a timeout would
+                remove_callback = token.add_callback(
+                    lambda: scope.reschedule(loop.time())
+                )
+                try:
+                    return await call_next(call)
+                finally:
+                    remove_callback()
+        except TimeoutError:
+            if not scope.expired():
+                # Raised by the tool itself
+                raise
+            counters = self._counter(call.name)
+            counters.wasted_seconds += time.perf_counter() - started
+            if token.cancelled:
+                counters.disconnected += 1
+                raise ToolError("Call cancelled: the client went away") from None
+            token.cancel("timeout")
+            counters.timed_out += 1
+            raise ToolError(
+                f"Tool {call.name!r} timed out after {timeout:g} seconds"
+            ) from None
+        except asyncio.CancelledError:
+            # Cancelled by the client, or the server is shutting down
+            token.cancel("cancelled")
+            counters = self._counter(call.name)
+            counters.cancelled += 1
+            counters.wasted_seconds += time.perf_counter() - started
+            raise
+        finally:
+            current_cancellation.reset(context_token)
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """
+        Get per-tool counters.
+
+        Returns:
+            Dictionary mapping tool names to their timed-out, cancelled and
+            disconnected calls and the seconds those calls ran
+        """
+        return {
+            name: {
+                "timed_out": counters.timed_out,
+                "cancelled": counters.cancelled,
+                "disconnected": counters.disconnected,
+                "wasted_seconds": counters.wasted_seconds,
+            }
+            for name, counters in self._counters.items()
+        }
+
+    def collect_metrics(self, prefix: str = "mcp") -> Iterable[MetricFamily]:
+        """
+        Collect the cancellation counters for a MetricsRegistry.
+
+        Args:
+            prefix: Metric name prefix
+
+        Returns:
+            Metric families for calls ended early, by tool and reason, and the time they
+            ran
+        """
+        tools = sorted(self._counters.items())
+        reasons = (
+            ("timeout", "timed_out"),
+            ("cancelled", "cancelled"),
+            ("disconnect", "disconnected"),
+        )
+        return [
+            (
+                f"{prefix}_tool_calls_aborted_total",
+                "counter",
+                "Tool calls ended before completing, by reason.",
+                [
+                    ({"tool": name, "reason": reason}, getattr(counters, field))
+                    for name, counters in tools
+                    for reason, field in reasons
+                ],
+            ),
+            (
+                f"{prefix}_tool_aborted_seconds_total",
+                "counter",
+                "Seconds tool calls ran before they were ended early.",
+                [({"tool": name}, counters.wasted_seconds) for name, counters in tools],
+            ),
+        ]
+
+
+class DisconnectMiddleware:
+    """
+    ASGI middleware cancelling the tool calls of HTTP clients that go away.
+    """
+
+    def __init__(
+        self, app: ASGIApp, timeouts: CallTimeouts, paths: Iterable[str] = ("/mcp",)
+    ):
+        """
+        Args:
+            app: The downstream ASGI application
+            timeouts: Middleware running the calls
+            paths: Path prefixes receiving tool calls, such as the MCP and batch
+                endpoints
+        """
+        self.app = app
+        self.timeouts = timeouts
+        self.paths = tuple(paths)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or scope["method"] != "POST"
+            or not scope["path"].startswith(self.paths)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        origin = current_origin()
+        if origin is None:
+            # Without CallOriginMiddleware, calls cannot be told apart by session
+            await self.app(scope, receive, send)
+            return
+
+        calls, receive = await read_tool_calls(scope, receive)
+        calls = [call for call in calls if call.request_id is not None]
+        if not calls:
+            await self.app(scope, receive, send)
+            return
+
+        tokens = [
+            self.timeouts.expect(origin, call.request_id, call.name) for call in calls
+        ]
+
+        async def watched_receive() -> Message:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                for token in tokens:
+                    token.cancel("disconnect")
+            return message
+
+        try:
+            await self.app(scope, watched_receive, send)
+        finally:
+            # Calls rejected before reaching their tool
+            for call, token in zip(calls, tokens):
+                self.timeouts.forget(origin, call.request_id, call.name, token)
+
+
+def register_timeouts(
+    mcp_instance: FastMCP, timeouts: Optional[CallTimeouts] = None
+) -> CallTimeouts:
+    """
+    Enforce timeouts on the tool calls of a FastMCP server.
+
+    Args:
+        mcp_instance: The FastMCP instance whose tool calls are bounded
+        timeouts: The middleware. Defaults to one built from the application config
+
+    Returns:
+        CallTimeouts: The middleware in use
+    """
+    timeouts = timeouts or CallTimeouts.from_config(config.timeouts)
+    timeouts.tool_manager = mcp_instance._tool_manager
+    add_tool_call_middleware(mcp_instance, timeouts)
+    return timeouts
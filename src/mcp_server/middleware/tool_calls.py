@@ -0,0 +1,284 @@
+"""
+Tool-call middleware for FastMCP servers.
+
+HTTP middleware sees raw requests; tool-call middleware sees every tool call
+after the MCP protocol layer has decoded it, whichever transport it arrived
+on. A middleware is an async callable taking the ToolCall and the next handler
+in the chain:
+
+    async def timing(call: ToolCall, call_next: ToolCallHandler):
+        started = time.perf_counter()
+        try:
+            return await call_next(call)
+        finally:
+            print(call.name, time.perf_counter() - started)
+
+    add_tool_call_middleware(mcp, timing)
+
+Middleware added first runs outermost.
+
+CallOriginMiddleware records which streamable-HTTP session or HTTP request
+the tool calls come from. Calls of a session carry "session:<mcp-session-id>"
+as their client, or "key:<api key id>" once APIKeyAuthMiddleware has
+authenticated the request, so that every session of one key is one client.
+HTTP middleware announcing calls ahead of them, such as
+DisconnectMiddleware, key their announcements by current_origin(), so calls
+of different sessions reusing a JSON-RPC id never match each other.
+"""
+
+import functools
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from fastmcp import FastMCP
+from mcp.server.lowlevel.server import request_ctx
+from mcp.server.streamable_http import MCP_SESSION_ID_HEADER
+from mcp.types import EmbeddedResource, ImageContent, TextContent
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.mcp_server.middleware.jsonrpc import get_header
+
+Content = List[TextContent | ImageContent | EmbeddedResource]
+
+
+@dataclass(slots=True)
+class ToolCall:
+    """A tool call travelling through the middleware chain."""
+
+    name: str
+    arguments: Dict[str, Any]
+    request_id: Any = None
+    meta: Dict[str, Any] = field(default_factory=dict)
+    state: Dict[str, Any] = field(default_factory=dict)
+    # Identifies the caller: its API key or MCP session, or the client of call_tool
+    client: Optional[str] = None
+
+
+ToolCallHandler = Callable[[ToolCall], Awaitable[Content]]
+ToolCallMiddleware = Callable[[ToolCall, ToolCallHandler], Awaitable[Content]]
+
+# Request id, _meta and client of calls made through call_tool, not an MCP session
+_call_info: ContextVar[Optional[tuple]] = ContextVar("tool_call_info", default=None)
+
+
+class CallOrigin:
+    """
+    The streamable-HTTP session, or else the HTTP request, tool calls arrive on.
+    """
+
+    __slots__ = ("session_id", "api_key_id")
+
+    def __init__(
+        self, session_id: Optional[str] = None, api_key_id: Optional[str] = None
+    ):
+        """
+        Args:
+            session_id: The mcp-session-id of the request, if any
+            api_key_id: Id of the API key the request was authenticated with, if any
+        """
+        self.session_id = session_id
+        self.api_key_id = api_key_id
+
+    @property
+    def key(self) -> str:
+        """Identity of the session, or of the request if it belongs to no session."""
+        return (
+            f"session:{self.session_id}" if self.session_id else f"request:{id(self):x}"
+        )
+
+
+# Origin of the HTTP request being served. The SDK starts the task running a
+# session from the request that opens it, so the session's tool calls see the
+# origin of that request, which gets the session id from the response.
+_call_origin: ContextVar[Optional[CallOrigin]] = ContextVar(
+    "tool_call_origin", default=None
+)
+
+
+def current_origin() -> Optional[str]:
+    """
+    Get the key of the session or HTTP request the current tool call or request comes
+    from.
+
+    Returns:
+        The origin key, or None outside CallOriginMiddleware
+    """
+    origin = _call_origin.get()
+    return origin.key if origin is not None else None
+
+
+def authenticate_origin(api_key_id: str) -> None:
+    """
+    Record the API key the current HTTP request was authenticated with.
+
+    The tool calls of the request, and of the session it opens, then carry
+    "key:<api_key_id>" as their client.
+
+    Args:
+        api_key_id: Id of the verified key
+    """
+    origin = _call_origin.get()
+    if origin is not None:
+        origin.api_key_id = api_key_id
+
+
+class CallOriginMiddleware:
+    """
+    ASGI middleware recording the origin of the tool calls of each HTTP request.
+
+    Place it in front of the middleware using current_origin.
+    """
+
+    def __init__(self, app: ASGIApp):
+        """
+        Args:
+            app: The downstream ASGI application
+        """
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        origin = CallOrigin(get_header(scope, MCP_SESSION_ID_HEADER))
+
+        async def send_with_origin(message: Message) -> None:
+            if message["type"] == "http.response.start" and origin.session_id is None:
+                # The request opened a session
+                for name, value in message.get("headers", []):
+                    if name.decode("latin-1").lower() == MCP_SESSION_ID_HEADER:
+                        origin.session_id = value.decode("latin-1")
+                        break
+            await send(message)
+
+        token = _call_origin.set(origin)
+        try:
+            await self.app(scope, receive, send_with_origin)
+        finally:
+            _call_origin.reset(token)
+
+
+def _request_info() -> tuple:
+    """
+    Get the JSON-RPC request id, _meta fields and client of the current request, if any.
+    """
+    info = _call_info.get()
+    if info is not None:
+        return info
+    try:
+        context = request_ctx.get()
+    except LookupError:
+        return None, {}, None
+    meta = (
+        context.meta.model_dump(exclude_none=True) if context.meta is not None else {}
+    )
+    origin = _call_origin.get()
+    if origin is not None and origin.api_key_id:
+        return context.request_id, meta, f"key:{origin.api_key_id}"
+    if origin is not None and origin.session_id:
+        return context.request_id, meta, origin.key
+    return context.request_id, meta, f"session:{id(context.session):x}"
+
+
+def _build_handler(
+    call_tool: Callable[..., Awaitable[Content]], middleware: List[ToolCallMiddleware]
+) -> ToolCallHandler:
+    """Compose the middleware around the tool manager's call_tool."""
+
+    async def dispatch(call: ToolCall) -> Content:
+        return await call_tool(call.name, call.arguments)
+
+    handler: ToolCallHandler = dispatch
+    for item in reversed(middleware):
+        handler = functools.partial(item, call_next=handler)
+    return handler
+
+
+def add_tool_call_middleware(
+    mcp_instance: FastMCP, middleware: ToolCallMiddleware
+) -> None:
+    """
+    Add a middleware around every tool call of a FastMCP server.
+
+    Applies to tools registered before and after the call, including tools
+    registered through register_utility_tools.
+
+    Args:
+        mcp_instance: The FastMCP instance whose tool calls are wrapped
+        middleware: The middleware to add
+    """
+    tool_manager = mcp_instance._tool_manager
+    chain: Optional[List[ToolCallMiddleware]] = getattr(
+        tool_manager, "_middleware", None
+    )
+
+    if chain is None:
+        chain = tool_manager._middleware = []
+        original_call_tool = tool_manager.call_tool
+
+        async def call_tool(key: str, arguments: Dict[str, Any]) -> Content:
+            request_id, meta, client = _request_info()
+            call = ToolCall(
+                name=key,
+                arguments=arguments,
+                request_id=request_id,
+                meta=meta,
+                client=client,
+            )
+            return await tool_manager._middleware_handler(call)
+
+        tool_manager._original_call_tool = original_call_tool
+        tool_manager.call_tool = call_tool
+
+    chain.append(middleware)
+    tool_manager._middleware_handler = _build_handler(
+        tool_manager._original_call_tool, chain
+    )
+
+
+def get_tool_call_middleware(mcp_instance: FastMCP) -> List[ToolCallMiddleware]:
+    """
+    Get the tool-call middleware installed on a server.
+
+    Args:
+        mcp_instance: The FastMCP instance
+
+    Returns:
+        The installed middleware, outermost first
+    """
+    return list(getattr(mcp_instance._tool_manager, "_middleware", []))
+
+
+async def call_tool(
+    mcp_instance: FastMCP,
+    name: str,
+    arguments: Dict[str, Any],
+    request_id: Any = None,
+    meta: Optional[Dict[str, Any]] = None,
+    client: Optional[str] = None,
+) -> Content:
+    """
+    Call a tool through the middleware chain from outside an MCP session.
+
+    Used by HTTP routes that receive tool calls themselves, so middleware sees
+    the same request id and _meta fields it would for a tools/call request.
+    Those routes identify the client themselves, as MCP sessions do not apply.
+
+    Args:
+        mcp_instance: The FastMCP instance owning the tool
+        name: Name of the tool
+        arguments: Tool arguments
+        request_id: JSON-RPC id of the call
+        meta: _meta fields of the call
+        client: Identity of the caller, such as client_identity of the HTTP request
+
+    Returns:
+        The tool result content
+    """
+    token = _call_info.set((request_id, meta or {}, client))
+    try:
+        return await mcp_instance._mcp_call_tool(name, arguments)
+    finally:
+        _call_info.reset(token)
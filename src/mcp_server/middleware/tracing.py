@@ -0,0 +1,258 @@
+"""
+Tool-call tracing and the /debug/traces endpoint.
+
+register_tracing traces sampled tool calls of a FastMCP server, whichever
+transport they arrive on, and serves the recent traces as JSON on an HTTP
+route next to the MCP endpoint:
+
+    GET /debug/traces?tool=Search&min_duration_ms=250&limit=20
+
+Over HTTP, TracingMiddleware takes the sampling decision for each request,
+following the sampled flag of a W3C traceparent header when the client sends
+one, and records when the request arrived. The call is matched to its
+request by session, JSON-RPC id and tool name, so it needs
+CallOriginMiddleware in front of it. Bodies are only read for sampled
+requests.
+
+Traces show which tools are called, when, and the errors they raise, so the
+route is limited to administrators like the profiling routes.
+"""
+
+import time
+from typing import Iterable, Optional
+
+from fastmcp import FastMCP
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from src.mcp_server.middleware.jsonrpc import get_header, read_tool_calls
+from src.mcp_server.middleware.profiling import is_admin
+from src.mcp_server.middleware.tool_calls import (
+    Content,
+    ToolCall,
+    ToolCallHandler,
+    add_tool_call_middleware,
+    current_origin,
+)
+from src.mcp_server.utils import serialization
+from src.mcp_server.utils.tracing import (
+    Trace,
+    TraceContext,
+    Tracer,
+    current_trace,
+    get_tracer,
+    new_trace_id,
+    parse_traceparent,
+)
+
+
+class TracingToolMiddleware:
+    """
+    Tool-call middleware recording a trace for sampled calls.
+    """
+
+    def __init__(self, tracer: Tracer):
+        """
+        Args:
+            tracer: Tracer sampling and keeping the traces
+        """
+        self.tracer = tracer
+
+    async def __call__(self, call: ToolCall, call_next: ToolCallHandler) -> Content:
+        tracer = self.tracer
+        entered = time.perf_counter()
+        origin = current_origin()
+        context = (
+            tracer.claim(origin, call.request_id, call.name)
+            if origin is not None
+            else None
+        )
+        if context is None and (tracer.http_sampling or not tracer.should_sample()):
+            return await self._call_unsampled(call, call_next, entered)
+
+        attributes = {"mcp.tool": call.name, "jsonrpc.request_id": str(call.request_id)}
+        if context is None:
+            trace = Trace(
+                f"tools/call {call.name}", started=entered, attributes=attributes
+            )
+        else:
+            trace = Trace(
+                f"tools/call {call.name}",
+                trace_id=context.trace_id,
+                parent_id=context.parent_id,
+                started=context.received,
+                start_time=context.received_time,
+                attributes=attributes,
+            )
+            trace.add_span("receive", context.received, entered)
+
+        token = current_trace.set(trace)
+        error = None
+        try:
+            return await call_next(call)
+        except BaseException as e:
+            error = str(e) or type(e).__name__
+            raise
+        finally:
+            current_trace.reset(token)
+            if len(trace.spans) < (2 if context is not None else 1):
+                # The tool did not report its phases
+                trace.add_span("run", entered, time.perf_counter(), error=error)
+            tracer.record(trace.finish(error))
+
+    async def _call_unsampled(
+        self, call: ToolCall, call_next: ToolCallHandler, entered: float
+    ) -> Content:
+        """
+        Run a call that was not sampled, recording it anyway if it is slow or fails
+        slowly.
+        """
+        threshold = self.tracer.slow_threshold_ms
+        if not threshold:
+            return await call_next(call)
+        start_time = time.time()
+        error = None
+        try:
+            return await call_next(call)
+        except BaseException as e:
+            error = str(e) or type(e).__name__
+            raise
+        finally:
+            if (time.perf_counter() - entered) * 1000 >= threshold:
+                trace = Trace(
+                    f"tools/call {call.name}",
+                    started=entered,
+                    start_time=start_time,
+                    attributes={
+                        "mcp.tool": call.name,
+                        "jsonrpc.request_id": str(call.request_id),
+                        "sampled": False,
+                    },
+                )
+                self.tracer.record(trace.finish(error))
+
+
+class TracingMiddleware:
+    """
+    ASGI middleware sampling HTTP requests and recording when sampled tool calls arrive.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        tracer: Optional[Tracer] = None,
+        paths: Iterable[str] = ("/mcp",),
+    ):
+        """
+        Args:
+            app: The downstream ASGI application
+            tracer: Tracer the calls are announced to. Defaults to the shared tracer
+            paths: Path prefixes receiving tool calls, such as the MCP and batch
+                endpoints
+        """
+        self.app = app
+        self.tracer = tracer or get_tracer()
+        self.tracer.http_sampling = True
+        self.paths = tuple(paths)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or scope["method"] != "POST"
+            or not scope["path"].startswith(self.paths)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        origin = current_origin()
+        if origin is None:
+            # Without CallOriginMiddleware, calls cannot be told apart by session
+            await self.app(scope, receive, send)
+            return
+
+        received, received_time = time.perf_counter(), time.time()
+        parent = parse_traceparent(get_header(scope, "traceparent"))
+        sampled = parent[2] if parent is not None else self.tracer.should_sample()
+        if not sampled:
+            await self.app(scope, receive, send)
+            return
+
+        calls, receive = await read_tool_calls(scope, receive)
+        calls = [call for call in calls if call.request_id is not None]
+        trace_id = parent[0] if parent is not None else None
+        contexts = [
+            TraceContext(
+                trace_id=trace_id or new_trace_id(),
+                parent_id=parent[1] if parent is not None else None,
+                received=received,
+                received_time=received_time,
+            )
+            for _ in calls
+        ]
+        for call, context in zip(calls, contexts):
+            self.tracer.expect(origin, call.request_id, call.name, context)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            # Calls rejected before reaching their tool
+            for call, context in zip(calls, contexts):
+                self.tracer.forget(origin, call.request_id, call.name, context)
+
+
+def register_tracing(
+    mcp_instance: FastMCP,
+    tracer: Optional[Tracer] = None,
+    path: str = "/debug/traces",
+    admin_keys: Iterable[str] = (),
+) -> Tracer:
+    """
+    Trace sampled tool calls and serve the recent traces over HTTP.
+
+    Register it before other tool-call middleware, so traces cover them.
+
+    Args:
+        mcp_instance: The FastMCP instance to instrument
+        tracer: Tracer to record into. Defaults to the shared tracer
+        path: Route serving the traces
+        admin_keys: API key ids allowed to read traces; empty allows loopback clients
+            only
+
+    Returns:
+        Tracer: The tracer in use
+    """
+    tracer = tracer or get_tracer()
+    add_tool_call_middleware(mcp_instance, TracingToolMiddleware(tracer))
+    admin_keys = frozenset(admin_keys)
+
+    @mcp_instance.custom_route(path, methods=["GET"], include_in_schema=False)
+    async def traces(request: Request) -> Response:
+        if not is_admin(request, admin_keys):
+            return Response(
+                b'{"error":"Traces are restricted to administrators"}',
+                status_code=403,
+                media_type="application/json",
+            )
+        params = request.query_params
+        try:
+            limit = int(params.get("limit", "50"))
+            min_duration_ms = float(params.get("min_duration_ms", "0"))
+        except ValueError:
+            return Response(
+                b'{"error":"limit and min_duration_ms must be numbers"}',
+                status_code=400,
+                media_type="application/json",
+            )
+        found = tracer.traces(
+            limit=max(1, limit),
+            tool=params.get("tool"),
+            min_duration_ms=min_duration_ms,
+            trace_id=params.get("trace_id"),
+            errors_only=params.get("errors", "").lower() in ("1", "true"),
+        )
+        body = serialization.dumps({"sample_rate": tracer.sample_rate, "traces": found})
+        return Response(
+            body, media_type="application/json", headers={"Cache-Control": "no-store"}
+        )
+
+    return tracer
@@ -0,0 +1,280 @@
+"""
+Tool plugins discovered through Python entry points.
+
+A third-party package exposes a register function in the "mcp_server.tools"
+entry point group, following the register_*_tools pattern:
+
+    [project.entry-points."mcp_server.tools"]
+    weather = "mcp_weather.tools:register_weather_tools"
+
+The first start imports each enabled plugin once against a scratch server and
+writes the discovered tool names and schemas to a manifest file. Later starts
+read the manifest instead of scanning package metadata and register the tools
+lazily, so a plugin is only imported when one of its tools is called. The
+manifest is rebuilt when a site-packages directory changes, which happens
+when packages are installed or removed.
+"""
+
+import importlib.metadata
+import logging
+import os
+import sys
+from typing import Dict, List, Optional
+
+from fastmcp import FastMCP
+from pydantic import BaseModel, Field, ValidationError
+
+from src.mcp_server.config.config import PluginConfig, config
+from src.mcp_server.tools.registry import (
+    LazyTool,
+    ToolSpec,
+    import_target,
+    load_registrar_tools,
+    register_lazy_tools,
+)
+
+logger = logging.getLogger(config.app_name)
+
+
+class PluginInfo(BaseModel):
+    """A plugin found in the entry point group."""
+
+    name: str = Field(description="Entry point name")
+    value: str = Field(description="Import path of the plugin's register function")
+    distribution: Optional[str] = Field(
+        default=None, description="Package providing the plugin"
+    )
+    version: Optional[str] = Field(default=None, description="Version of the package")
+    tools: Optional[List[ToolSpec]] = Field(
+        default=None, description="Tools the plugin registers, None until compiled"
+    )
+    error: Optional[str] = Field(
+        default=None, description="Error raised while compiling the plugin"
+    )
+
+
+class PluginManifest(BaseModel):
+    """Cached result of plugin discovery."""
+
+    group: str = Field(description="Entry point group that was scanned")
+    fingerprint: Dict[str, float] = Field(
+        description="Modification time of each site-packages directory"
+    )
+    plugins: List[PluginInfo] = Field(
+        default_factory=list, description="Discovered plugins"
+    )
+
+
+def path_fingerprint() -> Dict[str, float]:
+    """
+    Fingerprint the installed packages cheaply.
+
+    Installing or removing a package adds or removes its metadata directory
+    in site-packages, which changes the directory's modification time.
+
+    Returns:
+        Modification time of each site-packages directory on sys.path
+    """
+    fingerprint = {}
+    for entry in sys.path:
+        if os.path.basename(entry) not in ("site-packages", "dist-packages"):
+            continue
+        try:
+            fingerprint[entry] = os.stat(entry).st_mtime
+        except OSError:
+            continue
+    return fingerprint
+
+
+def discover_plugins(group: str = "mcp_server.tools") -> List[PluginInfo]:
+    """
+    Scan installed packages for plugins without importing them.
+
+    Args:
+        group: Entry point group to scan
+
+    Returns:
+        The plugins found, sorted by name
+    """
+    plugins = []
+    for entry_point in importlib.metadata.entry_points(group=group):
+        distribution = entry_point.dist
+        plugins.append(
+            PluginInfo(
+                name=entry_point.name,
+                value=entry_point.value.split("[")[0].strip(),
+                distribution=distribution.name if distribution else None,
+                version=distribution.version if distribution else None,
+            )
+        )
+    return sorted(plugins, key=lambda plugin: plugin.name)
+
+
+def compile_plugin(plugin: PluginInfo) -> PluginInfo:
+    """
+    Import a plugin once and record the tools it registers.
+
+    Tools whose function can be imported by path are loaded from that path on
+    first call; tools defined inside the register function are loaded by
+    running the register function again.
+
+    Args:
+        plugin: The plugin to compile
+
+    Returns:
+        PluginInfo: The plugin with its tools or its error filled in
+    """
+    try:
+        tools = load_registrar_tools(plugin.value)
+    except Exception as e:
+        logger.error(f"Failed to load tool plugin '{plugin.name}': {e}")
+        return plugin.model_copy(
+            update={"tools": [], "error": f"{type(e).__name__}: {e}"}
+        )
+
+    specs = []
+    for name, tool in tools.items():
+        module = getattr(tool.fn, "__module__", "")
+        target = f"{module}:{getattr(tool.fn, '__qualname__', '')}"
+        try:
+            importable = import_target(target) is tool.fn
+        except (ImportError, AttributeError, ValueError):
+            importable = False
+        specs.append(
+            ToolSpec(
+                name=name,
+                target=target if importable else None,
+                registrar=None if importable else plugin.value,
+                description=tool.description or "",
+                parameters=tool.parameters,
+                tags=tool.tags,
+                annotations=tool.annotations,
+            )
+        )
+    return plugin.model_copy(update={"tools": specs, "error": None})
+
+
+def load_manifest(path: str) -> Optional[PluginManifest]:
+    """
+    Read the plugin manifest.
+
+    Args:
+        path: Manifest file path
+
+    Returns:
+        The manifest, or None if it is missing or unreadable
+    """
+    try:
+        with open(path) as f:
+            return PluginManifest.model_validate_json(f.read())
+    except (OSError, ValidationError):
+        return None
+
+
+def save_manifest(path: str, manifest: PluginManifest) -> None:
+    """
+    Write the plugin manifest atomically.
+
+    Args:
+        path: Manifest file path
+        manifest: The manifest to write
+    """
+    directory = os.path.dirname(path)
+    try:
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, "w") as f:
+            f.write(manifest.model_dump_json(indent=2))
+        os.replace(temp_path, path)
+    except OSError as e:
+        logger.warning(f"Could not write plugin manifest to {path}: {e}")
+
+
+def is_plugin_enabled(name: str, plugin_config: PluginConfig) -> bool:
+    """
+    Check whether a plugin may be loaded.
+
+    Args:
+        name: Entry point name of the plugin
+        plugin_config: Plugin configuration
+
+    Returns:
+        bool: True unless the plugin is disabled or not in the allow list
+    """
+    if name in plugin_config.disabled:
+        return False
+    return plugin_config.allow is None or name in plugin_config.allow
+
+
+def build_manifest(
+    plugin_config: Optional[PluginConfig] = None, rebuild: bool = False
+) -> PluginManifest:
+    """
+    Get the plugin manifest, scanning and compiling only what changed.
+
+    Package metadata is rescanned when the manifest is missing, was built for
+    another entry point group or installed packages have changed. Enabled plugins that
+    have not been compiled yet are imported once; disabled plugins never are.
+
+    Args:
+        plugin_config: Plugin configuration. Defaults to the application configuration
+        rebuild: Ignore the existing manifest
+
+    Returns:
+        PluginManifest: The up-to-date manifest
+    """
+    plugin_config = plugin_config or config.plugins
+    fingerprint = path_fingerprint()
+    manifest = None if rebuild else load_manifest(plugin_config.manifest_path)
+    changed = False
+
+    if (
+        manifest is None
+        or manifest.group != plugin_config.entry_point_group
+        or manifest.fingerprint != fingerprint
+    ):
+        previous = {
+            (plugin.name, plugin.value, plugin.version): plugin
+            for plugin in (manifest.plugins if manifest else [])
+        }
+        plugins = [
+            previous.get((plugin.name, plugin.value, plugin.version), plugin)
+            for plugin in discover_plugins(plugin_config.entry_point_group)
+        ]
+        manifest = PluginManifest(
+            group=plugin_config.entry_point_group,
+            fingerprint=fingerprint,
+            plugins=plugins,
+        )
+        changed = True
+
+    for index, plugin in enumerate(manifest.plugins):
+        if plugin.tools is None and is_plugin_enabled(plugin.name, plugin_config):
+            manifest.plugins[index] = compile_plugin(plugin)
+            changed = True
+
+    if changed:
+        save_manifest(plugin_config.manifest_path, manifest)
+    return manifest
+
+
+def register_plugin_tools(
+    mcp_instance: FastMCP, plugin_config: Optional[PluginConfig] = None
+) -> List[LazyTool]:
+    """
+    Register the tools of every enabled plugin.
+
+    Args:
+        mcp_instance: The FastMCP instance to register tools with
+        plugin_config: Plugin configuration. Defaults to the application configuration
+
+    Returns:
+        List[LazyTool]: The registered tools
+    """
+    plugin_config = plugin_config or config.plugins
+    specs = []
+    for plugin in build_manifest(plugin_config).plugins:
+        if plugin.tools and is_plugin_enabled(plugin.name, plugin_config):
+            specs.extend(plugin.tools)
+    return register_lazy_tools(mcp_instance, specs)
@@ -0,0 +1,410 @@
+"""
+Lazy tool registration.
+
+A ToolSpec declares a tool's name, description and input schema together with
+the import path of its implementation. register_lazy_tools makes the tool
+visible to clients immediately, but the implementation module is only
+imported the first time the tool is called.
+
+Tools defined inside a register_*_tools(mcp_instance) function cannot be
+imported by path; their spec names the register function instead, which is
+run against a scratch server on first call.
+
+Declarations can be kept in a JSON manifest. generate_tool_specs fills in the
+description and input schema of each declared tool from its implementation,
+so `mcp-server tool-manifest` regenerates them whenever a tool changes and the
+server loads them at startup without importing the tools.
+
+precompile_tools replaces registered tools with CompiledTools, which build
+their argument validator and find their Context parameter once instead of on
+every call. CompiledTools also report their validate, execute and serialize
+phases on the current trace.
+"""
+
+import functools
+import importlib
+import inspect
+import json
+import os
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+import fastmcp.settings
+from fastmcp import FastMCP
+from fastmcp.server.context import Context
+from fastmcp.server.dependencies import get_context
+from fastmcp.tools.tool import Tool, _convert_to_content
+from fastmcp.utilities.types import find_kwarg_by_type
+from mcp.types import EmbeddedResource, ImageContent, TextContent, ToolAnnotations
+from pydantic import BaseModel, Field, PrivateAttr, TypeAdapter, model_validator
+
+from src.mcp_server.utils.tracing import Trace, current_trace
+
+# Tools created by each register function that has been run, by import path
+_registered_tools: Dict[str, Dict[str, Tool]] = {}
+
+# Manifest of the utility tools registered by the server
+UTILITY_TOOLS_MANIFEST = os.path.join(os.path.dirname(__file__), "utility_tools.json")
+
+
+class ToolSpec(BaseModel):
+    """Up-front declaration of a tool."""
+
+    name: str = Field(description="Name the tool is registered under")
+    target: Optional[str] = Field(
+        default=None,
+        description='Import path of the implementation, as "module:attribute"',
+    )
+    registrar: Optional[str] = Field(
+        default=None,
+        description=(
+            "Import path of a register function defining the tool, used when target is "
+            "not set"
+        ),
+    )
+    description: str = Field(default="", description="Description shown to clients")
+    parameters: Dict[str, Any] = Field(
+        default_factory=lambda: {"type": "object", "properties": {}},
+        description="JSON schema of the tool arguments",
+    )
+    tags: Set[str] = Field(
+        default_factory=set, description="Tags of the tool, such as its priority class"
+    )
+    annotations: Optional[ToolAnnotations] = Field(
+        default=None, description="Hints about the tool's behavior shown to clients"
+    )
+
+    @model_validator(mode="after")
+    def _check_source(self) -> "ToolSpec":
+        if not self.target and not self.registrar:
+            raise ValueError(f"Tool {self.name!r} needs a target or a registrar")
+        return self
+
+
+def import_target(target: str) -> Any:
+    """
+    Import an object from a "module:attribute" path.
+
+    Args:
+        target: The import path
+
+    Returns:
+        The imported object
+    """
+    module_name, _, attribute = target.partition(":")
+    if not attribute:
+        raise ValueError(f"Invalid tool target {target!r}, expected 'module:attribute'")
+    obj: Any = importlib.import_module(module_name)
+    for part in attribute.split("."):
+        obj = getattr(obj, part)
+    return obj
+
+
+def load_registrar_tools(registrar: str) -> Dict[str, Tool]:
+    """
+    Run a register function against a scratch server and collect its tools.
+
+    The function runs once per process; later calls return the same tools.
+
+    Args:
+        registrar: Import path of a register_*_tools(mcp_instance) function
+
+    Returns:
+        The tools it registered, by name
+    """
+    tools = _registered_tools.get(registrar)
+    if tools is None:
+        scratch = FastMCP(registrar)
+        import_target(registrar)(scratch)
+        tools = _registered_tools[registrar] = dict(scratch._tool_manager.get_tools())
+    return tools
+
+
+def generate_tool_specs(specs: Iterable[ToolSpec]) -> List[ToolSpec]:
+    """
+    Fill in the description and input schema of tool declarations from their
+    implementations.
+
+    Imports every tool, so it is meant for generating a manifest, not for startup.
+
+    Args:
+        specs: Declarations naming the tools and their targets or registrars
+
+    Returns:
+        List[ToolSpec]: The declarations with the tools' own description and schema
+    """
+    generated = []
+    for spec in specs:
+        if spec.target:
+            tool = Tool.from_function(import_target(spec.target), name=spec.name)
+        else:
+            tools = load_registrar_tools(spec.registrar)
+            if spec.name not in tools:
+                raise LookupError(
+                    f"{spec.registrar} did not register tool {spec.name!r}"
+                )
+            tool = tools[spec.name]
+        generated.append(
+            spec.model_copy(
+                update={
+                    "description": tool.description or "",
+                    "parameters": tool.parameters,
+                }
+            )
+        )
+    return generated
+
+
+def load_tool_manifest(path: str) -> List[ToolSpec]:
+    """
+    Read tool declarations from a JSON manifest.
+
+    Args:
+        path: Path of the manifest, a list of ToolSpec objects
+
+    Returns:
+        List[ToolSpec]: The declared tools
+    """
+    with open(path) as f:
+        return [ToolSpec.model_validate(entry) for entry in json.load(f)]
+
+
+def dump_tool_manifest(specs: Iterable[ToolSpec]) -> str:
+    """
+    Render tool declarations as a JSON manifest.
+
+    Args:
+        specs: The declarations
+
+    Returns:
+        The manifest, with tags sorted so that it is stable across runs
+    """
+    entries = []
+    for spec in specs:
+        entry = spec.model_dump(mode="json", exclude_none=True)
+        entry["tags"] = sorted(spec.tags)
+        entries.append(entry)
+    return json.dumps(entries, indent=2) + "\n"
+
+
+def _mark_execute(fn: Callable[..., Any]) -> Callable[..., Any]:
+    """
+    Wrap a tool function to record on the current trace when it is entered, which ends
+    validation.
+    """
+
+    @functools.wraps(fn)
+    def marked(*args: Any, **kwargs: Any) -> Any:
+        trace = current_trace.get()
+        if trace is not None:
+            trace.execute_started = time.perf_counter()
+        return fn(*args, **kwargs)
+
+    return marked
+
+
+class CompiledTool(Tool):
+    """
+    Tool with its argument validator built ahead of the first call.
+    """
+
+    _validator: Optional[TypeAdapter] = PrivateAttr(default=None)
+    _context_kwarg: Optional[str] = PrivateAttr(default=None)
+
+    @classmethod
+    def compile(cls, tool: Tool) -> "CompiledTool":
+        """
+        Compile a tool.
+
+        Args:
+            tool: The tool to compile
+
+        Returns:
+            CompiledTool: A tool with the same definition and a prebuilt validator
+        """
+        compiled = cls(**{field: getattr(tool, field) for field in Tool.model_fields})
+        compiled._validator = TypeAdapter(_mark_execute(compiled.fn))
+        compiled._context_kwarg = find_kwarg_by_type(compiled.fn, kwarg_type=Context)
+        return compiled
+
+    async def run(
+        self, arguments: Dict[str, Any]
+    ) -> List[TextContent | ImageContent | EmbeddedResource]:
+        """Validate the arguments with the prebuilt validator and run the tool."""
+        if fastmcp.settings.settings.tool_attempt_parse_json_args:
+            # Argument pre-parsing inspects the signature per call anyway
+            return await super().run(arguments)
+
+        if self._context_kwarg and self._context_kwarg not in arguments:
+            arguments = {**arguments, self._context_kwarg: get_context()}
+
+        trace = current_trace.get()
+        if trace is not None:
+            return await self._run_traced(arguments, trace)
+
+        result = self._validator.validate_python(arguments)
+        if inspect.isawaitable(result):
+            result = await result
+        return _convert_to_content(result, serializer=self.serializer)
+
+    async def _run_traced(
+        self, arguments: Dict[str, Any], trace: Trace
+    ) -> List[TextContent | ImageContent | EmbeddedResource]:
+        """Run the tool, recording its phases on a trace."""
+        trace.execute_started = None
+        started = time.perf_counter()
+        try:
+            result = self._validator.validate_python(arguments)
+            if inspect.isawaitable(result):
+                result = await result
+        except Exception as e:
+            ended = time.perf_counter()
+            entered = trace.execute_started
+            if entered is None:
+                trace.add_span("validate", started, ended, error=str(e))
+            else:
+                trace.add_span("validate", started, entered)
+                trace.add_span("execute", entered, ended, error=str(e))
+            raise
+        executed = time.perf_counter()
+        entered = trace.execute_started or executed
+        trace.add_span("validate", started, entered)
+        trace.add_span("execute", entered, executed)
+
+        content = _convert_to_content(result, serializer=self.serializer)
+        trace.add_span("serialize", executed, time.perf_counter())
+        return content
+
+
+def _not_loaded(*args: Any, **kwargs: Any) -> Any:
+    """Placeholder function of a tool whose implementation is not imported yet."""
+    raise RuntimeError("Lazy tool implementation has not been loaded")
+
+
+class LazyTool(Tool):
+    """
+    Tool whose implementation is imported on first call.
+    """
+
+    target: Optional[str] = Field(
+        default=None,
+        description='Import path of the implementation, as "module:attribute"',
+    )
+    registrar: Optional[str] = Field(
+        default=None, description="Import path of a register function defining the tool"
+    )
+    _resolved: Optional[Tool] = PrivateAttr(default=None)
+
+    @classmethod
+    def from_spec(
+        cls, spec: ToolSpec, serializer: Optional[Callable[[Any], str]] = None
+    ) -> "LazyTool":
+        """
+        Create a lazy tool from its declaration.
+
+        Args:
+            spec: The tool declaration
+            serializer: Serializer for results that are not text
+
+        Returns:
+            LazyTool: The unresolved tool
+        """
+        return cls(
+            fn=_not_loaded,
+            name=spec.name,
+            description=spec.description,
+            parameters=spec.parameters,
+            tags=spec.tags,
+            annotations=spec.annotations,
+            target=spec.target,
+            registrar=spec.registrar,
+            serializer=serializer,
+        )
+
+    @property
+    def resolved(self) -> bool:
+        """Whether the implementation has been imported."""
+        return self._resolved is not None
+
+    def resolve(self) -> Tool:
+        """
+        Import the implementation and build the real tool.
+
+        Returns:
+            Tool: The tool wrapping the imported function
+        """
+        if self._resolved is None:
+            if self.target:
+                fn = import_target(self.target)
+            else:
+                tools = load_registrar_tools(self.registrar)
+                if self.name not in tools:
+                    raise LookupError(
+                        f"{self.registrar} did not register tool {self.name!r}"
+                    )
+                fn = tools[self.name].fn
+            self._resolved = CompiledTool.compile(
+                Tool.from_function(
+                    fn,
+                    name=self.name,
+                    description=self.description or None,
+                    tags=self.tags,
+                    annotations=self.annotations,
+                    serializer=self.serializer,
+                )
+            )
+            self.fn = self._resolved.fn
+        return self._resolved
+
+    async def run(
+        self, arguments: Dict[str, Any]
+    ) -> List[TextContent | ImageContent | EmbeddedResource]:
+        """Import the implementation if needed and run it."""
+        return await self.resolve().run(arguments)
+
+
+def register_lazy_tools(
+    mcp_instance: FastMCP, specs: Iterable[ToolSpec]
+) -> List[LazyTool]:
+    """
+    Register tools whose implementations are imported on first call.
+
+    Args:
+        mcp_instance: The FastMCP instance to register tools with
+        specs: Declarations of the tools
+
+    Returns:
+        List[LazyTool]: The registered tools
+    """
+    tools = []
+    for spec in specs:
+        tool = LazyTool.from_spec(
+            spec, serializer=mcp_instance._tool_manager._serializer
+        )
+        mcp_instance._tool_manager.add_tool(tool)
+        tools.append(tool)
+    mcp_instance._cache.clear()
+    return tools
+
+
+def precompile_tools(mcp_instance: FastMCP) -> List[CompiledTool]:
+    """
+    Replace the registered tools with compiled tools.
+
+    Lazy tools are left alone; they compile themselves when resolved.
+
+    Args:
+        mcp_instance: The FastMCP instance whose tools are compiled
+
+    Returns:
+        List[CompiledTool]: The newly compiled tools
+    """
+    tools = mcp_instance._tool_manager.get_tools()
+    compiled = []
+    for key, tool in list(tools.items()):
+        if isinstance(tool, (CompiledTool, LazyTool)):
+            continue
+        tools[key] = CompiledTool.compile(tool)
+        compiled.append(tools[key])
+    mcp_instance._cache.clear()
+    return compiled
@@ -3,52 +3,78 @@ General utility tools for the MCP server.
 
 This module contains general utility tools that can be used by MCP clients.
 """
-from typing import Dict, Any
+
+from typing import Any, Dict
 
 from mcp.server import FastMCP
 
+from src.mcp_server.middleware.scheduling import priority_tag
+from src.mcp_server.utils.cache import cached
+from src.mcp_server.utils.resources import get_resource_monitor
+
+
+def echo(message: str) -> str:
+    """
+    Echo back the received message.
+
+    Args:
+        message: The message to echo back
+
+    Returns:
+        The same message that was received
+    """
+    return message
+
+
+@cached(name="Get Server Info")
+def server_info() -> Dict[str, Any]:
+    """
+    Get information about the MCP server.
+
+    Returns:
+        Dictionary with server information
+    """
+    return {
+        "name": "MCP Server Template",
+        "version": "0.1.0",
+        "description": "A starter template for building MCP servers in Python",
+    }
+
+
+def resource_usage() -> Dict[str, Any]:
+    """
+    Get the resource usage of the MCP server process.
+
+    Returns:
+        Dictionary with memory, CPU, open files, event-loop lag, tool calls in
+        flight and any exceeded load-shedding limits
+    """
+    return get_resource_monitor().current().model_dump()
+
+
+def ping() -> str:
+    """
+    Simple ping tool to check if the server is responsive.
+
+    Returns:
+        "pong" message
+    """
+    return "pong"
+
 
 def register_utility_tools(mcp_instance: FastMCP):
     """
     Register all utility tools with the MCP server instance.
 
+    The tool functions live at module level so they can also be registered
+    lazily through src.mcp_server.tools.registry. They are cheap, so they are
+    scheduled in the interactive priority class.
+
     Args:
         mcp_instance: The FastMCP instance to register tools with
     """
-
-    @mcp_instance.tool("Echo Message")
-    def echo(message: str) -> str:
-        """
-        Echo back the received message.
-
-        Args:
-            message: The message to echo back
-
-        Returns:
-            The same message that was received
-        """
-        return message
-
-    @mcp_instance.tool("Get Server Info")
-    def server_info() -> Dict[str, Any]:
-        """
-        Get information about the MCP server.
-
-        Returns:
-            Dictionary with server information
-        """
-        return {
-            "name": "MCP Server Template",
-            "version": "0.1.0",
-            "description": "A starter template for building MCP servers in Python"
-        }
-
-    @mcp_instance.tool("Ping")
-    def ping() -> str:
-        """
-        Simple ping tool to check if the server is responsive.
-
-        Returns:
-            "pong" message
-        """
-        return "pong"
+    interactive = {priority_tag("interactive")}
+    mcp_instance.tool("Echo Message", tags=interactive)(echo)
+    mcp_instance.tool("Get Server Info", tags=interactive)(server_info)
+    mcp_instance.tool("Get Resource Usage", tags=interactive)(resource_usage)
+    mcp_instance.tool("Ping", tags=interactive)(ping)
@@ -0,0 +1,569 @@
+"""
+Load-test and latency benchmark harness for the MCP server.
+
+This module boots the streamable-HTTP server in-process on an ephemeral local
+port, drives tool calls against it from local MCP clients and reports
+throughput and latency percentiles as JSON. The application server is booted
+with the HTTP middleware it serves production traffic with, so
+authentication, rate limiting, compression and tracing are measured as they
+are configured.
+
+run_serialization_benchmark is a micro-benchmark of the JSON backends and of
+tool argument validation, without any networking.
+"""
+
+import asyncio
+import math
+import socket
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import uvicorn
+from fastmcp import Client, FastMCP
+from fastmcp.client.transports import StreamableHttpTransport
+from pydantic import BaseModel, Field
+from starlette.middleware import Middleware
+
+# Tools exercised when no explicit tool list is given
+DEFAULT_TOOLS = ["hello-world", "Echo Message", "Ping"]
+
+# Argument that receives the generated payload for tools that accept one
+PAYLOAD_ARGUMENTS = {
+    "hello-world": "name",
+    "Echo Message": "message",
+}
+
+
+class LatencySummary(BaseModel):
+    """Latency distribution of a benchmark run, in milliseconds."""
+
+    min: float = Field(default=0.0, description="Fastest call")
+    mean: float = Field(default=0.0, description="Mean latency")
+    p50: float = Field(default=0.0, description="Median latency")
+    p95: float = Field(default=0.0, description="95th percentile latency")
+    p99: float = Field(default=0.0, description="99th percentile latency")
+    max: float = Field(default=0.0, description="Slowest call")
+
+
+class ToolBenchmarkResult(BaseModel):
+    """Benchmark result for a single tool."""
+
+    tool: str = Field(description="Name of the benchmarked tool")
+    requests: int = Field(description="Number of completed calls")
+    errors: int = Field(default=0, description="Number of failed calls")
+    duration_seconds: float = Field(description="Wall-clock time of the run")
+    requests_per_second: float = Field(description="Completed calls per second")
+    latency_ms: LatencySummary = Field(description="Latency distribution")
+
+
+class BenchmarkReport(BaseModel):
+    """Full report of a benchmark session."""
+
+    url: str = Field(description="Endpoint the clients were driven against")
+    concurrency: int = Field(description="Number of concurrent client sessions")
+    requests_per_tool: int = Field(description="Calls issued per tool")
+    payload_size: int = Field(description="Size of generated string payloads")
+    results: List[ToolBenchmarkResult] = Field(default_factory=list)
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """
+    Compute a percentile using the nearest-rank method.
+
+    Args:
+        samples: Observed values, in any order
+        pct: Percentile to compute, between 0 and 100
+
+    Returns:
+        The percentile value, or 0.0 when there are no samples
+    """
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def summarize_latencies(samples: List[float]) -> LatencySummary:
+    """
+    Summarize latency samples given in seconds.
+
+    Args:
+        samples: Latencies in seconds
+
+    Returns:
+        LatencySummary: The distribution converted to milliseconds
+    """
+    if not samples:
+        return LatencySummary()
+    millis = [sample * 1000 for sample in samples]
+    return LatencySummary(
+        min=round(min(millis), 3),
+        mean=round(sum(millis) / len(millis), 3),
+        p50=round(percentile(millis, 50), 3),
+        p95=round(percentile(millis, 95), 3),
+        p99=round(percentile(millis, 99), 3),
+        max=round(max(millis), 3),
+    )
+
+
+def build_arguments(tool: str, payload_size: int) -> Dict[str, Any]:
+    """
+    Build call arguments for a tool with a payload of the given size.
+
+    Args:
+        tool: Name of the tool
+        payload_size: Number of characters in the generated payload
+
+    Returns:
+        Arguments for the tool call
+    """
+    argument = PAYLOAD_ARGUMENTS.get(tool)
+    if argument is None:
+        return {}
+    return {argument: "x" * payload_size}
+
+
+class InProcessServer:
+    """
+    Run an MCP server over streamable HTTP in a background thread.
+
+    The server binds to an ephemeral port on the loopback interface so several
+    benchmarks can run side by side. Use it as a context manager.
+    """
+
+    def __init__(
+        self,
+        mcp_instance: FastMCP,
+        host: str = "127.0.0.1",
+        path: str = "/mcp",
+        middleware: Optional[List[Middleware]] = None,
+    ):
+        """
+        Args:
+            mcp_instance: The server to run
+            host: Interface to bind to
+            path: Path of the streamable-HTTP endpoint
+            middleware: HTTP middleware placed in front of the endpoint
+        """
+        self.mcp_instance = mcp_instance
+        self.host = host
+        self.path = path
+        self.middleware = middleware
+        self._server: Optional[uvicorn.Server] = None
+        self._thread: Optional[threading.Thread] = None
+        self._socket: Optional[socket.socket] = None
+
+    @property
+    def url(self) -> str:
+        """URL of the streamable-HTTP endpoint."""
+        assert self._socket is not None, "Server is not running"
+        port = self._socket.getsockname()[1]
+        return f"http://{self.host}:{port}{self.path}/"
+
+    def start(self, timeout: float = 10.0) -> None:
+        """
+        Start the server and wait until it accepts connections.
+
+        Args:
+            timeout: Seconds to wait for the server to start
+        """
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._socket.bind((self.host, 0))
+
+        app = self.mcp_instance.http_app(path=self.path, middleware=self.middleware)
+        config = uvicorn.Config(app, log_level="warning", lifespan="on")
+        self._server = uvicorn.Server(config)
+        self._thread = threading.Thread(
+            target=self._server.run,
+            kwargs={"sockets": [self._socket]},
+            name="benchmark-server",
+            daemon=True,
+        )
+        self._thread.start()
+
+        deadline = time.monotonic() + timeout
+        while not self._server.started:
+            if not self._thread.is_alive() or time.monotonic() > deadline:
+                raise RuntimeError("Benchmark server failed to start")
+            time.sleep(0.01)
+
+    def stop(self) -> None:
+        """Stop the server and wait for its thread to exit."""
+        if self._server is not None:
+            self._server.should_exit = True
+        if self._thread is not None:
+            self._thread.join(timeout=10)
+        if self._socket is not None:
+            self._socket.close()
+
+    def __enter__(self) -> "InProcessServer":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
+
+
+def application_server() -> InProcessServer:
+    """
+    Prepare the application server to run in-process.
+
+    Returns:
+        InProcessServer: The server, behind the HTTP middleware production traffic goes
+            through
+    """
+    from src.mcp_server.main import get_http_middleware, mcp
+
+    return InProcessServer(
+        mcp, path=mcp.settings.streamable_http_path, middleware=get_http_middleware()
+    )
+
+
+async def benchmark_tool(
+    url: str,
+    tool: str,
+    arguments: Dict[str, Any],
+    requests: int,
+    concurrency: int,
+    warmup: int = 0,
+    headers: Optional[Dict[str, str]] = None,
+) -> ToolBenchmarkResult:
+    """
+    Drive a single tool with concurrent client sessions.
+
+    Args:
+        url: Streamable-HTTP endpoint of the server
+        tool: Name of the tool to call
+        arguments: Arguments passed on every call
+        requests: Total number of measured calls
+        concurrency: Number of concurrent client sessions
+        warmup: Unmeasured calls issued by each session before the run
+        headers: HTTP headers sent with every request, such as an API key
+
+    Returns:
+        ToolBenchmarkResult: Throughput and latency of the run
+
+    Raises:
+        Exception: A session failed to connect or to warm up
+    """
+    latencies: List[float] = []
+    errors = 0
+    remaining = requests
+    sessions_ready = 0
+    start_event = asyncio.Event()
+    concurrency = max(1, min(concurrency, requests))
+
+    async def worker() -> None:
+        nonlocal remaining, errors, sessions_ready
+        async with Client(StreamableHttpTransport(url, headers=headers)) as client:
+            for _ in range(warmup):
+                await client.call_tool_mcp(tool, arguments)
+
+            sessions_ready += 1
+            if sessions_ready == concurrency:
+                start_event.set()
+            await start_event.wait()
+
+            while remaining > 0:
+                remaining -= 1
+                started = time.perf_counter()
+                try:
+                    result = await client.call_tool_mcp(tool, arguments)
+                    if result.isError:
+                        errors += 1
+                except Exception:
+                    errors += 1
+                latencies.append(time.perf_counter() - started)
+
+    tasks = [asyncio.create_task(worker()) for _ in range(concurrency)]
+    starting = asyncio.create_task(start_event.wait())
+    await asyncio.wait([starting, *tasks], return_when=asyncio.FIRST_COMPLETED)
+    if not start_event.is_set():
+        # Workers only return before the start by failing to connect or warm up
+        failure = next(task.exception() for task in tasks if task.done())
+        starting.cancel()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(starting, *tasks, return_exceptions=True)
+        raise failure
+    started = time.perf_counter()
+    await asyncio.gather(*tasks)
+    duration = time.perf_counter() - started
+
+    return ToolBenchmarkResult(
+        tool=tool,
+        requests=len(latencies),
+        errors=errors,
+        duration_seconds=round(duration, 6),
+        requests_per_second=round(len(latencies) / duration, 3) if duration else 0.0,
+        latency_ms=summarize_latencies(latencies),
+    )
+
+
+async def run_benchmark_async(
+    url: str,
+    tools: Optional[List[str]] = None,
+    concurrency: int = 10,
+    requests: int = 100,
+    payload_size: int = 16,
+    warmup: int = 1,
+    headers: Optional[Dict[str, str]] = None,
+) -> BenchmarkReport:
+    """
+    Benchmark each tool in turn against a running server.
+
+    Args:
+        url: Streamable-HTTP endpoint of the server
+        tools: Tools to benchmark. Defaults to DEFAULT_TOOLS
+        concurrency: Number of concurrent client sessions
+        requests: Number of measured calls per tool
+        payload_size: Size of the string payload for tools that accept one
+        warmup: Unmeasured calls issued by each session before measuring
+        headers: HTTP headers sent with every request, such as an API key
+
+    Returns:
+        BenchmarkReport: Results for every tool
+    """
+    report = BenchmarkReport(
+        url=url,
+        concurrency=concurrency,
+        requests_per_tool=requests,
+        payload_size=payload_size,
+    )
+    for tool in tools or DEFAULT_TOOLS:
+        result = await benchmark_tool(
+            url,
+            tool,
+            build_arguments(tool, payload_size),
+            requests=requests,
+            concurrency=concurrency,
+            warmup=warmup,
+            headers=headers,
+        )
+        report.results.append(result)
+    return report
+
+
+def run_benchmark(
+    mcp_instance: Optional[FastMCP] = None,
+    tools: Optional[List[str]] = None,
+    concurrency: int = 10,
+    requests: int = 100,
+    payload_size: int = 16,
+    warmup: int = 1,
+    headers: Optional[Dict[str, str]] = None,
+) -> BenchmarkReport:
+    """
+    Boot the server in-process and benchmark it over streamable HTTP.
+
+    Args:
+        mcp_instance: Server to benchmark, without HTTP middleware. Defaults to
+            the application server with its production middleware
+        tools: Tools to benchmark. Defaults to DEFAULT_TOOLS
+        concurrency: Number of concurrent client sessions
+        requests: Number of measured calls per tool
+        payload_size: Size of the string payload for tools that accept one
+        warmup: Unmeasured calls issued by each session before measuring
+        headers: HTTP headers sent with every request, such as an API key
+
+    Returns:
+        BenchmarkReport: Results for every tool
+    """
+    server = (
+        InProcessServer(mcp_instance)
+        if mcp_instance is not None
+        else application_server()
+    )
+    with server:
+        return asyncio.run(
+            run_benchmark_async(
+                server.url,
+                tools=tools,
+                concurrency=concurrency,
+                requests=requests,
+                payload_size=payload_size,
+                warmup=warmup,
+                headers=headers,
+            )
+        )
+
+
+class SerializationResult(BaseModel):
+    """Encode and decode speed of one JSON backend on one payload."""
+
+    backend: str = Field(description="Name of the JSON backend")
+    payload: str = Field(description="Name of the payload")
+    payload_bytes: int = Field(description="Size of the encoded payload")
+    dumps_us: float = Field(
+        description="Mean time to encode the payload, in microseconds"
+    )
+    loads_us: float = Field(
+        description="Mean time to decode the payload, in microseconds"
+    )
+
+
+class ValidationResult(BaseModel):
+    """Cost of validating tool arguments with and without precompilation."""
+
+    compile_us: float = Field(
+        description="Time to compile a tool, paid once at startup, in microseconds"
+    )
+    tool_run_us: float = Field(
+        description="Mean time of a call through a plain tool, in microseconds"
+    )
+    compiled_run_us: float = Field(
+        description="Mean time of a call through a compiled tool, in microseconds"
+    )
+
+
+class SerializationReport(BaseModel):
+    """Full report of a serialization benchmark."""
+
+    iterations: int = Field(description="Operations timed per measurement")
+    serialization: List[SerializationResult] = Field(default_factory=list)
+    validation: Optional[ValidationResult] = Field(default=None)
+
+
+def build_payloads(rows: int = 200) -> Dict[str, Any]:
+    """
+    Build the payloads of the serialization benchmark.
+
+    Args:
+        rows: Number of rows in the large payload
+
+    Returns:
+        The small and large payloads, by name
+    """
+    return {
+        "small": {"name": "Ada", "count": 3, "tags": ["a", "b"]},
+        "large": {
+            "rows": [
+                {
+                    "id": i,
+                    "name": f"row-{i}",
+                    "score": i * 0.5,
+                    "active": i % 2 == 0,
+                    "tags": ["x", "y", "z"],
+                }
+                for i in range(rows)
+            ]
+        },
+    }
+
+
+def time_per_call(fn: Callable[[], Any], iterations: int) -> float:
+    """
+    Time a function.
+
+    Args:
+        fn: Function taking no arguments
+        iterations: Number of calls
+
+    Returns:
+        Mean time per call, in microseconds
+    """
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def _make_sample_tool() -> Callable[..., Dict[str, Any]]:
+    """Create a fresh tool function, so its validator is built from scratch."""
+
+    def sample_tool(
+        name: str, count: int = 1, tags: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        return {"name": name, "count": count, "tags": tags or []}
+
+    return sample_tool
+
+
+async def _time_tool_runs(
+    tool: Any, arguments: Dict[str, Any], iterations: int
+) -> float:
+    """Mean time of running a tool, in microseconds."""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await tool.run(arguments)
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def benchmark_validation(iterations: int = 1000) -> ValidationResult:
+    """
+    Compare calls through a plain tool and a compiled tool.
+
+    Args:
+        iterations: Number of calls per tool
+
+    Returns:
+        ValidationResult: Compile and per-call times
+    """
+    from fastmcp.tools.tool import Tool
+
+    from src.mcp_server.tools.registry import CompiledTool
+
+    arguments = {"name": "Ada", "count": 3, "tags": ["a", "b"]}
+    tool = Tool.from_function(_make_sample_tool(), name="sample")
+
+    start = time.perf_counter()
+    compiled = CompiledTool.compile(
+        Tool.from_function(_make_sample_tool(), name="sample")
+    )
+    compile_us = (time.perf_counter() - start) * 1e6
+
+    async def measure() -> ValidationResult:
+        # Build the plain tool's cached validator before timing it
+        await tool.run(arguments)
+        return ValidationResult(
+            compile_us=round(compile_us, 3),
+            tool_run_us=round(await _time_tool_runs(tool, arguments, iterations), 3),
+            compiled_run_us=round(
+                await _time_tool_runs(compiled, arguments, iterations), 3
+            ),
+        )
+
+    return asyncio.run(measure())
+
+
+def run_serialization_benchmark(
+    iterations: int = 1000,
+    backends: Optional[List[str]] = None,
+    rows: int = 200,
+) -> SerializationReport:
+    """
+    Benchmark the JSON backends and tool argument validation.
+
+    Args:
+        iterations: Operations timed per measurement
+        backends: Backends to benchmark. Defaults to every installed backend
+        rows: Number of rows in the large payload
+
+    Returns:
+        SerializationReport: Results for every backend and payload
+    """
+    from src.mcp_server.utils.serialization import available_backends, create_backend
+
+    report = SerializationReport(iterations=iterations)
+    for name in backends or available_backends():
+        backend = create_backend(name)
+        for payload_name, payload in build_payloads(rows).items():
+            encoded = backend.dumps(payload)
+            report.serialization.append(
+                SerializationResult(
+                    backend=name,
+                    payload=payload_name,
+                    payload_bytes=len(encoded),
+                    dumps_us=round(
+                        time_per_call(lambda: backend.dumps(payload), iterations), 3
+                    ),
+                    loads_us=round(
+                        time_per_call(lambda: backend.loads(encoded), iterations), 3
+                    ),
+                )
+            )
+    report.validation = benchmark_validation(iterations)
+    return report
@@ -0,0 +1,324 @@
+"""
+Result caching for MCP tools.
+
+This module provides a size-bounded LRU cache with TTL expiry and a decorator
+that caches tool results keyed on the normalized call arguments. Concurrent
+identical calls are deduplicated so only one of them executes the tool.
+"""
+
+import asyncio
+import functools
+import inspect
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from src.mcp_server.config.config import CacheConfig, config
+from src.mcp_server.utils import serialization
+
+# Every cache created through the decorator, indexed by name
+_caches: Dict[str, "ToolCache"] = {}
+
+
+class _LeaderCancelled(Exception):
+    """
+    The call coalesced callers were waiting for was cancelled; one of them runs it
+    instead.
+    """
+
+
+def make_cache_key(signature: inspect.Signature, args: tuple, kwargs: dict) -> str:
+    """
+    Build a cache key from call arguments.
+
+    Arguments are bound to the function signature and defaults are applied, so
+    positional, keyword and omitted-default spellings of the same call share a
+    key.
+
+    Args:
+        signature: Signature of the cached function
+        args: Positional call arguments
+        kwargs: Keyword call arguments
+
+    Returns:
+        A canonical JSON string for the call
+    """
+    bound = signature.bind(*args, **kwargs)
+    bound.apply_defaults()
+    return serialization.dumps(bound.arguments, sort_keys=True).decode()
+
+
+class ToolCache:
+    """
+    Thread-safe LRU cache with optional TTL expiry and single-flight loading.
+    """
+
+    def __init__(
+        self, name: str, max_size: int = 1024, ttl_seconds: Optional[float] = 300.0
+    ):
+        """
+        Args:
+            name: Name of the cache, usually the tool name
+            max_size: Maximum number of entries before the least recently used is
+                evicted
+            ttl_seconds: Seconds an entry stays valid. None or 0 disables expiry
+        """
+        self.name = name
+        self.max_size = max(1, max_size)
+        self.ttl_seconds = ttl_seconds or None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.coalesced = 0
+        self._entries: "OrderedDict[str, Tuple[Optional[float], Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, Future] = {}
+        self._async_inflight: Dict[str, asyncio.Future] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _lookup(self, key: str) -> Tuple[bool, Any]:
+        """Look up a key. The caller must hold the lock."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+        expires_at, value = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._entries[key]
+            self.expirations += 1
+            return False, None
+        self._entries.move_to_end(key)
+        return True, value
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """
+        Get a cached value.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            A (found, value) tuple
+        """
+        with self._lock:
+            found, value = self._lookup(key)
+            if found:
+                self.hits += 1
+            else:
+                self.misses += 1
+            return found, value
+
+    def set(self, key: str, value: Any) -> None:
+        """
+        Store a value, evicting the least recently used entry if the cache is full.
+
+        Args:
+            key: Cache key
+            value: Value to cache
+        """
+        expires_at = time.monotonic() + self.ttl_seconds if self.ttl_seconds else None
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Remove every entry."""
+        with self._lock:
+            self._entries.clear()
+
+    def get_or_call(self, key: str, fn: Callable[[], Any]) -> Any:
+        """
+        Return the cached value for a key, computing it at most once concurrently.
+
+        Args:
+            key: Cache key
+            fn: Function computing the value on a miss
+
+        Returns:
+            The cached or freshly computed value
+        """
+        with self._lock:
+            found, value = self._lookup(key)
+            if found:
+                self.hits += 1
+                return value
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                self.misses += 1
+                future = self._inflight[key] = Future()
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            return future.result()
+
+        try:
+            value = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            self.set(key, value)
+            future.set_result(value)
+            return value
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    async def get_or_call_async(
+        self, key: str, fn: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """
+        Async variant of get_or_call for coroutine functions.
+
+        Args:
+            key: Cache key
+            fn: Coroutine function computing the value on a miss
+
+        Returns:
+            The cached or freshly computed value
+        """
+        while True:
+            with self._lock:
+                found, value = self._lookup(key)
+                if found:
+                    self.hits += 1
+                    return value
+                future = self._async_inflight.get(key)
+                leader = future is None
+                if leader:
+                    self.misses += 1
+                    future = self._async_inflight[key] = (
+                        asyncio.get_running_loop().create_future()
+                    )
+                else:
+                    self.coalesced += 1
+
+            if leader:
+                break
+            try:
+                return await asyncio.shield(future)
+            except _LeaderCancelled:
+                # The caller computing the value was cancelled; one of the waiters
+                # computes it instead
+                continue
+
+        try:
+            value = await fn()
+        except BaseException as e:
+            with self._lock:
+                self._async_inflight.pop(key, None)
+            future.set_exception(
+                _LeaderCancelled() if isinstance(e, asyncio.CancelledError) else e
+            )
+            # Mark the exception as retrieved when no other caller is waiting
+            future.exception()
+            raise
+        else:
+            self.set(key, value)
+            future.set_result(value)
+            return value
+        finally:
+            with self._lock:
+                self._async_inflight.pop(key, None)
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get cache counters.
+
+        Returns:
+            Dictionary with size, hits, misses, evictions, expirations and coalesced
+            calls
+        """
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "coalesced": self.coalesced,
+        }
+
+
+def cached(
+    name: Optional[str] = None,
+    ttl_seconds: Optional[float] = None,
+    max_size: Optional[int] = None,
+    cache_config: Optional[CacheConfig] = None,
+):
+    """
+    Cache the results of a tool function.
+
+    Apply it below the tool registration decorator. Sync functions stay sync
+    and coroutine functions stay coroutine functions, so the tool schema and
+    call semantics are unchanged. Exceptions are never cached.
+
+    Example:
+        @mcp_instance.tool("Get Server Info")
+        @cached(ttl_seconds=60)
+        def server_info() -> Dict[str, Any]:
+            ...
+
+    Args:
+        name: Name of the cache. Defaults to the function name
+        ttl_seconds: Entry lifetime. Defaults to the configured TTL
+        max_size: Maximum number of entries. Defaults to the configured size
+        cache_config: Cache configuration. Defaults to the application config
+
+    Returns:
+        A decorator wrapping the function with a ToolCache
+    """
+    cache_config = cache_config or config.cache
+
+    def decorator(fn: Callable[..., Any]) -> Callable[..., Any]:
+        if not cache_config.enabled:
+            return fn
+
+        cache = ToolCache(
+            name or fn.__name__,
+            max_size=max_size if max_size is not None else cache_config.max_size,
+            ttl_seconds=(
+                ttl_seconds if ttl_seconds is not None else cache_config.ttl_seconds
+            ),
+        )
+        _caches[cache.name] = cache
+        signature = inspect.signature(fn)
+
+        if inspect.iscoroutinefunction(fn):
+
+            @functools.wraps(fn)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                key = make_cache_key(signature, args, kwargs)
+                return await cache.get_or_call_async(key, lambda: fn(*args, **kwargs))
+
+            async_wrapper.cache = cache
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            key = make_cache_key(signature, args, kwargs)
+            return cache.get_or_call(key, lambda: fn(*args, **kwargs))
+
+        wrapper.cache = cache
+        return wrapper
+
+    return decorator
+
+
+def get_cache_stats() -> Dict[str, Dict[str, int]]:
+    """
+    Get counters for every cache created through the decorator.
+
+    Returns:
+        Dictionary mapping cache names to their counters
+    """
+    return {name: cache.stats() for name, cache in _caches.items()}
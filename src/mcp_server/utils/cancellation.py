@@ -0,0 +1,110 @@
+"""
+Cooperative cancellation of tool calls.
+
+Each tool call runs with a CancellationToken in the current_cancellation
+context variable. The token is cancelled when the call times out, when the
+client cancels it or goes away. Async tools are cancelled as well, at their
+next await. Sync tools running in the executor's threads cannot be
+interrupted, so long-running ones should check the token between steps:
+
+    @offload()
+    def build_report(rows: int) -> str:
+        for chunk in range(0, rows, 1000):
+            check_cancelled()
+            ...
+
+The thread of a cancelled call keeps its executor slot until it returns.
+"""
+
+import threading
+from contextvars import ContextVar
+from typing import Callable, List, Optional
+
+
+class CallCancelledError(Exception):
+    """Raised by check_cancelled once the current tool call is cancelled."""
+
+
+class CancellationToken:
+    """
+    Cancellation flag of one tool call, safe to read from any thread.
+    """
+
+    __slots__ = ("reason", "_event", "_callbacks")
+
+    def __init__(self):
+        self.reason: Optional[str] = None
+        self._event = threading.Event()
+        self._callbacks: List[Callable[[], None]] = []
+
+    @property
+    def cancelled(self) -> bool:
+        """Whether the call was cancelled."""
+        return self._event.is_set()
+
+    def cancel(self, reason: str = "cancelled") -> None:
+        """
+        Cancel the call. Later cancellations keep the first reason.
+
+        Call from the event loop thread; callbacks run synchronously.
+
+        Args:
+            reason: Why the call was cancelled: "timeout", "cancelled" or "disconnect"
+        """
+        if self._event.is_set():
+            return
+        self.reason = reason
+        self._event.set()
+        callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            callback()
+
+    def add_callback(self, callback: Callable[[], None]) -> Callable[[], None]:
+        """
+        Run a function when the call is cancelled, or at once if it already is.
+
+        Args:
+            callback: Function taking no arguments
+
+        Returns:
+            A function removing the callback
+        """
+        if self._event.is_set():
+            callback()
+            return lambda: None
+        self._callbacks.append(callback)
+
+        def remove() -> None:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+        return remove
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block the calling thread until the call is cancelled.
+
+        Args:
+            timeout: Seconds to wait at most
+
+        Returns:
+            Whether the call was cancelled
+        """
+        return self._event.wait(timeout)
+
+
+current_cancellation: ContextVar[Optional[CancellationToken]] = ContextVar(
+    "current_cancellation", default=None
+)
+
+
+def check_cancelled() -> None:
+    """
+    Stop a tool whose call was cancelled.
+
+    Raises:
+        CallCancelledError: The current call was cancelled
+    """
+    token = current_cancellation.get()
+    if token is not None and token.cancelled:
+        raise CallCancelledError(f"Tool call cancelled ({token.reason})")
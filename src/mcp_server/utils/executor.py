@@ -0,0 +1,389 @@
+"""
+Execution layer for blocking and CPU-bound MCP tools.
+
+Sync tool functions run directly on the event loop, so a tool doing blocking
+I/O or heavy computation stalls every other in-flight session. This module
+runs such tools in a bounded thread pool, or optionally a process pool, and
+limits how many calls of each tool may run at once so a single slow tool
+cannot starve cheap ones such as Ping.
+
+Cancelling a call that has not started yet removes it from its pool. A call
+already running in a thread cannot be interrupted: its CancellationToken is
+cancelled so the tool can stop at its next check_cancelled, and the call keeps
+its slot until the thread returns.
+"""
+
+import asyncio
+import contextvars
+import functools
+import importlib
+import inspect
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, Optional
+
+from src.mcp_server.config.config import ExecutorConfig, config
+from src.mcp_server.utils.cancellation import CancellationToken, current_cancellation
+
+
+class ToolLimiter:
+    """
+    Per-tool concurrency limit with queue-depth accounting.
+
+    Waiters are served in FIFO order. The limiter is not bound to an event
+    loop, so it can be shared by servers started on different loops.
+    """
+
+    def __init__(self, name: str, max_concurrency: Optional[int] = None):
+        """
+        Args:
+            name: Name of the tool
+            max_concurrency: Maximum concurrent calls. None or 0 means unlimited
+        """
+        self.name = name
+        self.max_concurrency = max_concurrency or None
+        self.running = 0
+        self.waiting = 0
+        self.peak_waiting = 0
+        self.completed = 0
+        self.cancelled = 0
+        # Threads still running calls that were cancelled
+        self.abandoned = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    async def acquire(self) -> None:
+        """Wait for a free slot."""
+        if self.max_concurrency is None or (
+            self.running < self.max_concurrency and not self._waiters
+        ):
+            self.running += 1
+            return
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self.waiting += 1
+        self.peak_waiting = max(self.peak_waiting, self.waiting)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed to us just before cancellation; pass it on
+                self.release()
+            else:
+                self._waiters.remove(waiter)
+            raise
+        finally:
+            self.waiting -= 1
+
+    def release(self) -> None:
+        """Release a slot, handing it to the next waiter if there is one."""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.running -= 1
+
+    def stats(self) -> Dict[str, Optional[int]]:
+        """
+        Get limiter counters.
+
+        Returns:
+            Dictionary with running, waiting (queue depth), peak_waiting,
+            completed, cancelled, abandoned and max_concurrency
+        """
+        return {
+            "running": self.running,
+            "waiting": self.waiting,
+            "peak_waiting": self.peak_waiting,
+            "completed": self.completed,
+            "cancelled": self.cancelled,
+            "abandoned": self.abandoned,
+            "max_concurrency": self.max_concurrency,
+        }
+
+
+def _call_by_reference(
+    module_name: str, qualname: str, args: tuple, kwargs: dict
+) -> Any:
+    """
+    Call a module-level function by its import path.
+
+    Decorated tool functions cannot be pickled by reference because the module
+    attribute is the wrapper, so process-pool calls resolve the function in the
+    worker and unwrap it there.
+    """
+    target: Any = importlib.import_module(module_name)
+    for part in qualname.split("."):
+        target = getattr(target, part)
+    return inspect.unwrap(target)(*args, **kwargs)
+
+
+class ToolExecutor:
+    """
+    Run sync tools off the event loop with per-tool concurrency limits.
+    """
+
+    def __init__(
+        self,
+        max_threads: Optional[int] = None,
+        process_pool_enabled: bool = False,
+        max_processes: Optional[int] = None,
+        default_concurrency: Optional[int] = None,
+    ):
+        """
+        Args:
+            max_threads: Size of the thread pool. None uses the Python default
+            process_pool_enabled: Run CPU-bound tools in a process pool
+            max_processes: Size of the process pool. None uses the CPU count
+            default_concurrency: Per-tool limit for tools that do not set one
+        """
+        self.max_threads = max_threads or None
+        self.process_pool_enabled = process_pool_enabled
+        self.max_processes = max_processes or None
+        self.default_concurrency = default_concurrency or None
+        self._thread_pool: Optional[ThreadPoolExecutor] = None
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+        self._limiters: Dict[str, ToolLimiter] = {}
+
+    @property
+    def thread_pool(self) -> ThreadPoolExecutor:
+        """The thread pool, created on first use."""
+        if self._thread_pool is None:
+            self._thread_pool = ThreadPoolExecutor(
+                max_workers=self.max_threads, thread_name_prefix="mcp-tool"
+            )
+        return self._thread_pool
+
+    @property
+    def process_pool(self) -> ProcessPoolExecutor:
+        """The process pool, created on first use."""
+        if self._process_pool is None:
+            self._process_pool = ProcessPoolExecutor(max_workers=self.max_processes)
+        return self._process_pool
+
+    def limiter(
+        self, tool_name: str, max_concurrency: Optional[int] = None
+    ) -> ToolLimiter:
+        """
+        Get or create the limiter for a tool.
+
+        Args:
+            tool_name: Name of the tool
+            max_concurrency: Limit to use when the limiter is created
+
+        Returns:
+            ToolLimiter: The tool's limiter
+        """
+        limiter = self._limiters.get(tool_name)
+        if limiter is None:
+            limiter = self._limiters[tool_name] = ToolLimiter(
+                tool_name,
+                (
+                    max_concurrency
+                    if max_concurrency is not None
+                    else self.default_concurrency
+                ),
+            )
+        return limiter
+
+    async def run(
+        self,
+        tool_name: str,
+        fn: Callable[..., Any],
+        *args: Any,
+        cpu_bound: bool = False,
+        **kwargs: Any,
+    ) -> Any:
+        """
+        Run a tool function under its concurrency limit.
+
+        Coroutine functions are awaited on the event loop. Sync functions run
+        in the thread pool, or in the process pool when cpu_bound is set and
+        the process pool is enabled.
+
+        Args:
+            tool_name: Name of the tool, used to select its limiter
+            fn: The tool function
+            *args: Positional arguments for the function
+            cpu_bound: Prefer the process pool
+            **kwargs: Keyword arguments for the function
+
+        Returns:
+            The function result
+        """
+        limiter = self.limiter(tool_name)
+        await limiter.acquire()
+        release = True
+        try:
+            if inspect.iscoroutinefunction(fn):
+                return await fn(*args, **kwargs)
+
+            if cpu_bound and self.process_pool_enabled:
+                call = functools.partial(
+                    _call_by_reference, fn.__module__, fn.__qualname__, args, kwargs
+                )
+                return await asyncio.wrap_future(self.process_pool.submit(call))
+
+            context = contextvars.copy_context()
+            token = current_cancellation.get()
+            if token is None:
+                token = CancellationToken()
+                context.run(current_cancellation.set, token)
+            future = self.thread_pool.submit(context.run, fn, *args, **kwargs)
+            try:
+                return await asyncio.wrap_future(future)
+            except asyncio.CancelledError:
+                if not future.done():
+                    # The thread runs on; tell the tool and keep the slot until done
+                    token.cancel()
+                    release = False
+                    self._release_when_done(limiter, future)
+                raise
+        except asyncio.CancelledError:
+            limiter.cancelled += 1
+            raise
+        finally:
+            limiter.completed += 1
+            if release:
+                limiter.release()
+
+    @staticmethod
+    def _release_when_done(limiter: ToolLimiter, future: Future) -> None:
+        """Release a limiter slot once an abandoned thread call returns."""
+        loop = asyncio.get_running_loop()
+        limiter.abandoned += 1
+
+        def done(_: Future) -> None:
+            def release() -> None:
+                limiter.abandoned -= 1
+                limiter.release()
+
+            try:
+                loop.call_soon_threadsafe(release)
+            except RuntimeError:
+                # The event loop is closed; nothing waits for the slot any more
+                pass
+
+        future.add_done_callback(done)
+
+    def offload(
+        self,
+        name: Optional[str] = None,
+        max_concurrency: Optional[int] = None,
+        cpu_bound: bool = False,
+    ):
+        """
+        Decorator running a tool through the executor.
+
+        Apply it below the tool registration decorator. The wrapped function
+        becomes a coroutine function with the original signature, so the tool
+        schema is unchanged.
+
+        Example:
+            @mcp_instance.tool("Fetch Report")
+            @offload(max_concurrency=4)
+            def fetch_report(report_id: str) -> str:
+                ...
+
+        Args:
+            name: Name used for the tool's limiter. Defaults to the function name
+            max_concurrency: Per-tool concurrency limit
+            cpu_bound: Run in the process pool when it is enabled. The function
+                must be defined at module level so worker processes can import it
+
+        Returns:
+            A decorator wrapping the function
+        """
+
+        def decorator(fn: Callable[..., Any]) -> Callable[..., Any]:
+            if (
+                cpu_bound
+                and self.process_pool_enabled
+                and "<locals>" in fn.__qualname__
+            ):
+                raise ValueError(
+                    f"CPU-bound tool {fn.__qualname__} must be defined at module level"
+                )
+
+            tool_name = name or fn.__name__
+            self.limiter(tool_name, max_concurrency)
+
+            @functools.wraps(fn)
+            async def wrapper(*args: Any, **kwargs: Any) -> Any:
+                return await self.run(
+                    tool_name, fn, *args, cpu_bound=cpu_bound, **kwargs
+                )
+
+            return wrapper
+
+        return decorator
+
+    def stats(self) -> Dict[str, Dict[str, Optional[int]]]:
+        """
+        Get per-tool execution counters.
+
+        Returns:
+            Dictionary mapping tool names to their limiter counters
+        """
+        return {name: limiter.stats() for name, limiter in self._limiters.items()}
+
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        Shut down the worker pools.
+
+        Args:
+            wait: Wait for running calls to finish
+        """
+        if self._thread_pool is not None:
+            self._thread_pool.shutdown(wait=wait)
+            self._thread_pool = None
+        if self._process_pool is not None:
+            self._process_pool.shutdown(wait=wait)
+            self._process_pool = None
+
+
+_executor: Optional[ToolExecutor] = None
+
+
+def get_executor(executor_config: Optional[ExecutorConfig] = None) -> ToolExecutor:
+    """
+    Get the shared tool executor, creating it from the configuration on first use.
+
+    Args:
+        executor_config: Executor configuration. Defaults to the application config
+
+    Returns:
+        ToolExecutor: The shared executor
+    """
+    global _executor
+    if _executor is None:
+        executor_config = executor_config or config.executor
+        _executor = ToolExecutor(
+            max_threads=executor_config.max_threads,
+            process_pool_enabled=executor_config.process_pool_enabled,
+            max_processes=executor_config.max_processes,
+            default_concurrency=executor_config.default_concurrency,
+        )
+    return _executor
+
+
+def offload(
+    name: Optional[str] = None,
+    max_concurrency: Optional[int] = None,
+    cpu_bound: bool = False,
+):
+    """
+    Run a tool through the shared executor. See ToolExecutor.offload.
+
+    Args:
+        name: Name used for the tool's limiter. Defaults to the function name
+        max_concurrency: Per-tool concurrency limit
+        cpu_bound: Run in the process pool when it is enabled
+
+    Returns:
+        A decorator wrapping the function
+    """
+    return get_executor().offload(
+        name=name, max_concurrency=max_concurrency, cpu_bound=cpu_bound
+    )
@@ -1,14 +1,41 @@
 """
 Logging configuration for the MCP server.
+
+Records are written in the LOG_FORMAT text format, or as one JSON object per
+line with LOG_JSON. JSON records carry the tool and JSON-RPC request id of
+the call they were logged in, and any extra fields:
+
+    logger.info(
+        "Cache refreshed in %.1f ms", elapsed, extra={"entries": lazy(cache.count)}
+    )
+
+Pass arguments instead of formatting messages up front, and wrap values that
+are costly to compute in lazy(): messages and fields are only built for
+records that are written.
+
+Frequent messages can be sampled: with LOG_SAMPLE_INITIAL set, each message
+is kept that many times per LOG_SAMPLE_INTERVAL, then one record in
+LOG_SAMPLE_THEREAFTER. Sampling applies to DEBUG and INFO records and tells
+messages apart by their format string. LOG_TOOL_LEVELS sets the level of the
+records logged while given tools run, such as "Search:DEBUG".
 """
+
+import atexit
+import copy
 import logging
 import os
+import queue
 import sys
+import threading
+import time
+from contextvars import ContextVar
+from datetime import datetime, timezone
 from logging.handlers import RotatingFileHandler
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
-from dotenv import load_dotenv
-
-load_dotenv()
+from src.mcp_server.config.config import LoggingConfig, load_config
+from src.mcp_server.middleware.tool_calls import Content, ToolCall, ToolCallHandler
+from src.mcp_server.utils import serialization
 
 # Log levels dictionary to map string values to logging constants
 LOG_LEVELS = {
@@ -19,50 +46,429 @@ LOG_LEVELS = {
     "CRITICAL": logging.CRITICAL,
 }
 
-def setup_logging(app_name=None):
+# Logging configuration applied to each configured logger, by logger name
+_configured = {}
+
+# Marks the end of the record stream for the background writer
+_STOP = object()
+
+# Tool name and JSON-RPC request id of the tool call being run
+current_tool_call: ContextVar[Optional[Tuple[str, Any]]] = ContextVar(
+    "current_tool_call", default=None
+)
+
+# Attributes every LogRecord has; the others came from extra
+_RECORD_ATTRIBUTES = frozenset(
+    vars(logging.LogRecord("", logging.INFO, "", 0, "", None, None))
+) | {"message", "asctime", "tool", "request_id"}
+
+
+class lazy:
+    """
+    Log argument or extra field computed only if the record is written.
+
+    Example:
+        logger.debug("Sessions: %s", lazy(lambda: len(tracker)))
+    """
+
+    __slots__ = ("_fn",)
+
+    def __init__(self, fn: Callable[[], Any]):
+        """
+        Args:
+            fn: Function computing the value
+        """
+        self._fn = fn
+
+    def __call__(self) -> Any:
+        return self._fn()
+
+    def __str__(self) -> str:
+        return str(self._fn())
+
+    def __repr__(self) -> str:
+        return repr(self._fn())
+
+
+async def log_tool_context(call: ToolCall, call_next: ToolCallHandler) -> Content:
+    """
+    Tool-call middleware recording which tool call the records logged during it belong
+    to.
+
+    Args:
+        call: The tool call
+        call_next: The next handler in the chain
+
+    Returns:
+        The tool result
+    """
+    token = current_tool_call.set((call.name, call.request_id))
+    try:
+        return await call_next(call)
+    finally:
+        current_tool_call.reset(token)
+
+
+class ToolContextFilter(logging.Filter):
+    """
+    Stamp records with their tool call and apply per-tool log levels.
+
+    The records are stamped on the logging thread, so the context survives
+    the background writer.
+    """
+
+    def __init__(self, level: int, tool_levels: Optional[Dict[str, int]] = None):
+        """
+        Args:
+            level: Level of records logged outside the tools in tool_levels
+            tool_levels: Levels by tool name
+        """
+        super().__init__()
+        self.level = level
+        self.tool_levels = tool_levels or {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        context = current_tool_call.get()
+        if context is None:
+            record.tool = record.request_id = None
+            return record.levelno >= self.level
+        record.tool, record.request_id = context
+        return record.levelno >= self.tool_levels.get(context[0], self.level)
+
+
+class LogSampler(logging.Filter):
+    """
+    Keep the first records of each message per interval, then one in N.
+
+    Only records below WARNING are sampled.
+    """
+
+    def __init__(self, initial: int, thereafter: int = 100, interval: float = 1.0):
+        """
+        Args:
+            initial: Records of one message kept per interval before sampling starts
+            thereafter: Once sampling starts, one record of every N is kept. 0 drops the
+                rest
+            interval: Seconds after which every message starts over
+        """
+        super().__init__()
+        self.initial = initial
+        self.thereafter = thereafter
+        self.interval = interval
+        self.dropped = 0
+        self._counts: Dict[Tuple[str, int, Any], int] = {}
+        self._window_end = time.monotonic() + interval
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        now = time.monotonic()
+        if now >= self._window_end:
+            self._counts.clear()
+            self._window_end = now + self.interval
+        key = (record.name, record.levelno, record.msg)
+        count = self._counts[key] = self._counts.get(key, 0) + 1
+        if count <= self.initial or (
+            self.thereafter and (count - self.initial) % self.thereafter == 0
+        ):
+            return True
+        self.dropped += 1
+        return False
+
+
+class JSONFormatter(logging.Formatter):
+    """
+    Format records as single-line JSON objects.
+
+    The object holds the time, level, logger, message, tool call, exception
+    and the record's extra fields. Lazy values are computed here, so only for
+    records that are written.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(
+                timespec="milliseconds"
+            ),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        tool = getattr(record, "tool", None)
+        if tool is not None:
+            entry["tool"] = tool
+            entry["request_id"] = record.request_id
+        for name, value in vars(record).items():
+            if name not in _RECORD_ATTRIBUTES:
+                entry[name] = value() if isinstance(value, lazy) else value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        if record.stack_info:
+            entry["stack"] = self.formatStack(record.stack_info)
+        return serialization.dumps(entry).decode()
+
+
+class _BatchFlushMixin:
+    """
+    Defer the per-record flush of a stream handler.
+
+    StreamHandler flushes after every record. When records are written in
+    batches by AsyncLogHandler, the writer flushes once at the end of each
+    batch instead.
+    """
+
+    _batching = False
+
+    def flush(self) -> None:
+        if not self._batching:
+            super().flush()
+
+
+class BatchedStreamHandler(_BatchFlushMixin, logging.StreamHandler):
+    """StreamHandler that flushes once per batch."""
+
+
+class BatchedRotatingFileHandler(_BatchFlushMixin, RotatingFileHandler):
+    """RotatingFileHandler that flushes once per batch."""
+
+
+class AsyncLogHandler(logging.Handler):
+    """
+    Hand log records to a background writer through a bounded queue.
+
+    The calling thread only enqueues a copy of the record, so disk and
+    stdout writes, formatting and log rotation all happen off the request
+    path. Records are drained and written in batches. Pending records are
+    flushed when the handler is closed, which also happens at interpreter
+    exit.
+    """
+
+    def __init__(
+        self,
+        handlers: List[logging.Handler],
+        queue_size: int = 10000,
+        overflow_policy: str = "drop",
+        batch_size: int = 256,
+    ):
+        """
+        Args:
+            handlers: Handlers that perform the actual writes
+            queue_size: Maximum number of buffered records
+            overflow_policy: "drop" to discard records when the buffer is full,
+                "block" to make the caller wait for space
+            batch_size: Maximum number of records written per batch
+        """
+        super().__init__()
+        if overflow_policy not in ("drop", "block"):
+            raise ValueError(f"Unknown log overflow policy: {overflow_policy}")
+
+        self.handlers = handlers
+        self.overflow_policy = overflow_policy
+        self.batch_size = max(1, batch_size)
+        self.dropped = 0
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._closed = False
+        self._thread = threading.Thread(
+            target=self._writer, name="async-log-writer", daemon=True
+        )
+        self._thread.start()
+        atexit.register(self.close)
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """
+        Copy the record for the background writer.
+
+        The message is merged with its arguments, and lazy values computed,
+        when the writer formats the record, so arguments must not be changed
+        after they are logged.
+
+        Args:
+            record: The record to prepare
+
+        Returns:
+            The prepared record
+        """
+        return copy.copy(record)
+
+    def emit(self, record: logging.LogRecord) -> None:
+        """
+        Enqueue a record for the background writer.
+
+        Args:
+            record: The record to write
+        """
+        if self._closed:
+            return
+        try:
+            record = self.prepare(record)
+            if self.overflow_policy == "block":
+                self._queue.put(record)
+            else:
+                self._queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+        except Exception:
+            self.handleError(record)
+
+    def _write_batch(self, batch: list) -> None:
+        """Write a batch of records and flush every handler once."""
+        for handler in self.handlers:
+            if isinstance(handler, _BatchFlushMixin):
+                handler._batching = True
+        try:
+            for record in batch:
+                for handler in self.handlers:
+                    if record.levelno >= handler.level:
+                        handler.handle(record)
+        finally:
+            for handler in self.handlers:
+                if isinstance(handler, _BatchFlushMixin):
+                    handler._batching = False
+                handler.flush()
+
+    def _writer(self) -> None:
+        """Drain the queue in batches until the stop marker is seen."""
+        while True:
+            item = self._queue.get()
+            items = [item]
+            while len(items) < self.batch_size:
+                try:
+                    items.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            stop = any(entry is _STOP for entry in items)
+            try:
+                self._write_batch([entry for entry in items if entry is not _STOP])
+            finally:
+                for _ in items:
+                    self._queue.task_done()
+            if stop:
+                return
+
+    def flush(self) -> None:
+        """Block until every record queued so far has been written."""
+        if not self._closed and self._thread.is_alive():
+            self._queue.join()
+
+    def close(self) -> None:
+        """Flush pending records, stop the writer and close the target handlers."""
+        if self._closed:
+            return
+        self._closed = True
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join()
+        for handler in self.handlers:
+            handler.close()
+        atexit.unregister(self.close)
+        super().close()
+
+
+def setup_logging(
+    app_name=None, logging_config: Optional[LoggingConfig] = None, force: bool = False
+):
     """
     Set up logging for the application.
 
+    Calling it again with the same configuration returns the already
+    configured logger, so the CLI and the server module can both call it
+    without building the handlers twice.
+
     Args:
-        app_name (str): Name of the application. If None, uses the APP_NAME from environment variable.
+        app_name (str): Name of the application. If None, uses the configured app_name.
+        logging_config (LoggingConfig): Logging configuration. If None, it is loaded
+            from the configuration layers.
+        force (bool): Rebuild the handlers even if the configuration is unchanged.
 
     Returns:
         logging.Logger: Configured logger instance
     """
-    # Get configuration from environment variables
-    app_name = app_name or os.getenv("APP_NAME", "mcp_server")
-    log_level_name = os.getenv("LOG_LEVEL", "INFO")
-    log_format = os.getenv("LOG_FORMAT", "%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    # Read the configuration layers again, so environment changes are picked up
+    if app_name is None or logging_config is None:
+        loaded = load_config()
+        app_name = app_name or loaded.app_name
+        logging_config = logging_config or loaded.logging
+    log_level_name = logging_config.level
+    log_level = LOG_LEVELS.get(log_level_name, logging.INFO)
+    tool_levels = {
+        tool: LOG_LEVELS[level] for tool, level in logging_config.tool_levels.items()
+    }
 
     # Create logger
     logger = logging.getLogger(app_name)
-    logger.setLevel(LOG_LEVELS.get(log_level_name, logging.INFO))
+    if not force and logger.handlers and _configured.get(app_name) == logging_config:
+        return logger
+    # The logger passes the lowest level in use; ToolContextFilter applies the others
+    logger.setLevel(min([log_level, *tool_levels.values()]))
+    for log_filter in list(logger.filters):
+        if isinstance(log_filter, (ToolContextFilter, LogSampler)):
+            logger.removeFilter(log_filter)
+    logger.addFilter(ToolContextFilter(log_level, tool_levels))
+    if logging_config.sample_initial:
+        logger.addFilter(
+            LogSampler(
+                logging_config.sample_initial,
+                thereafter=logging_config.sample_thereafter,
+                interval=logging_config.sample_interval,
+            )
+        )
 
-    # Clear existing handlers if any
-    if logger.hasHandlers():
-        logger.handlers.clear()
+    # Close the existing handlers, flushing any background writer
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+        handler.close()
+
+    async_enabled = logging_config.async_enabled
+    handlers: List[logging.Handler] = []
+    if logging_config.json_enabled:
+        formatter: logging.Formatter = JSONFormatter()
+    else:
+        formatter = logging.Formatter(logging_config.format)
 
     # Create console handler
-    console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setFormatter(logging.Formatter(log_format))
-    logger.addHandler(console_handler)
+    console_handler_class = (
+        BatchedStreamHandler if async_enabled else logging.StreamHandler
+    )
+    console_handler = console_handler_class(sys.stdout)
+    console_handler.setFormatter(formatter)
+    handlers.append(console_handler)
 
-    # Create file handler if log directory exists
-    log_dir = os.path.join(os.getcwd(), "logs")
-    if not os.path.exists(log_dir):
-        try:
-            os.makedirs(log_dir)
-        except OSError:
-            logger.warning(f"Could not create log directory at {log_dir}")
+    # Create file handler, creating the log directory if needed
+    log_dir = None
+    if logging_config.file_enabled:
+        log_dir = os.path.join(os.getcwd(), logging_config.file_dir)
+        if not os.path.exists(log_dir):
+            try:
+                os.makedirs(log_dir)
+            except OSError:
+                logger.warning("Could not create log directory at %s", log_dir)
 
-    if os.path.exists(log_dir):
+    if log_dir is not None and os.path.exists(log_dir):
         log_file = os.path.join(log_dir, f"{app_name}.log")
-        file_handler = RotatingFileHandler(
+        file_handler_class = (
+            BatchedRotatingFileHandler if async_enabled else RotatingFileHandler
+        )
+        file_handler = file_handler_class(
             log_file, maxBytes=10485760, backupCount=5  # 10MB
         )
-        file_handler.setFormatter(logging.Formatter(log_format))
-        logger.addHandler(file_handler)
+        file_handler.setFormatter(formatter)
+        handlers.append(file_handler)
+
+    if async_enabled:
+        logger.addHandler(
+            AsyncLogHandler(
+                handlers,
+                queue_size=logging_config.queue_size,
+                overflow_policy=logging_config.overflow_policy,
+                batch_size=logging_config.batch_size,
+            )
+        )
+    else:
+        for handler in handlers:
+            logger.addHandler(handler)
 
-    logger.info(f"Logging configured with level {log_level_name}")
+    _configured[app_name] = logging_config
+    logger.info("Logging configured with level %s", log_level_name)
 
     return logger
@@ -0,0 +1,263 @@
+"""
+Metric types and the Prometheus text exposition for the MCP server.
+
+Metrics are recorded from the event loop thread, so recording is plain
+attribute arithmetic with no locks. Histogram buckets are allocated once when
+the histogram is created; observing a value is a binary search and two
+increments.
+"""
+
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Latency bucket bounds in seconds
+DEFAULT_LATENCY_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+# Payload size bucket bounds in bytes
+DEFAULT_SIZE_BUCKETS = (64, 256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+# A metric family: name, type, help text and (labels, value) samples
+MetricFamily = Tuple[str, str, str, List[Tuple[Dict[str, str], float]]]
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram.
+    """
+
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: Sequence[float] = DEFAULT_LATENCY_BUCKETS):
+        """
+        Args:
+            bounds: Sorted upper bounds of the buckets. A +Inf bucket is implied
+        """
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        """
+        Record a value.
+
+        Args:
+            value: The observed value
+        """
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        """
+        Get cumulative bucket counts.
+
+        Returns:
+            (upper bound, count) pairs, ending with the +Inf bucket
+        """
+        total = 0
+        buckets = []
+        for bound, count in zip(self.bounds + (float("inf"),), self.counts):
+            total += count
+            buckets.append(
+                ("+Inf" if bound == float("inf") else _format_value(bound), total)
+            )
+        return buckets
+
+
+class ToolStats:
+    """
+    Metrics for a single tool.
+    """
+
+    __slots__ = (
+        "calls",
+        "errors",
+        "in_flight",
+        "latency",
+        "argument_bytes",
+        "result_bytes",
+    )
+
+    def __init__(
+        self,
+        latency_buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS,
+        size_buckets: Sequence[float] = DEFAULT_SIZE_BUCKETS,
+    ):
+        self.calls = 0
+        self.errors = 0
+        self.in_flight = 0
+        self.latency = Histogram(latency_buckets)
+        self.argument_bytes = Histogram(size_buckets)
+        self.result_bytes = Histogram(size_buckets)
+
+
+class MetricsRegistry:
+    """
+    Per-tool metrics plus pluggable collectors, rendered in Prometheus format.
+    """
+
+    def __init__(
+        self,
+        prefix: str = "mcp",
+        latency_buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS,
+        size_buckets: Sequence[float] = DEFAULT_SIZE_BUCKETS,
+    ):
+        """
+        Args:
+            prefix: Prefix of every metric name
+            latency_buckets: Latency histogram bounds in seconds
+            size_buckets: Payload size histogram bounds in bytes
+        """
+        self.prefix = prefix
+        self.latency_buckets = tuple(latency_buckets)
+        self.size_buckets = tuple(size_buckets)
+        self.tools: Dict[str, ToolStats] = {}
+        self._collectors: List[Callable[[], Iterable[MetricFamily]]] = []
+
+    def tool(self, name: str) -> ToolStats:
+        """
+        Get or create the metrics of a tool.
+
+        Args:
+            name: Name of the tool
+
+        Returns:
+            ToolStats: The tool's metrics
+        """
+        stats = self.tools.get(name)
+        if stats is None:
+            stats = self.tools[name] = ToolStats(
+                self.latency_buckets, self.size_buckets
+            )
+        return stats
+
+    def add_collector(self, collector: Callable[[], Iterable[MetricFamily]]) -> None:
+        """
+        Add a collector whose metric families are rendered with the tool metrics.
+
+        Args:
+            collector: Callable returning metric families when metrics are scraped
+        """
+        self._collectors.append(collector)
+
+    def collect(self) -> List[MetricFamily]:
+        """
+        Collect every metric family.
+
+        Returns:
+            The tool metrics followed by the collectors' metrics
+        """
+        p = self.prefix
+        tools = sorted(self.tools.items())
+        families: List[MetricFamily] = [
+            (
+                f"{p}_tool_calls_total",
+                "counter",
+                "Tool calls by tool.",
+                [({"tool": name}, stats.calls) for name, stats in tools],
+            ),
+            (
+                f"{p}_tool_errors_total",
+                "counter",
+                "Failed tool calls by tool.",
+                [({"tool": name}, stats.errors) for name, stats in tools],
+            ),
+            (
+                f"{p}_tool_in_flight",
+                "gauge",
+                "Tool calls currently executing.",
+                [({"tool": name}, stats.in_flight) for name, stats in tools],
+            ),
+        ]
+        for collector in self._collectors:
+            families.extend(collector())
+        return families
+
+    def histograms(self) -> List[Tuple[str, str, Dict[str, Histogram]]]:
+        """
+        Get the per-tool histograms.
+
+        Returns:
+            (name, help text, histogram by tool) triples
+        """
+        p = self.prefix
+        return [
+            (
+                f"{p}_tool_call_duration_seconds",
+                "Tool call latency in seconds.",
+                {name: stats.latency for name, stats in self.tools.items()},
+            ),
+            (
+                f"{p}_tool_argument_bytes",
+                "Size of sampled tool call arguments in bytes.",
+                {name: stats.argument_bytes for name, stats in self.tools.items()},
+            ),
+            (
+                f"{p}_tool_result_bytes",
+                "Size of tool call results in bytes.",
+                {name: stats.result_bytes for name, stats in self.tools.items()},
+            ),
+        ]
+
+    def render(self) -> str:
+        """
+        Render every metric in the Prometheus text exposition format.
+
+        Returns:
+            The exposition text
+        """
+        lines = []
+        for name, metric_type, help_text, samples in self.collect():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            for labels, value in samples:
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+
+        for name, help_text, histograms in self.histograms():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} histogram")
+            for tool, histogram in sorted(histograms.items()):
+                for bound, count in histogram.cumulative():
+                    labels = _format_labels({"tool": tool, "le": bound})
+                    lines.append(f"{name}_bucket{labels} {count}")
+                labels = _format_labels({"tool": tool})
+                lines.append(f"{name}_sum{labels} {_format_value(histogram.sum)}")
+                lines.append(f"{name}_count{labels} {histogram.count}")
+
+        return "\n".join(lines) + "\n"
+
+
+def _format_labels(labels: Optional[Dict[str, str]]) -> str:
+    """Format a label set, escaping values as the exposition format requires."""
+    if not labels:
+        return ""
+    pairs = []
+    for key, value in labels.items():
+        escaped = (
+            str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        )
+        pairs.append(f'{key}="{escaped}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    """Format a sample value."""
+    if isinstance(value, float) and value.is_integer():
+        return repr(value)
+    return str(value)
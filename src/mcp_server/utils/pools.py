@@ -0,0 +1,825 @@
+"""
+Connection pools and shared handles for tools.
+
+Tools that talk to databases or remote services should not open a
+connection per call. PoolManager owns named pools of such handles for the
+lifetime of the server: pools are warmed up at startup, connections left
+idle beyond the pool's minimum size are closed in the background, and
+everything is closed at shutdown. Tools receive handles by dependency
+injection:
+
+    get_pool_manager().pool(
+        "db", connect_db, close=lambda conn: conn.close(), min_size=2
+    )
+
+    @mcp_instance.tool("Count Users")
+    @inject(db="db")
+    async def count_users(db: Connection) -> int:
+        return await db.fetchval("SELECT COUNT(*) FROM users")
+
+The injected parameters are hidden from the tool schema. ResourcePool hands
+each handle to one call at a time; SharedResource hands the same handle to
+every call, for clients that pool internally such as httpx.AsyncClient.
+"""
+
+import asyncio
+import contextlib
+import functools
+import inspect
+import logging
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Deque,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    Type,
+)
+
+from src.mcp_server.config.config import PoolConfig, config
+from src.mcp_server.utils.executor import get_executor
+from src.mcp_server.utils.metrics import MetricFamily
+
+logger = logging.getLogger(config.app_name)
+
+# Creates a handle; may be a coroutine function. Sync factories run in the executor's
+# thread pool
+Factory = Callable[[], Any]
+
+# Closes a handle; may be a coroutine function
+Closer = Callable[[Any], Any]
+
+# Result handed to a waiter allowed to open a connection of its own
+_OPEN = object()
+
+
+class PoolTimeoutError(TimeoutError):
+    """Raised when no connection becomes free within the acquire timeout."""
+
+
+async def _call(fn: Callable[..., Any], *args: Any) -> Any:
+    """Await a coroutine function, or run a sync one in the thread pool."""
+    if inspect.iscoroutinefunction(fn):
+        return await fn(*args)
+    result = await asyncio.get_running_loop().run_in_executor(
+        get_executor().thread_pool, fn, *args
+    )
+    if inspect.isawaitable(result):
+        result = await result
+    return result
+
+
+class ManagedResource(ABC):
+    """
+    A named source of handles managed by a PoolManager.
+    """
+
+    def __init__(self, name: str, factory: Factory, close: Optional[Closer] = None):
+        """
+        Args:
+            name: Name tools use to request the resource
+            factory: Creates a handle
+            close: Closes a handle. None leaves handles to the garbage collector
+        """
+        self.name = name
+        self.factory = factory
+        self.closer = close
+        self.in_use = 0
+        self.created = 0
+        self.closed = 0
+
+    async def _open(self) -> Any:
+        """Create a handle."""
+        handle = await _call(self.factory)
+        self.created += 1
+        return handle
+
+    async def _close(self, handle: Any) -> None:
+        """Close a handle, logging rather than raising failures."""
+        self.closed += 1
+        if self.closer is None:
+            return
+        try:
+            await _call(self.closer, handle)
+        except Exception:
+            logger.warning(
+                "Failed to close a connection of pool %s", self.name, exc_info=True
+            )
+
+    @abstractmethod
+    async def acquire(self) -> Any:
+        """
+        Get a handle.
+
+        Returns:
+            The handle, to be given back with release
+        """
+
+    @abstractmethod
+    async def release(self, handle: Any, discard: bool = False) -> None:
+        """
+        Give back a handle.
+
+        Args:
+            handle: Handle returned by acquire
+            discard: Close the handle instead of reusing it
+        """
+
+    @contextlib.asynccontextmanager
+    async def connection(self) -> AsyncIterator[Any]:
+        """
+        Borrow a handle for the duration of a block.
+
+        Yields:
+            The handle
+        """
+        handle = await self.acquire()
+        try:
+            yield handle
+        except BaseException as e:
+            await self.release(handle, discard=self._is_broken(e))
+            raise
+        await self.release(handle)
+
+    def _is_broken(self, error: BaseException) -> bool:
+        """
+        Whether an error raised while a handle was borrowed means the handle is
+        unusable.
+        """
+        return False
+
+    async def warm(self) -> None:
+        """Open the handles kept ready at startup."""
+
+    async def reap(self, now: Optional[float] = None) -> int:
+        """
+        Close handles idle for too long.
+
+        Args:
+            now: Current monotonic time
+
+        Returns:
+            The number of handles closed
+        """
+        return 0
+
+    async def close(self) -> None:
+        """Close the idle handles."""
+
+    @abstractmethod
+    def stats(self) -> Dict[str, Optional[int]]:
+        """
+        Get pool counters.
+
+        Returns:
+            Dictionary with size, in_use, idle, waiting, min_size, max_size,
+            created, closed, waits and timeouts
+        """
+
+
+class ResourcePool(ManagedResource):
+    """
+    Pool lending each handle to one call at a time.
+
+    Free handles are reused most recently released first, so the pool shrinks
+    back to its minimum size when load drops. Waiters are served in FIFO order.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        factory: Factory,
+        close: Optional[Closer] = None,
+        min_size: int = 0,
+        max_size: int = 10,
+        idle_timeout: float = 300.0,
+        acquire_timeout: float = 10.0,
+        discard_on: Tuple[Type[BaseException], ...] = (OSError,),
+    ):
+        """
+        Args:
+            name: Name tools use to request the pool
+            factory: Creates a connection
+            close: Closes a connection
+            min_size: Connections opened at startup and never reaped
+            max_size: Maximum connections open at once
+            idle_timeout: Seconds a free connection above min_size is kept open
+            acquire_timeout: Seconds to wait for a free connection
+            discard_on: Errors that close the connection they were raised with instead
+                of reusing it
+        """
+        if max_size < 1:
+            raise ValueError(f"Pool {name!r} needs a max_size of at least 1")
+        super().__init__(name, factory, close)
+        self.min_size = min(min_size, max_size)
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.acquire_timeout = acquire_timeout
+        self.discard_on = discard_on
+        self.opening = 0
+        self.waits = 0
+        self.timeouts = 0
+        # (connection, monotonic time it was released), least recently released first
+        self._idle: Deque[Tuple[Any, float]] = deque()
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    @property
+    def size(self) -> int:
+        """Connections open or being opened."""
+        return len(self._idle) + self.in_use + self.opening
+
+    def _is_broken(self, error: BaseException) -> bool:
+        return isinstance(error, self.discard_on)
+
+    async def _open_reserved(self) -> Any:
+        """Open a connection in a slot already counted in opening."""
+        try:
+            handle = await self._open()
+        except BaseException:
+            self.opening -= 1
+            self._wake_opener()
+            raise
+        self.opening -= 1
+        self.in_use += 1
+        return handle
+
+    def _wake_opener(self) -> None:
+        """Let the next waiter open a connection in a slot that just freed up."""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.opening += 1
+                waiter.set_result(_OPEN)
+                return
+
+    async def acquire(self) -> Any:
+        if self._idle and not self._waiters:
+            handle, _ = self._idle.pop()
+            self.in_use += 1
+            return handle
+        if self.size < self.max_size and not self._waiters:
+            self.opening += 1
+            return await self._open_reserved()
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self.waits += 1
+        try:
+            result = await asyncio.wait_for(waiter, self.acquire_timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.done() and not waiter.cancelled():
+                # A connection or slot was handed over just before the timeout
+                if waiter.result() is _OPEN:
+                    self.opening -= 1
+                    self._wake_opener()
+                else:
+                    await self.release(waiter.result())
+            elif waiter in self._waiters:
+                self._waiters.remove(waiter)
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            self.timeouts += 1
+            raise PoolTimeoutError(
+                f"No connection of pool {self.name!r} became free within "
+                f"{self.acquire_timeout}s"
+            ) from None
+
+        if result is _OPEN:
+            return await self._open_reserved()
+        return result
+
+    async def release(self, handle: Any, discard: bool = False) -> None:
+        self.in_use -= 1
+        if discard:
+            await self._close(handle)
+            self._wake_opener()
+            return
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.in_use += 1
+                waiter.set_result(handle)
+                return
+        self._idle.append((handle, time.monotonic()))
+
+    async def warm(self) -> None:
+        """
+        Open connections until the pool holds min_size.
+
+        Raises:
+            The first error raised by the factory, after keeping the connections that
+            opened
+        """
+        missing = self.min_size - self.size
+        if missing <= 0:
+            return
+        self.opening += missing
+        results = await asyncio.gather(
+            *(self._open() for _ in range(missing)), return_exceptions=True
+        )
+        self.opening -= missing
+        now = time.monotonic()
+        errors = [result for result in results if isinstance(result, BaseException)]
+        for result in results:
+            if isinstance(result, BaseException):
+                self._wake_opener()
+            else:
+                self._idle.appendleft((result, now))
+        if errors:
+            raise errors[0]
+
+    async def reap(self, now: Optional[float] = None) -> int:
+        now = time.monotonic() if now is None else now
+        reaped = 0
+        while (
+            self._idle
+            and self.size > self.min_size
+            and now - self._idle[0][1] > self.idle_timeout
+        ):
+            handle, _ = self._idle.popleft()
+            await self._close(handle)
+            reaped += 1
+        return reaped
+
+    async def close(self) -> None:
+        while self._idle:
+            handle, _ = self._idle.popleft()
+            await self._close(handle)
+
+    def stats(self) -> Dict[str, Optional[int]]:
+        return {
+            "size": self.size,
+            "in_use": self.in_use,
+            "idle": len(self._idle),
+            "waiting": len(self._waiters),
+            "min_size": self.min_size,
+            "max_size": self.max_size,
+            "created": self.created,
+            "closed": self.closed,
+            "waits": self.waits,
+            "timeouts": self.timeouts,
+        }
+
+
+class SharedResource(ManagedResource):
+    """
+    One handle shared by every call, for clients that are safe to use concurrently.
+    """
+
+    def __init__(self, name: str, factory: Factory, close: Optional[Closer] = None):
+        """
+        Args:
+            name: Name tools use to request the resource
+            factory: Creates the handle
+            close: Closes the handle
+        """
+        super().__init__(name, factory, close)
+        self._handle: Any = None
+        self._opening: Optional[asyncio.Future] = None
+
+    async def acquire(self) -> Any:
+        if self._handle is None:
+            # Concurrent first calls share one factory call
+            if self._opening is None or self._opening.done():
+                self._opening = asyncio.ensure_future(self._open())
+            handle = await asyncio.shield(self._opening)
+            if self._handle is None:
+                self._handle = handle
+        self.in_use += 1
+        return self._handle
+
+    async def release(self, handle: Any, discard: bool = False) -> None:
+        # A failed call does not make a shared client unusable
+        self.in_use -= 1
+
+    async def warm(self) -> None:
+        await self.release(await self.acquire())
+
+    async def close(self) -> None:
+        handle, self._handle = self._handle, None
+        if handle is not None:
+            await self._close(handle)
+
+    def stats(self) -> Dict[str, Optional[int]]:
+        size = 0 if self._handle is None else 1
+        return {
+            "size": size,
+            "in_use": self.in_use,
+            "idle": size if self.in_use == 0 else 0,
+            "waiting": 0,
+            "min_size": None,
+            "max_size": None,
+            "created": self.created,
+            "closed": self.closed,
+            "waits": 0,
+            "timeouts": 0,
+        }
+
+
+class PoolManager:
+    """
+    Named pools started and stopped with the server.
+    """
+
+    def __init__(self, pool_config: Optional[PoolConfig] = None):
+        """
+        Args:
+            pool_config: Pool defaults and reaping interval. Defaults to the application
+                configuration
+        """
+        self.config = pool_config or config.pools
+        self._resources: Dict[str, ManagedResource] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._resources
+
+    def add(self, resource: ManagedResource) -> ManagedResource:
+        """
+        Register a pool or shared resource.
+
+        Args:
+            resource: The resource
+
+        Returns:
+            The resource
+        """
+        if resource.name in self._resources:
+            raise ValueError(f"Pool {resource.name!r} is already registered")
+        self._resources[resource.name] = resource
+        return resource
+
+    def pool(
+        self,
+        name: str,
+        factory: Factory,
+        close: Optional[Closer] = None,
+        min_size: Optional[int] = None,
+        max_size: Optional[int] = None,
+        idle_timeout: Optional[float] = None,
+        acquire_timeout: Optional[float] = None,
+        discard_on: Tuple[Type[BaseException], ...] = (OSError,),
+    ) -> ResourcePool:
+        """
+        Register a pool of connections lent to one call at a time.
+
+        Sizes and timeouts not given default to the pool configuration, where
+        POOL_MAX_SIZES overrides the maximum size of a pool by name.
+
+        Args:
+            name: Name tools use to request the pool
+            factory: Creates a connection; sync factories run in a worker thread
+            close: Closes a connection
+            min_size: Connections opened at startup and never reaped
+            max_size: Maximum connections open at once
+            idle_timeout: Seconds a free connection above min_size is kept open
+            acquire_timeout: Seconds to wait for a free connection
+            discard_on: Errors that close the connection they were raised with
+
+        Returns:
+            ResourcePool: The registered pool
+        """
+        pool = ResourcePool(
+            name,
+            factory,
+            close=close,
+            min_size=self.config.min_size if min_size is None else min_size,
+            max_size=(
+                self.config.max_sizes.get(name, self.config.max_size)
+                if max_size is None
+                else max_size
+            ),
+            idle_timeout=(
+                self.config.idle_timeout if idle_timeout is None else idle_timeout
+            ),
+            acquire_timeout=(
+                self.config.acquire_timeout
+                if acquire_timeout is None
+                else acquire_timeout
+            ),
+            discard_on=discard_on,
+        )
+        self.add(pool)
+        return pool
+
+    def shared(
+        self, name: str, factory: Factory, close: Optional[Closer] = None
+    ) -> SharedResource:
+        """
+        Register a handle shared by every call.
+
+        Args:
+            name: Name tools use to request the handle
+            factory: Creates the handle
+            close: Closes the handle
+
+        Returns:
+            SharedResource: The registered resource
+        """
+        resource = SharedResource(name, factory, close=close)
+        self.add(resource)
+        return resource
+
+    def http_client(
+        self,
+        name: str = "http",
+        max_connections: Optional[int] = None,
+        **client_options: Any,
+    ) -> SharedResource:
+        """
+        Register a shared httpx.AsyncClient.
+
+        The client keeps its own connection pool, sized from the pool
+        configuration and closing keep-alive connections after the idle timeout.
+
+        Args:
+            name: Name tools use to request the client
+            max_connections: Maximum connections of the client. Defaults to the pool
+                size
+            **client_options: Further httpx.AsyncClient options, such as base_url or
+                timeout
+
+        Returns:
+            SharedResource: The registered client
+        """
+        max_connections = max_connections or self.config.max_sizes.get(
+            name, self.config.max_size
+        )
+
+        def create_client() -> Any:
+            import httpx
+
+            limits = httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+                keepalive_expiry=self.config.idle_timeout,
+            )
+            return httpx.AsyncClient(limits=limits, **client_options)
+
+        async def close_client(client: Any) -> None:
+            await client.aclose()
+
+        return self.shared(name, create_client, close=close_client)
+
+    def get(self, name: str) -> ManagedResource:
+        """
+        Get a registered pool or shared resource.
+
+        Args:
+            name: Name of the resource
+
+        Returns:
+            The resource
+        """
+        try:
+            return self._resources[name]
+        except KeyError:
+            raise LookupError(f"Unknown pool {name!r}") from None
+
+    def connection(self, name: str) -> "contextlib.AbstractAsyncContextManager[Any]":
+        """
+        Borrow a handle of a pool for the duration of a block.
+
+        Args:
+            name: Name of the pool
+
+        Returns:
+            An async context manager yielding the handle
+        """
+        self.ensure_running()
+        return self.get(name).connection()
+
+    def inject(
+        self, **resources: str
+    ) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+        """
+        Decorator passing pooled handles to a tool.
+
+        Each keyword maps a parameter of the tool to the name of a pool. The
+        parameters are removed from the tool's signature, so they are not part
+        of its schema, and a handle is borrowed for each call. Apply it below
+        the tool registration decorator and above offload.
+
+        Args:
+            **resources: Parameter name to pool name
+
+        Returns:
+            A decorator wrapping the function in a coroutine function
+        """
+
+        def decorator(fn: Callable[..., Any]) -> Callable[..., Any]:
+            signature = inspect.signature(fn)
+            missing = [
+                param for param in resources if param not in signature.parameters
+            ]
+            if missing:
+                raise ValueError(
+                    f"{fn.__qualname__} has no parameter {', '.join(missing)} to inject"
+                )
+
+            @functools.wraps(fn)
+            async def wrapper(*args: Any, **kwargs: Any) -> Any:
+                async with contextlib.AsyncExitStack() as stack:
+                    for param, pool_name in resources.items():
+                        kwargs[param] = await stack.enter_async_context(
+                            self.connection(pool_name)
+                        )
+                    result = fn(*args, **kwargs)
+                    if inspect.isawaitable(result):
+                        result = await result
+                    return result
+
+            wrapper.__signature__ = signature.replace(
+                parameters=[
+                    param
+                    for param in signature.parameters.values()
+                    if param.name not in resources
+                ]
+            )
+            wrapper.__annotations__ = {
+                name: annotation
+                for name, annotation in fn.__annotations__.items()
+                if name not in resources
+            }
+            return wrapper
+
+        return decorator
+
+    async def warm(self) -> None:
+        """
+        Open the connections every pool keeps ready.
+
+        Raises:
+            The first error raised while opening a connection
+        """
+        results = await asyncio.gather(
+            *(resource.warm() for resource in self._resources.values()),
+            return_exceptions=True,
+        )
+        errors = [result for result in results if isinstance(result, BaseException)]
+        if errors:
+            raise errors[0]
+
+    async def start(self) -> None:
+        """
+        Warm up the pools and start reaping idle connections. Warm-up failures are
+        logged.
+        """
+        started = time.perf_counter()
+        names = list(self._resources)
+        results = await asyncio.gather(
+            *(self._resources[name].warm() for name in names), return_exceptions=True
+        )
+        for name, result in zip(names, results):
+            if isinstance(result, BaseException):
+                logger.warning("Failed to warm up pool %s: %s", name, result)
+        if names:
+            logger.info(
+                "Warmed up %d pools in %.1f ms",
+                len(names),
+                (time.perf_counter() - started) * 1000,
+            )
+        self.ensure_running()
+
+    async def stop(self) -> None:
+        """Stop reaping and close the idle connections of every pool."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        for resource in self._resources.values():
+            await resource.close()
+
+    async def reap(self, now: Optional[float] = None) -> int:
+        """
+        Close the connections idle for longer than their pool's idle timeout.
+
+        Args:
+            now: Current monotonic time
+
+        Returns:
+            The number of connections closed
+        """
+        reaped = 0
+        for resource in list(self._resources.values()):
+            reaped += await resource.reap(now)
+        return reaped
+
+    async def run(self) -> None:
+        """Reap idle connections until cancelled."""
+        while True:
+            await asyncio.sleep(self.config.reap_interval)
+            try:
+                reaped = await self.reap()
+            except Exception:
+                logger.exception("Failed to reap idle pool connections")
+                continue
+            if reaped:
+                logger.debug("Closed %d idle pool connections", reaped)
+
+    def ensure_running(self) -> None:
+        """Start the reaper on the running event loop if it is not running."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self.run())
+
+    def stats(self) -> Dict[str, Dict[str, Optional[int]]]:
+        """
+        Get per-pool counters.
+
+        Returns:
+            Dictionary mapping pool names to their counters
+        """
+        return {name: resource.stats() for name, resource in self._resources.items()}
+
+    def collect_metrics(self, prefix: str = "mcp") -> Iterable[MetricFamily]:
+        """
+        Collect pool utilization for a MetricsRegistry.
+
+        Args:
+            prefix: Metric name prefix
+
+        Returns:
+            Metric families for pool size, usage, waits and timeouts
+        """
+        pools = sorted(self.stats().items())
+        families: List[MetricFamily] = [
+            (
+                f"{prefix}_pool_connections",
+                "gauge",
+                "Open pool connections.",
+                [({"pool": name}, stats["size"]) for name, stats in pools],
+            ),
+            (
+                f"{prefix}_pool_connections_in_use",
+                "gauge",
+                "Pool connections lent to tool calls.",
+                [({"pool": name}, stats["in_use"]) for name, stats in pools],
+            ),
+            (
+                f"{prefix}_pool_waiting",
+                "gauge",
+                "Tool calls waiting for a pool connection.",
+                [({"pool": name}, stats["waiting"]) for name, stats in pools],
+            ),
+            (
+                f"{prefix}_pool_utilization",
+                "gauge",
+                "Share of the pool's maximum size in use.",
+                [
+                    ({"pool": name}, stats["in_use"] / stats["max_size"])
+                    for name, stats in pools
+                    if stats["max_size"]
+                ],
+            ),
+            (
+                f"{prefix}_pool_connections_created_total",
+                "counter",
+                "Pool connections opened.",
+                [({"pool": name}, stats["created"]) for name, stats in pools],
+            ),
+            (
+                f"{prefix}_pool_acquire_timeouts_total",
+                "counter",
+                "Tool calls that found no free pool connection in time.",
+                [({"pool": name}, stats["timeouts"]) for name, stats in pools],
+            ),
+        ]
+        return families
+
+
+_manager: Optional[PoolManager] = None
+
+
+def get_pool_manager(pool_config: Optional[PoolConfig] = None) -> PoolManager:
+    """
+    Get the shared pool manager, creating it from the configuration on first use.
+
+    Args:
+        pool_config: Pool configuration. Defaults to the application config
+
+    Returns:
+        PoolManager: The shared manager
+    """
+    global _manager
+    if _manager is None:
+        _manager = PoolManager(pool_config)
+    return _manager
+
+
+def inject(**resources: str) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """
+    Pass handles of the shared manager's pools to a tool. See PoolManager.inject.
+
+    Args:
+        **resources: Parameter name to pool name
+
+    Returns:
+        A decorator wrapping the function
+    """
+    return get_pool_manager().inject(**resources)
@@ -0,0 +1,332 @@
+"""
+On-demand CPU and allocation profiling of a running server.
+
+A Profiler records one bounded window at a time. It runs two profilers:
+
+- A sampling CPU profiler. A background thread reads the stack of every
+  thread at a fixed interval. The stacks are reported in the collapsed
+  format read by flamegraph.pl, speedscope and similar tools:
+
+      MainThread;run (runners.py:160);_run_once (base_events.py:1910) 42
+
+- An allocation profiler. tracemalloc runs only for the window. The top
+  allocation sites are reported by memory growth.
+
+Threads that are waiting are left out of the CPU samples unless asked for.
+This covers an idle event loop and idle executor workers. What remains shows
+where the process spends its CPU.
+"""
+
+import logging
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+from src.mcp_server.config.config import ProfilingConfig, config
+
+logger = logging.getLogger(config.app_name)
+
+# Innermost Python frames of threads waiting for work, by (file name, function)
+_IDLE_LEAVES = {
+    ("selectors.py", "select"),
+    ("threading.py", "wait"),
+    ("queue.py", "get"),
+    ("thread.py", "_worker"),
+}
+
+# Allocations made by the profiler itself or by imports are not reported
+_MEMORY_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, __file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+)
+
+
+class ProfileInProgressError(RuntimeError):
+    """Raised when a profile is started while another one is running."""
+
+
+def _frame_label(code: Any) -> str:
+    """Label a frame in a collapsed stack as "function (file:first line)"."""
+    return (
+        f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+    )
+
+
+def collapse_stacks(stacks: Counter) -> str:
+    """
+    Format sampled stacks in the collapsed format of flame graph tools.
+
+    Args:
+        stacks: Sample counts, by stack of frame labels from the outermost frame
+
+    Returns:
+        One "frame;frame;frame count" line per stack, most sampled first
+    """
+    return "".join(
+        f"{';'.join(stack)} {count}\n" for stack, count in stacks.most_common()
+    )
+
+
+class Profiler:
+    """
+    Record CPU samples and allocations of the process for a bounded window.
+    """
+
+    def __init__(
+        self,
+        max_duration: float = 60.0,
+        sample_interval: float = 0.005,
+        memory_frames: int = 16,
+        top_allocators: int = 25,
+    ):
+        """
+        Args:
+            max_duration: Longest window, in seconds
+            sample_interval: Seconds between CPU stack samples
+            memory_frames: Stack frames tracemalloc keeps per allocation
+            top_allocators: Allocation sites reported
+        """
+        self.max_duration = max_duration
+        self.sample_interval = sample_interval
+        self.memory_frames = memory_frames
+        self.top_allocators = top_allocators
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._options: Dict[str, Any] = {}
+        self._stacks: Counter = Counter()
+        self._samples = 0
+        self._started_at = 0.0
+        self._started = 0.0
+        self._deadline = 0.0
+        self._baseline: Optional[tracemalloc.Snapshot] = None
+        self._owns_tracemalloc = False
+        self._result: Optional[Dict[str, Any]] = None
+
+    @classmethod
+    def from_config(cls, profiling_config: ProfilingConfig) -> "Profiler":
+        """
+        Create a profiler from configuration.
+
+        Args:
+            profiling_config: Profiling configuration
+
+        Returns:
+            Profiler: The configured profiler
+        """
+        return cls(
+            max_duration=profiling_config.max_duration,
+            sample_interval=profiling_config.sample_interval,
+            memory_frames=profiling_config.memory_frames,
+            top_allocators=profiling_config.top_allocators,
+        )
+
+    @property
+    def running(self) -> bool:
+        """Whether a profile is being recorded."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(
+        self,
+        duration: float,
+        cpu: bool = True,
+        memory: bool = True,
+        include_idle: bool = False,
+    ) -> Dict[str, Any]:
+        """
+        Start recording a profile in the background.
+
+        The profile stops by itself after the duration, or earlier on stop().
+
+        Args:
+            duration: Length of the window, in seconds, up to max_duration
+            cpu: Sample the stacks of all threads
+            memory: Trace allocations with tracemalloc
+            include_idle: Keep samples of threads waiting for work
+
+        Returns:
+            The status of the new profile
+        """
+        if not 0 < duration <= self.max_duration:
+            raise ValueError(
+                f"Profile duration must be between 0 and {self.max_duration:g} seconds"
+            )
+        if not cpu and not memory:
+            raise ValueError("Enable the CPU profiler, the allocation profiler or both")
+        with self._lock:
+            if self.running:
+                raise ProfileInProgressError("A profile is already running")
+            self._options = {"cpu": cpu, "memory": memory, "include_idle": include_idle}
+            self._stacks = Counter()
+            self._samples = 0
+            self._baseline = None
+            self._owns_tracemalloc = False
+            if memory:
+                if not tracemalloc.is_tracing():
+                    tracemalloc.start(self.memory_frames)
+                    self._owns_tracemalloc = True
+                self._baseline = tracemalloc.take_snapshot().filter_traces(
+                    _MEMORY_FILTERS
+                )
+            self._started_at = time.time()
+            self._started = time.perf_counter()
+            self._deadline = self._started + duration
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run, name="profiler", daemon=True
+            )
+            self._thread.start()
+        logger.info(
+            "Profiling started for %.1fs (cpu=%s, memory=%s)", duration, cpu, memory
+        )
+        return self.status()
+
+    def stop(self) -> Optional[Dict[str, Any]]:
+        """
+        Stop the running profile, if any, and get the latest result.
+
+        Blocks until the result is built; call it from a worker thread in async code.
+
+        Returns:
+            The result of the latest profile, or None if none was recorded
+        """
+        thread = self._thread
+        if thread is not None:
+            self._stop.set()
+            thread.join()
+        return self._result
+
+    @property
+    def result(self) -> Optional[Dict[str, Any]]:
+        """Result of the latest finished profile."""
+        return self._result
+
+    def status(self) -> Dict[str, Any]:
+        """
+        Describe the running or latest profile.
+
+        Returns:
+            Whether a profile is running, its options and its progress
+        """
+        running = self.running
+        status: Dict[str, Any] = {"running": running, "max_duration": self.max_duration}
+        if running:
+            status.update(
+                self._options,
+                started_at=self._started_at,
+                remaining_seconds=round(
+                    max(0.0, self._deadline - time.perf_counter()), 3
+                ),
+                samples=self._samples,
+            )
+        return status
+
+    def _run(self) -> None:
+        """Sample until the deadline or stop(), then build the result."""
+        try:
+            if self._options["cpu"]:
+                include_idle = self._options["include_idle"]
+                while time.perf_counter() < self._deadline and not self._stop.wait(
+                    self.sample_interval
+                ):
+                    self._sample(include_idle)
+            else:
+                self._stop.wait(max(0.0, self._deadline - time.perf_counter()))
+            self._result = self._finish()
+        except Exception:
+            logger.exception("Profiling failed")
+            self._result = {"error": "Profiling failed, see the server log"}
+        finally:
+            if self._owns_tracemalloc:
+                tracemalloc.stop()
+            self._baseline = None
+        logger.info("Profiling finished")
+
+    def _sample(self, include_idle: bool) -> None:
+        """Count the current stack of every other thread."""
+        own = threading.get_ident()
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own:
+                continue
+            code = frame.f_code
+            if (
+                not include_idle
+                and (os.path.basename(code.co_filename), code.co_name) in _IDLE_LEAVES
+            ):
+                continue
+            stack: List[str] = []
+            while frame is not None:
+                stack.append(_frame_label(frame.f_code))
+                frame = frame.f_back
+            stack.append(names.get(thread_id, f"thread-{thread_id}"))
+            stack.reverse()
+            self._stacks[tuple(stack)] += 1
+        self._samples += 1
+
+    def _finish(self) -> Dict[str, Any]:
+        """Build the result of the window that just ended."""
+        result: Dict[str, Any] = {
+            "started_at": self._started_at,
+            "duration_seconds": round(time.perf_counter() - self._started, 3),
+        }
+        if self._options["cpu"]:
+            result["cpu"] = {
+                "sample_interval": self.sample_interval,
+                "samples": self._samples,
+                "collapsed": collapse_stacks(self._stacks),
+            }
+        if self._options["memory"]:
+            result["memory"] = self._allocations()
+        return result
+
+    def _allocations(self) -> Dict[str, Any]:
+        """Compare the allocations now with those at the start of the window."""
+        snapshot = tracemalloc.take_snapshot().filter_traces(_MEMORY_FILTERS)
+        current, peak = tracemalloc.get_traced_memory()
+        stats = snapshot.compare_to(self._baseline, "lineno")
+        return {
+            "traced_bytes": current,
+            "peak_bytes": peak,
+            "top_allocators": [
+                _allocation_site(stat) for stat in stats[: self.top_allocators]
+            ],
+        }
+
+
+def _allocation_site(stat: tracemalloc.StatisticDiff) -> Dict[str, Any]:
+    """Describe the allocations of one source line."""
+    frame = stat.traceback[0]
+    return {
+        "file": frame.filename,
+        "line": frame.lineno,
+        "size_bytes": stat.size,
+        "size_diff_bytes": stat.size_diff,
+        "count": stat.count,
+        "count_diff": stat.count_diff,
+    }
+
+
+_profiler: Optional[Profiler] = None
+
+
+def get_profiler(profiling_config: Optional[ProfilingConfig] = None) -> Profiler:
+    """
+    Get the shared profiler, creating it from the configuration on first use.
+
+    Args:
+        profiling_config: Profiling configuration. Defaults to the application config
+
+    Returns:
+        Profiler: The shared profiler
+    """
+    global _profiler
+    if _profiler is None:
+        _profiler = Profiler.from_config(profiling_config or config.profiling)
+    return _profiler
@@ -0,0 +1,287 @@
+"""
+Replay of recorded tool calls for regression benchmarking.
+
+A recording written by CallRecorder is re-driven against a server with the
+pacing it was recorded with, or faster, and the latencies are compared with
+the recorded ones per tool. Each recorded client gets its own MCP session,
+up to a bound, so session-scoped state is exercised as it was in production.
+
+Recorded latencies were measured inside the server and replayed latencies
+are measured by the client, so replayed ones include the HTTP round trip.
+Compare two replays of the same recording to compare builds.
+"""
+
+import asyncio
+import time
+from collections import defaultdict
+from contextlib import AsyncExitStack
+from typing import Dict, List, Optional
+
+from fastmcp import Client, FastMCP
+from fastmcp.client.transports import StreamableHttpTransport
+from pydantic import BaseModel, Field
+
+from src.mcp_server.middleware.metrics import content_size
+from src.mcp_server.middleware.recording import RecordedCall, read_recording
+from src.mcp_server.utils.benchmark import (
+    InProcessServer,
+    LatencySummary,
+    application_server,
+    summarize_latencies,
+)
+
+
+class ToolReplayResult(BaseModel):
+    """Replayed and recorded latencies of one tool."""
+
+    tool: str = Field(description="Name of the tool")
+    calls: int = Field(description="Number of replayed calls")
+    errors: int = Field(default=0, description="Replayed calls that failed")
+    recorded_errors: int = Field(
+        default=0, description="Calls that failed when they were recorded"
+    )
+    size_mismatches: int = Field(
+        default=0,
+        description="Successful calls whose result size differs from the recording",
+    )
+    recorded_ms: LatencySummary = Field(
+        description="Latency distribution in the recording, measured in the server"
+    )
+    replayed_ms: LatencySummary = Field(
+        description="Latency distribution of the replay, measured by the client"
+    )
+    p50_ratio: float = Field(
+        default=0.0, description="Replayed median latency over the recorded one"
+    )
+    p95_ratio: float = Field(
+        default=0.0,
+        description="Replayed 95th percentile latency over the recorded one",
+    )
+    p99_ratio: float = Field(
+        default=0.0,
+        description="Replayed 99th percentile latency over the recorded one",
+    )
+
+
+class ReplayReport(BaseModel):
+    """Full report of a replay."""
+
+    url: str = Field(description="Endpoint the recording was replayed against")
+    recording: Optional[str] = Field(
+        default=None, description="File the calls were read from"
+    )
+    speed: float = Field(description="Replay speed relative to the recording")
+    calls: int = Field(description="Number of replayed calls")
+    skipped_lines: int = Field(
+        default=0, description="Lines of the recording that could not be read"
+    )
+    sessions: int = Field(
+        description="Number of client sessions the calls were spread over"
+    )
+    recorded_duration_seconds: float = Field(
+        description="Time between the first and last recorded call"
+    )
+    duration_seconds: float = Field(description="Wall-clock time of the replay")
+    max_lag_ms: float = Field(
+        default=0.0, description="Longest a call was sent after its scheduled time"
+    )
+    results: List[ToolReplayResult] = Field(default_factory=list)
+
+
+def _ratio(replayed: float, recorded: float) -> float:
+    return round(replayed / recorded, 3) if recorded else 0.0
+
+
+def compare_tool(
+    tool: str,
+    recorded: List[RecordedCall],
+    latencies: List[float],
+    errors: int,
+    size_mismatches: int,
+) -> ToolReplayResult:
+    """
+    Compare the replayed calls of a tool with the recorded ones.
+
+    Args:
+        tool: Name of the tool
+        recorded: Recorded calls of the tool
+        latencies: Replayed latencies, in seconds
+        errors: Replayed calls that failed
+        size_mismatches: Successful calls whose result size differs from the recording
+
+    Returns:
+        ToolReplayResult: Both latency distributions and their ratios
+    """
+    recorded_ms = summarize_latencies([call.duration_ms / 1000 for call in recorded])
+    replayed_ms = summarize_latencies(latencies)
+    return ToolReplayResult(
+        tool=tool,
+        calls=len(latencies),
+        errors=errors,
+        recorded_errors=sum(1 for call in recorded if call.error is not None),
+        size_mismatches=size_mismatches,
+        recorded_ms=recorded_ms,
+        replayed_ms=replayed_ms,
+        p50_ratio=_ratio(replayed_ms.p50, recorded_ms.p50),
+        p95_ratio=_ratio(replayed_ms.p95, recorded_ms.p95),
+        p99_ratio=_ratio(replayed_ms.p99, recorded_ms.p99),
+    )
+
+
+async def replay_calls(
+    url: str,
+    calls: List[RecordedCall],
+    speed: float = 1.0,
+    max_sessions: int = 100,
+    headers: Optional[Dict[str, str]] = None,
+) -> ReplayReport:
+    """
+    Replay recorded calls against a running server.
+
+    Args:
+        url: Streamable-HTTP endpoint of the server
+        calls: Recorded calls, in the order they started
+        speed: Replay speed: 1 keeps the recorded pacing, 10 is ten times faster
+        max_sessions: Most client sessions opened; further clients share them
+        headers: HTTP headers sent with every request, such as an API key
+
+    Returns:
+        ReplayReport: Replayed and recorded latencies of every tool
+    """
+    # Recorded clients in order of appearance, mapped onto the sessions
+    session_of: Dict[Optional[str], int] = {}
+    for call in calls:
+        if call.client not in session_of:
+            session_of[call.client] = len(session_of) % max_sessions
+    sessions = min(len(session_of), max_sessions)
+
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    errors: Dict[str, int] = defaultdict(int)
+    size_mismatches: Dict[str, int] = defaultdict(int)
+
+    async def send(call: RecordedCall, client: Client) -> None:
+        started = time.perf_counter()
+        try:
+            result = await client.call_tool_mcp(call.tool, call.arguments)
+        except Exception:
+            result = None
+        latencies[call.tool].append(time.perf_counter() - started)
+        if result is None or result.isError:
+            errors[call.tool] += 1
+        elif call.error is None and content_size(result.content) != call.result_bytes:
+            size_mismatches[call.tool] += 1
+
+    async with AsyncExitStack() as stack:
+        # Sessions are opened before the clock starts, as the recorded ones already were
+        clients = [
+            await stack.enter_async_context(
+                Client(StreamableHttpTransport(url, headers=headers))
+            )
+            for _ in range(sessions)
+        ]
+
+        origin = calls[0].started_at if calls else 0.0
+        max_lag = 0.0
+        tasks = []
+        started = time.perf_counter()
+        for call in calls:
+            due = (call.started_at - origin) / speed
+            delay = due - (time.perf_counter() - started)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            max_lag = max(max_lag, time.perf_counter() - started - due)
+            tasks.append(
+                asyncio.create_task(send(call, clients[session_of[call.client]]))
+            )
+        await asyncio.gather(*tasks)
+        duration = time.perf_counter() - started
+
+    recorded: Dict[str, List[RecordedCall]] = defaultdict(list)
+    for call in calls:
+        recorded[call.tool].append(call)
+    return ReplayReport(
+        url=url,
+        speed=speed,
+        calls=len(calls),
+        sessions=sessions,
+        recorded_duration_seconds=(
+            round(calls[-1].started_at - origin, 6) if calls else 0.0
+        ),
+        duration_seconds=round(duration, 6),
+        max_lag_ms=round(max_lag * 1000, 3),
+        results=[
+            compare_tool(
+                tool,
+                recorded[tool],
+                latencies[tool],
+                errors[tool],
+                size_mismatches[tool],
+            )
+            for tool in sorted(recorded)
+        ],
+    )
+
+
+def run_replay(
+    path: str,
+    url: Optional[str] = None,
+    speed: float = 1.0,
+    max_sessions: int = 100,
+    tools: Optional[List[str]] = None,
+    headers: Optional[Dict[str, str]] = None,
+    mcp_instance: Optional[FastMCP] = None,
+) -> ReplayReport:
+    """
+    Replay a recording against a server, booting one in-process if no URL is given.
+
+    Args:
+        path: Recording written by CallRecorder
+        url: Streamable-HTTP endpoint of a running server
+        speed: Replay speed: 1 keeps the recorded pacing, 10 is ten times faster
+        max_sessions: Most client sessions opened; further clients share them
+        tools: Only replay the calls of these tools
+        headers: HTTP headers sent with every request, such as an API key
+        mcp_instance: Server booted in-process, without HTTP middleware, when no URL is
+            given.
+            Defaults to the application server with its production middleware
+
+    Returns:
+        ReplayReport: Replayed and recorded latencies of every tool
+
+    Raises:
+        ValueError: The speed is not positive or the recording has no calls to replay
+        OSError: The recording cannot be read
+    """
+    if speed <= 0:
+        raise ValueError("Replay speed must be positive")
+    calls, skipped = read_recording(path)
+    if tools:
+        calls = [call for call in calls if call.tool in tools]
+    if not calls:
+        raise ValueError(f"No tool calls to replay in {path}")
+
+    if url is not None:
+        report = asyncio.run(
+            replay_calls(
+                url, calls, speed=speed, max_sessions=max_sessions, headers=headers
+            )
+        )
+    else:
+        server = (
+            InProcessServer(mcp_instance)
+            if mcp_instance is not None
+            else application_server()
+        )
+        with server:
+            report = asyncio.run(
+                replay_calls(
+                    server.url,
+                    calls,
+                    speed=speed,
+                    max_sessions=max_sessions,
+                    headers=headers,
+                )
+            )
+    report.recording = path
+    report.skipped_lines = skipped
+    return report
@@ -0,0 +1,338 @@
+"""
+Resource usage monitoring.
+
+ResourceMonitor samples the process in the background: resident memory, CPU
+usage, open file descriptors, event-loop lag and the number of tool calls in
+flight. Readings are logged periodically, served by the "Get Resource Usage"
+tool and exported as metrics. When a reading exceeds its limit in the
+resource configuration the monitor reports the server as overloaded, and
+LoadSheddingMiddleware turns new tool calls away until it recovers.
+
+Memory and file descriptors are read from /proc where available; elsewhere
+memory falls back to the peak resident size and descriptors are not reported.
+"""
+
+import asyncio
+import logging
+import os
+import resource
+import sys
+import time
+from typing import Iterable, List, Optional
+
+from pydantic import BaseModel, Field
+
+from src.mcp_server.config.config import ResourceConfig, config
+from src.mcp_server.middleware.tool_calls import Content, ToolCall, ToolCallHandler
+from src.mcp_server.utils.metrics import MetricFamily
+
+logger = logging.getLogger(config.app_name)
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def read_rss_bytes() -> int:
+    """
+    Get the resident memory of the process.
+
+    Returns:
+        Resident set size in bytes, or the peak size where the current one is
+        unavailable
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, IndexError, ValueError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+def count_open_fds() -> Optional[int]:
+    """
+    Count the open file descriptors of the process.
+
+    Returns:
+        The number of descriptors, or None where they cannot be listed
+    """
+    for path in ("/proc/self/fd", "/dev/fd"):
+        try:
+            return len(os.listdir(path))
+        except OSError:
+            continue
+    return None
+
+
+class ResourceSnapshot(BaseModel):
+    """Resource usage at one point in time."""
+
+    timestamp: float = Field(description="Unix time of the sample")
+    rss_bytes: int = Field(description="Resident memory")
+    cpu_percent: float = Field(
+        description="Process CPU usage since the previous sample, 100 per busy core"
+    )
+    open_fds: Optional[int] = Field(default=None, description="Open file descriptors")
+    event_loop_lag_ms: Optional[float] = Field(
+        default=None, description="Delay of the sampler's wake-up on the event loop"
+    )
+    in_flight_calls: int = Field(description="Tool calls running")
+    overloaded: List[str] = Field(
+        default_factory=list, description="Limits exceeded at the time of the sample"
+    )
+
+
+class ResourceMonitor:
+    """
+    Background sampler of process resource usage.
+    """
+
+    def __init__(self, resource_config: Optional[ResourceConfig] = None):
+        """
+        Args:
+            resource_config: Sampling intervals and limits. Defaults to the application
+                configuration
+        """
+        self.config = resource_config or config.resources
+        self.in_flight = 0
+        self.shed = 0
+        self.snapshot: Optional[ResourceSnapshot] = None
+        self._cpu_mark = (time.monotonic(), time.process_time())
+        self._task: Optional[asyncio.Task] = None
+        self._logged_at = 0.0
+
+    def configure(self, resource_config: ResourceConfig) -> None:
+        """
+        Apply new limits and intervals from the next sample on.
+
+        Args:
+            resource_config: The new resource configuration
+        """
+        self.config = resource_config
+
+    async def count_call(self, call: ToolCall, call_next: ToolCallHandler) -> Content:
+        """Tool-call middleware counting the calls in flight."""
+        self.in_flight += 1
+        try:
+            return await call_next(call)
+        finally:
+            self.in_flight -= 1
+
+    def _exceeded(self, snapshot: ResourceSnapshot) -> List[str]:
+        """List the limits a snapshot exceeds."""
+        limits = self.config
+        exceeded = []
+        if limits.max_rss_mb and snapshot.rss_bytes > limits.max_rss_mb * 1024 * 1024:
+            exceeded.append(
+                f"memory {snapshot.rss_bytes / 1048576:.0f} MiB > "
+                f"{limits.max_rss_mb:g} MiB"
+            )
+        if limits.max_cpu_percent and snapshot.cpu_percent > limits.max_cpu_percent:
+            exceeded.append(
+                f"cpu {snapshot.cpu_percent:.0f}% > {limits.max_cpu_percent:g}%"
+            )
+        if (
+            limits.max_open_fds
+            and snapshot.open_fds is not None
+            and snapshot.open_fds > limits.max_open_fds
+        ):
+            exceeded.append(f"open files {snapshot.open_fds} > {limits.max_open_fds}")
+        if (
+            limits.max_event_loop_lag_ms
+            and snapshot.event_loop_lag_ms is not None
+            and snapshot.event_loop_lag_ms > limits.max_event_loop_lag_ms
+        ):
+            exceeded.append(
+                f"event loop lag {snapshot.event_loop_lag_ms:.0f} ms > "
+                f"{limits.max_event_loop_lag_ms:g} ms"
+            )
+        return exceeded
+
+    def sample(self, event_loop_lag_ms: Optional[float] = None) -> ResourceSnapshot:
+        """
+        Take a sample and make it the current snapshot.
+
+        Args:
+            event_loop_lag_ms: Lag measured by the caller, if it measured any
+
+        Returns:
+            ResourceSnapshot: The new snapshot
+        """
+        now, cpu = time.monotonic(), time.process_time()
+        wall = now - self._cpu_mark[0]
+        cpu_percent = (cpu - self._cpu_mark[1]) / wall * 100 if wall > 0 else 0.0
+        self._cpu_mark = (now, cpu)
+
+        snapshot = ResourceSnapshot(
+            timestamp=time.time(),
+            rss_bytes=read_rss_bytes(),
+            cpu_percent=round(cpu_percent, 1),
+            open_fds=count_open_fds(),
+            event_loop_lag_ms=(
+                round(event_loop_lag_ms, 3) if event_loop_lag_ms is not None else None
+            ),
+            in_flight_calls=self.in_flight,
+        )
+        snapshot.overloaded = self._exceeded(snapshot)
+
+        previous = self.snapshot
+        self.snapshot = snapshot
+        if snapshot.overloaded and not (previous and previous.overloaded):
+            logger.warning(
+                "Server overloaded, shedding tool calls: %s",
+                "; ".join(snapshot.overloaded),
+            )
+        elif previous and previous.overloaded and not snapshot.overloaded:
+            logger.info("Server recovered from overload")
+        return snapshot
+
+    def current(self) -> ResourceSnapshot:
+        """
+        Get the latest snapshot, sampling now if none is recent.
+
+        Returns:
+            ResourceSnapshot: The snapshot, with the live number of calls in flight
+        """
+        snapshot = self.snapshot
+        if (
+            snapshot is None
+            or time.time() - snapshot.timestamp > 2 * self.config.sample_interval
+        ):
+            snapshot = self.sample(snapshot.event_loop_lag_ms if snapshot else None)
+        return snapshot.model_copy(update={"in_flight_calls": self.in_flight})
+
+    def overload_reason(self) -> Optional[str]:
+        """
+        Check whether new tool calls should be shed.
+
+        Returns:
+            The exceeded limits, or None if the server accepts calls
+        """
+        limit = self.config.max_in_flight_calls
+        if limit and self.in_flight >= limit:
+            return f"{self.in_flight} tool calls in flight, limit {limit}"
+        if self.snapshot is not None and self.snapshot.overloaded:
+            return "; ".join(self.snapshot.overloaded)
+        return None
+
+    async def run(self) -> None:
+        """
+        Sample until cancelled, measuring event-loop lag as the sampler's wake-up delay.
+        """
+        interval = self.config.sample_interval
+        while True:
+            started = time.monotonic()
+            await asyncio.sleep(interval)
+            lag_ms = max(0.0, (time.monotonic() - started - interval) * 1000)
+            snapshot = self.sample(lag_ms)
+
+            if (
+                self.config.log_interval
+                and snapshot.timestamp - self._logged_at >= self.config.log_interval
+            ):
+                self._logged_at = snapshot.timestamp
+                logger.info(
+                    "Resource usage: rss=%.1fMiB cpu=%.1f%% fds=%s loop_lag=%.1fms "
+                    "in_flight=%d shed=%d",
+                    snapshot.rss_bytes / 1048576,
+                    snapshot.cpu_percent,
+                    snapshot.open_fds,
+                    lag_ms,
+                    snapshot.in_flight_calls,
+                    self.shed,
+                )
+
+    async def start(self) -> None:
+        """
+        Start the sampler on the running event loop if it is not running.
+
+        Registered as an application startup hook, so the sampler runs on the loop
+        serving requests.
+        """
+        if not self.config.enabled:
+            return
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self.run())
+
+    async def stop(self) -> None:
+        """Stop the sampler."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def collect_metrics(self, prefix: str = "mcp") -> Iterable[MetricFamily]:
+        """
+        Collect the latest readings for a MetricsRegistry.
+
+        Args:
+            prefix: Metric name prefix
+
+        Returns:
+            Metric families for every reading and the shed calls
+        """
+        snapshot = self.current()
+        families: List[MetricFamily] = [
+            (
+                f"{prefix}_process_resident_memory_bytes",
+                "gauge",
+                "Resident memory of the process.",
+                [({}, snapshot.rss_bytes)],
+            ),
+            (
+                f"{prefix}_process_cpu_percent",
+                "gauge",
+                "Process CPU usage, 100 per busy core.",
+                [({}, snapshot.cpu_percent)],
+            ),
+            (
+                f"{prefix}_tool_calls_shed_total",
+                "counter",
+                "Tool calls rejected because the server was overloaded.",
+                [({}, self.shed)],
+            ),
+            (
+                f"{prefix}_overloaded",
+                "gauge",
+                "Whether new tool calls are being shed.",
+                [({}, 1 if self.overload_reason() else 0)],
+            ),
+        ]
+        if snapshot.open_fds is not None:
+            families.append(
+                (
+                    f"{prefix}_process_open_fds",
+                    "gauge",
+                    "Open file descriptors.",
+                    [({}, snapshot.open_fds)],
+                )
+            )
+        if snapshot.event_loop_lag_ms is not None:
+            families.append(
+                (
+                    f"{prefix}_event_loop_lag_seconds",
+                    "gauge",
+                    "Delay of the resource sampler's wake-up.",
+                    [({}, snapshot.event_loop_lag_ms / 1000)],
+                )
+            )
+        return families
+
+
+_monitor: Optional[ResourceMonitor] = None
+
+
+def get_resource_monitor(
+    resource_config: Optional[ResourceConfig] = None,
+) -> ResourceMonitor:
+    """
+    Get the shared resource monitor, creating it from the configuration on first use.
+
+    Args:
+        resource_config: Resource configuration. Defaults to the application config
+
+    Returns:
+        ResourceMonitor: The shared monitor
+    """
+    global _monitor
+    if _monitor is None:
+        _monitor = ResourceMonitor(resource_config)
+    return _monitor
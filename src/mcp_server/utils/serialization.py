@@ -0,0 +1,280 @@
+"""
+JSON serialization backends.
+
+The server encodes and decodes JSON in the HTTP middleware, the batch
+endpoint, the result cache and when turning tool results into text. All of
+these go through dumps and loads here, which use the fastest available
+backend: orjson, then msgspec, then the standard library. A backend can also
+be chosen with the JSON_BACKEND setting.
+
+Values the backend cannot encode natively, such as Pydantic models, are
+converted with pydantic_core first, and anything else falls back to str().
+"""
+
+import json
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, List, Optional, Union
+
+import pydantic_core
+
+from src.mcp_server.config.config import SerializationConfig, config
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:  # pragma: no cover - depends on the environment
+    msgspec = None
+
+
+def _to_jsonable(obj: Any) -> Any:
+    """Convert a value the backend cannot encode into plain JSON types."""
+    return pydantic_core.to_jsonable_python(obj, fallback=str)
+
+
+class JSONBackend(ABC):
+    """
+    A JSON encoder and decoder.
+    """
+
+    name = ""
+
+    @abstractmethod
+    def dumps(self, obj: Any, sort_keys: bool = False) -> bytes:
+        """
+        Encode a value as compact JSON.
+
+        Args:
+            obj: The value to encode
+            sort_keys: Sort object keys, for stable output
+
+        Returns:
+            The UTF-8 encoded JSON
+        """
+
+    @abstractmethod
+    def loads(self, data: Union[bytes, str]) -> Any:
+        """
+        Decode JSON.
+
+        Args:
+            data: The JSON document
+
+        Returns:
+            The decoded value
+
+        Raises:
+            ValueError: If the document is not valid JSON
+        """
+
+
+class StdlibBackend(JSONBackend):
+    """Backend using the json module."""
+
+    name = "stdlib"
+
+    def dumps(self, obj: Any, sort_keys: bool = False) -> bytes:
+        try:
+            text = json.dumps(
+                obj,
+                default=_to_jsonable,
+                ensure_ascii=False,
+                separators=(",", ":"),
+                sort_keys=sort_keys,
+            )
+        except TypeError:
+            if not sort_keys:
+                raise
+            # Keys of mixed types cannot be sorted until they are strings
+            return self.dumps(json.loads(self.dumps(obj)), sort_keys=True)
+        return text.encode()
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        return json.loads(data)
+
+
+class PydanticBackend(JSONBackend):
+    """Backend using pydantic_core, the path FastMCP uses by default."""
+
+    name = "pydantic"
+
+    def dumps(self, obj: Any, sort_keys: bool = False) -> bytes:
+        if sort_keys:
+            obj = json.loads(pydantic_core.to_json(obj, fallback=str))
+            return json.dumps(
+                obj, ensure_ascii=False, separators=(",", ":"), sort_keys=True
+            ).encode()
+        return pydantic_core.to_json(obj, fallback=str)
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        return pydantic_core.from_json(data)
+
+
+class OrjsonBackend(JSONBackend):
+    """Backend using orjson."""
+
+    name = "orjson"
+
+    def dumps(self, obj: Any, sort_keys: bool = False) -> bytes:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_SORT_KEYS if sort_keys else 0)
+        return orjson.dumps(obj, default=_to_jsonable, option=option)
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        return orjson.loads(data)
+
+
+class MsgspecBackend(JSONBackend):
+    """Backend using msgspec."""
+
+    name = "msgspec"
+
+    def __init__(self):
+        self._encoder = msgspec.json.Encoder(enc_hook=_to_jsonable)
+        self._sorted_encoder = msgspec.json.Encoder(
+            enc_hook=_to_jsonable, order="sorted"
+        )
+        self._decoder = msgspec.json.Decoder()
+
+    def dumps(self, obj: Any, sort_keys: bool = False) -> bytes:
+        if not sort_keys:
+            return self._encoder.encode(obj)
+        try:
+            return self._sorted_encoder.encode(obj)
+        except TypeError:
+            # msgspec only sorts objects with string keys: stringify them first
+            return self._sorted_encoder.encode(
+                self._decoder.decode(self._encoder.encode(obj))
+            )
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        try:
+            return self._decoder.decode(data)
+        except msgspec.DecodeError as e:
+            raise ValueError(str(e)) from e
+
+
+# Backend factories by name
+BACKENDS: Dict[str, Callable[[], JSONBackend]] = {
+    "orjson": OrjsonBackend,
+    "msgspec": MsgspecBackend,
+    "stdlib": StdlibBackend,
+    "pydantic": PydanticBackend,
+}
+
+# Backends tried in order when the backend is "auto"
+AUTO_ORDER = ("orjson", "msgspec", "stdlib")
+
+
+def available_backends() -> List[str]:
+    """
+    Get the backends that can be used in this environment.
+
+    Returns:
+        The backend names
+    """
+    missing = {"orjson": orjson is None, "msgspec": msgspec is None}
+    return [name for name in BACKENDS if not missing.get(name, False)]
+
+
+def create_backend(name: str = "auto") -> JSONBackend:
+    """
+    Create a JSON backend.
+
+    Args:
+        name: Backend name, or "auto" for the fastest available one
+
+    Returns:
+        JSONBackend: The backend
+
+    Raises:
+        ValueError: If the backend is unknown or its package is not installed
+    """
+    available = available_backends()
+    if name == "auto":
+        name = next(candidate for candidate in AUTO_ORDER if candidate in available)
+    if name not in BACKENDS:
+        raise ValueError(
+            f"Unknown JSON backend {name!r}, expected one of {', '.join(BACKENDS)}"
+        )
+    if name not in available:
+        raise ValueError(f"JSON backend {name!r} is not installed")
+    return BACKENDS[name]()
+
+
+_backend: Optional[JSONBackend] = None
+
+
+def get_backend() -> JSONBackend:
+    """
+    Get the JSON backend selected by the application configuration.
+
+    Returns:
+        JSONBackend: The shared backend
+    """
+    global _backend
+    if _backend is None:
+        _backend = create_backend(config.serialization.backend)
+    return _backend
+
+
+def set_backend(serialization_config: SerializationConfig) -> JSONBackend:
+    """
+    Replace the shared JSON backend.
+
+    Args:
+        serialization_config: Serialization configuration
+
+    Returns:
+        JSONBackend: The new backend
+    """
+    global _backend
+    _backend = create_backend(serialization_config.backend)
+    return _backend
+
+
+def dumps(obj: Any, sort_keys: bool = False) -> bytes:
+    """
+    Encode a value as compact JSON with the shared backend.
+
+    Args:
+        obj: The value to encode
+        sort_keys: Sort object keys, for stable output
+
+    Returns:
+        The UTF-8 encoded JSON
+    """
+    return get_backend().dumps(obj, sort_keys=sort_keys)
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    """
+    Decode JSON with the shared backend.
+
+    Args:
+        data: The JSON document
+
+    Returns:
+        The decoded value
+
+    Raises:
+        ValueError: If the document is not valid JSON
+    """
+    return get_backend().loads(data)
+
+
+def tool_serializer(data: Any) -> str:
+    """
+    Serialize a tool result that is not already text.
+
+    Passed to FastMCP as its tool_serializer.
+
+    Args:
+        data: The tool result
+
+    Returns:
+        The result as compact JSON text
+    """
+    return get_backend().dumps(data).decode()
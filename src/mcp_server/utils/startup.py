@@ -0,0 +1,70 @@
+"""
+Startup timing for the MCP server.
+
+main.py wraps each startup phase in startup_phase so the cost of building the
+server can be reported by the startup-profile command.
+"""
+
+import re
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Tuple
+
+# Durations of the completed startup phases, in completion order
+_phases: List[Tuple[str, float]] = []
+
+# Matches a line of `python -X importtime` output
+_IMPORT_TIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$")
+
+
+@contextmanager
+def startup_phase(name: str) -> Iterator[None]:
+    """
+    Time a startup phase.
+
+    Args:
+        name: Name of the phase
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        _phases.append((name, time.perf_counter() - started))
+
+
+def get_startup_timings() -> Dict[str, float]:
+    """
+    Get the durations of the completed startup phases.
+
+    Returns:
+        Seconds spent in each phase, in the order the phases ran
+    """
+    return dict(_phases)
+
+
+def parse_import_times(output: str) -> List[Dict[str, object]]:
+    """
+    Parse the output of `python -X importtime`.
+
+    Args:
+        output: The interpreter's stderr
+
+    Returns:
+        One entry per imported module with its self and cumulative time in
+        seconds and its nesting depth, in import completion order
+    """
+    modules = []
+    for line in output.splitlines():
+        match = _IMPORT_TIME_LINE.match(line)
+        if match is None:
+            continue
+        self_us, cumulative_us, indent, module = match.groups()
+        modules.append(
+            {
+                "module": module,
+                "self_seconds": int(self_us) / 1e6,
+                "cumulative_seconds": int(cumulative_us) / 1e6,
+                "depth": (len(indent) - 1) // 2,
+            }
+        )
+    return modules
@@ -0,0 +1,141 @@
+"""
+Streaming tool results.
+
+A tool written as a generator or async generator can yield its result in
+chunks:
+
+    @mcp_instance.tool("Export Rows")
+    @streaming()
+    async def export_rows(table: str):
+        async for row in fetch_rows(table):
+            yield row + "\\n"
+
+When the client sends a progressToken, every chunk is sent as soon as it is
+produced as a progress notification on the request's streamable-HTTP stream,
+with the chunk as the message and the bytes sent so far as the progress. If
+the client also sets "stream": true in the request _meta, the chunks are not
+kept and the final result only summarizes the stream. Otherwise the final
+result is the concatenated chunks, bounded by max_result_bytes.
+"""
+
+import functools
+import inspect
+from typing import Any, AsyncIterator, Callable, Optional
+
+from fastmcp.server.dependencies import get_context
+from mcp.server.lowlevel.server import request_ctx
+
+from src.mcp_server.config.config import StreamingConfig, config
+from src.mcp_server.utils import serialization
+
+
+class ResultTooLargeError(Exception):
+    """Raised when an aggregated streaming result exceeds its size limit."""
+
+
+def _chunk_text(chunk: Any) -> str:
+    """Convert a yielded chunk to text."""
+    if isinstance(chunk, str):
+        return chunk
+    if isinstance(chunk, (bytes, bytearray)):
+        return bytes(chunk).decode("utf-8", errors="replace")
+    return serialization.dumps(chunk).decode()
+
+
+def _stream_target() -> tuple:
+    """
+    Get where chunks of the current call should be sent.
+
+    Returns:
+        (progress token, whether the client asked for chunks only), or (None, False)
+        outside an MCP request or when the client sent no progress token
+    """
+    try:
+        meta = request_ctx.get().meta
+    except LookupError:
+        return None, False
+    if meta is None or meta.progressToken is None:
+        return None, False
+    return meta.progressToken, bool((meta.model_extra or {}).get("stream"))
+
+
+async def _iterate(result: Any) -> AsyncIterator[Any]:
+    """Iterate a sync or async iterable from async code."""
+    if hasattr(result, "__aiter__"):
+        async for chunk in result:
+            yield chunk
+    else:
+        for chunk in result:
+            yield chunk
+
+
+def streaming(
+    max_result_bytes: Optional[int] = None,
+    streaming_config: Optional[StreamingConfig] = None,
+) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """
+    Turn a generator function into a tool that streams its chunks.
+
+    Apply it below the tool decorator. The tool keeps the generator's
+    parameters and returns the concatenated chunks as text.
+
+    Args:
+        max_result_bytes: Limit of the aggregated result. Defaults to the configured
+            limit
+        streaming_config: Streaming configuration. Defaults to the application
+            configuration
+
+    Returns:
+        A decorator for generator and async generator functions
+    """
+    streaming_config = streaming_config or config.streaming
+    limit = (
+        max_result_bytes
+        if max_result_bytes is not None
+        else streaming_config.max_result_bytes
+    )
+
+    def decorator(fn: Callable[..., Any]) -> Callable[..., Any]:
+        if not (inspect.isgeneratorfunction(fn) or inspect.isasyncgenfunction(fn)):
+            raise TypeError(
+                f"{fn.__qualname__} must be a generator or async generator function"
+            )
+
+        @functools.wraps(fn)
+        async def wrapper(*args: Any, **kwargs: Any) -> str:
+            progress_token, chunks_only = _stream_target()
+            session = get_context().session if progress_token is not None else None
+
+            parts = []
+            sent = 0
+            count = 0
+            async for chunk in _iterate(fn(*args, **kwargs)):
+                text = _chunk_text(chunk)
+                count += 1
+                sent += len(text.encode())
+                if session is not None:
+                    await session.send_progress_notification(
+                        progress_token=progress_token,
+                        progress=sent,
+                        message=text,
+                        related_request_id=request_ctx.get().request_id,
+                    )
+                if chunks_only:
+                    continue
+                if limit and sent > limit:
+                    raise ResultTooLargeError(
+                        f"Result of {fn.__name__} exceeds {limit} bytes; "
+                        "request it with a progressToken and _meta.stream to receive "
+                        "it in chunks"
+                    )
+                parts.append(text)
+
+            if chunks_only:
+                return f"Streamed {count} chunks ({sent} bytes)"
+            return "".join(parts)
+
+        # Clients see the result type, not the generator type
+        wrapper.__annotations__ = {**getattr(fn, "__annotations__", {}), "return": str}
+        return wrapper
+
+    return decorator
@@ -0,0 +1,594 @@
+"""
+Lightweight tracing of tool calls.
+
+A sampled tool call is recorded as a trace: a root span covering the whole
+call and child spans for its phases:
+
+- receive: from the arrival of the HTTP request to the start of the call,
+  covering reading the body and the MCP SDK's dispatch
+- validate: argument validation
+- execute: the tool function
+- serialize: conversion of the result to MCP content
+
+Writing the response to the transport happens in the MCP SDK after the call
+and is not covered. Tools not precompiled report a single run span in place
+of validate, execute and serialize.
+
+Finished traces are kept in a ring buffer served by the traces route and,
+when an exporter is configured, exported in the background to a JSON lines
+file or an OTLP/HTTP collector. Span and trace ids follow W3C Trace Context,
+so traces continue the trace of a client that sends a traceparent header.
+"""
+
+import asyncio
+import logging
+import os
+import random
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict, deque
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from src.mcp_server.config.config import TracingConfig, config
+from src.mcp_server.utils import serialization
+from src.mcp_server.utils.executor import get_executor
+
+logger = logging.getLogger(config.app_name)
+
+# Calls announced by the HTTP layer and not yet claimed, beyond which the oldest drop
+_MAX_EXPECTED = 10000
+
+
+def new_trace_id() -> str:
+    """Generate a random 128-bit trace id as 32 hex digits."""
+    return f"{random.getrandbits(128):032x}"
+
+
+def new_span_id() -> str:
+    """Generate a random 64-bit span id as 16 hex digits."""
+    return f"{random.getrandbits(64):016x}"
+
+
+def parse_traceparent(header: Optional[str]) -> Optional[Tuple[str, str, bool]]:
+    """
+    Parse a W3C traceparent header.
+
+    Args:
+        header: Header value, such as "00-<trace id>-<parent id>-01"
+
+    Returns:
+        (trace id, parent span id, sampled), or None if the header is missing or invalid
+    """
+    if not header:
+        return None
+    parts = header.strip().split("-")
+    if (
+        len(parts) < 4
+        or len(parts[1]) != 32
+        or len(parts[2]) != 16
+        or len(parts[3]) != 2
+    ):
+        return None
+    try:
+        flags = int(parts[3], 16)
+        int(parts[1], 16), int(parts[2], 16)
+    except ValueError:
+        return None
+    if parts[1] == "0" * 32 or parts[2] == "0" * 16:
+        return None
+    return parts[1], parts[2], bool(flags & 1)
+
+
+@dataclass(slots=True)
+class Span:
+    """A finished span."""
+
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str]
+    name: str
+    start_time: float
+    duration_ms: float
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    error: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Convert the span to a JSON-compatible dictionary.
+
+        Returns:
+            The span fields
+        """
+        return asdict(self)
+
+
+@dataclass(slots=True)
+class TraceContext:
+    """Where a traced call started, as recorded by the HTTP layer."""
+
+    trace_id: str
+    parent_id: Optional[str]
+    received: float
+    received_time: float
+
+
+class Trace:
+    """
+    A tool call being traced.
+    """
+
+    __slots__ = (
+        "trace_id",
+        "span_id",
+        "parent_id",
+        "name",
+        "started",
+        "start_time",
+        "attributes",
+        "spans",
+        "execute_started",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        trace_id: Optional[str] = None,
+        parent_id: Optional[str] = None,
+        started: Optional[float] = None,
+        start_time: Optional[float] = None,
+        attributes: Optional[Dict[str, Any]] = None,
+    ):
+        """
+        Args:
+            name: Name of the root span
+            trace_id: Trace to continue. Defaults to a new trace
+            parent_id: Span of the caller the root span is a child of
+            started: perf_counter time the call started. Defaults to now
+            start_time: Unix time the call started. Defaults to now
+            attributes: Attributes of the root span
+        """
+        self.trace_id = trace_id or new_trace_id()
+        self.span_id = new_span_id()
+        self.parent_id = parent_id
+        self.name = name
+        self.started = time.perf_counter() if started is None else started
+        self.start_time = time.time() if start_time is None else start_time
+        self.attributes = attributes or {}
+        self.spans: List[Span] = []
+        # perf_counter time the tool function was entered, set by precompiled tools
+        self.execute_started: Optional[float] = None
+
+    def add_span(
+        self,
+        name: str,
+        started: float,
+        ended: float,
+        error: Optional[str] = None,
+        **attributes: Any,
+    ) -> None:
+        """
+        Record a phase of the call.
+
+        Args:
+            name: Name of the phase
+            started: perf_counter time the phase started
+            ended: perf_counter time the phase ended
+            error: Error the phase ended with
+            **attributes: Span attributes
+        """
+        self.spans.append(
+            Span(
+                trace_id=self.trace_id,
+                span_id=new_span_id(),
+                parent_id=self.span_id,
+                name=name,
+                start_time=self.start_time + (started - self.started),
+                duration_ms=(ended - started) * 1000,
+                attributes=attributes,
+                error=error,
+            )
+        )
+
+    def finish(self, error: Optional[str] = None) -> List[Span]:
+        """
+        End the call.
+
+        Args:
+            error: Error the call ended with
+
+        Returns:
+            The root span followed by the phase spans
+        """
+        root = Span(
+            trace_id=self.trace_id,
+            span_id=self.span_id,
+            parent_id=self.parent_id,
+            name=self.name,
+            start_time=self.start_time,
+            duration_ms=(time.perf_counter() - self.started) * 1000,
+            attributes=self.attributes,
+            error=error,
+        )
+        return [root, *self.spans]
+
+
+# Trace of the tool call running in the current task, if it is sampled
+current_trace: ContextVar[Optional[Trace]] = ContextVar("current_trace", default=None)
+
+
+class SpanExporter(ABC):
+    """
+    Destination of finished spans.
+    """
+
+    @abstractmethod
+    async def export(self, spans: List[Span]) -> None:
+        """
+        Export a batch of spans.
+
+        Args:
+            spans: Spans of one or more traces
+        """
+
+    async def shutdown(self) -> None:
+        """Release the exporter's resources."""
+
+
+class JSONLinesExporter(SpanExporter):
+    """
+    Append spans to a file, one JSON object per line.
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: File to append to; its directory is created if needed
+        """
+        self.path = path
+
+    def _write(self, data: bytes) -> None:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.path, "ab") as f:
+            f.write(data)
+
+    async def export(self, spans: List[Span]) -> None:
+        data = b"".join(serialization.dumps(span.to_dict()) + b"\n" for span in spans)
+        await asyncio.get_running_loop().run_in_executor(
+            get_executor().thread_pool, self._write, data
+        )
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    """Encode an attribute value as an OTLP AnyValue."""
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def to_otlp(spans: List[Span], service_name: str) -> Dict[str, Any]:
+    """
+    Encode spans as an OTLP/HTTP JSON export request.
+
+    Args:
+        spans: Spans to encode
+        service_name: service.name resource attribute
+
+    Returns:
+        The ExportTraceServiceRequest body
+    """
+    encoded = []
+    for span in spans:
+        start_ns = int(span.start_time * 1e9)
+        item = {
+            "traceId": span.trace_id,
+            "spanId": span.span_id,
+            "name": span.name,
+            # SERVER for the root span of a call, INTERNAL for its phases
+            "kind": 2 if span.attributes.get("mcp.tool") is not None else 1,
+            "startTimeUnixNano": str(start_ns),
+            "endTimeUnixNano": str(start_ns + int(span.duration_ms * 1e6)),
+            "attributes": [
+                {"key": key, "value": _otlp_value(value)}
+                for key, value in span.attributes.items()
+            ],
+            "status": (
+                {"code": 2, "message": span.error}
+                if span.error is not None
+                else {"code": 1}
+            ),
+        }
+        if span.parent_id:
+            item["parentSpanId"] = span.parent_id
+        encoded.append(item)
+    return {
+        "resourceSpans": [
+            {
+                "resource": {
+                    "attributes": [
+                        {"key": "service.name", "value": {"stringValue": service_name}}
+                    ]
+                },
+                "scopeSpans": [
+                    {"scope": {"name": "mcp_server.tracing"}, "spans": encoded}
+                ],
+            }
+        ]
+    }
+
+
+class OTLPExporter(SpanExporter):
+    """
+    Send spans to an OpenTelemetry collector over OTLP/HTTP with JSON encoding.
+    """
+
+    def __init__(
+        self,
+        endpoint: str,
+        service_name: Optional[str] = None,
+        headers: Optional[Dict[str, str]] = None,
+    ):
+        """
+        Args:
+            endpoint: Traces endpoint of the collector, such as http://localhost:4318/v1/traces
+            service_name: service.name reported for the spans. Defaults to the
+                application name
+            headers: Extra request headers, such as credentials
+        """
+        self.endpoint = endpoint
+        self.service_name = service_name or config.app_name
+        self.headers = {"Content-Type": "application/json", **(headers or {})}
+        self._client: Any = None
+
+    async def export(self, spans: List[Span]) -> None:
+        if self._client is None:
+            import httpx
+
+            self._client = httpx.AsyncClient(timeout=10.0)
+        response = await self._client.post(
+            self.endpoint,
+            content=serialization.dumps(to_otlp(spans, self.service_name)),
+            headers=self.headers,
+        )
+        response.raise_for_status()
+
+    async def shutdown(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+def create_exporter(tracing_config: TracingConfig) -> Optional[SpanExporter]:
+    """
+    Create the exporter selected in the configuration.
+
+    Args:
+        tracing_config: Tracing configuration
+
+    Returns:
+        The exporter, or None if spans are only kept in memory
+    """
+    if tracing_config.exporter == "file":
+        return JSONLinesExporter(tracing_config.file_path)
+    if tracing_config.exporter == "otlp":
+        return OTLPExporter(tracing_config.otlp_endpoint)
+    return None
+
+
+class Tracer:
+    """
+    Samples tool calls, keeps recent traces and exports them.
+    """
+
+    def __init__(
+        self,
+        tracing_config: Optional[TracingConfig] = None,
+        exporter: Optional[SpanExporter] = None,
+    ):
+        """
+        Args:
+            tracing_config: Sampling, buffer and export settings. Defaults to the
+                application configuration
+            exporter: Exporter for finished spans. Defaults to the one selected in the
+                configuration
+        """
+        self.config = tracing_config or config.tracing
+        self.sample_rate = self.config.sample_rate
+        self.slow_threshold_ms = self.config.slow_threshold_ms
+        self.exporter = (
+            exporter if exporter is not None else create_exporter(self.config)
+        )
+        # Set when the HTTP layer takes the sampling decisions of HTTP requests
+        self.http_sampling = False
+        self.recorded = 0
+        self.export_errors = 0
+        self._traces: Deque[List[Span]] = deque(maxlen=self.config.buffer_size)
+        self._pending: List[Span] = []
+        self._expected: "OrderedDict[Tuple[str, Any, str], TraceContext]" = (
+            OrderedDict()
+        )
+        self._task: Optional[asyncio.Task] = None
+
+    def configure(self, tracing_config: TracingConfig) -> None:
+        """
+        Apply new sampling and export settings.
+
+        The sample rate, slow-call threshold and export interval apply at
+        once; the buffer size and the exporter are kept until the next restart.
+
+        Args:
+            tracing_config: The new tracing configuration
+        """
+        self.config = tracing_config
+        self.sample_rate = tracing_config.sample_rate
+        self.slow_threshold_ms = tracing_config.slow_threshold_ms
+
+    def should_sample(self) -> bool:
+        """
+        Take a head sampling decision.
+
+        Returns:
+            Whether to trace the call
+        """
+        rate = self.sample_rate
+        return rate >= 1 or (rate > 0 and random.random() < rate)
+
+    def expect(
+        self, origin: str, request_id: Any, name: str, context: TraceContext
+    ) -> None:
+        """
+        Announce a sampled call received by the HTTP layer.
+
+        Args:
+            origin: Session or request the call comes from, see current_origin
+            request_id: JSON-RPC id of the call
+            name: Name of the tool
+            context: Where the call started
+        """
+        self._expected[(origin, request_id, name)] = context
+        if len(self._expected) > _MAX_EXPECTED:
+            self._expected.popitem(last=False)
+
+    def forget(
+        self, origin: str, request_id: Any, name: str, context: TraceContext
+    ) -> None:
+        """
+        Drop an announced call that never reached its tool.
+
+        Args:
+            origin: Session or request the call comes from
+            request_id: JSON-RPC id of the call
+            name: Name of the tool
+            context: The announced context, so a later call reusing the id is kept
+        """
+        if self._expected.get((origin, request_id, name)) is context:
+            del self._expected[(origin, request_id, name)]
+
+    def claim(self, origin: str, request_id: Any, name: str) -> Optional[TraceContext]:
+        """
+        Take the context the HTTP layer announced for a call.
+
+        Args:
+            origin: Session or request the call comes from
+            request_id: JSON-RPC id of the call
+            name: Name of the tool
+
+        Returns:
+            The context, or None if the call was not announced
+        """
+        if not self._expected:
+            return None
+        return self._expected.pop((origin, request_id, name), None)
+
+    def record(self, spans: List[Span]) -> None:
+        """
+        Keep a finished trace and queue it for export.
+
+        Args:
+            spans: Root span followed by its phases
+        """
+        self.recorded += 1
+        self._traces.append(spans)
+        if self.exporter is not None:
+            self._pending.extend(spans)
+            self.ensure_running()
+
+    def traces(
+        self,
+        limit: int = 50,
+        tool: Optional[str] = None,
+        min_duration_ms: float = 0.0,
+        trace_id: Optional[str] = None,
+        errors_only: bool = False,
+    ) -> List[Dict[str, Any]]:
+        """
+        Query the recent traces, newest first.
+
+        Args:
+            limit: Maximum number of traces returned
+            tool: Only traces of this tool
+            min_duration_ms: Only traces at least this long
+            trace_id: Only the trace with this id
+            errors_only: Only traces that ended with an error
+
+        Returns:
+            Traces as dictionaries with the root span fields and a spans list
+        """
+        found = []
+        for spans in reversed(self._traces):
+            root = spans[0]
+            if trace_id is not None and root.trace_id != trace_id:
+                continue
+            if tool is not None and root.attributes.get("mcp.tool") != tool:
+                continue
+            if root.duration_ms < min_duration_ms or (
+                errors_only and root.error is None
+            ):
+                continue
+            found.append(
+                {**root.to_dict(), "spans": [span.to_dict() for span in spans[1:]]}
+            )
+            if len(found) >= limit:
+                break
+        return found
+
+    async def flush(self) -> None:
+        """Export the queued spans."""
+        if self.exporter is None or not self._pending:
+            return
+        spans, self._pending = self._pending, []
+        try:
+            await self.exporter.export(spans)
+        except Exception as e:
+            self.export_errors += 1
+            logger.warning("Failed to export %d spans: %s", len(spans), e)
+
+    async def run(self) -> None:
+        """Export queued spans every export interval until cancelled."""
+        while True:
+            await asyncio.sleep(self.config.export_interval)
+            await self.flush()
+
+    def ensure_running(self) -> None:
+        """Start the exporter loop on the running event loop if it is not running."""
+        if self._task is None or self._task.done():
+            try:
+                self._task = asyncio.get_running_loop().create_task(self.run())
+            except RuntimeError:
+                # No running loop; spans are exported once one starts the loop
+                pass
+
+    async def stop(self) -> None:
+        """Stop the exporter loop, exporting what is queued."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        await self.flush()
+        if self.exporter is not None:
+            await self.exporter.shutdown()
+
+
+_tracer: Optional[Tracer] = None
+
+
+def get_tracer(tracing_config: Optional[TracingConfig] = None) -> Tracer:
+    """
+    Get the shared tracer, creating it from the configuration on first use.
+
+    Args:
+        tracing_config: Tracing configuration. Defaults to the application config
+
+    Returns:
+        Tracer: The shared tracer
+    """
+    global _tracer
+    if _tracer is None:
+        _tracer = Tracer(tracing_config)
+    return _tracer
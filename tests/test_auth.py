@@ -0,0 +1,191 @@
+"""
+Tests for API key authentication.
+"""
+
+import os
+
+import pytest
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from src.mcp_server.config.config import SecurityConfig
+from src.mcp_server.middleware.auth import (
+    APIKeyAuthenticator,
+    APIKeyAuthMiddleware,
+    hash_key,
+    parse_key_file,
+)
+from src.mcp_server.middleware.rate_limit import client_identity
+
+
+def _write_keys(path, keys, mtime=None):
+    path.write_text(
+        "".join(f"{key_id} {hash_key(key)}\n" for key_id, key in keys.items())
+    )
+    if mtime is not None:
+        os.utime(path, (mtime, mtime))
+
+
+class TestParseKeyFile:
+    """Test cases for parse_key_file."""
+
+    def test_parses_lines_and_skips_comments(self):
+        """Test key lines are parsed and comments and blank lines are skipped."""
+        lines = ["# keys\n", "\n", f"ci {hash_key('secret')}  # runner\n"]
+
+        keys = parse_key_file(lines)
+
+        assert [key_id for key_id, _ in keys] == ["ci"]
+        assert keys[0][1].hex() == hash_key("secret")[len("sha256:") :]
+
+    @pytest.mark.parametrize(
+        "line", ["ci", "ci md5:abc", "ci sha256:zz", "ci sha256:abcd"]
+    )
+    def test_rejects_malformed_lines(self, line):
+        """Test malformed lines are reported with their line number."""
+        with pytest.raises(ValueError, match="line 1"):
+            parse_key_file([line])
+
+
+class TestAPIKeyAuthenticator:
+    """Test cases for APIKeyAuthenticator."""
+
+    def test_verifies_known_keys(self, tmp_path):
+        """
+        Test keys from the file and configuration are accepted and others rejected.
+        """
+        keys_file = tmp_path / "keys"
+        _write_keys(keys_file, {"ci": "secret-1"})
+        authenticator = APIKeyAuthenticator(
+            keys_file=str(keys_file), keys={"default": "secret-2"}
+        )
+
+        assert authenticator.verify("secret-1").key_id == "ci"
+        assert authenticator.verify("secret-2").key_id == "default"
+        assert authenticator.verify("wrong") is None
+        assert authenticator.verify(None) is None
+        assert authenticator.failures == 2
+
+    def test_counts_requests_per_key(self):
+        """Test every verified request is counted against its key."""
+        authenticator = APIKeyAuthenticator(keys={"a": "k1", "b": "k2"})
+
+        for _ in range(3):
+            authenticator.verify("k1")
+        authenticator.verify("k2")
+
+        stats = authenticator.stats()
+        assert stats["a"]["requests"] == 3
+        assert stats["b"]["requests"] == 1
+        assert stats["a"]["last_used"] is not None
+
+    def test_presented_keys_are_not_kept(self):
+        """
+        Test a verified key is checked against the index every time, not remembered.
+        """
+        authenticator = APIKeyAuthenticator(keys={"a": "k1"})
+        assert authenticator.verify("k1").key_id == "a"
+        authenticator._index.clear()
+
+        assert authenticator.verify("k1") is None
+
+    def test_key_file_is_hot_reloaded(self, tmp_path):
+        """Test added and revoked keys take effect without a restart."""
+        keys_file = tmp_path / "keys"
+        _write_keys(keys_file, {"old": "secret-1"}, mtime=1000)
+        authenticator = APIKeyAuthenticator(keys_file=str(keys_file), reload_interval=0)
+        assert authenticator.verify("secret-1") is not None
+
+        _write_keys(keys_file, {"new": "secret-2"}, mtime=2000)
+
+        assert authenticator.verify("secret-1") is None
+        assert authenticator.verify("secret-2").key_id == "new"
+
+    def test_broken_key_file_keeps_current_keys(self, tmp_path):
+        """Test a malformed key file does not lock everyone out."""
+        keys_file = tmp_path / "keys"
+        _write_keys(keys_file, {"ci": "secret-1"}, mtime=1000)
+        authenticator = APIKeyAuthenticator(keys_file=str(keys_file), reload_interval=0)
+
+        keys_file.write_text("garbage\n")
+        os.utime(keys_file, (2000, 2000))
+
+        assert authenticator.verify("secret-1").key_id == "ci"
+
+    def test_from_config(self):
+        """Test the configured single key is accepted."""
+        authenticator = APIKeyAuthenticator.from_config(
+            SecurityConfig(api_key_enabled=True, api_key="secret")
+        )
+        assert authenticator.verify("secret").key_id == "default"
+
+    def test_collect_metrics(self):
+        """Test per-key request counters are exported."""
+        authenticator = APIKeyAuthenticator(keys={"a": "k1"})
+        authenticator.verify("k1")
+        authenticator.verify("nope")
+
+        families = {
+            name: samples for name, _, _, samples in authenticator.collect_metrics()
+        }
+
+        assert families["mcp_auth_requests_total"] == [({"key": "a"}, 1)]
+        assert families["mcp_auth_failures_total"] == [({}, 1)]
+
+
+class TestAPIKeyAuthMiddleware:
+    """Test cases for APIKeyAuthMiddleware."""
+
+    def setup_method(self):
+        async def whoami(request: Request) -> PlainTextResponse:
+            return PlainTextResponse(request.state.api_key_id)
+
+        async def health(request: Request) -> PlainTextResponse:
+            return PlainTextResponse("ok")
+
+        self.app = Starlette(
+            routes=[Route("/whoami", whoami), Route("/health", health)],
+            middleware=[
+                Middleware(
+                    APIKeyAuthMiddleware,
+                    authenticator=APIKeyAuthenticator(keys={"ci": "secret"}),
+                    exempt_paths=["/health"],
+                )
+            ],
+        )
+
+    def test_rejects_missing_and_invalid_keys(self):
+        """Test requests without a valid key get 401."""
+        with TestClient(self.app) as client:
+            missing = client.get("/whoami")
+            invalid = client.get("/whoami", headers={"x-api-key": "wrong"})
+
+        assert missing.status_code == 401
+        assert missing.headers["www-authenticate"] == "Bearer"
+        assert missing.json()["error"]["code"] == -32001
+        assert invalid.status_code == 401
+
+    def test_accepts_header_and_bearer_token(self):
+        """Test the key is read from the API key header or a bearer token."""
+        with TestClient(self.app) as client:
+            by_header = client.get("/whoami", headers={"x-api-key": "secret"})
+            by_bearer = client.get(
+                "/whoami", headers={"authorization": "Bearer secret"}
+            )
+
+        assert by_header.text == "ci"
+        assert by_bearer.text == "ci"
+
+    def test_exempt_paths(self):
+        """Test exempt paths are served without a key."""
+        with TestClient(self.app) as client:
+            assert client.get("/health").status_code == 200
+
+    def test_rate_limiter_uses_key_id(self):
+        """Test authenticated clients are rate limited by key id."""
+        scope = {"type": "http", "headers": [], "state": {"api_key_id": "ci"}}
+        assert client_identity(scope) == "key:ci"
@@ -0,0 +1,205 @@
+"""
+Tests for the batched tool-call endpoint.
+"""
+
+import asyncio
+import json
+
+from fastmcp import FastMCP
+from starlette.testclient import TestClient
+
+from src.mcp_server.middleware.batch import register_batch_route, run_batch
+from src.mcp_server.middleware.jsonrpc import ToolCallRequest
+from src.mcp_server.middleware.tool_calls import add_tool_call_middleware
+
+
+def _call(request_id, name, arguments=None):
+    return {
+        "jsonrpc": "2.0",
+        "id": request_id,
+        "method": "tools/call",
+        "params": {"name": name, "arguments": arguments or {}},
+    }
+
+
+class TestRunBatch:
+    """Test cases for run_batch."""
+
+    def setup_method(self):
+        self.mcp = FastMCP("test")
+        self.running = 0
+        self.peak = 0
+
+        @self.mcp.tool("Sleep")
+        async def sleep(seconds: float) -> float:
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+            await asyncio.sleep(seconds)
+            self.running -= 1
+            return seconds
+
+    def _run(self, calls, max_concurrency):
+        async def collect():
+            return [
+                message async for message in run_batch(self.mcp, calls, max_concurrency)
+            ]
+
+        return asyncio.run(collect())
+
+    def test_results_stream_in_completion_order(self):
+        """Test faster calls are answered first."""
+        calls = [
+            ToolCallRequest(1, "Sleep", {"seconds": 0.05}, {}),
+            ToolCallRequest(2, "Sleep", {"seconds": 0.0}, {}),
+        ]
+
+        messages = self._run(calls, max_concurrency=2)
+
+        assert [message["id"] for message in messages] == [2, 1]
+        assert messages[0]["result"]["isError"] is False
+
+    def test_parallelism_is_capped(self):
+        """Test no more than max_concurrency calls run at once."""
+        calls = [ToolCallRequest(i, "Sleep", {"seconds": 0.01}, {}) for i in range(8)]
+
+        messages = self._run(calls, max_concurrency=3)
+
+        assert len(messages) == 8
+        assert self.peak == 3
+
+    def test_errors_are_reported_per_call(self):
+        """Test a failing call does not fail the batch."""
+        calls = [
+            ToolCallRequest(1, "Missing", {}, {}),
+            ToolCallRequest(2, "Sleep", {"seconds": 0}, {}),
+        ]
+
+        messages = {
+            message["id"]: message for message in self._run(calls, max_concurrency=2)
+        }
+
+        assert messages[1]["result"]["isError"] is True
+        assert "Unknown tool" in messages[1]["result"]["content"][0]["text"]
+        assert messages[2]["result"]["isError"] is False
+
+    def test_calls_pass_through_middleware(self):
+        """Test tool-call middleware sees the request id and _meta of each call."""
+        seen = []
+
+        async def record(call, call_next):
+            seen.append((call.request_id, call.meta))
+            return await call_next(call)
+
+        add_tool_call_middleware(self.mcp, record)
+        self._run(
+            [ToolCallRequest(7, "Sleep", {"seconds": 0}, {"trace": "x"})],
+            max_concurrency=1,
+        )
+
+        assert seen == [(7, {"trace": "x"})]
+
+
+class TestBatchRoute:
+    """Test cases for the batch route."""
+
+    def setup_method(self):
+        self.mcp = FastMCP("test")
+
+        @self.mcp.tool("Echo")
+        def echo(message: str) -> str:
+            return message
+
+        register_batch_route(
+            self.mcp, max_concurrency=4, max_calls=3, api_key_header="x-client-key"
+        )
+
+    def _post(self, body, headers=None):
+        with TestClient(self.mcp.http_app()) as client:
+            return client.post(
+                "/batch", content=json.dumps(body), headers=headers or {}
+            )
+
+    def test_ndjson_stream(self):
+        """Test each call is answered on its own line."""
+        response = self._post(
+            [_call(1, "Echo", {"message": "a"}), _call(2, "Echo", {"message": "b"})]
+        )
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        messages = [json.loads(line) for line in response.text.splitlines()]
+        texts = {
+            message["id"]: message["result"]["content"][0]["text"]
+            for message in messages
+        }
+        assert texts == {1: "a", 2: "b"}
+
+    def test_event_stream(self):
+        """Test clients accepting server-sent events get SSE frames."""
+        response = self._post(
+            [_call(1, "Echo", {"message": "a"})], {"accept": "text/event-stream"}
+        )
+
+        assert response.headers["content-type"].startswith("text/event-stream")
+        assert response.text.startswith("event: message\ndata: ")
+
+    def test_clients_are_identified_by_the_configured_header(self):
+        """Test batched calls carry the client identity the rate limiter would use."""
+        clients = []
+
+        async def record(call, call_next):
+            clients.append(call.client)
+            return await call_next(call)
+
+        add_tool_call_middleware(self.mcp, record)
+        self._post([_call(1, "Echo", {"message": "a"})], {"x-client-key": "first"})
+        self._post([_call(1, "Echo", {"message": "a"})], {"x-client-key": "second"})
+
+        assert clients[0].startswith("key:")
+        assert clients[0] != clients[1]
+
+    def test_missing_ids_use_position(self):
+        """Test calls without an id are answered with their index."""
+        body = [_call(None, "Echo", {"message": "a"})]
+
+        response = self._post(body)
+
+        assert json.loads(response.text)["id"] == 0
+
+    def test_rejects_invalid_batches(self):
+        """Test malformed, mixed and oversized batches are rejected."""
+        with TestClient(self.mcp.http_app()) as client:
+            assert client.post("/batch", content=b"{").status_code == 400
+            mixed = [
+                _call(1, "Echo", {"message": "a"}),
+                {"jsonrpc": "2.0", "id": 2, "method": "ping"},
+            ]
+            assert client.post("/batch", content=json.dumps(mixed)).status_code == 400
+            oversized = [_call(i, "Echo", {"message": "a"}) for i in range(4)]
+            assert (
+                client.post("/batch", content=json.dumps(oversized)).status_code == 413
+            )
+
+    def test_rejects_repeated_ids(self):
+        """
+        Test batches whose ids repeat, including ids given by position, are rejected.
+        """
+        repeated = [
+            _call(1, "Echo", {"message": "a"}),
+            _call(1, "Echo", {"message": "b"}),
+        ]
+        assert self._post(repeated).status_code == 400
+        positional = [
+            _call(None, "Echo", {"message": "a"}),
+            _call(0, "Echo", {"message": "b"}),
+        ]
+        assert self._post(positional).status_code == 400
+
+    def test_rejects_large_bodies(self):
+        """Test batches over the body size limit are rejected before they are parsed."""
+        register_batch_route(self.mcp, path="/small-batch", max_body_bytes=64)
+        body = [_call(1, "Echo", {"message": "a" * 100})]
+        with TestClient(self.mcp.http_app()) as client:
+            response = client.post("/small-batch", content=json.dumps(body))
+
+        assert response.status_code == 413
@@ -0,0 +1,90 @@
+"""
+Tests for the benchmark harness.
+"""
+
+import asyncio
+import json
+
+import pytest
+
+from src.mcp_server.utils.benchmark import (
+    DEFAULT_TOOLS,
+    benchmark_tool,
+    build_arguments,
+    percentile,
+    run_benchmark,
+    summarize_latencies,
+)
+
+
+class TestLatencyStatistics:
+    """Test cases for latency statistics helpers."""
+
+    def test_percentile_nearest_rank(self):
+        """Test percentile uses the nearest-rank method."""
+        samples = list(range(1, 101))
+        assert percentile(samples, 50) == 50
+        assert percentile(samples, 95) == 95
+        assert percentile(samples, 99) == 99
+        assert percentile(samples, 100) == 100
+
+    def test_percentile_unsorted_and_empty(self):
+        """Test percentile handles unsorted and empty samples."""
+        assert percentile([3.0, 1.0, 2.0], 50) == 2.0
+        assert percentile([], 99) == 0.0
+
+    def test_summarize_latencies_converts_to_milliseconds(self):
+        """Test summarize_latencies reports milliseconds."""
+        summary = summarize_latencies([0.001, 0.002, 0.003])
+        assert summary.min == 1.0
+        assert summary.max == 3.0
+        assert summary.p50 == 2.0
+        assert summary.mean == 2.0
+
+
+class TestBuildArguments:
+    """Test cases for payload generation."""
+
+    def test_payload_tools(self):
+        """Test tools that take a string receive a payload of the given size."""
+        assert build_arguments("hello-world", 4) == {"name": "xxxx"}
+        assert build_arguments("Echo Message", 2) == {"message": "xx"}
+
+    def test_tools_without_payload(self):
+        """Test tools without arguments receive none."""
+        assert build_arguments("Ping", 100) == {}
+
+
+class TestRunBenchmark:
+    """Test cases for running the benchmark against the in-process server."""
+
+    def test_run_benchmark_reports_all_default_tools(self):
+        """Test a small benchmark run covers every default tool without errors."""
+        report = run_benchmark(concurrency=2, requests=6, payload_size=8, warmup=0)
+
+        assert [result.tool for result in report.results] == DEFAULT_TOOLS
+        for result in report.results:
+            assert result.requests == 6
+            assert result.errors == 0
+            assert result.requests_per_second > 0
+            assert result.latency_ms.p50 <= result.latency_ms.p99
+
+        # The report must be JSON serializable
+        data = json.loads(report.model_dump_json())
+        assert data["concurrency"] == 2
+        assert data["results"][0]["latency_ms"]["p95"] >= 0
+
+    def test_unreachable_server_fails_instead_of_hanging(self):
+        """Test sessions that cannot connect abort the benchmark with their error."""
+
+        async def run():
+            await asyncio.wait_for(
+                benchmark_tool(
+                    "http://127.0.0.1:1/mcp/", "Ping", {}, requests=4, concurrency=2
+                ),
+                timeout=10,
+            )
+
+        with pytest.raises(Exception) as excinfo:
+            asyncio.run(run())
+        assert not isinstance(excinfo.value, (asyncio.TimeoutError, TypeError))
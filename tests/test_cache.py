@@ -0,0 +1,227 @@
+"""
+Tests for the tool result cache.
+"""
+
+import asyncio
+import inspect
+import threading
+import time
+from unittest import mock
+
+import pytest
+
+from src.mcp_server.config.config import CacheConfig
+from src.mcp_server.utils.cache import (
+    ToolCache,
+    cached,
+    get_cache_stats,
+    make_cache_key,
+)
+
+
+class TestMakeCacheKey:
+    """Test cases for argument normalization."""
+
+    def test_equivalent_calls_share_a_key(self):
+        """Test positional, keyword and default spellings produce the same key."""
+
+        def tool(name: str, greeting: str = "Hello"):
+            pass
+
+        signature = inspect.signature(tool)
+        key = make_cache_key(signature, ("Ada",), {})
+        assert make_cache_key(signature, (), {"name": "Ada"}) == key
+        assert make_cache_key(signature, ("Ada", "Hello"), {}) == key
+        assert make_cache_key(signature, ("Ada", "Hi"), {}) != key
+
+    def test_dict_argument_order_is_normalized(self):
+        """Test dictionary arguments are keyed independently of insertion order."""
+
+        def tool(options: dict):
+            pass
+
+        signature = inspect.signature(tool)
+        assert make_cache_key(signature, ({"a": 1, "b": 2},), {}) == make_cache_key(
+            signature, ({"b": 2, "a": 1},), {}
+        )
+
+
+class TestToolCache:
+    """Test cases for the ToolCache class."""
+
+    def test_hit_and_miss_counters(self):
+        """Test hits and misses are counted."""
+        cache = ToolCache("test")
+        assert cache.get("a") == (False, None)
+        cache.set("a", 1)
+        assert cache.get("a") == (True, 1)
+
+        stats = cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+
+    def test_lru_eviction(self):
+        """Test the least recently used entry is evicted when full."""
+        cache = ToolCache("test", max_size=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")  # "b" is now least recently used
+        cache.set("c", 3)
+
+        assert cache.get("b") == (False, None)
+        assert cache.get("a") == (True, 1)
+        assert cache.stats()["evictions"] == 1
+
+    def test_ttl_expiry(self):
+        """Test entries expire after their TTL."""
+        cache = ToolCache("test", ttl_seconds=10)
+        with mock.patch(
+            "src.mcp_server.utils.cache.time.monotonic", return_value=100.0
+        ):
+            cache.set("a", 1)
+        with mock.patch(
+            "src.mcp_server.utils.cache.time.monotonic", return_value=105.0
+        ):
+            assert cache.get("a") == (True, 1)
+        with mock.patch(
+            "src.mcp_server.utils.cache.time.monotonic", return_value=111.0
+        ):
+            assert cache.get("a") == (False, None)
+        assert cache.stats()["expirations"] == 1
+
+    def test_single_flight_for_threads(self):
+        """Test concurrent identical calls execute the function once."""
+        cache = ToolCache("test")
+        calls = []
+        started = threading.Event()
+
+        def slow():
+            calls.append(1)
+            started.set()
+            time.sleep(0.05)
+            return "value"
+
+        results = []
+        threads = [
+            threading.Thread(
+                target=lambda: results.append(cache.get_or_call("k", slow))
+            )
+            for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert results == ["value"] * 5
+        assert len(calls) == 1
+
+    def test_single_flight_for_coroutines(self):
+        """Test concurrent identical async calls execute the coroutine once."""
+        cache = ToolCache("test")
+        calls = []
+
+        async def slow():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return "value"
+
+        async def run():
+            return await asyncio.gather(
+                *(cache.get_or_call_async("k", slow) for _ in range(5))
+            )
+
+        assert asyncio.run(run()) == ["value"] * 5
+        assert len(calls) == 1
+        assert cache.stats()["coalesced"] == 4
+
+    def test_cancelled_leader_hands_over_to_a_waiter(self):
+        """
+        Test cancelling the coroutine computing a value does not fail the callers
+        waiting for it.
+        """
+        cache = ToolCache("test")
+        calls = []
+
+        async def slow():
+            calls.append(1)
+            await asyncio.sleep(0.02)
+            return "value"
+
+        async def run():
+            leader = asyncio.create_task(cache.get_or_call_async("k", slow))
+            await asyncio.sleep(0)
+            followers = [
+                asyncio.create_task(cache.get_or_call_async("k", slow))
+                for _ in range(3)
+            ]
+            await asyncio.sleep(0.005)
+            leader.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await leader
+            return await asyncio.gather(*followers)
+
+        assert asyncio.run(run()) == ["value"] * 3
+        assert len(calls) == 2
+
+    def test_exceptions_are_not_cached(self):
+        """Test a failing call is retried on the next request."""
+        cache = ToolCache("test")
+
+        def failing():
+            raise RuntimeError("boom")
+
+        with pytest.raises(RuntimeError):
+            cache.get_or_call("k", failing)
+        assert cache.get_or_call("k", lambda: "ok") == "ok"
+
+
+class TestCachedDecorator:
+    """Test cases for the cached decorator."""
+
+    def test_sync_function_is_cached(self):
+        """Test a sync function stays sync and is only called once per key."""
+        calls = []
+
+        @cached(name="test-sync", cache_config=CacheConfig())
+        def tool(name: str = "World") -> str:
+            calls.append(name)
+            return f"Hello, {name}!"
+
+        assert not inspect.iscoroutinefunction(tool)
+        assert tool() == "Hello, World!"
+        assert tool(name="World") == "Hello, World!"
+        assert tool("Ada") == "Hello, Ada!"
+        assert calls == ["World", "Ada"]
+        assert get_cache_stats()["test-sync"]["hits"] == 1
+
+    def test_async_function_is_cached(self):
+        """Test a coroutine function stays a coroutine function."""
+        calls = []
+
+        @cached(cache_config=CacheConfig())
+        async def tool(x: int) -> int:
+            calls.append(x)
+            return x * 2
+
+        assert inspect.iscoroutinefunction(tool)
+        assert asyncio.run(tool(2)) == 4
+        assert asyncio.run(tool(2)) == 4
+        assert calls == [2]
+
+    def test_signature_is_preserved(self):
+        """Test the wrapper exposes the original signature for schema generation."""
+
+        @cached(cache_config=CacheConfig())
+        def tool(message: str, count: int = 1) -> str:
+            return message * count
+
+        assert list(inspect.signature(tool).parameters) == ["message", "count"]
+
+    def test_disabled_cache_returns_function_unchanged(self):
+        """Test the decorator is a no-op when caching is disabled."""
+
+        def tool() -> str:
+            return "value"
+
+        assert cached(cache_config=CacheConfig(enabled=False))(tool) is tool
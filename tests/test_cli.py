@@ -0,0 +1,304 @@
+"""
+Tests for the command-line interface.
+"""
+
+import json
+import os
+from unittest.mock import patch
+
+import pytest
+from sse_starlette.sse import AppStatus
+from typer.testing import CliRunner
+
+import src.mcp_server.config.config as config_module
+from src.mcp_server.cli import app
+
+runner = CliRunner()
+
+
+class TestStartCommand:
+    """Test cases for the start command."""
+
+    @pytest.fixture(autouse=True)
+    def _restore_config(self):
+        """Undo the environment variables and configuration set from the flags."""
+        with (
+            patch.dict(os.environ),
+            patch.object(config_module, "config", config_module.config),
+        ):
+            yield
+
+    @patch("src.mcp_server.main.mcp")
+    def test_start_single_process(self, mock_mcp):
+        """Test a single worker runs the server in-process."""
+        result = runner.invoke(app, ["start", "--host", "127.0.0.1", "--port", "9000"])
+
+        assert result.exit_code == 0
+        mock_mcp.run.assert_called_once()
+        kwargs = mock_mcp.run.call_args.kwargs
+        assert kwargs["transport"] == "streamable-http"
+        assert kwargs["host"] == "127.0.0.1"
+        assert kwargs["port"] == 9000
+        assert kwargs["uvicorn_config"] == {"timeout_graceful_shutdown": 30}
+
+    @patch("src.mcp_server.main.mcp")
+    def test_start_with_config_file(self, mock_mcp, tmp_path):
+        """Test flags take precedence over the configuration file."""
+        config_file = tmp_path / "server.toml"
+        config_file.write_text(
+            '[server]\nhost = "10.0.0.1"\nport = 7000\n\n[logging]\nlevel = "WARNING"\n'
+        )
+
+        result = runner.invoke(
+            app, ["start", "--config", str(config_file), "--host", "127.0.0.1"]
+        )
+
+        assert result.exit_code == 0
+        kwargs = mock_mcp.run.call_args.kwargs
+        assert kwargs["host"] == "127.0.0.1"
+        assert kwargs["port"] == 7000
+        assert kwargs["log_level"] == "warning"
+        assert config_module.config.server.port == 7000
+
+    @patch("src.mcp_server.cli.uvicorn.run")
+    def test_start_multiple_workers(self, mock_run):
+        """Test several workers are supervised through the app factory."""
+        result = runner.invoke(
+            app,
+            ["start", "--port", "9000", "--workers", "4", "--graceful-timeout", "5"],
+        )
+
+        assert result.exit_code == 0
+        mock_run.assert_called_once()
+        args, kwargs = mock_run.call_args
+        assert args[0] == "src.mcp_server.main:create_http_app"
+        assert kwargs["factory"] is True
+        assert kwargs["workers"] == 4
+        assert kwargs["port"] == 9000
+        assert kwargs["timeout_graceful_shutdown"] == 5
+
+    @patch("src.mcp_server.cli.uvicorn.run")
+    def test_start_rejects_invalid_worker_count(self, mock_run):
+        """Test a worker count below one is rejected."""
+        result = runner.invoke(app, ["start", "--workers", "0"])
+
+        assert result.exit_code == 1
+        mock_run.assert_not_called()
+
+
+class TestVersionCommand:
+    """Test cases for the version command."""
+
+    def test_version(self):
+        """Test the version command prints the package version."""
+        result = runner.invoke(app, ["version"])
+        assert result.exit_code == 0
+        assert "0.1.0" in result.output
+
+
+class TestHashKeyCommand:
+    """Test cases for the hash-key command."""
+
+    def test_hash_given_key(self):
+        """Test the key file line for a given key is printed."""
+        from src.mcp_server.middleware.auth import hash_key
+
+        result = runner.invoke(app, ["hash-key", "ci", "--key", "secret"])
+
+        assert result.exit_code == 0
+        assert result.output.strip() == f"ci {hash_key('secret')}"
+
+
+class TestStartupProfileCommand:
+    """Test cases for the startup-profile command."""
+
+    def test_startup_profile_reports_timings(self):
+        """Test a cold start is profiled in a fresh interpreter."""
+        result = runner.invoke(app, ["startup-profile", "--top", "3"])
+
+        assert result.exit_code == 0
+        report = json.loads(result.output)
+        assert report["import_seconds"] > 0
+        assert {"logging", "server", "tools"} <= set(report["phases"])
+        assert set(report["lazy_tool_import_seconds"]) == {
+            "Echo Message",
+            "Get Server Info",
+            "Get Resource Usage",
+            "Ping",
+        }
+        assert len(report["packages"]) == 3
+        assert len(report["slowest_imports"]) == 3
+
+
+class TestToolManifestCommand:
+    """Test cases for the tool-manifest command."""
+
+    def test_utility_manifest_is_up_to_date(self):
+        """Test the shipped manifest matches the utility tool functions."""
+        result = runner.invoke(app, ["tool-manifest", "--check"])
+        assert result.exit_code == 0, result.output
+
+    def test_regenerates_stale_manifest(self, tmp_path):
+        """Test a stale manifest is reported by --check and rewritten otherwise."""
+        path = tmp_path / "tools.json"
+        path.write_text(
+            json.dumps(
+                [{"name": "Ping", "target": "src.mcp_server.tools.utility:ping"}]
+            )
+        )
+
+        assert (
+            runner.invoke(app, ["tool-manifest", str(path), "--check"]).exit_code == 1
+        )
+        assert runner.invoke(app, ["tool-manifest", str(path)]).exit_code == 0
+        [entry] = json.loads(path.read_text())
+        assert entry["description"].strip().startswith("Simple ping tool")
+        assert entry["parameters"] == {"properties": {}, "type": "object"}
+
+
+class TestBenchSerializationCommand:
+    """Test cases for the bench-serialization command."""
+
+    def test_reports_every_backend_and_payload(self):
+        """Test the report covers the requested backends and validation."""
+        result = runner.invoke(
+            app,
+            [
+                "bench-serialization",
+                "-n",
+                "5",
+                "--rows",
+                "3",
+                "-b",
+                "stdlib",
+                "-b",
+                "pydantic",
+            ],
+        )
+
+        assert result.exit_code == 0
+        report = json.loads(result.output)
+        assert [(r["backend"], r["payload"]) for r in report["serialization"]] == [
+            ("stdlib", "small"),
+            ("stdlib", "large"),
+            ("pydantic", "small"),
+            ("pydantic", "large"),
+        ]
+        assert report["validation"]["compiled_run_us"] > 0
+
+    def test_rejects_unknown_backend(self):
+        """Test an unknown backend is an error."""
+        result = runner.invoke(app, ["bench-serialization", "-b", "yaml"])
+        assert result.exit_code == 1
+
+
+class TestProfileCommand:
+    """Test cases for the profile command."""
+
+    def test_profile_writes_collapsed_stacks(self, tmp_path):
+        """
+        Test a window is started, stopped, and its stacks written for a flame graph.
+        """
+        import httpx
+
+        requests = []
+
+        def handler(request):
+            requests.append(
+                (request.method, request.url.path, request.headers.get("authorization"))
+            )
+            if request.url.path.endswith("/start"):
+                return httpx.Response(202, json={"running": True})
+            return httpx.Response(
+                200,
+                json={
+                    "duration_seconds": 0.5,
+                    "cpu": {
+                        "samples": 100,
+                        "collapsed": "MainThread;main (app.py:1) 100\n",
+                    },
+                    "memory": {"top_allocators": []},
+                },
+            )
+
+        real_client = httpx.Client
+        output = tmp_path / "profile.folded"
+        with (
+            patch(
+                "httpx.Client",
+                lambda **kwargs: real_client(
+                    transport=httpx.MockTransport(handler), **kwargs
+                ),
+            ),
+            patch("time.sleep"),
+        ):
+            result = runner.invoke(
+                app, ["profile", "-s", "0.5", "-k", "secret", "-o", str(output)]
+            )
+
+        assert result.exit_code == 0
+        assert requests == [
+            ("POST", "/debug/profile/start", "Bearer secret"),
+            ("POST", "/debug/profile/stop", "Bearer secret"),
+        ]
+        assert output.read_text() == "MainThread;main (app.py:1) 100\n"
+        assert json.loads(result.output)["cpu"] == {"samples": 100}
+
+    def test_profile_reports_refusals(self):
+        """Test a refused start is an error."""
+        import httpx
+
+        real_client = httpx.Client
+        transport = httpx.MockTransport(
+            lambda request: httpx.Response(403, json={"error": "forbidden"})
+        )
+        with patch(
+            "httpx.Client", lambda **kwargs: real_client(transport=transport, **kwargs)
+        ):
+            result = runner.invoke(app, ["profile"])
+
+        assert result.exit_code == 1
+
+
+class TestReplayCommand:
+    """Test cases for the replay command."""
+
+    def setup_method(self):
+        # sse-starlette binds a process-wide event to the first event loop using it
+        AppStatus.should_exit_event = None
+
+    def test_replay_reports_latencies(self, tmp_path):
+        """Test a recording is replayed in-process and its report written."""
+        recording = tmp_path / "calls.jsonl"
+        recording.write_text(
+            "".join(
+                json.dumps(
+                    {
+                        "ts": 10 + i * 0.01,
+                        "tool": "Ping",
+                        "arguments": {},
+                        "duration_ms": 0.2,
+                        "result_bytes": 4,
+                        "client": "session:1",
+                    }
+                )
+                + "\n"
+                for i in range(3)
+            )
+        )
+        output = tmp_path / "report.json"
+
+        result = runner.invoke(
+            app, ["replay", str(recording), "--speed", "5", "-o", str(output)]
+        )
+
+        assert result.exit_code == 0
+        report = json.loads(output.read_text())
+        assert report["calls"] == 3
+        assert report["results"][0]["tool"] == "Ping"
+        assert report["results"][0]["errors"] == 0
+
+    def test_replay_reports_missing_recordings(self, tmp_path):
+        """Test a recording that cannot be read is an error."""
+        result = runner.invoke(app, ["replay", str(tmp_path / "missing.jsonl")])
+        assert result.exit_code == 1
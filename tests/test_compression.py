@@ -0,0 +1,149 @@
+"""
+Tests for response compression.
+"""
+
+import zlib
+
+import pytest
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.responses import PlainTextResponse, Response, StreamingResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from src.mcp_server.middleware import compression
+from src.mcp_server.middleware.compression import (
+    CompressionMiddleware,
+    Encoder,
+    GzipEncoder,
+    negotiate_encoding,
+)
+
+LARGE = "x" * 4096
+
+
+async def large(request):
+    return PlainTextResponse(LARGE)
+
+
+async def small(request):
+    return PlainTextResponse("small")
+
+
+async def image(request):
+    return Response(b"\x89PNG" + b"0" * 4096, media_type="image/png")
+
+
+async def events(request):
+    async def stream():
+        for i in range(3):
+            yield f"event: message\ndata: {i}\n\n"
+
+    return StreamingResponse(stream(), media_type="text/event-stream")
+
+
+def _client(**options):
+    app = Starlette(
+        routes=[
+            Route("/large", large),
+            Route("/small", small),
+            Route("/image", image),
+            Route("/events", events),
+        ],
+        middleware=[Middleware(CompressionMiddleware, **options)],
+    )
+    return TestClient(app)
+
+
+class TestNegotiateEncoding:
+    """Test cases for negotiate_encoding."""
+
+    @pytest.mark.parametrize(
+        "header, expected",
+        [
+            ("gzip, deflate", "gzip"),
+            ("gzip, zstd", "zstd"),
+            ("zstd;q=0.5, gzip", "gzip"),
+            ("gzip;q=0", None),
+            ("*", "zstd"),
+            ("br", None),
+            ("", None),
+        ],
+    )
+    def test_negotiation(self, header, expected):
+        """Test q-values and server preference decide the encoding."""
+        assert negotiate_encoding(header, ["zstd", "gzip"]) == expected
+
+
+class TestEncoder:
+    """Test cases for the Encoder interface."""
+
+    def test_is_abstract(self):
+        """Test encoders must implement compress and finish."""
+        with pytest.raises(TypeError):
+            Encoder()
+
+
+class TestGzipEncoder:
+    """Test cases for GzipEncoder."""
+
+    def test_flushed_chunks_decode_incrementally(self):
+        """Test every compressed chunk can be decoded before the stream ends."""
+        encoder = GzipEncoder()
+        decoder = zlib.decompressobj(zlib.MAX_WBITS | 16)
+
+        assert decoder.decompress(encoder.compress(b"first")) == b"first"
+        assert decoder.decompress(encoder.finish(b"last")) == b"last"
+
+
+class TestCompressionMiddleware:
+    """Test cases for CompressionMiddleware."""
+
+    def test_large_response_is_gzipped(self):
+        """Test bodies above the threshold are compressed."""
+        with _client() as client:
+            response = client.get("/large", headers={"accept-encoding": "gzip"})
+
+        assert response.headers["content-encoding"] == "gzip"
+        assert "accept-encoding" in response.headers["vary"].lower()
+        assert int(response.headers["content-length"]) < len(LARGE)
+        assert response.text == LARGE
+
+    def test_small_and_unaccepted_responses_are_not_compressed(self):
+        """Test small bodies and clients without Accept-Encoding get plain responses."""
+        with _client() as client:
+            small_response = client.get("/small", headers={"accept-encoding": "gzip"})
+            identity = client.get("/large", headers={"accept-encoding": "identity"})
+
+        assert "content-encoding" not in small_response.headers
+        assert small_response.text == "small"
+        assert "content-encoding" not in identity.headers
+
+    def test_compressed_media_is_skipped(self):
+        """Test already compressed content types are sent as is."""
+        with _client() as client:
+            response = client.get("/image", headers={"accept-encoding": "gzip"})
+
+        assert "content-encoding" not in response.headers
+
+    def test_event_stream_is_compressed_per_chunk(self):
+        """Test streamed responses are compressed without a content length."""
+        with _client(minimum_size=10) as client:
+            response = client.get("/events", headers={"accept-encoding": "gzip"})
+
+        assert response.headers["content-encoding"] == "gzip"
+        assert "content-length" not in response.headers
+        assert response.text == "".join(
+            f"event: message\ndata: {i}\n\n" for i in range(3)
+        )
+
+    @pytest.mark.skipif(
+        compression.zstandard is None, reason="zstandard is not installed"
+    )
+    def test_zstd(self):
+        """Test zstd is preferred when the client accepts it."""
+        with _client() as client:
+            response = client.get("/large", headers={"accept-encoding": "gzip, zstd"})
+
+        assert response.headers["content-encoding"] == "zstd"
+        assert response.text == LARGE
@@ -1,16 +1,23 @@
 """
 Tests for configuration module.
 """
+
 import os
-import pytest
 from unittest import mock
 
+import pytest
+
 from src.mcp_server.config.config import (
-    ServerConfig,
+    AppConfig,
+    CacheConfig,
+    ExecutorConfig,
     LoggingConfig,
+    SchedulingConfig,
     SecurityConfig,
-    AppConfig,
-    load_config
+    ServerConfig,
+    TimeoutConfig,
+    load_config,
+    read_env,
 )
 
 
@@ -38,6 +45,8 @@ class TestConfigModels:
         assert "%(asctime)s" in config.format
         assert config.file_enabled is True
         assert config.file_dir == "logs"
+        assert config.async_enabled is False
+        assert config.overflow_policy == "drop"
 
     def test_security_config_defaults(self):
         """Test SecurityConfig default values."""
@@ -47,6 +56,25 @@ class TestConfigModels:
         assert config.cors_enabled is True
         assert config.cors_origins == ["*"]
 
+    def test_scheduling_and_timeouts_are_off_by_default(self):
+        """Test the scheduler and tool timeouts are opt-in."""
+        assert SchedulingConfig().enabled is False
+        assert TimeoutConfig().enabled is False
+
+    def test_cache_config_defaults(self):
+        """Test CacheConfig default values."""
+        config = CacheConfig()
+        assert config.enabled is True
+        assert config.max_size == 1024
+        assert config.ttl_seconds == 300.0
+
+    def test_executor_config_defaults(self):
+        """Test ExecutorConfig default values."""
+        config = ExecutorConfig()
+        assert config.max_threads is None
+        assert config.process_pool_enabled is False
+        assert config.default_concurrency is None
+
     def test_app_config_defaults(self):
         """Test AppConfig default values."""
         config = AppConfig()
@@ -54,21 +82,56 @@ class TestConfigModels:
         assert isinstance(config.server, ServerConfig)
         assert isinstance(config.logging, LoggingConfig)
         assert isinstance(config.security, SecurityConfig)
+        assert isinstance(config.cache, CacheConfig)
+        assert isinstance(config.executor, ExecutorConfig)
 
 
 class TestLoadConfig:
     """Test cases for load_config function."""
 
-    @mock.patch.dict(os.environ, {
-        "APP_NAME": "test_app",
-        "HOST": "127.0.0.1",
-        "PORT": "9000",
-        "DEBUG": "true",
-        "LOG_LEVEL": "DEBUG",
-        "API_KEY_ENABLED": "true",
-        "API_KEY": "test_key",
-        "CORS_ORIGINS": "origin1.com,origin2.com"
-    })
+    @mock.patch.dict(
+        os.environ,
+        {
+            "APP_NAME": "test_app",
+            "HOST": "127.0.0.1",
+            "PORT": "9000",
+            "DEBUG": "true",
+            "LOG_LEVEL": "DEBUG",
+            "API_KEY_ENABLED": "true",
+            "API_KEY": "test_key",
+            "CORS_ORIGINS": "origin1.com,origin2.com",
+            "LOG_ASYNC_ENABLED": "true",
+            "LOG_QUEUE_SIZE": "500",
+            "LOG_OVERFLOW_POLICY": "block",
+            "RATE_LIMIT_ENABLED": "true",
+            "RATE_LIMIT_TOOL_COSTS": "Ping:0,Get Server Info:2.5",
+            "PLUGINS_ALLOW": "weather, maps",
+            "PLUGINS_DISABLED": "maps",
+            "BATCH_MAX_CONCURRENCY": "4",
+            "API_KEYS_FILE": "/etc/mcp/keys",
+            "AUTH_EXEMPT_PATHS": "/healthz,/readyz",
+            "COMPRESSION_MINIMUM_SIZE": "512",
+            "JSON_BACKEND": "STDLIB",
+            "HEALTH_CACHE_TTL": "0.5",
+            "HEALTH_MAX_EXECUTOR_QUEUE_DEPTH": "100",
+            "RESOURCE_MAX_RSS_MB": "512",
+            "RESOURCE_MAX_IN_FLIGHT_CALLS": "64",
+            "SESSIONS_MAX": "100",
+            "SESSIONS_BACKEND": "SQLite",
+            "POOL_MAX_SIZES": "db:20, http:50",
+            "TRACING_SAMPLE_RATE": "0.25",
+            "TRACING_EXPORTER": "OTLP",
+            "PROFILING_ENABLED": "true",
+            "PROFILING_ADMIN_KEYS": "ops, oncall",
+            "IDEMPOTENCY_TTL": "60",
+            "IDEMPOTENCY_BACKEND": "SQLite",
+            "SCHEDULING_TOOL_CLASSES": "Search:background, Ping:interactive",
+            "TOOL_TIMEOUTS": "Search:2.5",
+            "LOG_JSON": "true",
+            "RECORDING_TOOLS": "Search, Ping",
+            "LOG_TOOL_LEVELS": "Search:debug",
+        },
+    )
     def test_load_config_from_env(self):
         """Test loading configuration from environment variables."""
         config = load_config()
@@ -79,14 +142,48 @@ class TestLoadConfig:
         assert config.server.port == 9000
         assert config.server.debug is True
         assert config.logging.level == "DEBUG"
+        assert config.logging.async_enabled is True
+        assert config.logging.queue_size == 500
+        assert config.logging.overflow_policy == "block"
+        assert config.logging.json_enabled is True
+        assert config.logging.tool_levels == {"Search": "DEBUG"}
+        assert config.rate_limit.enabled is True
+        assert config.rate_limit.tool_costs == {"Ping": 0.0, "Get Server Info": 2.5}
+        assert config.plugins.allow == ["weather", "maps"]
+        assert config.plugins.disabled == ["maps"]
+        assert config.batch.max_concurrency == 4
+        assert config.compression.minimum_size == 512
+        assert config.serialization.backend == "stdlib"
+        assert config.health.cache_ttl == 0.5
+        assert config.health.max_executor_queue_depth == 100
+        assert config.resources.max_rss_mb == 512
+        assert config.resources.max_in_flight_calls == 64
+        assert config.sessions.max_sessions == 100
+        assert config.sessions.backend == "sqlite"
+        assert config.pools.max_sizes == {"db": 20, "http": 50}
+        assert config.tracing.sample_rate == 0.25
+        assert config.tracing.exporter == "otlp"
+        assert config.profiling.enabled is True
+        assert config.profiling.admin_keys == ["ops", "oncall"]
+        assert config.idempotency.ttl == 60.0
+        assert config.idempotency.backend == "sqlite"
+        assert config.scheduling.tool_classes == {
+            "Search": "background",
+            "Ping": "interactive",
+        }
+        assert config.timeouts.tool_timeouts == {"Search": 2.5}
+        assert config.recording.tools == ["Search", "Ping"]
         assert config.security.api_key_enabled is True
         assert config.security.api_key == "test_key"
+        assert config.security.api_keys_file == "/etc/mcp/keys"
+        assert config.security.auth_exempt_paths == ["/healthz", "/readyz"]
         assert "origin1.com" in config.security.cors_origins
         assert "origin2.com" in config.security.cors_origins
 
     def test_load_config_with_defaults(self):
         """Test loading configuration with default values when env vars are not set."""
-        # Use a context manager to temporarily clear any environment variables that might affect the test
+        # Use a context manager to temporarily clear any environment variables that
+        # might affect the test
         with mock.patch.dict(os.environ, {}, clear=True):
             config = load_config()
 
@@ -96,3 +193,76 @@ class TestLoadConfig:
             assert config.server.port == 8000
             assert config.server.debug is False
             assert config.logging.level == "INFO"
+            assert config.plugins.allow is None
+
+
+class TestConfigLayers:
+    """Test cases for configuration files and layering."""
+
+    def test_file_env_and_overrides_take_precedence_in_order(self, tmp_path):
+        """
+        Test the file overrides defaults, the environment the file, and overrides
+        everything.
+        """
+        config_file = tmp_path / "server.toml"
+        config_file.write_text(
+            'app_name = "from_file"\n'
+            '[server]\nport = 7000\nhost = "10.0.0.1"\n'
+            "[rate_limit]\nburst = 5\ntool_costs = { Ping = 0.5 }\n"
+        )
+        with mock.patch.dict(os.environ, {"PORT": "9000"}, clear=True):
+            config = load_config(
+                str(config_file), overrides={"server": {"host": "127.0.0.1"}}
+            )
+
+        assert config.app_name == "from_file"
+        assert config.server.port == 9000
+        assert config.server.host == "127.0.0.1"
+        assert config.server.workers == 1
+        assert config.rate_limit.burst == 5.0
+        assert config.rate_limit.tool_costs == {"Ping": 0.5}
+
+    def test_yaml_file_from_environment(self, tmp_path):
+        """Test a YAML file named by MCP_CONFIG_FILE is read."""
+        pytest.importorskip("yaml")
+        config_file = tmp_path / "server.yaml"
+        config_file.write_text(
+            "logging:\n  level: DEBUG\ntracing:\n  sample_rate: 0.5\n"
+        )
+
+        with mock.patch.dict(
+            os.environ, {"MCP_CONFIG_FILE": str(config_file)}, clear=True
+        ):
+            config = load_config()
+
+        assert config.logging.level == "DEBUG"
+        assert config.tracing.sample_rate == 0.5
+
+    def test_invalid_files_are_rejected(self, tmp_path):
+        """Test unknown settings, invalid values and unknown formats are errors."""
+        unknown = tmp_path / "unknown.toml"
+        unknown.write_text("[rate_limit]\nburts = 5\n")
+        invalid = tmp_path / "invalid.toml"
+        invalid.write_text("[tracing]\nsample_rate = 2\n")
+        other = tmp_path / "server.ini"
+        other.write_text("")
+        unknown_class = tmp_path / "classes.toml"
+        unknown_class.write_text('[scheduling]\ntool_classes = { Search = "urgent" }\n')
+
+        with mock.patch.dict(os.environ, {}, clear=True):
+            with pytest.raises(ValueError, match="burts"):
+                load_config(str(unknown))
+            with pytest.raises(ValueError, match="sample_rate"):
+                load_config(str(invalid))
+            with pytest.raises(ValueError, match="Unsupported"):
+                load_config(str(other))
+            with pytest.raises(ValueError, match="urgent"):
+                load_config(str(unknown_class))
+
+    def test_read_env_only_returns_set_variables(self):
+        """Test unset variables leave the lower layers alone."""
+        assert read_env({"PORT": "9000", "API_KEY_HEADER": "x-key"}) == {
+            "server": {"port": 9000},
+            "security": {"api_key_header": "x-key"},
+            "rate_limit": {"api_key_header": "x-key"},
+        }
@@ -0,0 +1,206 @@
+"""
+Tests for the tool execution layer.
+"""
+
+import asyncio
+import inspect
+import os
+import threading
+import time
+
+import pytest
+
+from src.mcp_server.utils.cancellation import CallCancelledError, check_cancelled
+from src.mcp_server.utils.executor import ToolExecutor, ToolLimiter
+
+
+def _square_with_pid(x: int):
+    """Module-level function so process-pool workers can import it."""
+    return x * x, os.getpid()
+
+
+class TestToolLimiter:
+    """Test cases for the per-tool concurrency limiter."""
+
+    def test_limit_and_queue_depth(self):
+        """Test calls beyond the limit wait and are counted as queued."""
+        limiter = ToolLimiter("slow", max_concurrency=2)
+        peak_running = 0
+
+        async def call():
+            nonlocal peak_running
+            await limiter.acquire()
+            try:
+                peak_running = max(peak_running, limiter.running)
+                await asyncio.sleep(0.01)
+            finally:
+                limiter.release()
+
+        async def run():
+            await asyncio.gather(*(call() for _ in range(6)))
+
+        asyncio.run(run())
+        assert peak_running == 2
+        assert limiter.peak_waiting == 4
+        assert limiter.running == 0
+        assert limiter.waiting == 0
+
+    def test_cancelled_waiter_is_removed(self):
+        """Test a cancelled waiter does not leak a slot."""
+        limiter = ToolLimiter("slow", max_concurrency=1)
+
+        async def run():
+            await limiter.acquire()
+            waiter = asyncio.create_task(limiter.acquire())
+            await asyncio.sleep(0)
+            waiter.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await waiter
+            limiter.release()
+
+        asyncio.run(run())
+        assert limiter.running == 0
+        assert limiter.waiting == 0
+
+    def test_unlimited(self):
+        """Test a limiter without a limit never queues."""
+        limiter = ToolLimiter("fast")
+        assert limiter.stats()["max_concurrency"] is None
+
+
+class TestToolExecutor:
+    """Test cases for the ToolExecutor class."""
+
+    def setup_method(self):
+        """Create a fresh executor for each test."""
+        self.executor = ToolExecutor(max_threads=4)
+
+    def teardown_method(self):
+        """Shut down the executor pools."""
+        self.executor.shutdown()
+
+    def test_sync_tool_runs_in_thread_pool(self):
+        """Test offloaded sync tools run off the event loop thread."""
+
+        @self.executor.offload(name="blocking")
+        def blocking(name: str = "World") -> str:
+            return threading.current_thread().name
+
+        assert inspect.iscoroutinefunction(blocking)
+        assert list(inspect.signature(blocking).parameters) == ["name"]
+        thread_name = asyncio.run(blocking())
+        assert thread_name.startswith("mcp-tool")
+
+    def test_blocking_tool_does_not_stall_event_loop(self):
+        """Test a blocking tool leaves the loop free for other calls."""
+
+        @self.executor.offload(name="sleepy")
+        def sleepy() -> str:
+            time.sleep(0.2)
+            return "done"
+
+        async def ping() -> float:
+            started = time.perf_counter()
+            await asyncio.sleep(0)
+            return time.perf_counter() - started
+
+        async def run():
+            slow = asyncio.create_task(sleepy())
+            await asyncio.sleep(0.01)
+            ping_latency = await ping()
+            return await slow, ping_latency
+
+        result, ping_latency = asyncio.run(run())
+        assert result == "done"
+        assert ping_latency < 0.1
+
+    def test_per_tool_limit_and_stats(self):
+        """Test the per-tool limit caps concurrent calls and stats are reported."""
+        active = 0
+        peak = 0
+        lock = threading.Lock()
+
+        @self.executor.offload(name="limited", max_concurrency=1)
+        def limited() -> None:
+            nonlocal active, peak
+            with lock:
+                active += 1
+                peak = max(peak, active)
+            time.sleep(0.02)
+            with lock:
+                active -= 1
+
+        async def run():
+            await asyncio.gather(*(limited() for _ in range(4)))
+
+        asyncio.run(run())
+        assert peak == 1
+        stats = self.executor.stats()["limited"]
+        assert stats["completed"] == 4
+        assert stats["peak_waiting"] == 3
+        assert stats["max_concurrency"] == 1
+
+    def test_cancelled_thread_call_stops_cooperatively(self):
+        """
+        Test cancelling a running thread call signals the tool and holds its slot until
+        it returns.
+        """
+        stopped = threading.Event()
+
+        @self.executor.offload(name="steps", max_concurrency=1)
+        def steps() -> None:
+            try:
+                for _ in range(100):
+                    check_cancelled()
+                    time.sleep(0.05)
+            except CallCancelledError:
+                stopped.set()
+                raise
+
+        async def run():
+            call = asyncio.create_task(steps())
+            await asyncio.sleep(0.05)
+            call.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await call
+            held = self.executor.stats()["steps"]
+            await asyncio.sleep(0.2)
+            return held
+
+        held = asyncio.run(run())
+        assert stopped.is_set()
+        assert held["running"] == 1 and held["abandoned"] == 1
+        stats = self.executor.stats()["steps"]
+        assert stats["cancelled"] == 1
+        assert stats["running"] == 0 and stats["abandoned"] == 0
+
+    def test_async_tool_is_limited_but_not_offloaded(self):
+        """Test coroutine tools are awaited on the loop under their limit."""
+
+        @self.executor.offload(name="async-tool", max_concurrency=2)
+        async def async_tool(x: int) -> int:
+            return x + 1
+
+        assert asyncio.run(async_tool(1)) == 2
+        assert self.executor.stats()["async-tool"]["completed"] == 1
+
+    def test_cpu_bound_tool_runs_in_process_pool(self):
+        """Test CPU-bound tools run in a separate process when enabled."""
+        executor = ToolExecutor(process_pool_enabled=True, max_processes=1)
+        try:
+            square = executor.offload(name="square", cpu_bound=True)(_square_with_pid)
+            result, pid = asyncio.run(square(7))
+            assert result == 49
+            assert pid != os.getpid()
+        finally:
+            executor.shutdown()
+
+    def test_cpu_bound_tool_must_be_module_level(self):
+        """Test nested functions are rejected for the process pool."""
+        executor = ToolExecutor(process_pool_enabled=True)
+
+        def nested() -> None:
+            pass
+
+        with pytest.raises(ValueError):
+            executor.offload(cpu_bound=True)(nested)
@@ -0,0 +1,128 @@
+"""
+Tests for the health endpoints.
+"""
+
+import asyncio
+from unittest.mock import patch
+
+from fastmcp import FastMCP
+from starlette.testclient import TestClient
+
+from src.mcp_server.middleware.health import (
+    HealthRegistry,
+    executor_queue_check,
+    readiness_check,
+    register_health_routes,
+)
+
+
+class TestHealthRegistry:
+    """Test cases for HealthRegistry."""
+
+    def test_ready_without_checks(self):
+        """Test a registry without checks is ready."""
+        status_code, body = asyncio.run(HealthRegistry().readiness())
+        assert status_code == 200
+        assert body == b'{"status":"ready","checks":{}}'
+
+    def test_failing_checks_are_reported(self):
+        """Test false results, exceptions and timeouts fail readiness."""
+        registry = HealthRegistry(check_timeout=0.01)
+
+        async def slow():
+            await asyncio.sleep(1)
+            return True
+
+        def broken():
+            raise RuntimeError("pool closed")
+
+        registry.add_check("ok", lambda: True)
+        registry.add_check("warming", lambda: False)
+        registry.add_check("broken", broken)
+        registry.add_check("slow", slow)
+
+        report = asyncio.run(registry.run_checks())
+
+        assert report["status"] == "not ready"
+        assert report["checks"]["ok"] == {"ready": True}
+        assert report["checks"]["warming"] == {"ready": False}
+        assert report["checks"]["broken"] == {"ready": False, "error": "pool closed"}
+        assert report["checks"]["slow"]["error"].startswith("Timed out")
+
+    def test_results_are_cached(self):
+        """Test checks run once per cache interval."""
+        registry = HealthRegistry(cache_ttl=60)
+        calls = []
+        registry.add_check("counted", lambda: calls.append(1) or True)
+
+        async def probe():
+            await asyncio.gather(*(registry.readiness() for _ in range(10)))
+            await registry.readiness()
+
+        asyncio.run(probe())
+        assert len(calls) == 1
+
+    def test_adding_a_check_invalidates_the_cache(self):
+        """Test a new check is seen by the next probe."""
+        registry = HealthRegistry(cache_ttl=60)
+        assert asyncio.run(registry.readiness())[0] == 200
+
+        registry.add_check("down", lambda: False)
+        assert asyncio.run(registry.readiness())[0] == 503
+
+        registry.remove_check("down")
+        assert asyncio.run(registry.readiness())[0] == 200
+
+    def test_readiness_check_decorator(self):
+        """Test the decorator registers the function unchanged."""
+        registry = HealthRegistry()
+
+        @readiness_check("index", registry=registry)
+        async def index_loaded():
+            return False
+
+        assert asyncio.run(index_loaded()) is False
+        assert asyncio.run(registry.readiness())[0] == 503
+
+    def test_executor_queue_check(self):
+        """Test the executor check fails above the queue depth limit."""
+        check = executor_queue_check(2)
+        executor = type(
+            "Executor",
+            (),
+            {"stats": lambda self: {"a": {"waiting": 1}, "b": {"waiting": 2}}},
+        )()
+        with patch(
+            "src.mcp_server.middleware.health.get_executor", return_value=executor
+        ):
+            registry = HealthRegistry()
+            registry.add_check("executor", check)
+            report = asyncio.run(registry.run_checks())
+        assert report["checks"]["executor"] == {
+            "ready": False,
+            "error": "3 calls waiting for the executor, limit 2",
+        }
+
+
+class TestHealthRoutes:
+    """Test cases for the HTTP routes."""
+
+    def test_liveness_and_readiness_routes(self):
+        """Test the probes answer without an MCP session."""
+        mcp = FastMCP("test")
+        registry = register_health_routes(mcp, registry=HealthRegistry(cache_ttl=0))
+
+        with TestClient(mcp.http_app()) as client:
+            live = client.get("/healthz")
+            assert live.status_code == 200
+            assert live.json() == {"status": "ok"}
+            assert client.get("/readyz").status_code == 200
+
+            registry.add_check("database", lambda: False)
+            ready = client.get("/readyz")
+            assert ready.status_code == 503
+            assert ready.json() == {
+                "status": "not ready",
+                "checks": {"database": {"ready": False}},
+            }
+            assert ready.headers["cache-control"] == "no-store"
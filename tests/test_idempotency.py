@@ -0,0 +1,189 @@
+"""
+Tests for idempotent tool calls.
+"""
+
+import asyncio
+
+import pytest
+from fastmcp import FastMCP
+
+from src.mcp_server.middleware.idempotency import (
+    IdempotencyMiddleware,
+    InMemoryIdempotencyStore,
+    SQLiteIdempotencyStore,
+)
+from src.mcp_server.middleware.tool_calls import add_tool_call_middleware, call_tool
+
+
+def _server(middleware):
+    mcp = FastMCP("test")
+    mcp.runs = []
+    mcp.release = None
+
+    @mcp.tool("Create")
+    async def create(name: str) -> str:
+        mcp.runs.append(name)
+        if mcp.release is not None:
+            await mcp.release.wait()
+        if name == "fail" and mcp.runs.count("fail") == 1:
+            raise RuntimeError("temporary failure")
+        return f"{name}-{len(mcp.runs)}"
+
+    add_tool_call_middleware(mcp, middleware)
+    return mcp
+
+
+async def _call(mcp, name, key=None):
+    meta = {"idempotencyKey": key} if key is not None else None
+    content = await call_tool(mcp, "Create", {"name": name}, meta=meta)
+    return content[0].text
+
+
+class TestIdempotencyMiddleware:
+    """Test cases for IdempotencyMiddleware."""
+
+    def test_completed_calls_are_replayed(self):
+        """
+        Test a retry with the same key gets the stored result without running the tool.
+        """
+        middleware = IdempotencyMiddleware()
+        mcp = _server(middleware)
+
+        async def scenario():
+            return [
+                await _call(mcp, "a", key="k1"),
+                await _call(mcp, "a", key="k1"),
+                await _call(mcp, "a", key="k2"),
+                await _call(mcp, "a"),
+            ]
+
+        assert asyncio.run(scenario()) == ["a-1", "a-1", "a-2", "a-3"]
+        assert middleware.executed == 2
+        assert middleware.replayed == 1
+
+    def test_duplicates_attach_to_the_call_in_flight(self):
+        """Test concurrent duplicates wait for the first call and share its result."""
+        middleware = IdempotencyMiddleware()
+        mcp = _server(middleware)
+
+        async def scenario():
+            mcp.release = asyncio.Event()
+            calls = [asyncio.create_task(_call(mcp, "a", key="k")) for _ in range(3)]
+            await asyncio.sleep(0.01)
+            mcp.release.set()
+            return await asyncio.gather(*calls)
+
+        assert asyncio.run(scenario()) == ["a-1"] * 3
+        assert mcp.runs == ["a"]
+        assert middleware.attached == 2
+
+    def test_failures_are_not_stored(self):
+        """Test a retry after a failed call runs the tool again."""
+        mcp = _server(IdempotencyMiddleware())
+
+        async def scenario():
+            with pytest.raises(Exception, match="temporary failure"):
+                await _call(mcp, "fail", key="k")
+            return await _call(mcp, "fail", key="k")
+
+        assert asyncio.run(scenario()) == "fail-2"
+
+    def test_cancelled_call_is_run_by_a_duplicate(self):
+        """Test duplicates of a cancelled call run the tool themselves."""
+        mcp = _server(IdempotencyMiddleware())
+
+        async def scenario():
+            mcp.release = asyncio.Event()
+            first = asyncio.create_task(_call(mcp, "a", key="k"))
+            await asyncio.sleep(0.01)
+            duplicate = asyncio.create_task(_call(mcp, "a", key="k"))
+            await asyncio.sleep(0.01)
+            first.cancel()
+            await asyncio.sleep(0.01)
+            mcp.release.set()
+            return await duplicate
+
+        assert asyncio.run(scenario()) == "a-2"
+
+    def test_key_reuse_and_invalid_keys_are_rejected(self):
+        """Test a key reused with other arguments, or a malformed key, is an error."""
+        middleware = IdempotencyMiddleware()
+        mcp = _server(middleware)
+
+        async def scenario():
+            await _call(mcp, "a", key="k")
+            with pytest.raises(Exception, match="different call"):
+                await _call(mcp, "b", key="k")
+            with pytest.raises(Exception, match="idempotencyKey"):
+                await _call(mcp, "a", key=42)
+
+        asyncio.run(scenario())
+        assert middleware.conflicts == 1
+        assert mcp.runs == ["a"]
+
+    def test_results_expire(self):
+        """Test a result is only replayed for the TTL."""
+        mcp = _server(IdempotencyMiddleware(ttl=0.05))
+
+        async def scenario():
+            first = await _call(mcp, "a", key="k")
+            await asyncio.sleep(0.1)
+            return first, await _call(mcp, "a", key="k")
+
+        assert asyncio.run(scenario()) == ("a-1", "a-2")
+
+
+class TestStores:
+    """Test cases for the idempotency stores."""
+
+    def test_in_memory_store_is_bounded(self):
+        """Test the oldest entries are dropped over the bound."""
+        store = InMemoryIdempotencyStore(max_entries=2)
+
+        async def scenario():
+            for key in ("a", "b", "c"):
+                assert await store.claim(key, "f", 1e12) is None
+            return await store.claim("a", "f", 1e12)
+
+        assert asyncio.run(scenario()) is None
+        assert len(store) == 2
+
+    def test_sqlite_store_is_shared_by_workers(self, tmp_path):
+        """
+        Test a duplicate on another worker waits for the call in flight and gets its
+        result.
+        """
+        path = str(tmp_path / "idempotency.db")
+        first = _server(IdempotencyMiddleware(SQLiteIdempotencyStore(path)))
+        second = _server(
+            IdempotencyMiddleware(SQLiteIdempotencyStore(path), poll_interval=0.01)
+        )
+
+        async def scenario():
+            first.release = asyncio.Event()
+            running = asyncio.create_task(_call(first, "a", key="k"))
+            await asyncio.sleep(0.01)
+            duplicate = asyncio.create_task(_call(second, "a", key="k"))
+            await asyncio.sleep(0.05)
+            assert not duplicate.done()
+            first.release.set()
+            return await running, await duplicate, await _call(second, "a", key="k")
+
+        assert asyncio.run(scenario()) == ("a-1", "a-1", "a-1")
+        assert first.runs == ["a"]
+        assert second.runs == []
+
+    def test_sqlite_lease_expiry_takes_over(self, tmp_path):
+        """Test a call whose worker disappeared is run again after its lease."""
+        store = SQLiteIdempotencyStore(str(tmp_path / "idempotency.db"))
+
+        async def scenario():
+            assert await store.claim("k", "f", 0.0) is None
+            assert await store.claim("k", "f", 1e12) is None
+            try:
+                return await store.claim("k", "f", 1e12)
+            finally:
+                await store.close()
+
+        held = asyncio.run(scenario())
+        assert held is not None and held.content is None
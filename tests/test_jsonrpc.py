@@ -0,0 +1,190 @@
+"""
+Tests for the JSON-RPC middleware helpers.
+"""
+
+import asyncio
+import json
+
+import pytest
+
+from src.mcp_server.middleware.jsonrpc import (
+    BodyTooLarge,
+    ToolCallBodyMiddleware,
+    get_header,
+    parse_tool_calls,
+    read_body,
+    read_tool_calls,
+    replay_receive,
+)
+
+
+def _tool_call(name, request_id=1, arguments=None, meta=None):
+    params = {"name": name, "arguments": arguments or {}}
+    if meta is not None:
+        params["_meta"] = meta
+    return {
+        "jsonrpc": "2.0",
+        "id": request_id,
+        "method": "tools/call",
+        "params": params,
+    }
+
+
+class TestParseToolCalls:
+    """Test cases for parse_tool_calls."""
+
+    def test_single_tool_call(self):
+        """Test a single tools/call request is parsed."""
+        body = json.dumps(_tool_call("Ping", meta={"progressToken": 1})).encode()
+        calls = parse_tool_calls(body)
+        assert len(calls) == 1
+        assert calls[0].name == "Ping"
+        assert calls[0].request_id == 1
+        assert calls[0].meta == {"progressToken": 1}
+
+    def test_batch_skips_other_methods(self):
+        """Test batches yield only their tool calls."""
+        body = json.dumps(
+            [
+                {"jsonrpc": "2.0", "id": 1, "method": "tools/list"},
+                _tool_call("Echo Message", 2, {"message": "hi"}),
+                _tool_call("Ping", 3),
+            ]
+        ).encode()
+        calls = parse_tool_calls(body)
+        assert [call.name for call in calls] == ["Echo Message", "Ping"]
+        assert calls[0].arguments == {"message": "hi"}
+
+    def test_invalid_bodies(self):
+        """Test malformed bodies yield no tool calls."""
+        assert parse_tool_calls(b"not json") == []
+        assert parse_tool_calls(b'{"method": "tools/call", "params": {}}') == []
+        assert parse_tool_calls(b"[1, 2]") == []
+
+
+class TestBodyReplay:
+    """Test cases for reading and replaying request bodies."""
+
+    def test_read_and_replay(self):
+        """Test a chunked body is read whole and replayed once."""
+        messages = [
+            {"type": "http.request", "body": b"ab", "more_body": True},
+            {"type": "http.request", "body": b"cd", "more_body": False},
+            {"type": "http.disconnect"},
+        ]
+
+        async def receive():
+            return messages.pop(0)
+
+        async def run():
+            body = await read_body(receive)
+            replay = replay_receive(body, receive)
+            return body, await replay(), await replay()
+
+        body, first, second = asyncio.run(run())
+        assert body == b"abcd"
+        assert first == {"type": "http.request", "body": b"abcd", "more_body": False}
+        assert second == {"type": "http.disconnect"}
+
+    def test_get_header(self):
+        """Test headers are looked up by lower-case name."""
+        scope = {"headers": [(b"x-api-key", b"secret")]}
+        assert get_header(scope, "x-api-key") == "secret"
+        assert get_header(scope, "authorization") is None
+
+    def test_read_body_limit(self):
+        """Test bodies over the size limit are refused."""
+        messages = [
+            {"type": "http.request", "body": b"ab", "more_body": True},
+            {"type": "http.request", "body": b"cd", "more_body": False},
+        ]
+
+        async def receive():
+            return messages.pop(0)
+
+        with pytest.raises(BodyTooLarge):
+            asyncio.run(read_body(receive, max_body_bytes=3))
+
+
+def _receiver(body):
+    messages = [{"type": "http.request", "body": body, "more_body": False}]
+
+    async def receive():
+        return messages.pop(0) if messages else {"type": "http.disconnect"}
+
+    return receive
+
+
+class TestReadToolCalls:
+    """Test cases for sharing the body and tool calls of a request."""
+
+    def test_body_is_read_and_parsed_once(self):
+        """Test a second reader reuses the body and tool calls of the first."""
+        body = json.dumps(_tool_call("Ping")).encode()
+        scope = {"type": "http"}
+
+        async def run():
+            first, receive = await read_tool_calls(scope, _receiver(body))
+            second, replay = await read_tool_calls(scope, receive)
+            return first, second, await replay()
+
+        first, second, message = asyncio.run(run())
+        assert [call.name for call in first] == ["Ping"]
+        assert second is first
+        assert message["body"] == body
+
+
+class TestToolCallBodyMiddleware:
+    """Test cases for ToolCallBodyMiddleware."""
+
+    def _run(self, middleware, body, headers=()):
+        scope = {
+            "type": "http",
+            "method": "POST",
+            "path": "/mcp",
+            "headers": list(headers),
+        }
+        sent = []
+        seen = {}
+
+        async def send(message):
+            sent.append(message)
+
+        async def run():
+            await middleware(scope, _receiver(body), send)
+
+        async def app(scope, receive, send):
+            seen["calls"], _ = await read_tool_calls(scope, receive)
+            seen["body"] = (await receive())["body"]
+
+        middleware.app = app
+        asyncio.run(run())
+        return sent, seen
+
+    def test_body_is_shared(self):
+        """Test the body is replayed and its tool calls are available downstream."""
+        body = json.dumps(_tool_call("Ping")).encode()
+        sent, seen = self._run(ToolCallBodyMiddleware(None, max_body_bytes=1024), body)
+        assert sent == []
+        assert seen["body"] == body
+        assert [call.name for call in seen["calls"]] == ["Ping"]
+
+    def test_large_body_is_rejected(self):
+        """Test bodies over the limit are answered with 413 and not passed on."""
+        body = json.dumps(
+            _tool_call("Echo Message", arguments={"message": "x" * 100})
+        ).encode()
+        sent, seen = self._run(ToolCallBodyMiddleware(None, max_body_bytes=64), body)
+        assert sent[0]["status"] == 413
+        assert json.loads(sent[1]["body"])["error"]["code"] == -32600
+        assert seen == {}
+
+    def test_announced_length_is_rejected_unread(self):
+        """Test a Content-Length over the limit is refused before reading the body."""
+        sent, seen = self._run(
+            ToolCallBodyMiddleware(None, max_body_bytes=64),
+            b"",
+            headers=[(b"content-length", b"100000")],
+        )
+        assert sent[0]["status"] == 413
+        assert seen == {}
@@ -0,0 +1,72 @@
+"""
+Tests for the lifespan hook middleware.
+"""
+
+import pytest
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from src.mcp_server.middleware.lifespan import LifespanMiddleware
+
+
+def _app(events, startup=None, shutdown=None):
+    async def started():
+        events.append("startup")
+
+    async def stopped():
+        events.append("shutdown")
+
+    async def endpoint(request):
+        events.append("request")
+        return PlainTextResponse("ok")
+
+    return Starlette(
+        routes=[Route("/", endpoint)],
+        middleware=[
+            Middleware(
+                LifespanMiddleware,
+                startup=startup or [started],
+                shutdown=shutdown or [stopped],
+            )
+        ],
+    )
+
+
+class TestLifespanMiddleware:
+    """Test cases for LifespanMiddleware."""
+
+    def test_hooks_run_around_requests(self):
+        """Test startup hooks run before requests and shutdown hooks after them."""
+        events = []
+        with TestClient(_app(events)) as client:
+            client.get("/")
+
+        assert events == ["startup", "request", "shutdown"]
+
+    def test_failing_startup_hook_fails_startup(self):
+        """Test an error in a startup hook aborts the application startup."""
+
+        async def failing():
+            raise RuntimeError("database unreachable")
+
+        with pytest.raises(RuntimeError, match="database unreachable"):
+            with TestClient(_app([], startup=[failing])):
+                pass
+
+    def test_failing_shutdown_hook_is_logged(self):
+        """Test an error in a shutdown hook does not stop the other hooks."""
+        events = []
+
+        async def failing():
+            raise RuntimeError("boom")
+
+        async def stopped():
+            events.append("shutdown")
+
+        with TestClient(_app(events, shutdown=[failing, stopped])):
+            pass
+
+        assert events == ["startup", "shutdown"]
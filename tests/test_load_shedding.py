@@ -0,0 +1,81 @@
+"""
+Tests for the load shedding middleware.
+"""
+
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from src.mcp_server.config.config import ResourceConfig
+from src.mcp_server.middleware.load_shedding import (
+    OVERLOADED_ERROR_CODE,
+    LoadSheddingMiddleware,
+)
+from src.mcp_server.utils.resources import ResourceMonitor
+
+
+def _tool_call(name, request_id=1):
+    return {
+        "jsonrpc": "2.0",
+        "id": request_id,
+        "method": "tools/call",
+        "params": {"name": name, "arguments": {}},
+    }
+
+
+class TestLoadSheddingMiddleware:
+    """Test cases for LoadSheddingMiddleware."""
+
+    def setup_method(self):
+        """Create an app that echoes the request body behind the middleware."""
+        self.calls = 0
+
+        async def endpoint(request):
+            self.calls += 1
+            return JSONResponse(await request.json())
+
+        self.monitor = ResourceMonitor(
+            ResourceConfig(enabled=False, max_in_flight_calls=2)
+        )
+        app = Starlette(
+            routes=[Route("/mcp", endpoint, methods=["POST"])],
+            middleware=[
+                Middleware(LoadSheddingMiddleware, monitor=self.monitor, retry_after=3)
+            ],
+        )
+        self.client = TestClient(app)
+
+    def test_calls_pass_when_not_overloaded(self):
+        """Test tool calls reach the endpoint while the server has capacity."""
+        response = self.client.post("/mcp", json=_tool_call("Ping"))
+        assert response.status_code == 200
+        assert self.calls == 1
+
+    def test_tool_calls_are_shed_when_overloaded(self):
+        """Test tool calls get a fast 503 with Retry-After while overloaded."""
+        self.monitor.in_flight = 2
+
+        response = self.client.post(
+            "/mcp", json=[_tool_call("Ping", 7), _tool_call("Ping", 8)]
+        )
+
+        assert response.status_code == 503
+        assert response.headers["retry-after"] == "3"
+        assert response.json()["id"] == 7
+        assert response.json()["error"]["code"] == OVERLOADED_ERROR_CODE
+        assert "2 tool calls in flight" in response.json()["error"]["message"]
+        assert self.monitor.shed == 2
+        assert self.calls == 0
+
+    def test_other_messages_pass_when_overloaded(self):
+        """Test messages other than tool calls are still served."""
+        self.monitor.in_flight = 2
+
+        response = self.client.post(
+            "/mcp", json={"jsonrpc": "2.0", "id": 1, "method": "initialize"}
+        )
+
+        assert response.status_code == 200
+        assert response.json()["method"] == "initialize"
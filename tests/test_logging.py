@@ -1,12 +1,29 @@
 """
 Tests for logging utilities.
 """
+
+import asyncio
+import json
 import logging
 import os
-import pytest
+import threading
 from unittest import mock
 
-from src.mcp_server.utils.logging import setup_logging, LOG_LEVELS
+import pytest
+
+from src.mcp_server.config.config import LoggingConfig
+from src.mcp_server.middleware.tool_calls import ToolCall
+from src.mcp_server.utils.logging import (
+    LOG_LEVELS,
+    AsyncLogHandler,
+    BatchedStreamHandler,
+    JSONFormatter,
+    LogSampler,
+    ToolContextFilter,
+    lazy,
+    log_tool_context,
+    setup_logging,
+)
 
 
 class TestLoggingUtility:
@@ -50,7 +67,7 @@ class TestLoggingUtility:
     def test_setup_logging_handlers(self):
         """Test setup_logging creates appropriate handlers."""
         # Mock os.path.exists to avoid creating directories
-        with mock.patch('os.path.exists') as mock_exists:
+        with mock.patch("os.path.exists") as mock_exists:
             mock_exists.return_value = False
 
             logger = setup_logging("test_app")
@@ -65,11 +82,14 @@ class TestLoggingUtility:
             mock_exists.return_value = True
 
             # Mock the makedirs and RotatingFileHandler to avoid file operations
-            with mock.patch('os.makedirs') as mock_makedirs, \
-                 mock.patch('logging.handlers.RotatingFileHandler') as mock_file_handler:
+            with (
+                mock.patch("os.makedirs") as mock_makedirs,
+                mock.patch("logging.handlers.RotatingFileHandler") as mock_file_handler,
+            ):
 
                 mock_file_handler.return_value = logging.handlers.RotatingFileHandler(
-                    "dummy.log", maxBytes=1024, backupCount=3)
+                    "dummy.log", maxBytes=1024, backupCount=3
+                )
 
                 logger = setup_logging("test_app")
 
@@ -88,4 +108,228 @@ class TestLoggingUtility:
 
             # Check that the formatter for the handler uses our custom format
             formatter = logger.handlers[0].formatter
-            assert formatter._fmt == custom_format  # Access private attribute for testing
+            assert (
+                formatter._fmt == custom_format
+            )  # Access private attribute for testing
+
+
+class TestAsyncLogging:
+    """Test cases for the queue-based asynchronous logging mode."""
+
+    def _make_record(self, message, *args):
+        return logging.LogRecord("test", logging.INFO, __file__, 1, message, args, None)
+
+    def test_records_are_written_by_background_writer(self):
+        """Test queued records reach the target handler after a flush."""
+        written = []
+        target = logging.Handler()
+        target.emit = lambda record: written.append(record.getMessage())
+
+        handler = AsyncLogHandler([target], queue_size=100)
+        try:
+            handler.emit(self._make_record("hello %s", "world"))
+            handler.emit(self._make_record("second"))
+            handler.flush()
+            assert written == ["hello world", "second"]
+        finally:
+            handler.close()
+
+    def test_messages_are_built_by_background_writer(self):
+        """
+        Test the calling thread only enqueues; arguments are formatted by the writer.
+        """
+        threads = []
+        written = []
+        target = logging.Handler()
+        target.emit = lambda record: written.append(record.getMessage())
+
+        handler = AsyncLogHandler([target], queue_size=100)
+        try:
+            builder = lazy(
+                lambda: threads.append(threading.current_thread()) or "writer"
+            )
+            record = self._make_record("built by %s", builder)
+            handler.emit(record)
+            handler.flush()
+        finally:
+            handler.close()
+
+        assert written == ["built by writer"]
+        assert threads == [handler._thread]
+        assert record.args is not None
+
+    def test_drop_policy_counts_dropped_records(self):
+        """Test the drop policy discards records when the buffer is full."""
+        release = threading.Event()
+        target = logging.Handler()
+        target.emit = lambda record: release.wait(5)
+
+        handler = AsyncLogHandler([target], queue_size=1, overflow_policy="drop")
+        try:
+            # The writer blocks on the first record, the second fills the queue
+            for _ in range(5):
+                handler.emit(self._make_record("message"))
+            assert handler.dropped >= 1
+        finally:
+            release.set()
+            handler.close()
+
+    def test_close_flushes_pending_records(self):
+        """Test closing the handler writes every pending record."""
+        written = []
+        target = logging.Handler()
+        target.emit = lambda record: written.append(record.getMessage())
+
+        handler = AsyncLogHandler(
+            [target], queue_size=1000, overflow_policy="block", batch_size=10
+        )
+        for i in range(200):
+            handler.emit(self._make_record("record %d", i))
+        handler.close()
+
+        assert len(written) == 200
+        assert written[-1] == "record 199"
+
+    def test_invalid_overflow_policy(self):
+        """Test an unknown overflow policy is rejected."""
+        with pytest.raises(ValueError):
+            AsyncLogHandler([], overflow_policy="spill")
+
+    def test_reconfiguring_closes_replaced_handlers(self, tmp_path):
+        """
+        Test the handlers replaced by a new configuration are closed, releasing the log
+        file.
+        """
+        with mock.patch("os.getcwd", return_value=str(tmp_path)):
+            logger = setup_logging("reload_app", LoggingConfig(), force=True)
+            replaced = list(logger.handlers)
+            setup_logging("reload_app", LoggingConfig(file_enabled=False), force=True)
+
+        file_handlers = [
+            handler for handler in replaced if isinstance(handler, logging.FileHandler)
+        ]
+        assert file_handlers
+        assert all(handler.stream is None for handler in file_handlers)
+        assert not any(
+            isinstance(handler, logging.FileHandler) for handler in logger.handlers
+        )
+
+    def test_setup_logging_async_mode(self):
+        """Test setup_logging installs a single background handler in async mode."""
+        logging_config = LoggingConfig(async_enabled=True, queue_size=50)
+        logger = setup_logging("async_app", logging_config)
+        try:
+            assert len(logger.handlers) == 1
+            handler = logger.handlers[0]
+            assert isinstance(handler, AsyncLogHandler)
+            assert isinstance(handler.handlers[0], BatchedStreamHandler)
+        finally:
+            setup_logging("async_app", LoggingConfig())
+
+
+class TestStructuredLogging:
+    """Test cases for JSON records, sampling and per-tool levels."""
+
+    def _make_record(self, message, *args, level=logging.INFO, **extra):
+        record = logging.LogRecord("test", level, __file__, 1, message, args, None)
+        record.__dict__.update(extra)
+        return record
+
+    def test_json_formatter_writes_one_object_per_record(self):
+        """
+        Test records are formatted as JSON with their extra fields, lazy values
+        computed.
+        """
+        record = self._make_record("hello %s", "world", rows=3, size=lazy(lambda: 42))
+        ToolContextFilter(logging.INFO).filter(record)
+
+        entry = json.loads(JSONFormatter().format(record))
+        assert entry["message"] == "hello world"
+        assert entry["level"] == "INFO"
+        assert entry["logger"] == "test"
+        assert entry["rows"] == 3
+        assert entry["size"] == 42
+        assert "tool" not in entry
+
+    def test_records_carry_their_tool_call(self):
+        """Test records logged during a tool call name the tool and request id."""
+        records = []
+
+        async def handler(call):
+            record = self._make_record("inside")
+            ToolContextFilter(logging.INFO).filter(record)
+            records.append(record)
+            return []
+
+        asyncio.run(log_tool_context(ToolCall("Search", {}, request_id=7), handler))
+
+        entry = json.loads(JSONFormatter().format(records[0]))
+        assert entry["tool"] == "Search"
+        assert entry["request_id"] == 7
+
+    def test_tool_levels_apply_during_their_calls(self):
+        """
+        Test a tool's level lets its DEBUG records through while others are filtered.
+        """
+        log_filter = ToolContextFilter(logging.INFO, {"Search": logging.DEBUG})
+        passed = []
+
+        async def handler(call):
+            passed.append(
+                log_filter.filter(self._make_record("debug", level=logging.DEBUG))
+            )
+            return []
+
+        asyncio.run(log_tool_context(ToolCall("Search", {}), handler))
+        asyncio.run(log_tool_context(ToolCall("Ping", {}), handler))
+
+        assert passed == [True, False]
+        assert not log_filter.filter(self._make_record("debug", level=logging.DEBUG))
+
+    def test_sampler_keeps_initial_records_then_one_in_n(self):
+        """
+        Test each message is kept a few times, then sampled, while warnings always pass.
+        """
+        sampler = LogSampler(2, thereafter=3, interval=60)
+
+        kept = [sampler.filter(self._make_record("tick %d", i)) for i in range(8)]
+        assert kept == [True, True, False, False, True, False, False, True]
+        assert sampler.filter(self._make_record("other"))
+        assert all(
+            sampler.filter(self._make_record("tick", level=logging.WARNING))
+            for _ in range(5)
+        )
+        assert sampler.dropped == 4
+
+    def test_setup_logging_structured_mode(self, tmp_path):
+        """
+        Test setup_logging installs the JSON formatter, sampler and tool levels, and
+        honors file settings.
+        """
+        logging_config = LoggingConfig(
+            json_enabled=True,
+            sample_initial=5,
+            tool_levels={"Search": "DEBUG"},
+            file_enabled=False,
+        )
+        logger = setup_logging("structured_app", logging_config)
+        try:
+            assert logger.level == logging.DEBUG
+            assert len(logger.handlers) == 1
+            assert isinstance(logger.handlers[0].formatter, JSONFormatter)
+            assert [type(f) for f in logger.filters] == [ToolContextFilter, LogSampler]
+        finally:
+            setup_logging("structured_app", LoggingConfig(file_enabled=False))
+
+        with mock.patch("os.getcwd", return_value=str(tmp_path)):
+            logger = setup_logging("file_app", LoggingConfig(file_dir="custom_logs"))
+        logger.handlers.clear()
+        assert (tmp_path / "custom_logs" / "file_app.log").exists()
+
+    def test_unknown_tool_level_is_rejected(self):
+        """Test tool levels are validated."""
+        assert LoggingConfig(tool_levels={"Search": "debug"}).tool_levels == {
+            "Search": "DEBUG"
+        }
+        with pytest.raises(ValueError, match="LOUD"):
+            LoggingConfig(tool_levels={"Search": "LOUD"})
@@ -0,0 +1,159 @@
+"""
+Tests for tool metrics.
+"""
+
+import asyncio
+
+from fastmcp import Client, FastMCP
+from mcp.types import TextContent
+from starlette.testclient import TestClient
+
+from src.mcp_server.middleware.metrics import content_size, register_metrics
+from src.mcp_server.utils.metrics import Histogram, MetricsRegistry
+
+
+class TestHistogram:
+    """Test cases for the Histogram class."""
+
+    def test_observe_and_cumulative(self):
+        """Test values land in the right buckets and render cumulatively."""
+        histogram = Histogram([1.0, 5.0])
+        for value in (0.5, 1.0, 3.0, 10.0):
+            histogram.observe(value)
+
+        assert histogram.counts == [2, 1, 1]
+        assert histogram.count == 4
+        assert histogram.sum == 14.5
+        assert histogram.cumulative() == [("1.0", 2), ("5.0", 3), ("+Inf", 4)]
+
+
+class TestMetricsRegistry:
+    """Test cases for the MetricsRegistry class."""
+
+    def test_render_prometheus_format(self):
+        """Test the exposition format of counters, gauges and histograms."""
+        registry = MetricsRegistry(latency_buckets=[0.1], size_buckets=[10])
+        stats = registry.tool('Say "hi"')
+        stats.calls = 2
+        stats.errors = 1
+        stats.latency.observe(0.05)
+
+        text = registry.render()
+        assert "# TYPE mcp_tool_calls_total counter" in text
+        assert 'mcp_tool_calls_total{tool="Say \\"hi\\""} 2' in text
+        assert 'mcp_tool_errors_total{tool="Say \\"hi\\""} 1' in text
+        assert "# TYPE mcp_tool_call_duration_seconds histogram" in text
+        assert (
+            'mcp_tool_call_duration_seconds_bucket{tool="Say \\"hi\\"",le="0.1"} 1'
+            in text
+        )
+        assert (
+            'mcp_tool_call_duration_seconds_bucket{tool="Say \\"hi\\"",le="+Inf"} 1'
+            in text
+        )
+        assert 'mcp_tool_call_duration_seconds_count{tool="Say \\"hi\\""} 1' in text
+
+    def test_collectors_are_rendered(self):
+        """Test metric families from collectors are included."""
+        registry = MetricsRegistry()
+        registry.add_collector(lambda: [("mcp_custom", "gauge", "Custom.", [({}, 3)])])
+        assert "mcp_custom 3" in registry.render()
+
+
+class TestRegisterMetrics:
+    """Test cases for register_metrics."""
+
+    def setup_method(self):
+        """Create an instrumented server."""
+        self.mcp = FastMCP("test")
+
+        @self.mcp.tool("Echo Message")
+        def echo(message: str) -> str:
+            return message
+
+        @self.mcp.tool("Fail")
+        def fail() -> str:
+            raise RuntimeError("boom")
+
+        self.registry = register_metrics(
+            self.mcp, MetricsRegistry(), argument_sample_rate=1.0
+        )
+
+    def _call(self, name, arguments):
+        async def run():
+            async with Client(self.mcp) as client:
+                return await client.call_tool_mcp(name, arguments)
+
+        return asyncio.run(run())
+
+    def test_calls_are_recorded(self):
+        """Test calls, sizes and latency are recorded per tool."""
+        self._call("Echo Message", {"message": "hello"})
+        self._call("Echo Message", {"message": "hello"})
+
+        stats = self.registry.tools["Echo Message"]
+        assert stats.calls == 2
+        assert stats.errors == 0
+        assert stats.in_flight == 0
+        assert stats.latency.count == 2
+        assert stats.result_bytes.sum == 10
+        assert stats.argument_bytes.sum == 2 * len('{"message":"hello"}')
+
+    def test_errors_are_recorded(self):
+        """Test failing calls are counted as errors."""
+        result = self._call("Fail", {})
+        assert result.isError
+        stats = self.registry.tools["Fail"]
+        assert stats.calls == 1
+        assert stats.errors == 1
+        assert stats.in_flight == 0
+
+    def test_metrics_route(self):
+        """Test metrics are served over HTTP next to the MCP endpoint."""
+        self._call("Echo Message", {"message": "hello"})
+        with TestClient(self.mcp.http_app()) as client:
+            response = client.get("/metrics")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+        assert 'mcp_tool_calls_total{tool="Echo Message"} 1' in response.text
+        assert "mcp_executor_queued" in response.text
+
+    def test_argument_sizes_are_sampled(self):
+        """Test argument sizes are only measured for the sampled share of calls."""
+        mcp = FastMCP("test")
+
+        @mcp.tool("Echo Message")
+        def echo(message: str) -> str:
+            return message
+
+        registry = register_metrics(mcp, MetricsRegistry(), argument_sample_rate=0)
+
+        async def run():
+            async with Client(mcp) as client:
+                await client.call_tool("Echo Message", {"message": "hello"})
+
+        asyncio.run(run())
+        stats = registry.tools["Echo Message"]
+        assert stats.calls == 1
+        assert stats.argument_bytes.count == 0
+
+
+class TestContentSize:
+    """Test cases for content_size."""
+
+    def test_text_content(self):
+        """Test text content is measured by length."""
+        assert (
+            content_size(
+                [
+                    TextContent(type="text", text="abc"),
+                    TextContent(type="text", text="de"),
+                ]
+            )
+            == 5
+        )
+
+    def test_text_is_measured_in_bytes(self):
+        """Test non-ASCII text is measured in encoded bytes, not characters."""
+        assert content_size([TextContent(type="text", text="héllo")]) == 6
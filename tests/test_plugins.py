@@ -0,0 +1,183 @@
+"""
+Tests for tool plugins.
+"""
+
+import asyncio
+from unittest.mock import patch
+
+from fastmcp import Client, FastMCP
+from mcp.types import ToolAnnotations
+
+from src.mcp_server.config.config import PluginConfig
+from src.mcp_server.middleware.scheduling import priority_tag
+from src.mcp_server.tools.plugins import (
+    PluginInfo,
+    build_manifest,
+    compile_plugin,
+    is_plugin_enabled,
+    load_manifest,
+    register_plugin_tools,
+)
+from src.mcp_server.tools.registry import LazyTool
+
+
+def shout(text: str) -> str:
+    """Upper-case the text."""
+    return text.upper()
+
+
+def register_greeting_tools(mcp_instance):
+    """Test plugin registering a module-level tool and a closure tool."""
+    mcp_instance.tool(
+        "Shout",
+        tags={priority_tag("interactive")},
+        annotations=ToolAnnotations(readOnlyHint=True),
+    )(shout)
+
+    @mcp_instance.tool("Greet")
+    def greet(name: str) -> str:
+        """Greet someone."""
+        return f"Hi, {name}"
+
+
+def register_broken_tools(mcp_instance):
+    """Test plugin failing to register."""
+    raise RuntimeError("boom")
+
+
+GREET_PLUGIN = PluginInfo(
+    name="greet", value=f"{__name__}:register_greeting_tools", version="1.0"
+)
+BROKEN_PLUGIN = PluginInfo(
+    name="broken", value=f"{__name__}:register_broken_tools", version="1.0"
+)
+
+
+def _plugin_config(tmp_path, **kwargs):
+    return PluginConfig(manifest_path=str(tmp_path / "plugins.json"), **kwargs)
+
+
+class TestCompilePlugin:
+    """Test cases for compile_plugin."""
+
+    def test_records_tool_schemas_and_sources(self):
+        """Test importable tools get a target and closures the registrar."""
+        plugin = compile_plugin(GREET_PLUGIN)
+
+        tools = {tool.name: tool for tool in plugin.tools}
+        assert tools["Shout"].target == f"{__name__}:shout"
+        assert tools["Shout"].registrar is None
+        assert tools["Greet"].target is None
+        assert tools["Greet"].registrar == GREET_PLUGIN.value
+        assert tools["Greet"].parameters["required"] == ["name"]
+
+    def test_records_tags_and_annotations(self):
+        """
+        Test the priority class and hints a plugin registers its tools with are kept.
+        """
+        plugin = compile_plugin(GREET_PLUGIN)
+
+        tools = {tool.name: tool for tool in plugin.tools}
+        assert tools["Shout"].tags == {priority_tag("interactive")}
+        assert tools["Shout"].annotations.readOnlyHint is True
+        assert tools["Greet"].tags == set()
+        assert tools["Greet"].annotations is None
+
+    def test_records_errors(self):
+        """Test a failing plugin is recorded with no tools."""
+        plugin = compile_plugin(BROKEN_PLUGIN)
+
+        assert plugin.tools == []
+        assert "boom" in plugin.error
+
+
+class TestIsPluginEnabled:
+    """Test cases for is_plugin_enabled."""
+
+    def test_disabled_and_allow_lists(self):
+        """Test the disabled list wins over the allow list."""
+        assert is_plugin_enabled("a", PluginConfig())
+        assert not is_plugin_enabled("a", PluginConfig(disabled=["a"]))
+        assert not is_plugin_enabled("b", PluginConfig(allow=["a"]))
+        assert not is_plugin_enabled("a", PluginConfig(allow=["a"], disabled=["a"]))
+
+
+class TestBuildManifest:
+    """Test cases for build_manifest."""
+
+    def test_manifest_is_written_and_reused(self, tmp_path):
+        """Test a second start reads the manifest instead of scanning."""
+        plugin_config = _plugin_config(tmp_path)
+
+        with patch(
+            "src.mcp_server.tools.plugins.discover_plugins", return_value=[GREET_PLUGIN]
+        ) as discover:
+            build_manifest(plugin_config)
+            manifest = build_manifest(plugin_config)
+
+        discover.assert_called_once()
+        assert load_manifest(plugin_config.manifest_path) == manifest
+        assert [tool.name for tool in manifest.plugins[0].tools] == ["Shout", "Greet"]
+
+    def test_changed_packages_trigger_rescan(self, tmp_path):
+        """Test a changed fingerprint rescans package metadata."""
+        plugin_config = _plugin_config(tmp_path)
+
+        with patch(
+            "src.mcp_server.tools.plugins.discover_plugins", return_value=[GREET_PLUGIN]
+        ) as discover:
+            build_manifest(plugin_config)
+            with patch(
+                "src.mcp_server.tools.plugins.path_fingerprint",
+                return_value={"other": 1.0},
+            ):
+                build_manifest(plugin_config)
+
+        assert discover.call_count == 2
+
+    def test_disabled_plugins_are_not_imported(self, tmp_path):
+        """Test disabled plugins are listed but never compiled."""
+        plugin_config = _plugin_config(tmp_path, disabled=["broken"])
+
+        with patch(
+            "src.mcp_server.tools.plugins.discover_plugins",
+            return_value=[BROKEN_PLUGIN],
+        ):
+            manifest = build_manifest(plugin_config)
+
+        assert manifest.plugins[0].tools is None
+        assert manifest.plugins[0].error is None
+
+
+class TestRegisterPluginTools:
+    """Test cases for register_plugin_tools."""
+
+    def test_plugin_tools_are_registered_lazily(self, tmp_path):
+        """
+        Test plugin tools are served without running the plugin again until called.
+        """
+        plugin_config = _plugin_config(tmp_path)
+        with patch(
+            "src.mcp_server.tools.plugins.discover_plugins",
+            return_value=[GREET_PLUGIN, BROKEN_PLUGIN],
+        ):
+            build_manifest(plugin_config)
+
+        mcp = FastMCP("test")
+        tools = register_plugin_tools(mcp, plugin_config)
+
+        assert all(isinstance(tool, LazyTool) and not tool.resolved for tool in tools)
+        assert {tool.name: tool.tags for tool in tools}["Shout"] == {
+            priority_tag("interactive")
+        }
+
+        async def call():
+            async with Client(mcp) as client:
+                return (
+                    await client.call_tool("Shout", {"text": "hi"}),
+                    await client.call_tool("Greet", {"name": "Ann"}),
+                )
+
+        shouted, greeted = asyncio.run(call())
+        assert shouted[0].text == "HI"
+        assert greeted[0].text == "Hi, Ann"
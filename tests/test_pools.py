@@ -0,0 +1,310 @@
+"""
+Tests for the connection pools.
+"""
+
+import asyncio
+
+import pytest
+from fastmcp import FastMCP
+
+from src.mcp_server.config.config import PoolConfig
+from src.mcp_server.utils.pools import (
+    ManagedResource,
+    PoolManager,
+    PoolTimeoutError,
+    ResourcePool,
+    SharedResource,
+)
+
+
+class Connections:
+    """Factory recording the connections it opened and closed."""
+
+    def __init__(self):
+        self.opened = 0
+        self.closed = []
+
+    async def open(self):
+        self.opened += 1
+        return f"conn-{self.opened}"
+
+    async def close(self, conn):
+        self.closed.append(conn)
+
+
+class TestResourcePool:
+    """Test cases for ResourcePool."""
+
+    def setup_method(self):
+        self.connections = Connections()
+
+    def _pool(self, **options):
+        return ResourcePool(
+            "db", self.connections.open, close=self.connections.close, **options
+        )
+
+    def test_connections_are_reused(self):
+        """Test a released connection is lent to the next call."""
+        pool = self._pool()
+
+        async def scenario():
+            async with pool.connection() as first:
+                pass
+            async with pool.connection() as second:
+                return first, second
+
+        first, second = asyncio.run(scenario())
+
+        assert first == second == "conn-1"
+        assert pool.stats()["created"] == 1
+        assert pool.stats()["idle"] == 1
+
+    def test_waits_for_a_free_connection(self):
+        """Test calls beyond max_size wait for a connection to be released."""
+        pool = self._pool(max_size=1)
+        order = []
+
+        async def use(name):
+            async with pool.connection() as conn:
+                order.append((name, conn))
+                await asyncio.sleep(0.01)
+
+        async def scenario():
+            await asyncio.gather(use("a"), use("b"))
+
+        asyncio.run(scenario())
+
+        assert order == [("a", "conn-1"), ("b", "conn-1")]
+        assert pool.stats()["waits"] == 1
+        assert pool.stats()["size"] == 1
+
+    def test_acquire_timeout(self):
+        """Test waiting longer than the acquire timeout raises PoolTimeoutError."""
+        pool = self._pool(max_size=1, acquire_timeout=0.01)
+
+        async def scenario():
+            async with pool.connection():
+                with pytest.raises(PoolTimeoutError):
+                    await pool.acquire()
+
+        asyncio.run(scenario())
+
+        assert pool.stats()["timeouts"] == 1
+        assert pool.stats()["waiting"] == 0
+
+    def test_broken_connections_are_discarded(self):
+        """Test a connection that raised a discard_on error is closed and replaced."""
+        pool = self._pool(max_size=1)
+
+        async def scenario():
+            with pytest.raises(ConnectionError):
+                async with pool.connection():
+                    raise ConnectionError("reset")
+            with pytest.raises(ValueError):
+                async with pool.connection():
+                    raise ValueError("bad query")
+            async with pool.connection() as conn:
+                return conn
+
+        assert asyncio.run(scenario()) == "conn-2"
+        assert self.connections.closed == ["conn-1"]
+
+    def test_discard_lets_a_waiter_open_a_connection(self):
+        """
+        Test a waiter opens a new connection when the one it waited for is discarded.
+        """
+        pool = self._pool(max_size=1)
+
+        async def broken():
+            with pytest.raises(OSError):
+                async with pool.connection():
+                    await asyncio.sleep(0.01)
+                    raise OSError("gone")
+
+        async def waiting():
+            await asyncio.sleep(0)
+            async with pool.connection() as conn:
+                return conn
+
+        async def scenario():
+            return (await asyncio.gather(broken(), waiting()))[1]
+
+        assert asyncio.run(scenario()) == "conn-2"
+        assert pool.stats()["size"] == 1
+
+    def test_warm_and_reap(self):
+        """Test warm-up opens min_size connections and reaping keeps them."""
+        pool = self._pool(min_size=2, idle_timeout=10)
+
+        async def scenario():
+            await pool.warm()
+            conns = [await pool.acquire() for _ in range(3)]
+            for conn in conns:
+                await pool.release(conn)
+            reaped_early = await pool.reap()
+            reaped_late = await pool.reap(now=pool._idle[-1][1] + 11)
+            return reaped_early, reaped_late
+
+        assert asyncio.run(scenario()) == (0, 1)
+        assert pool.stats()["size"] == 2
+        assert self.connections.opened == 3
+
+    def test_sync_factory_runs_in_a_thread(self):
+        """Test sync factories and closers are supported."""
+        closed = []
+        pool = ResourcePool("files", lambda: object(), close=closed.append)
+
+        async def scenario():
+            async with pool.connection() as conn:
+                pass
+            await pool.close()
+            return conn
+
+        conn = asyncio.run(scenario())
+
+        assert closed == [conn]
+
+
+class TestSharedResource:
+    """Test cases for SharedResource."""
+
+    def test_handle_is_shared_and_opened_once(self):
+        """Test concurrent calls share one handle."""
+        connections = Connections()
+        resource = SharedResource("http", connections.open, close=connections.close)
+
+        async def use():
+            async with resource.connection() as client:
+                await asyncio.sleep(0.01)
+                return client
+
+        async def scenario():
+            clients = await asyncio.gather(use(), use(), use())
+            await resource.close()
+            return clients
+
+        assert asyncio.run(scenario()) == ["conn-1"] * 3
+        assert connections.closed == ["conn-1"]
+
+
+class TestManagedResource:
+    """Test cases for the ManagedResource interface."""
+
+    def test_is_abstract(self):
+        """Test resources must implement acquire, release and stats."""
+        with pytest.raises(TypeError):
+            ManagedResource("db", Connections().open)
+
+
+class TestPoolManager:
+    """Test cases for PoolManager."""
+
+    def setup_method(self):
+        self.manager = PoolManager(
+            PoolConfig(max_size=4, max_sizes={"db": 2}, min_size=1)
+        )
+        self.connections = Connections()
+
+    def test_pool_defaults_from_config(self):
+        """Test pools are sized from the configuration, by name where overridden."""
+        db = self.manager.pool("db", self.connections.open)
+        cache = self.manager.pool("cache", self.connections.open, max_size=8)
+
+        assert (db.min_size, db.max_size) == (1, 2)
+        assert cache.max_size == 8
+        with pytest.raises(ValueError):
+            self.manager.pool("db", self.connections.open)
+        with pytest.raises(LookupError):
+            self.manager.get("missing")
+
+    def test_explicit_zero_overrides_config(self):
+        """
+        Test timeouts of 0 given to a pool are kept rather than replaced by the
+        configured ones.
+        """
+        pool = self.manager.pool(
+            "cache", self.connections.open, idle_timeout=0, acquire_timeout=0
+        )
+
+        assert (pool.idle_timeout, pool.acquire_timeout) == (0, 0)
+        with pytest.raises(ValueError):
+            self.manager.pool("empty", self.connections.open, max_size=0)
+
+    def test_start_warms_up_and_stop_closes(self):
+        """
+        Test pools are warmed up at start and closed at stop, even if one fails to warm
+        up.
+        """
+        self.manager.pool("db", self.connections.open, close=self.connections.close)
+
+        async def failing():
+            raise OSError("unreachable")
+
+        self.manager.pool("broken", failing)
+
+        async def scenario():
+            await self.manager.start()
+            warmed = self.manager.stats()["db"]["size"]
+            await self.manager.stop()
+            return warmed
+
+        assert asyncio.run(scenario()) == 1
+        assert self.connections.closed == ["conn-1"]
+
+    def test_inject_hides_parameters_from_the_tool_schema(self):
+        """Test injected handles are passed to the tool and left out of its schema."""
+        self.manager.pool("db", self.connections.open)
+        mcp = FastMCP("test")
+
+        @mcp.tool("Query")
+        @self.manager.inject(db="db")
+        def query(sql: str, db: str) -> str:
+            return f"{db}: {sql}"
+
+        async def scenario():
+            tool = (await mcp.get_tools())["Query"]
+            result = await tool.run({"sql": "SELECT 1"})
+            return tool, result
+
+        tool, result = asyncio.run(scenario())
+
+        assert list(tool.parameters["properties"]) == ["sql"]
+        assert result[0].text == "conn-1: SELECT 1"
+
+    def test_inject_rejects_unknown_parameters(self):
+        """Test injecting a parameter the function does not have fails at decoration."""
+        with pytest.raises(ValueError):
+
+            @self.manager.inject(db="db")
+            def tool(sql: str) -> str:
+                return sql
+
+    def test_http_client(self):
+        """
+        Test the shared HTTP client is an httpx client sized from the configuration.
+        """
+        resource = self.manager.http_client("http", base_url="http://example.invalid")
+
+        async def scenario():
+            async with resource.connection() as client:
+                base_url = str(client.base_url)
+            await self.manager.stop()
+            return base_url
+
+        assert asyncio.run(scenario()) == "http://example.invalid"
+        assert resource.stats()["size"] == 0
+
+    def test_metrics(self):
+        """Test pool utilization is exported."""
+        pool = self.manager.pool("db", self.connections.open)
+
+        async def scenario():
+            await pool.acquire()
+
+        asyncio.run(scenario())
+        families = {
+            name: samples for name, _, _, samples in self.manager.collect_metrics()
+        }
+
+        assert families["mcp_pool_connections_in_use"] == [({"pool": "db"}, 1)]
+        assert families["mcp_pool_utilization"] == [({"pool": "db"}, 0.5)]
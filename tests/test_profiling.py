@@ -0,0 +1,190 @@
+"""
+Tests for on-demand profiling.
+"""
+
+import threading
+import time
+from collections import Counter
+
+import pytest
+from fastmcp import FastMCP
+from starlette.middleware import Middleware
+from starlette.testclient import TestClient
+
+from src.mcp_server.middleware.auth import APIKeyAuthenticator, APIKeyAuthMiddleware
+from src.mcp_server.middleware.profiling import register_profiling
+from src.mcp_server.utils.profiling import (
+    ProfileInProgressError,
+    Profiler,
+    collapse_stacks,
+)
+
+LOCAL_CLIENT = ("127.0.0.1", 50000)
+
+
+def _busy_loop(stop):
+    """Keep a thread on the CPU until stopped."""
+    buffers = []
+    while not stop.is_set():
+        buffers.append(bytearray(4096))
+        sum(range(1000))
+
+
+class TestCollapseStacks:
+    """Test cases for collapse_stacks."""
+
+    def test_most_sampled_first(self):
+        """Test stacks are joined with semicolons and followed by their count."""
+        stacks = Counter({("main", "a", "b"): 2, ("main", "c"): 5})
+        assert collapse_stacks(stacks) == "main;c 5\nmain;a;b 2\n"
+
+
+class TestProfiler:
+    """Test cases for the Profiler class."""
+
+    def test_records_cpu_stacks_and_allocations(self):
+        """
+        Test a window samples busy threads and reports the lines allocating memory.
+        """
+        profiler = Profiler(sample_interval=0.001)
+        stop = threading.Event()
+        worker = threading.Thread(target=_busy_loop, args=(stop,), name="busy")
+        worker.start()
+        try:
+            profiler.start(5)
+            assert profiler.running
+            time.sleep(0.2)
+            result = profiler.stop()
+        finally:
+            stop.set()
+            worker.join()
+
+        assert not profiler.running
+        assert result["cpu"]["samples"] > 0
+        busy = [
+            line
+            for line in result["cpu"]["collapsed"].splitlines()
+            if line.startswith("busy;")
+        ]
+        assert busy and "_busy_loop (test_profiling.py:" in busy[0]
+        allocators = result["memory"]["top_allocators"]
+        assert any(
+            site["file"].endswith("test_profiling.py") and site["size_diff_bytes"] > 0
+            for site in allocators
+        )
+
+    def test_window_ends_by_itself(self):
+        """Test the profile stops at the end of its window."""
+        profiler = Profiler()
+        profiler.start(0.05, memory=False)
+        time.sleep(0.3)
+
+        assert not profiler.running
+        assert profiler.result["duration_seconds"] < 0.3
+        assert "memory" not in profiler.result
+
+    def test_idle_threads_are_left_out(self):
+        """Test threads waiting for work are only sampled on request."""
+        profiler = Profiler(sample_interval=0.001)
+        stop = threading.Event()
+        waiter = threading.Thread(target=stop.wait, name="waiter")
+        waiter.start()
+        try:
+            profiler.start(0.05, memory=False)
+            time.sleep(0.1)
+            idle_left_out = profiler.stop()["cpu"]["collapsed"]
+            profiler.start(0.05, memory=False, include_idle=True)
+            time.sleep(0.1)
+            idle_kept = profiler.stop()["cpu"]["collapsed"]
+        finally:
+            stop.set()
+            waiter.join()
+
+        assert "waiter;" not in idle_left_out
+        assert "waiter;" in idle_kept
+
+    def test_invalid_windows_are_rejected(self):
+        """Test the duration is bounded and only one profile runs at a time."""
+        profiler = Profiler(max_duration=1.0)
+        with pytest.raises(ValueError):
+            profiler.start(5)
+        with pytest.raises(ValueError):
+            profiler.start(0.5, cpu=False, memory=False)
+
+        profiler.start(0.5, memory=False)
+        with pytest.raises(ProfileInProgressError):
+            profiler.start(0.5)
+        profiler.stop()
+
+
+class TestRegisterProfiling:
+    """Test cases for the profiling routes."""
+
+    def _app(self, admin_keys=(), middleware=None):
+        mcp = FastMCP("test")
+        self.profiler = register_profiling(
+            mcp, Profiler(sample_interval=0.001), admin_keys=admin_keys
+        )
+        return mcp.http_app(middleware=middleware)
+
+    def test_start_stop_and_collapsed_stacks(self):
+        """Test a loopback client starts a profile, stops it and fetches its stacks."""
+        with TestClient(self._app(), client=LOCAL_CLIENT) as client:
+            started = client.post(
+                "/debug/profile/start", params={"seconds": "5", "memory": "false"}
+            )
+            conflict = client.post("/debug/profile/start")
+            stopped = client.post("/debug/profile/stop")
+            status = client.get("/debug/profile")
+            collapsed = client.get("/debug/profile", params={"format": "collapsed"})
+
+        assert started.status_code == 202
+        assert started.json()["running"] is True
+        assert conflict.status_code == 409
+        assert stopped.status_code == 200
+        assert stopped.json()["cpu"]["samples"] >= 0
+        assert status.json()["running"] is False
+        assert status.json()["result"] == stopped.json()
+        assert collapsed.headers["content-type"].startswith("text/plain")
+
+    def test_bad_parameters(self):
+        """
+        Test invalid windows answer 400 and stopping before any profile answers 404.
+        """
+        with TestClient(self._app(), client=LOCAL_CLIENT) as client:
+            assert client.post("/debug/profile/stop").status_code == 404
+            assert (
+                client.post(
+                    "/debug/profile/start", params={"seconds": "soon"}
+                ).status_code
+                == 400
+            )
+            assert (
+                client.post(
+                    "/debug/profile/start", params={"seconds": "3600"}
+                ).status_code
+                == 400
+            )
+
+    def test_remote_clients_are_refused_without_admin_keys(self):
+        """Test only loopback clients are served when no admin keys are configured."""
+        with TestClient(self._app(), client=("203.0.113.7", 50000)) as client:
+            assert client.post("/debug/profile/start").status_code == 403
+            assert client.get("/debug/profile").status_code == 403
+        assert not self.profiler.running
+
+    def test_admin_keys(self):
+        """Test only requests authenticated with an admin key are served."""
+        authenticator = APIKeyAuthenticator(
+            keys={"ops": "ops-secret", "ci": "ci-secret"}
+        )
+        app = self._app(
+            admin_keys=["ops"],
+            middleware=[Middleware(APIKeyAuthMiddleware, authenticator=authenticator)],
+        )
+        with TestClient(app) as client:
+            user = client.get("/debug/profile", headers={"x-api-key": "ci-secret"})
+            admin = client.get("/debug/profile", headers={"x-api-key": "ops-secret"})
+
+        assert user.status_code == 403
+        assert admin.status_code == 200
@@ -0,0 +1,239 @@
+"""
+Tests for the rate limiting middleware.
+"""
+
+import asyncio
+
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from src.mcp_server.config.config import RateLimitConfig
+from src.mcp_server.middleware.rate_limit import (
+    InMemoryRateLimitBackend,
+    RateLimitBackend,
+    RateLimiter,
+    RateLimitMiddleware,
+    TokenBucket,
+    client_identity,
+)
+
+
+def _tool_call(name, request_id=1):
+    return {
+        "jsonrpc": "2.0",
+        "id": request_id,
+        "method": "tools/call",
+        "params": {"name": name, "arguments": {}},
+    }
+
+
+class SharedDictBackend(RateLimitBackend):
+    """Stand-in for a shared store: several limiters use the same dictionary."""
+
+    def __init__(self, store):
+        self.store = store
+
+    async def consume(self, key, cost, rate, capacity):
+        bucket = self.store.setdefault(key, TokenBucket(rate, capacity, 0.0))
+        return bucket.consume(cost, 0.0)
+
+    async def refund(self, key, cost):
+        self.store[key].refund(cost)
+
+
+class TestTokenBucket:
+    """Test cases for the TokenBucket class."""
+
+    def test_burst_then_refill(self):
+        """Test the bucket allows a burst and refills over time."""
+        bucket = TokenBucket(rate=2.0, capacity=2.0, now=0.0)
+        assert bucket.consume(1, 0.0) == 0.0
+        assert bucket.consume(1, 0.0) == 0.0
+        assert bucket.consume(1, 0.0) == 0.5
+        assert bucket.consume(1, 0.5) == 0.0
+
+    def test_refill_is_capped(self):
+        """Test tokens never exceed the capacity."""
+        bucket = TokenBucket(rate=100.0, capacity=3.0, now=0.0)
+        bucket.consume(3, 0.0)
+        bucket.consume(0, 60.0)
+        assert bucket.tokens == 3.0
+
+
+class TestRateLimiter:
+    """Test cases for the RateLimiter class."""
+
+    def test_tool_costs(self):
+        """Test tools are charged their configured cost."""
+        limiter = RateLimiter(
+            requests_per_second=0.001, burst=3, tool_costs={"Heavy": 3, "Ping": 0}
+        )
+
+        async def run():
+            results = [await limiter.check("client", ("Ping",)) for _ in range(10)]
+            results.append(await limiter.check("client", ("Heavy",)))
+            results.append(await limiter.check("client", ("Echo Message",)))
+            return results
+
+        results = asyncio.run(run())
+        assert all(retry == 0.0 for retry in results[:11])
+        assert results[11] > 0
+        assert limiter.rejected == 1
+
+    def test_clients_have_separate_buckets(self):
+        """Test one client exhausting its quota does not affect another."""
+        limiter = RateLimiter(requests_per_second=0.001, burst=1)
+
+        async def run():
+            return (
+                await limiter.check("a", ("Ping",)),
+                await limiter.check("a", ("Ping",)),
+                await limiter.check("b", ("Ping",)),
+            )
+
+        first, second, other = asyncio.run(run())
+        assert first == 0.0
+        assert second > 0
+        assert other == 0.0
+
+    def test_per_tool_rate(self):
+        """Test per-tool rates apply on top of the client bucket."""
+        limiter = RateLimiter(
+            requests_per_second=100, burst=100, tool_rates={"Echo Message": 1}
+        )
+
+        async def run():
+            return (
+                await limiter.check("a", ("Echo Message",)),
+                await limiter.check("a", ("Echo Message",)),
+                await limiter.check("a", ("Ping",)),
+            )
+
+        first, second, ping = asyncio.run(run())
+        assert first == 0.0
+        assert second > 0
+        assert ping == 0.0
+
+    def test_rejected_calls_do_not_spend_tool_quota(self):
+        """Test a call rejected by the client bucket gets its per-tool token back."""
+        backend = InMemoryRateLimitBackend()
+        limiter = RateLimiter(
+            requests_per_second=0.001,
+            burst=1,
+            tool_rates={"Echo Message": 0.001},
+            backend=backend,
+        )
+
+        async def run():
+            return (
+                await limiter.check("a", ("Ping",)),
+                await limiter.check("a", ("Echo Message",)),
+            )
+
+        ping, echo = asyncio.run(run())
+        assert ping == 0.0
+        assert echo > 0
+        assert backend._buckets["a|tool:Echo Message"].tokens == 1.0
+
+    def test_shared_backend_shares_quota_across_limiters(self):
+        """Test limiters in different workers share quotas through a backend."""
+        store = {}
+        worker_a = RateLimiter(
+            requests_per_second=1, burst=2, backend=SharedDictBackend(store)
+        )
+        worker_b = RateLimiter(
+            requests_per_second=1, burst=2, backend=SharedDictBackend(store)
+        )
+
+        async def run():
+            return (
+                await worker_a.check("client", ("Ping",)),
+                await worker_b.check("client", ("Ping",)),
+                await worker_a.check("client", ("Ping",)),
+            )
+
+        assert asyncio.run(run())[2] > 0
+
+    def test_in_memory_backend_is_bounded(self):
+        """Test the in-memory backend drops the least recently used bucket."""
+        backend = InMemoryRateLimitBackend(max_buckets=2)
+
+        async def run():
+            for key in ("a", "b", "c"):
+                await backend.consume(key, 1, 1, 1)
+
+        asyncio.run(run())
+        assert len(backend) == 2
+
+    def test_from_config(self):
+        """Test a limiter is built from RateLimitConfig."""
+        limiter = RateLimiter.from_config(
+            RateLimitConfig(requests_per_second=5, burst=7, tool_costs={"Ping": 0})
+        )
+        assert limiter.requests_per_second == 5
+        assert limiter.burst == 7
+        assert limiter.cost("Ping") == 0
+        assert limiter.cost("Echo Message") == 1
+
+
+class TestClientIdentity:
+    """Test cases for client_identity."""
+
+    def test_api_key_is_hashed(self):
+        """Test API keys identify the client without exposing the key."""
+        identity = client_identity({"headers": [(b"x-api-key", b"secret")]})
+        assert identity.startswith("key:")
+        assert "secret" not in identity
+
+    def test_bearer_token_and_address(self):
+        """Test bearer tokens and client addresses are used as fallbacks."""
+        bearer = client_identity({"headers": [(b"authorization", b"Bearer secret")]})
+        assert bearer == client_identity({"headers": [(b"x-api-key", b"secret")]})
+        assert (
+            client_identity({"headers": [], "client": ("10.0.0.1", 1234)})
+            == "addr:10.0.0.1"
+        )
+
+
+class TestRateLimitMiddleware:
+    """Test cases for RateLimitMiddleware."""
+
+    def setup_method(self):
+        """Create an app that echoes the request body behind the middleware."""
+        self.calls = 0
+
+        async def endpoint(request):
+            self.calls += 1
+            return JSONResponse(await request.json())
+
+        limiter = RateLimiter(requests_per_second=0.001, burst=1)
+        app = Starlette(
+            routes=[Route("/mcp", endpoint, methods=["POST"])],
+            middleware=[Middleware(RateLimitMiddleware, limiter=limiter)],
+        )
+        self.client = TestClient(app)
+
+    def test_rejects_over_quota_before_dispatch(self):
+        """Test calls over quota get a 429 and never reach the endpoint."""
+        first = self.client.post("/mcp", json=_tool_call("Ping", 1))
+        assert first.status_code == 200
+        assert first.json()["id"] == 1
+
+        second = self.client.post("/mcp", json=_tool_call("Ping", 2))
+        assert second.status_code == 429
+        assert int(second.headers["retry-after"]) >= 1
+        assert second.json()["id"] == 2
+        assert second.json()["error"]["message"] == "Rate limit exceeded"
+        assert self.calls == 1
+
+    def test_non_tool_requests_pass_through(self):
+        """Test requests other than tool calls are not charged."""
+        for request_id in range(3):
+            response = self.client.post(
+                "/mcp",
+                json={"jsonrpc": "2.0", "id": request_id, "method": "tools/list"},
+            )
+            assert response.status_code == 200
@@ -0,0 +1,109 @@
+"""
+Tests for tool call recording.
+"""
+
+import asyncio
+
+import pytest
+from fastmcp import FastMCP
+from fastmcp.exceptions import ToolError
+
+from src.mcp_server.middleware.recording import (
+    CallRecorder,
+    read_recording,
+    register_recording,
+)
+from src.mcp_server.middleware.tool_calls import call_tool
+
+
+def _server(recorder):
+    mcp = FastMCP("test")
+
+    @mcp.tool("Echo")
+    def echo(message: str) -> str:
+        return message
+
+    @mcp.tool("Fail")
+    def fail() -> str:
+        raise ValueError("broken")
+
+    register_recording(mcp, recorder)
+    return mcp
+
+
+class TestCallRecorder:
+    """Test cases for the CallRecorder middleware."""
+
+    def test_calls_are_written_and_read_back(self, tmp_path):
+        """
+        Test each call is appended with its arguments, client, timing, result size and
+        error.
+        """
+        path = tmp_path / "recordings" / "calls.jsonl"
+        recorder = CallRecorder(str(path), flush_interval=60)
+        mcp = _server(recorder)
+
+        async def scenario():
+            await call_tool(mcp, "Echo", {"message": "hello"}, client="a")
+            with pytest.raises(ToolError):
+                await call_tool(mcp, "Fail", {})
+            assert not path.exists()
+            await recorder.stop()
+
+        asyncio.run(scenario())
+        calls, skipped = read_recording(str(path))
+
+        assert skipped == 0
+        assert [(call.tool, call.arguments, call.client) for call in calls] == [
+            ("Echo", {"message": "hello"}, "a"),
+            ("Fail", {}, None),
+        ]
+        assert calls[0].result_bytes == 5
+        assert calls[0].error is None
+        assert calls[1].error == "ToolError"
+        assert calls[0].started_at <= calls[1].started_at
+        assert calls[0].duration_ms >= 0
+        assert recorder.stats() == {
+            "recorded": 2,
+            "dropped": 0,
+            "pending": 0,
+            "write_errors": 0,
+        }
+
+    def test_calls_are_filtered_and_bounded(self, tmp_path):
+        """
+        Test only the listed tools are recorded, and calls beyond the buffer are
+        dropped.
+        """
+        recorder = CallRecorder(
+            str(tmp_path / "calls.jsonl"), tools=["Echo"], max_pending=1
+        )
+        mcp = _server(recorder)
+
+        async def scenario():
+            for message in ("a", "b"):
+                await call_tool(mcp, "Echo", {"message": message})
+            with pytest.raises(ToolError):
+                await call_tool(mcp, "Fail", {})
+            await recorder.stop()
+
+        asyncio.run(scenario())
+        assert recorder.stats()["recorded"] == 1
+        assert recorder.stats()["dropped"] == 1
+        assert not CallRecorder(
+            str(tmp_path / "other.jsonl"), sample_rate=0
+        ).should_record("Echo")
+
+    def test_unreadable_lines_are_skipped(self, tmp_path):
+        """Test a line cut short by a crash does not prevent reading the rest."""
+        path = tmp_path / "calls.jsonl"
+        path.write_text(
+            '{"ts": 2.0, "tool": "Echo", "arguments": {"message": "b"}, '
+            '"duration_ms": 1.5, "result_bytes": 1}\n'
+            '{"ts": 1.0, "tool": "Ping", "duration_ms": 0.5}\n'
+            '{"ts": 3.0, "tool": "Ec'
+        )
+
+        calls, skipped = read_recording(str(path))
+        assert [call.tool for call in calls] == ["Ping", "Echo"]
+        assert skipped == 1
@@ -0,0 +1,177 @@
+"""
+Tests for lazy tool registration.
+"""
+
+import asyncio
+import sys
+
+import pytest
+from fastmcp import Client, Context, FastMCP
+from fastmcp.tools.tool import Tool
+
+from src.mcp_server.tools.registry import (
+    CompiledTool,
+    LazyTool,
+    ToolSpec,
+    dump_tool_manifest,
+    generate_tool_specs,
+    import_target,
+    load_tool_manifest,
+    precompile_tools,
+    register_lazy_tools,
+)
+
+
+# Module-level tool implementation targeted by the specs below
+def add(a: int, b: int = 1) -> int:
+    """Add two numbers."""
+    return a + b
+
+
+ADD_SPEC = ToolSpec(
+    name="add",
+    target=f"{__name__}:add",
+    description="Add two numbers.",
+    parameters={
+        "type": "object",
+        "properties": {
+            "a": {"title": "A", "type": "integer"},
+            "b": {"default": 1, "title": "B", "type": "integer"},
+        },
+        "required": ["a"],
+    },
+)
+
+
+class TestImportTarget:
+    """Test cases for import_target."""
+
+    def test_imports_attribute(self):
+        """Test a module attribute is imported from its path."""
+        assert import_target("os.path:join") is sys.modules["os"].path.join
+
+    def test_rejects_path_without_attribute(self):
+        """Test a path without an attribute is rejected."""
+        with pytest.raises(ValueError):
+            import_target("os.path")
+
+
+class TestLazyTool:
+    """Test cases for LazyTool."""
+
+    def test_declared_metadata_is_available_before_import(self):
+        """Test the tool is described by its spec until it is resolved."""
+        tool = LazyTool.from_spec(ADD_SPEC)
+
+        assert not tool.resolved
+        mcp_tool = tool.to_mcp_tool()
+        assert mcp_tool.name == "add"
+        assert mcp_tool.inputSchema == ADD_SPEC.parameters
+
+    def test_resolves_on_first_run(self):
+        """Test the implementation is imported and called on the first run."""
+        tool = LazyTool.from_spec(ADD_SPEC)
+
+        result = asyncio.run(tool.run({"a": 2, "b": 3}))
+
+        assert tool.resolved
+        assert result[0].text == "5"
+
+    def test_resolves_to_compiled_tool(self):
+        """Test the resolved tool has a prebuilt validator."""
+        assert isinstance(LazyTool.from_spec(ADD_SPEC).resolve(), CompiledTool)
+
+    def test_resolve_is_cached(self):
+        """Test the real tool is built once."""
+        tool = LazyTool.from_spec(ADD_SPEC)
+        assert tool.resolve() is tool.resolve()
+
+    def test_missing_target_fails_on_call(self):
+        """Test an unknown target only fails when the tool is resolved."""
+        tool = LazyTool.from_spec(ToolSpec(name="missing", target="no_such_module:fn"))
+        with pytest.raises(ImportError):
+            tool.resolve()
+
+
+class TestCompiledTool:
+    """Test cases for CompiledTool and precompile_tools."""
+
+    def test_runs_like_the_original_tool(self):
+        """Test a compiled tool validates and converts like a plain tool."""
+        tool = Tool.from_function(add, name="add")
+        compiled = CompiledTool.compile(tool)
+
+        assert compiled.parameters == tool.parameters
+        assert asyncio.run(compiled.run({"a": "2"}))[0].text == "3"
+        with pytest.raises(Exception):
+            asyncio.run(compiled.run({"a": "two"}))
+
+    def test_serializes_with_tool_serializer(self):
+        """Test non-text results go through the tool's serializer."""
+        compiled = CompiledTool.compile(
+            Tool.from_function(
+                lambda: {"a": 1}, name="obj", serializer=lambda data: "custom"
+            )
+        )
+        assert asyncio.run(compiled.run({}))[0].text == "custom"
+
+    def test_precompile_replaces_registered_tools(self):
+        """Test registered tools are compiled and lazy tools left alone."""
+        mcp = FastMCP("test")
+
+        @mcp.tool()
+        async def greet(name: str, ctx: Context) -> str:
+            return f"{name} via {ctx.fastmcp.name}"
+
+        register_lazy_tools(mcp, [ADD_SPEC])
+        compiled = precompile_tools(mcp)
+
+        tools = mcp._tool_manager.get_tools()
+        assert [tool.name for tool in compiled] == ["greet"]
+        assert isinstance(tools["greet"], CompiledTool)
+        assert isinstance(tools["add"], LazyTool)
+        assert precompile_tools(mcp) == []
+
+        async def call():
+            async with Client(mcp) as client:
+                return await client.call_tool("greet", {"name": "Ada"})
+
+        assert asyncio.run(call())[0].text == "Ada via test"
+
+
+class TestRegisterLazyTools:
+    """Test cases for register_lazy_tools."""
+
+    def test_tools_are_listed_and_callable(self):
+        """Test lazy tools are listed and called through a client."""
+        mcp = FastMCP("test")
+        register_lazy_tools(mcp, [ADD_SPEC])
+
+        async def list_and_call():
+            async with Client(mcp) as client:
+                return await client.list_tools(), await client.call_tool(
+                    "add", {"a": 40, "b": 2}
+                )
+
+        tools, result = asyncio.run(list_and_call())
+
+        assert [tool.name for tool in tools] == ["add"]
+        assert result[0].text == "42"
+
+
+class TestToolManifest:
+    """Test cases for generating and loading tool manifests."""
+
+    def test_generates_schema_from_function(self):
+        """Test the description and schema of a declared tool come from its function."""
+        spec = ToolSpec(name="add", target=f"{__name__}:add", tags={"math"})
+        [generated] = generate_tool_specs([spec])
+        assert generated.description == "Add two numbers."
+        assert generated.parameters == ADD_SPEC.parameters
+        assert generated.tags == {"math"}
+
+    def test_round_trip(self, tmp_path):
+        """Test a dumped manifest loads back to the same declarations."""
+        path = tmp_path / "tools.json"
+        path.write_text(dump_tool_manifest([ADD_SPEC]))
+        assert load_tool_manifest(str(path)) == [ADD_SPEC]
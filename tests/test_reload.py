@@ -0,0 +1,134 @@
+"""
+Tests for configuration reloading.
+"""
+
+import asyncio
+import os
+from unittest import mock
+
+import pytest
+
+from src.mcp_server.config.reload import ConfigManager
+from src.mcp_server.middleware.rate_limit import RateLimiter
+
+
+@pytest.fixture(autouse=True)
+def clean_env():
+    """Keep environment variables from overriding the test files."""
+    with mock.patch.dict(os.environ, {}, clear=True):
+        yield
+
+
+def _write(path, text):
+    path.write_text(text)
+    # Make the change visible to the mtime check on coarse file systems
+    mtime = os.stat(path).st_mtime + 1
+    os.utime(path, (mtime, mtime))
+
+
+class TestConfigManager:
+    """Test cases for the ConfigManager class."""
+
+    def test_changed_sections_are_applied(self, tmp_path):
+        """Test subscribers of changed sections receive the new settings."""
+        config_file = tmp_path / "server.toml"
+        config_file.write_text('[logging]\nlevel = "INFO"\n')
+        manager = ConfigManager(config_file=str(config_file))
+        logging_changes, tracing_changes, every_change = [], [], []
+        manager.subscribe(logging_changes.append, section="logging")
+        manager.subscribe(tracing_changes.append, section="tracing")
+        manager.subscribe(every_change.append)
+        before = manager.current
+
+        _write(config_file, '[logging]\nlevel = "DEBUG"\n')
+        assert manager.check() == ["logging"]
+
+        assert manager.current is not before
+        assert before.logging.level == "INFO"
+        assert [c.level for c in logging_changes] == ["DEBUG"]
+        assert tracing_changes == []
+        assert every_change == [manager.current]
+        assert manager.check() == []
+
+    def test_invalid_file_keeps_the_current_snapshot(self, tmp_path):
+        """Test a file that fails validation is logged and ignored."""
+        config_file = tmp_path / "server.toml"
+        config_file.write_text("[tracing]\nsample_rate = 0.5\n")
+        manager = ConfigManager(config_file=str(config_file))
+        current = manager.current
+
+        _write(config_file, "[tracing]\nsample_rate = 5\n")
+        assert manager.check() == []
+        assert manager.current is current
+        assert manager.failures == 1
+
+        _write(config_file, "[tracing\n")
+        assert manager.check() == []
+        assert manager.failures == 2
+
+    def test_malformed_yaml_keeps_the_watcher_running(self, tmp_path):
+        """
+        Test a YAML syntax error is reported as an invalid file and the next fix is
+        picked up.
+        """
+        pytest.importorskip("yaml")
+        config_file = tmp_path / "server.yaml"
+        config_file.write_text("metrics:\n  enabled: true\n")
+        manager = ConfigManager(config_file=str(config_file), reload_interval=0.01)
+
+        async def scenario():
+            await manager.start()
+            _write(config_file, "metrics: [enabled\n")
+            await asyncio.sleep(0.1)
+            _write(config_file, "metrics:\n  enabled: false\n")
+            await asyncio.sleep(0.1)
+            await manager.stop()
+
+        asyncio.run(scenario())
+        assert manager.failures == 1
+        assert manager.current.metrics.enabled is False
+
+    def test_failing_subscriber_does_not_stop_the_others(self, tmp_path):
+        """
+        Test an error in one subscriber still applies the new snapshot to the rest.
+        """
+        config_file = tmp_path / "server.toml"
+        config_file.write_text("[rate_limit]\nburst = 20\n")
+        manager = ConfigManager(config_file=str(config_file))
+        limiter = RateLimiter()
+
+        def failing(section):
+            raise RuntimeError("boom")
+
+        manager.subscribe(failing, section="rate_limit")
+        manager.subscribe(limiter.configure, section="rate_limit")
+
+        _write(config_file, "[rate_limit]\nburst = 50\ntool_costs = { Search = 3 }\n")
+        manager.check()
+
+        assert limiter.burst == 50
+        assert limiter.cost("Search") == 3
+
+    def test_unsubscribe_and_unknown_sections(self, tmp_path):
+        """Test subscriptions can be removed and must name a known section."""
+        manager = ConfigManager(config_file=None)
+        unsubscribe = manager.subscribe(lambda section: None, section="logging")
+        unsubscribe()
+        with pytest.raises(ValueError):
+            manager.subscribe(lambda section: None, section="loging")
+
+    def test_watcher_reloads_in_the_background(self, tmp_path):
+        """Test the started watcher picks up file changes."""
+        config_file = tmp_path / "server.toml"
+        config_file.write_text("[metrics]\nenabled = true\n")
+        manager = ConfigManager(config_file=str(config_file), reload_interval=0.01)
+
+        async def scenario():
+            await manager.start()
+            _write(config_file, "[metrics]\nenabled = false\n")
+            await asyncio.sleep(0.1)
+            await manager.stop()
+
+        asyncio.run(scenario())
+        assert manager.current.metrics.enabled is False
+        assert manager.reloads == 1
@@ -0,0 +1,127 @@
+"""
+Tests for replaying recorded tool calls.
+"""
+
+import json
+
+import pytest
+from fastmcp import FastMCP
+from sse_starlette.sse import AppStatus
+
+from src.mcp_server.middleware.recording import RecordedCall
+from src.mcp_server.utils.replay import compare_tool, run_replay
+
+
+def _write_recording(path, entries):
+    path.write_text("".join(json.dumps(entry) + "\n" for entry in entries))
+
+
+class TestCompareTool:
+    """Test cases for comparing replayed and recorded latencies."""
+
+    def test_ratios_compare_replayed_with_recorded(self):
+        """Test the percentiles of both runs are reported with their ratios."""
+        recorded = [
+            RecordedCall(started_at=0, tool="Echo", arguments={}, duration_ms=ms)
+            for ms in (1, 2, 4)
+        ]
+        recorded.append(
+            RecordedCall(
+                started_at=0,
+                tool="Echo",
+                arguments={},
+                duration_ms=8,
+                error="ToolError",
+            )
+        )
+
+        result = compare_tool(
+            "Echo", recorded, [0.002, 0.004, 0.008, 0.016], errors=1, size_mismatches=0
+        )
+        assert result.recorded_ms.p50 == 2.0
+        assert result.replayed_ms.p50 == 4.0
+        assert result.p50_ratio == 2.0
+        assert result.recorded_errors == 1
+        assert result.errors == 1
+
+
+class TestRunReplay:
+    """Test cases for replaying a recording against an in-process server."""
+
+    @pytest.fixture(autouse=True)
+    def reset_sse_exit_event(self):
+        """sse-starlette binds a process-wide event to the first event loop using it."""
+        AppStatus.should_exit_event = None
+        yield
+        AppStatus.should_exit_event = None
+
+    def _server(self):
+        mcp = FastMCP("test")
+
+        @mcp.tool("Echo")
+        def echo(message: str) -> str:
+            return message
+
+        return mcp
+
+    def test_recording_is_replayed_and_compared(self, tmp_path):
+        """
+        Test every call is replayed with its client's session and result sizes are
+        checked.
+        """
+        path = tmp_path / "calls.jsonl"
+        _write_recording(
+            path,
+            [
+                {
+                    "ts": 100.0,
+                    "tool": "Echo",
+                    "arguments": {"message": "hi"},
+                    "duration_ms": 1.0,
+                    "result_bytes": 2,
+                    "client": "a",
+                },
+                {
+                    "ts": 100.1,
+                    "tool": "Echo",
+                    "arguments": {"message": "hello"},
+                    "duration_ms": 2.0,
+                    "result_bytes": 2,
+                    "client": "b",
+                },
+                {
+                    "ts": 100.2,
+                    "tool": "Missing",
+                    "arguments": {},
+                    "duration_ms": 0.5,
+                    "client": "a",
+                },
+            ],
+        )
+
+        report = run_replay(str(path), speed=10, mcp_instance=self._server())
+
+        assert report.calls == 3
+        assert report.sessions == 2
+        assert report.recording == str(path)
+        assert report.recorded_duration_seconds == pytest.approx(0.2)
+        assert report.duration_seconds >= 0.02
+        echo, missing = report.results
+        assert echo.tool == "Echo"
+        assert echo.calls == 2
+        assert echo.errors == 0
+        assert echo.size_mismatches == 1
+        assert echo.replayed_ms.max > 0
+        assert missing.errors == 1
+
+    def test_invalid_replays_are_rejected(self, tmp_path):
+        """Test an empty recording and a non-positive speed are errors."""
+        path = tmp_path / "calls.jsonl"
+        _write_recording(
+            path, [{"ts": 1.0, "tool": "Echo", "arguments": {}, "duration_ms": 1.0}]
+        )
+
+        with pytest.raises(ValueError, match="No tool calls"):
+            run_replay(str(path), tools=["Other"], mcp_instance=self._server())
+        with pytest.raises(ValueError, match="positive"):
+            run_replay(str(path), speed=0, mcp_instance=self._server())
@@ -0,0 +1,106 @@
+"""
+Tests for resource usage monitoring.
+"""
+
+import asyncio
+import time
+
+from src.mcp_server.config.config import ResourceConfig
+from src.mcp_server.middleware.tool_calls import ToolCall
+from src.mcp_server.utils.resources import (
+    ResourceMonitor,
+    count_open_fds,
+    read_rss_bytes,
+)
+
+
+class TestReadings:
+    """Test cases for the process readings."""
+
+    def test_rss_and_fds(self):
+        """Test memory and descriptors are read."""
+        assert read_rss_bytes() > 1024 * 1024
+        fds = count_open_fds()
+        assert fds is None or fds > 0
+
+
+class TestResourceMonitor:
+    """Test cases for ResourceMonitor."""
+
+    def test_sample_within_limits(self):
+        """Test a sample without limits is not overloaded."""
+        monitor = ResourceMonitor(ResourceConfig())
+        snapshot = monitor.sample(event_loop_lag_ms=1.5)
+
+        assert snapshot.rss_bytes > 0
+        assert snapshot.event_loop_lag_ms == 1.5
+        assert snapshot.overloaded == []
+        assert monitor.overload_reason() is None
+
+    def test_exceeded_limits_are_reported(self):
+        """Test readings above their limits mark the server overloaded."""
+        monitor = ResourceMonitor(
+            ResourceConfig(max_rss_mb=1, max_event_loop_lag_ms=10)
+        )
+        snapshot = monitor.sample(event_loop_lag_ms=50)
+
+        assert len(snapshot.overloaded) == 2
+        assert snapshot.overloaded[0].startswith("memory")
+        assert "event loop lag 50 ms > 10 ms" in monitor.overload_reason()
+
+        monitor.config = ResourceConfig()
+        monitor.sample()
+        assert monitor.overload_reason() is None
+
+    def test_in_flight_limit_is_live(self):
+        """Test calls in flight are counted and checked without sampling."""
+        monitor = ResourceMonitor(ResourceConfig(max_in_flight_calls=1))
+        seen = []
+
+        async def call_next(call):
+            seen.append(monitor.overload_reason())
+            return []
+
+        asyncio.run(monitor.count_call(ToolCall(name="Ping", arguments={}), call_next))
+
+        assert seen == ["1 tool calls in flight, limit 1"]
+        assert monitor.in_flight == 0
+        assert monitor.overload_reason() is None
+
+    def test_current_samples_when_stale(self):
+        """Test current() samples on demand and reports live in-flight calls."""
+        monitor = ResourceMonitor(ResourceConfig(sample_interval=60))
+        first = monitor.current()
+        monitor.in_flight = 3
+
+        second = monitor.current()
+
+        assert second.timestamp == first.timestamp
+        assert second.in_flight_calls == 3
+
+    def test_background_sampler_measures_loop_lag(self):
+        """Test the sampler runs on the event loop and measures its lag."""
+        monitor = ResourceMonitor(ResourceConfig(sample_interval=0.01, log_interval=0))
+
+        async def run():
+            await monitor.start()
+            await asyncio.sleep(0)
+            time.sleep(0.05)  # block the loop
+            await asyncio.sleep(0.001)
+            await monitor.stop()
+
+        asyncio.run(run())
+        assert monitor.snapshot is not None
+        assert monitor.snapshot.event_loop_lag_ms > 10
+
+    def test_collect_metrics(self):
+        """Test readings are exported as metric families."""
+        monitor = ResourceMonitor(ResourceConfig())
+        monitor.shed = 4
+        families = {
+            name: samples for name, _, _, samples in monitor.collect_metrics("mcp")
+        }
+
+        assert families["mcp_tool_calls_shed_total"] == [({}, 4)]
+        assert families["mcp_overloaded"] == [({}, 0)]
+        assert families["mcp_process_resident_memory_bytes"][0][1] > 0
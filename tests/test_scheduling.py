@@ -0,0 +1,199 @@
+"""
+Tests for tool call scheduling.
+"""
+
+import asyncio
+import time
+
+import pytest
+from fastmcp import FastMCP
+from fastmcp.exceptions import ToolError
+
+from src.mcp_server.config.config import SchedulingConfig
+from src.mcp_server.middleware.scheduling import (
+    ToolScheduler,
+    priority_tag,
+    register_scheduling,
+)
+from src.mcp_server.middleware.tool_calls import call_tool
+
+
+async def _queue_behind_running_call(scheduler, calls):
+    """
+    Hold the only slot, queue calls as (class, client, label) and return the order they
+    ran in.
+    """
+    order = []
+
+    async def run(priority_class, client, label):
+        await scheduler.acquire(priority_class, client)
+        order.append(label)
+        scheduler.release()
+
+    await scheduler.acquire("default")
+    tasks = []
+    for call in calls:
+        tasks.append(asyncio.create_task(run(*call)))
+        await asyncio.sleep(0)
+    scheduler.release()
+    await asyncio.gather(*tasks)
+    return order
+
+
+class TestToolScheduler:
+    """Test cases for the ToolScheduler class."""
+
+    def test_calls_run_immediately_below_the_limit(self):
+        """Test calls are admitted without queueing while slots are free."""
+        scheduler = ToolScheduler(max_concurrency=2)
+
+        async def scenario():
+            await scheduler.acquire("default")
+            await scheduler.acquire("default")
+            return scheduler.running, scheduler.queued
+
+        assert asyncio.run(scenario()) == (2, 0)
+
+    def test_interactive_calls_overtake_a_backlog(self):
+        """Test a higher class is served ahead of queued calls of a lower class."""
+        scheduler = ToolScheduler(max_concurrency=1)
+        calls = [("background", "a", f"slow{i}") for i in range(3)] + [
+            ("interactive", "a", "ping")
+        ]
+
+        order = asyncio.run(_queue_behind_running_call(scheduler, calls))
+        assert order.index("ping") <= 1
+        assert scheduler.stats()["interactive"]["admitted"] == 1
+
+    def test_clients_share_the_queue_fairly(self):
+        """
+        Test a client's backlog does not delay another client's calls of the same class.
+        """
+        scheduler = ToolScheduler(max_concurrency=1)
+        calls = [("default", "flood", f"f{i}") for i in range(5)] + [
+            ("default", "other", "o")
+        ]
+
+        order = asyncio.run(_queue_behind_running_call(scheduler, calls))
+        assert order.index("o") <= 1
+        assert scheduler.running == 0
+        assert scheduler.queued == 0
+
+    def test_full_queue_rejects_calls(self):
+        """Test calls beyond the queue bound are rejected at once."""
+        scheduler = ToolScheduler(max_concurrency=1, max_queue=1)
+
+        async def scenario():
+            await scheduler.acquire("default")
+            queued = asyncio.create_task(scheduler.acquire("default"))
+            await asyncio.sleep(0)
+            with pytest.raises(ToolError, match="Server busy"):
+                await scheduler.acquire("default")
+            scheduler.release()
+            await queued
+
+        asyncio.run(scenario())
+        assert scheduler.stats()["default"]["rejected"] == 1
+
+    def test_expired_calls_are_dropped(self):
+        """
+        Test calls past their deadline, or waiting past the queue timeout, never run.
+        """
+        scheduler = ToolScheduler(max_concurrency=1, queue_timeout=0.05)
+
+        async def scenario():
+            with pytest.raises(ToolError, match="deadline"):
+                await scheduler.acquire("default", deadline=time.time() - 1)
+            await scheduler.acquire("default")
+            with pytest.raises(ToolError, match="deadline"):
+                await scheduler.acquire("default")
+            assert scheduler.queued == 0
+            scheduler.release()
+
+        asyncio.run(scenario())
+        assert scheduler.stats()["default"]["expired"] == 2
+        assert scheduler.running == 0
+
+    def test_cancelled_waiters_leave_the_queue(self):
+        """Test cancelling a queued call frees its place without taking a slot."""
+        scheduler = ToolScheduler(max_concurrency=1)
+
+        async def scenario():
+            await scheduler.acquire("default")
+            waiter = asyncio.create_task(scheduler.acquire("default"))
+            await asyncio.sleep(0)
+            waiter.cancel()
+            await asyncio.gather(waiter, return_exceptions=True)
+            assert scheduler.queued == 0
+            scheduler.release()
+
+        asyncio.run(scenario())
+        assert scheduler.running == 0
+
+    def test_raising_the_limit_admits_queued_calls(self):
+        """Test a configuration change with more slots admits waiting calls."""
+        scheduler = ToolScheduler(max_concurrency=1)
+
+        async def scenario():
+            await scheduler.acquire("default")
+            waiter = asyncio.create_task(scheduler.acquire("default"))
+            await asyncio.sleep(0)
+            scheduler.configure(SchedulingConfig(max_concurrency=2))
+            await asyncio.wait_for(waiter, 1)
+
+        asyncio.run(scenario())
+        assert scheduler.running == 2
+
+
+class TestRegisterScheduling:
+    """Test cases for scheduling a server's tool calls."""
+
+    def _server(self, scheduler):
+        mcp = FastMCP("test")
+
+        @mcp.tool("Ping", tags={priority_tag("interactive")})
+        def ping() -> str:
+            return "pong"
+
+        @mcp.tool("Report")
+        def report() -> str:
+            return "done"
+
+        register_scheduling(mcp, scheduler)
+        return mcp
+
+    def test_classes_come_from_tags_and_configuration(self):
+        """Test declared classes are used unless the configuration overrides them."""
+        scheduler = ToolScheduler(tool_classes={"Report": "background"})
+        self._server(scheduler)
+
+        assert scheduler.priority_class("Ping") == "interactive"
+        assert scheduler.priority_class("Report") == "background"
+        assert scheduler.priority_class("Unknown") == "default"
+
+    def test_deadline_from_meta(self):
+        """
+        Test a call whose _meta deadline passed is dropped, and a malformed deadline is
+        rejected.
+        """
+        scheduler = ToolScheduler()
+        mcp = self._server(scheduler)
+
+        async def scenario():
+            content = await call_tool(
+                mcp, "Ping", {}, meta={"deadline": time.time() + 60}, client="a"
+            )
+            with pytest.raises(ToolError, match="deadline"):
+                await call_tool(mcp, "Ping", {}, meta={"deadline": time.time() - 1})
+            with pytest.raises(ToolError, match="Unix time"):
+                await call_tool(mcp, "Ping", {}, meta={"deadline": "soon"})
+            return content[0].text
+
+        assert asyncio.run(scenario()) == "pong"
+        assert scheduler.stats()["interactive"] == {
+            "admitted": 1,
+            "rejected": 0,
+            "expired": 1,
+            "queued": 0,
+            "wait_seconds": 0.0,
+        }
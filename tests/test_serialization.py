@@ -0,0 +1,117 @@
+"""
+Tests for the JSON serialization backends.
+"""
+
+from datetime import date
+from unittest.mock import patch
+
+import pytest
+from pydantic import BaseModel
+
+from src.mcp_server.config.config import SerializationConfig
+from src.mcp_server.utils import serialization
+from src.mcp_server.utils.serialization import (
+    JSONBackend,
+    available_backends,
+    create_backend,
+    set_backend,
+    tool_serializer,
+)
+
+
+class Point(BaseModel):
+    x: int
+    y: int
+
+
+@pytest.fixture(params=available_backends())
+def backend(request):
+    """Every installed backend."""
+    return create_backend(request.param)
+
+
+class TestBackends:
+    """Test cases every backend must pass."""
+
+    def test_round_trip(self, backend):
+        """Test values survive encoding and decoding."""
+        value = {
+            "name": "Ada",
+            "count": 3,
+            "ratio": 0.5,
+            "tags": ["a", "é"],
+            "none": None,
+            "ok": True,
+        }
+        assert backend.loads(backend.dumps(value)) == value
+
+    def test_output_is_compact(self, backend):
+        """Test no whitespace is emitted."""
+        assert backend.dumps({"a": [1, 2]}) == b'{"a":[1,2]}'
+
+    def test_sort_keys(self, backend):
+        """Test sorted output does not depend on insertion order."""
+        assert (
+            backend.dumps({"b": 1, "a": {"d": 2, "c": 3}}, sort_keys=True)
+            == b'{"a":{"c":3,"d":2},"b":1}'
+        )
+        assert backend.dumps({"b": 1, 2: 3}, sort_keys=True) == b'{"2":3,"b":1}'
+
+    def test_encodes_non_json_values(self, backend):
+        """Test models, dates and other objects are converted."""
+        encoded = backend.loads(
+            backend.dumps(
+                {"point": Point(x=1, y=2), "day": date(2024, 1, 2), "obj": object}
+            )
+        )
+        assert encoded["point"] == {"x": 1, "y": 2}
+        assert encoded["day"] == "2024-01-02"
+        assert encoded["obj"] == str(object)
+
+    def test_invalid_json_raises_value_error(self, backend):
+        """Test decode errors are ValueErrors."""
+        with pytest.raises(ValueError):
+            backend.loads(b"{not json")
+
+    def test_interface_is_abstract(self):
+        """Test backends must implement dumps and loads."""
+        with pytest.raises(TypeError):
+            JSONBackend()
+
+
+class TestBackendSelection:
+    """Test cases for choosing the backend."""
+
+    def test_auto_prefers_fastest_installed(self):
+        """Test auto picks the first installed backend in AUTO_ORDER."""
+        expected = next(
+            name for name in serialization.AUTO_ORDER if name in available_backends()
+        )
+        assert create_backend("auto").name == expected
+
+    def test_auto_falls_back_to_stdlib(self):
+        """Test the standard library is used when no fast backend is installed."""
+        with (
+            patch.object(serialization, "orjson", None),
+            patch.object(serialization, "msgspec", None),
+        ):
+            assert available_backends() == ["stdlib", "pydantic"]
+            assert create_backend("auto").name == "stdlib"
+            with pytest.raises(ValueError, match="not installed"):
+                create_backend("orjson")
+
+    def test_unknown_backend(self):
+        """Test an unknown backend name is rejected."""
+        with pytest.raises(ValueError, match="Unknown JSON backend"):
+            create_backend("yaml")
+
+    def test_set_backend_replaces_shared_backend(self):
+        """Test the module-level helpers use the configured backend."""
+        previous = serialization.get_backend()
+        try:
+            set_backend(SerializationConfig(backend="stdlib"))
+            assert serialization.get_backend().name == "stdlib"
+            assert serialization.loads(serialization.dumps({"a": 1})) == {"a": 1}
+            assert tool_serializer({"a": [1, 2]}) == '{"a":[1,2]}'
+        finally:
+            serialization._backend = previous
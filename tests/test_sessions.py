@@ -0,0 +1,324 @@
+"""
+Tests for the bounded streamable-HTTP sessions.
+"""
+
+import asyncio
+import json
+import time
+from unittest import mock
+
+import pytest
+from fastmcp import FastMCP
+from sse_starlette.sse import AppStatus
+from starlette.middleware import Middleware
+from starlette.testclient import TestClient
+
+from src.mcp_server.config.config import SessionConfig
+from src.mcp_server.middleware.sessions import (
+    INVALID_REQUEST_CODE,
+    InMemorySessionStore,
+    SessionMiddleware,
+    SessionRecord,
+    SessionTracker,
+    SQLiteSessionStore,
+    find_session_manager,
+    supports_session_control,
+)
+
+HEADERS = {"accept": "application/json, text/event-stream"}
+
+INITIALIZE = {
+    "jsonrpc": "2.0",
+    "id": 1,
+    "method": "initialize",
+    "params": {
+        "protocolVersion": "2025-03-26",
+        "capabilities": {},
+        "clientInfo": {"name": "test", "version": "1.0"},
+    },
+}
+
+
+def _tool_call(message, request_id=2):
+    return {
+        "jsonrpc": "2.0",
+        "id": request_id,
+        "method": "tools/call",
+        "params": {"name": "Echo", "arguments": {"message": message}},
+    }
+
+
+def _server():
+    mcp = FastMCP("test")
+
+    @mcp.tool("Echo")
+    def echo(message: str) -> str:
+        return message
+
+    return mcp
+
+
+def _app(tracker):
+    return _server().http_app(
+        middleware=[Middleware(SessionMiddleware, tracker=tracker)]
+    )
+
+
+def _open_session(client):
+    response = client.post("/mcp/", json=INITIALIZE, headers=HEADERS)
+    assert response.status_code == 200
+    session_id = response.headers["mcp-session-id"]
+    headers = {**HEADERS, "mcp-session-id": session_id}
+    client.post(
+        "/mcp/",
+        json={"jsonrpc": "2.0", "method": "notifications/initialized"},
+        headers=headers,
+    )
+    return session_id
+
+
+def _call(client, session_id, message):
+    return client.post(
+        "/mcp/",
+        json=_tool_call(message),
+        headers={**HEADERS, "mcp-session-id": session_id},
+    )
+
+
+def _text(response):
+    data = next(
+        line for line in response.text.splitlines() if line.startswith("data: ")
+    )
+    return json.loads(data[6:])["result"]["content"][0]["text"]
+
+
+class TestSessionStores:
+    """Test cases for the session stores."""
+
+    @pytest.fixture(params=["memory", "sqlite"])
+    def store(self, request, tmp_path):
+        if request.param == "memory":
+            yield InMemorySessionStore()
+        else:
+            store = SQLiteSessionStore(str(tmp_path / "sessions" / "sessions.db"))
+            yield store
+            asyncio.run(store.close())
+
+    def test_save_load_touch_delete(self, store):
+        """Test records round-trip, record activity and can be forgotten."""
+
+        async def scenario():
+            await store.save(SessionRecord("a", 1.0, 1.0, 10))
+            await store.touch("a", 5.0)
+            record = await store.load("a")
+            await store.delete("a")
+            return record, await store.load("a")
+
+        record, deleted = asyncio.run(scenario())
+
+        assert record == SessionRecord("a", 1.0, 5.0, 10)
+        assert deleted is None
+
+    def test_purge_forgets_idle_sessions(self, store):
+        """Test purge drops only the sessions last seen before the cutoff."""
+
+        async def scenario():
+            await store.save(SessionRecord("old", 1.0, 1.0, 10))
+            await store.save(SessionRecord("new", 1.0, 9.0, 10))
+            purged = await store.purge(5.0)
+            return purged, await store.load("old"), await store.load("new")
+
+        purged, old, new = asyncio.run(scenario())
+
+        assert purged == 1
+        assert old is None
+        assert new is not None
+
+    def test_memory_store_is_bounded(self):
+        """Test the in-memory store drops the least recently used record."""
+        store = InMemorySessionStore(max_records=2)
+
+        async def scenario():
+            for session_id in ("a", "b"):
+                await store.save(SessionRecord(session_id, 1.0, 1.0, 10))
+            await store.touch("a", 2.0)
+            await store.save(SessionRecord("c", 3.0, 3.0, 10))
+
+        asyncio.run(scenario())
+
+        assert len(store) == 2
+        assert asyncio.run(store.load("b")) is None
+
+
+class TestSessionTracker:
+    """Test cases for SessionTracker without a session manager."""
+
+    def test_from_config(self, tmp_path):
+        """Test the configured backend and limits are used."""
+        tracker = SessionTracker.from_config(SessionConfig(max_sessions=5, idle_ttl=60))
+        assert isinstance(tracker.store, InMemorySessionStore)
+        assert tracker.store.max_records == 50
+        assert (tracker.max_sessions, tracker.idle_ttl) == (5, 60)
+
+        path = str(tmp_path / "sessions.db")
+        tracker = SessionTracker.from_config(
+            SessionConfig(backend="sqlite", sqlite_path=path)
+        )
+        assert isinstance(tracker.store, SQLiteSessionStore)
+        asyncio.run(tracker.store.close())
+
+    def test_cap_closes_least_recently_used(self):
+        """
+        Test opening a session over the cap closes and forgets the least recently used
+        one.
+        """
+        tracker = SessionTracker(max_sessions=2)
+
+        async def scenario():
+            await tracker.opened("a")
+            await tracker.opened("b")
+            await tracker.seen("a")
+            await tracker.opened("c")
+
+        asyncio.run(scenario())
+
+        assert "b" not in tracker
+        assert len(tracker) == 2
+        assert tracker.evicted == 1
+        assert asyncio.run(tracker.store.load("b")) is None
+
+    def test_sweep_closes_idle_sessions(self):
+        """Test a sweep closes the sessions idle longer than the TTL."""
+        tracker = SessionTracker(idle_ttl=10)
+
+        async def scenario():
+            await tracker.opened("a")
+            await tracker.opened("b")
+            tracker._active["a"] -= 20
+            return await tracker.sweep()
+
+        assert asyncio.run(scenario()) == 1
+        assert "a" not in tracker
+        assert "b" in tracker
+        assert tracker.expired == 1
+
+    def test_unknown_session_cannot_be_resumed(self):
+        """Test sessions cannot be resumed before a session manager is bound."""
+        tracker = SessionTracker()
+        assert asyncio.run(tracker.seen("missing")) is False
+
+    def test_metrics(self):
+        """Test the session counters are exported."""
+        tracker = SessionTracker()
+        asyncio.run(tracker.opened("a"))
+
+        families = {name: samples for name, _, _, samples in tracker.collect_metrics()}
+
+        assert families["mcp_sessions"] == [({}, 1)]
+        assert families["mcp_sessions_evicted_total"] == [({}, 0)]
+
+
+class TestSessionMiddleware:
+    """Test cases for SessionMiddleware on a streamable-HTTP server."""
+
+    @pytest.fixture(autouse=True)
+    def reset_sse_exit_event(self):
+        """sse-starlette binds a process-wide event to the first event loop using it."""
+        AppStatus.should_exit_event = None
+        yield
+        AppStatus.should_exit_event = None
+
+    def test_finds_session_manager(self):
+        """Test the session manager is found in the FastMCP application."""
+        assert find_session_manager(_server().http_app()) is not None
+
+    def test_sdk_without_session_internals_is_left_alone(self):
+        """
+        Test sessions are left to the SDK when it lacks the internals the tracker relies
+        on.
+        """
+        assert supports_session_control(find_session_manager(_server().http_app()))
+
+        tracker = SessionTracker(max_sessions=1)
+        with mock.patch(
+            "src.mcp_server.middleware.sessions._MANAGER_INTERNALS",
+            ("_renamed_task_group",),
+        ):
+            with TestClient(_app(tracker)) as client:
+                first = _open_session(client)
+                _open_session(client)
+                response = _call(client, first, "hello")
+
+        assert response.status_code == 200
+        assert tracker.manager is None
+        assert len(tracker) == 0
+
+    def test_tracks_opened_sessions(self):
+        """Test sessions opened by the SDK are tracked and serve calls."""
+        tracker = SessionTracker()
+        with TestClient(_app(tracker)) as client:
+            session_id = _open_session(client)
+            response = _call(client, session_id, "hello")
+
+        assert response.status_code == 200
+        assert _text(response) == "hello"
+        assert session_id in tracker
+
+    def test_evicted_session_gets_404(self):
+        """Test a session closed to stay under the cap is answered with 404."""
+        tracker = SessionTracker(max_sessions=1)
+        with TestClient(_app(tracker)) as client:
+            first = _open_session(client)
+            second = _open_session(client)
+            response = _call(client, first, "hello")
+            assert _call(client, second, "hello").status_code == 200
+
+        assert response.status_code == 404
+        assert response.json()["error"]["code"] == INVALID_REQUEST_CODE
+        assert len(tracker) == 1
+
+    def test_idle_session_gets_404(self):
+        """Test a session idle longer than the TTL is closed and answered with 404."""
+        tracker = SessionTracker(idle_ttl=60, sweep_interval=0.01)
+        with TestClient(_app(tracker)) as client:
+            session_id = _open_session(client)
+            tracker._active[session_id] -= 120
+            tracker.store._records[session_id].last_seen -= 120
+            time.sleep(0.02)
+            response = _call(client, session_id, "hello")
+
+        assert response.status_code == 404
+        assert tracker.expired == 1
+
+    def test_delete_forgets_session(self):
+        """Test a session deleted by the client is no longer tracked."""
+        tracker = SessionTracker()
+        with TestClient(_app(tracker)) as client:
+            session_id = _open_session(client)
+            response = client.delete(
+                "/mcp/", headers={**HEADERS, "mcp-session-id": session_id}
+            )
+
+        assert response.status_code == 200
+        assert session_id not in tracker
+        assert asyncio.run(tracker.store.load(session_id)) is None
+
+    def test_session_resumes_on_another_worker(self, tmp_path):
+        """
+        Test a session opened by one worker serves calls on another sharing the store.
+        """
+        path = str(tmp_path / "sessions.db")
+        first, second = SessionTracker(SQLiteSessionStore(path)), SessionTracker(
+            SQLiteSessionStore(path)
+        )
+
+        with TestClient(_app(first)) as client:
+            session_id = _open_session(client)
+        AppStatus.should_exit_event = None
+        with TestClient(_app(second)) as client:
+            response = _call(client, session_id, "resumed")
+
+        assert response.status_code == 200
+        assert _text(response) == "resumed"
+        assert second.resumed == 1
+        assert session_id in second
@@ -0,0 +1,56 @@
+"""
+Tests for startup timing.
+"""
+
+from src.mcp_server.utils.startup import (
+    get_startup_timings,
+    parse_import_times,
+    startup_phase,
+)
+
+
+class TestStartupPhase:
+    """Test cases for startup_phase."""
+
+    def test_phase_is_recorded(self):
+        """Test a completed phase appears in the timings."""
+        with startup_phase("test-phase"):
+            pass
+
+        timings = get_startup_timings()
+        assert timings["test-phase"] >= 0
+
+    def test_main_records_phases(self):
+        """Test importing the server records its startup phases."""
+        import src.mcp_server.main  # noqa: F401
+
+        assert {"logging", "server", "tools"} <= set(get_startup_timings())
+
+
+class TestParseImportTimes:
+    """Test cases for parse_import_times."""
+
+    def test_parses_importtime_output(self):
+        """Test -X importtime lines are parsed and the header is skipped."""
+        output = (
+            "import time: self [us] | cumulative | imported package\n"
+            "import time:       168 |        168 |   _io\n"
+            "import time:       414 |       1014 | _frozen_importlib_external\n"
+        )
+
+        modules = parse_import_times(output)
+
+        assert modules == [
+            {
+                "module": "_io",
+                "self_seconds": 0.000168,
+                "cumulative_seconds": 0.000168,
+                "depth": 1,
+            },
+            {
+                "module": "_frozen_importlib_external",
+                "self_seconds": 0.000414,
+                "cumulative_seconds": 0.001014,
+                "depth": 0,
+            },
+        ]
@@ -0,0 +1,113 @@
+"""
+Tests for streaming tool results.
+"""
+
+import asyncio
+
+import pytest
+from fastmcp import Client, FastMCP
+from mcp.types import (
+    CallToolRequest,
+    CallToolRequestParams,
+    CallToolResult,
+    ClientRequest,
+)
+
+from src.mcp_server.config.config import StreamingConfig
+from src.mcp_server.utils.streaming import ResultTooLargeError, streaming
+
+
+def _server():
+    mcp = FastMCP("test")
+
+    @mcp.tool("Count")
+    @streaming()
+    async def count(n: int):
+        for i in range(n):
+            yield f"{i},"
+
+    @mcp.tool("Words")
+    @streaming(max_result_bytes=8)
+    def words(text: str):
+        yield from text.split()
+
+    return mcp
+
+
+async def _call_streamed(mcp, name, arguments, chunks_only):
+    chunks = []
+
+    async def on_progress(progress, total, message):
+        chunks.append((progress, message))
+
+    async with Client(mcp) as client:
+        params = CallToolRequestParams(name=name, arguments=arguments)
+        if chunks_only:
+            params.meta = CallToolRequestParams.Meta(stream=True)
+        result = await client.session.send_request(
+            ClientRequest(CallToolRequest(method="tools/call", params=params)),
+            CallToolResult,
+            progress_callback=on_progress,
+        )
+    await asyncio.sleep(0)
+    return result, chunks
+
+
+class TestStreaming:
+    """Test cases for the streaming decorator."""
+
+    def test_rejects_plain_functions(self):
+        """Test only generator functions can be streamed."""
+        with pytest.raises(TypeError):
+            streaming()(lambda: "x")
+
+    def test_aggregates_chunks_without_progress_token(self):
+        """Test clients not asking for progress get the whole result."""
+
+        async def call():
+            async with Client(_server()) as client:
+                return await client.call_tool("Count", {"n": 3})
+
+        result = asyncio.run(call())
+
+        assert result[0].text == "0,1,2,"
+
+    def test_chunks_are_sent_as_progress(self):
+        """Test every chunk is sent as a progress notification and aggregated."""
+        result, chunks = asyncio.run(
+            _call_streamed(_server(), "Count", {"n": 3}, chunks_only=False)
+        )
+
+        assert chunks == [(2, "0,"), (4, "1,"), (6, "2,")]
+        assert result.content[0].text == "0,1,2,"
+
+    def test_chunks_only(self):
+        """Test clients streaming the result get a summary instead of a copy."""
+        result, chunks = asyncio.run(
+            _call_streamed(_server(), "Count", {"n": 3}, chunks_only=True)
+        )
+
+        assert [message for _, message in chunks] == ["0,", "1,", "2,"]
+        assert result.content[0].text == "Streamed 3 chunks (6 bytes)"
+
+    def test_aggregated_result_is_bounded(self):
+        """Test an aggregated result over the limit fails the call."""
+
+        async def call():
+            async with Client(_server()) as client:
+                return await client.call_tool_mcp("Words", {"text": "aaaa bbbb cccc"})
+
+        result = asyncio.run(call())
+
+        assert result.isError
+        assert "exceeds 8 bytes" in result.content[0].text
+
+    def test_limit_from_config(self):
+        """Test the configured limit applies when none is given."""
+
+        @streaming(streaming_config=StreamingConfig(max_result_bytes=1))
+        def chunks():
+            yield "ab"
+
+        with pytest.raises(ResultTooLargeError):
+            asyncio.run(chunks())
@@ -0,0 +1,255 @@
+"""
+Tests for tool call timeouts and cancellation.
+"""
+
+import asyncio
+import time
+
+import mcp.types as types
+import pytest
+from fastmcp import Client, FastMCP
+from fastmcp.exceptions import ToolError
+from mcp.shared.exceptions import McpError
+
+from src.mcp_server.middleware.jsonrpc import get_header
+from src.mcp_server.middleware.timeouts import (
+    CallTimeouts,
+    DisconnectMiddleware,
+    register_timeouts,
+    timeout_tag,
+)
+from src.mcp_server.middleware.tool_calls import (
+    CallOrigin,
+    CallOriginMiddleware,
+    _call_origin,
+    call_tool,
+)
+from src.mcp_server.utils.cancellation import current_cancellation
+
+
+def _server(timeouts):
+    mcp = FastMCP("test")
+    mcp.tokens = []
+
+    @mcp.tool("Sleep", tags={timeout_tag(0.05)})
+    async def sleep(seconds: float) -> str:
+        mcp.tokens.append(current_cancellation.get())
+        await asyncio.sleep(seconds)
+        return "awake"
+
+    @mcp.tool("Fail")
+    async def fail() -> str:
+        raise TimeoutError("upstream timed out")
+
+    register_timeouts(mcp, timeouts)
+    return mcp
+
+
+class TestCallTimeouts:
+    """Test cases for the CallTimeouts middleware."""
+
+    def test_timeouts_come_from_configuration_tags_and_default(self):
+        """
+        Test configured timeouts override declared ones, which override the default.
+        """
+        timeouts = CallTimeouts(default_timeout=10, tool_timeouts={"Fail": 2})
+        _server(timeouts)
+
+        assert timeouts.tool_timeout("Fail") == 2
+        assert timeouts.tool_timeout("Sleep") == 0.05
+        assert timeouts.tool_timeout("Other") == 10
+
+    def test_slow_calls_time_out(self):
+        """
+        Test a call over its timeout is stopped, its token cancelled and the call
+        counted.
+        """
+        timeouts = CallTimeouts()
+        mcp = _server(timeouts)
+
+        async def scenario():
+            with pytest.raises(ToolError, match="timed out after 0.05 seconds"):
+                await call_tool(mcp, "Sleep", {"seconds": 5})
+            return await call_tool(mcp, "Sleep", {"seconds": 0})
+
+        assert asyncio.run(scenario())[0].text == "awake"
+        assert mcp.tokens[0].reason == "timeout"
+        assert not mcp.tokens[1].cancelled
+        stats = timeouts.stats()["Sleep"]
+        assert stats["timed_out"] == 1
+        assert stats["wasted_seconds"] >= 0.05
+
+    def test_meta_shortens_the_timeout(self):
+        """
+        Test a client timeout below the tool's applies, and a malformed one is rejected.
+        """
+        timeouts = CallTimeouts(tool_timeouts={"Sleep": 5})
+        mcp = _server(timeouts)
+
+        async def scenario():
+            started = time.perf_counter()
+            with pytest.raises(ToolError, match="timed out"):
+                await call_tool(mcp, "Sleep", {"seconds": 5}, meta={"timeout": 0.05})
+            with pytest.raises(ToolError, match="timed out"):
+                await call_tool(
+                    mcp, "Sleep", {"seconds": 5}, meta={"deadline": time.time() + 0.05}
+                )
+            with pytest.raises(ToolError, match="number of seconds"):
+                await call_tool(mcp, "Sleep", {"seconds": 0}, meta={"timeout": "1m"})
+            return time.perf_counter() - started
+
+        assert asyncio.run(scenario()) < 1
+        assert timeouts.stats()["Sleep"]["timed_out"] == 2
+
+    def test_timeout_errors_of_tools_are_not_timeouts(self):
+        """
+        Test a TimeoutError raised by the tool itself is reported as its own error.
+        """
+        timeouts = CallTimeouts()
+        mcp = _server(timeouts)
+
+        with pytest.raises(ToolError, match="upstream timed out"):
+            asyncio.run(call_tool(mcp, "Fail", {}))
+        assert "Fail" not in timeouts.stats()
+
+    def test_disconnected_calls_are_cancelled(self):
+        """Test a call announced by the HTTP layer stops when its client goes away."""
+        timeouts = CallTimeouts()
+        mcp = _server(timeouts)
+
+        async def scenario():
+            _call_origin.set(CallOrigin("abc"))
+            token = timeouts.expect("session:abc", 7, "Sleep")
+            call = asyncio.create_task(
+                call_tool(mcp, "Sleep", {"seconds": 0.04}, request_id=7)
+            )
+            await asyncio.sleep(0.01)
+            token.cancel("disconnect")
+            with pytest.raises(ToolError, match="went away"):
+                await call
+
+        asyncio.run(scenario())
+        assert timeouts.stats()["Sleep"]["disconnected"] == 1
+
+    def test_cancel_notification_is_counted(self):
+        """Test a notifications/cancelled message cancels the call and is counted."""
+        timeouts = CallTimeouts(tool_timeouts={"Sleep": 0})
+        mcp = _server(timeouts)
+
+        async def scenario():
+            async with Client(mcp) as client:
+                call = asyncio.create_task(
+                    client.call_tool_mcp("Sleep", {"seconds": 5})
+                )
+                while not mcp.tokens:
+                    await asyncio.sleep(0.01)
+                params = types.CancelledNotificationParams(
+                    requestId=client.session._request_id - 1
+                )
+                await client.session.send_notification(
+                    types.ClientNotification(
+                        types.CancelledNotification(
+                            method="notifications/cancelled", params=params
+                        )
+                    )
+                )
+                with pytest.raises(McpError, match="cancelled"):
+                    await call
+
+        asyncio.run(scenario())
+        assert mcp.tokens[0].reason == "cancelled"
+        assert timeouts.stats()["Sleep"]["cancelled"] == 1
+
+
+class TestDisconnectMiddleware:
+    """Test cases for the DisconnectMiddleware class."""
+
+    def test_disconnect_cancels_the_announced_calls(self):
+        """
+        Test the calls of a request are cancelled when the client disconnects, and
+        forgotten after.
+        """
+        timeouts = CallTimeouts()
+        seen = []
+
+        async def app(scope, receive, send):
+            seen.append(timeouts._expected[("session:abc", 1, "Sleep")])
+            await receive()
+            await receive()
+
+        messages = [
+            {
+                "type": "http.request",
+                "body": b'{"jsonrpc": "2.0", "id": 1, "method": "tools/call", '
+                b'"params": {"name": "Sleep", "arguments": {}}}',
+            },
+            {"type": "http.disconnect"},
+        ]
+
+        async def receive():
+            return messages.pop(0)
+
+        scope = {
+            "type": "http",
+            "method": "POST",
+            "path": "/mcp/",
+            "headers": [(b"mcp-session-id", b"abc")],
+        }
+        asyncio.run(
+            CallOriginMiddleware(DisconnectMiddleware(app, timeouts))(
+                scope, receive, None
+            )
+        )
+        assert seen[0].reason == "disconnect"
+        assert not timeouts._expected
+
+    def test_sessions_reusing_request_ids_are_cancelled_apart(self):
+        """
+        Test a client going away does not cancel another session's call with the same
+        JSON-RPC id.
+        """
+        timeouts = CallTimeouts()
+        mcp = _server(timeouts)
+        results = {}
+        body = (
+            b'{"jsonrpc": "2.0", "id": 1, "method": "tools/call", '
+            b'"params": {"name": "Sleep", "arguments": {"seconds": 0.02}}}'
+        )
+
+        async def app(scope, receive, send):
+            await receive()
+            call = asyncio.create_task(
+                call_tool(mcp, "Sleep", {"seconds": 0.02}, request_id=1)
+            )
+            # Client b goes away here, client a only once its call is done
+            await receive()
+            try:
+                results[get_header(scope, "mcp-session-id")] = (await call)[0].text
+            except ToolError as e:
+                results[get_header(scope, "mcp-session-id")] = str(e)
+
+        def request(session_id, delay):
+            messages = [{"type": "http.request", "body": body}]
+
+            async def receive():
+                if messages:
+                    return messages.pop(0)
+                await asyncio.sleep(delay)
+                return {"type": "http.disconnect"}
+
+            scope = {
+                "type": "http",
+                "method": "POST",
+                "path": "/mcp/",
+                "headers": [(b"mcp-session-id", session_id.encode())],
+            }
+            return CallOriginMiddleware(DisconnectMiddleware(app, timeouts))(
+                scope, receive, None
+            )
+
+        async def scenario():
+            await asyncio.gather(request("a", 0.1), request("b", 0))
+
+        asyncio.run(scenario())
+        assert results == {"a": "awake", "b": "Call cancelled: the client went away"}
+        assert timeouts.stats()["Sleep"]["disconnected"] == 1
@@ -0,0 +1,212 @@
+"""
+Tests for tool-call middleware.
+"""
+
+import asyncio
+
+import pytest
+from fastmcp import Client, FastMCP
+from fastmcp.exceptions import ToolError
+from sse_starlette.sse import AppStatus
+from starlette.middleware import Middleware
+from starlette.testclient import TestClient
+
+from src.mcp_server.middleware.auth import APIKeyAuthenticator, APIKeyAuthMiddleware
+from src.mcp_server.middleware.tool_calls import (
+    CallOriginMiddleware,
+    add_tool_call_middleware,
+    current_origin,
+    get_tool_call_middleware,
+)
+
+
+def _make_server():
+    mcp = FastMCP("test")
+
+    @mcp.tool("Echo Message")
+    def echo(message: str) -> str:
+        return message
+
+    return mcp
+
+
+async def _call(mcp, name, arguments):
+    async with Client(mcp) as client:
+        return await client.call_tool(name, arguments)
+
+
+class TestToolCallMiddleware:
+    """Test cases for add_tool_call_middleware."""
+
+    def test_middleware_order_and_call_details(self):
+        """Test middleware added first runs outermost and sees the call."""
+        mcp = _make_server()
+        events = []
+
+        def make(label):
+            async def middleware(call, call_next):
+                events.append((label, "before", call.name, dict(call.arguments)))
+                result = await call_next(call)
+                events.append((label, "after"))
+                return result
+
+            return middleware
+
+        add_tool_call_middleware(mcp, make("outer"))
+        add_tool_call_middleware(mcp, make("inner"))
+
+        result = asyncio.run(_call(mcp, "Echo Message", {"message": "hi"}))
+
+        assert result[0].text == "hi"
+        assert events == [
+            ("outer", "before", "Echo Message", {"message": "hi"}),
+            ("inner", "before", "Echo Message", {"message": "hi"}),
+            ("inner", "after"),
+            ("outer", "after"),
+        ]
+        assert len(get_tool_call_middleware(mcp)) == 2
+
+    def test_middleware_applies_to_tools_registered_later(self):
+        """Test tools registered after the middleware are wrapped too."""
+        mcp = _make_server()
+        seen = []
+
+        async def record(call, call_next):
+            seen.append(call.name)
+            return await call_next(call)
+
+        add_tool_call_middleware(mcp, record)
+
+        @mcp.tool("Ping")
+        def ping() -> str:
+            return "pong"
+
+        asyncio.run(_call(mcp, "Ping", {}))
+        assert seen == ["Ping"]
+
+    def test_middleware_can_short_circuit(self):
+        """Test a middleware can fail a call without running the tool."""
+        mcp = _make_server()
+
+        async def reject(call, call_next):
+            raise ToolError("rejected")
+
+        add_tool_call_middleware(mcp, reject)
+
+        with pytest.raises(ToolError, match="rejected"):
+            asyncio.run(_call(mcp, "Echo Message", {"message": "hi"}))
+
+    def test_request_id_is_available(self):
+        """Test the JSON-RPC request id is attached to the call."""
+        mcp = _make_server()
+        request_ids = []
+
+        async def record(call, call_next):
+            request_ids.append(call.request_id)
+            return await call_next(call)
+
+        add_tool_call_middleware(mcp, record)
+        asyncio.run(_call(mcp, "Echo Message", {"message": "hi"}))
+        assert request_ids[0] is not None
+
+
+def _call_in_sessions(app, headers, sessions=2):
+    """
+    Open streamable-HTTP sessions and make one tool call in each, returning their ids.
+    """
+    headers = {"accept": "application/json, text/event-stream", **headers}
+    session_ids = []
+    with TestClient(app) as client:
+        for _ in range(sessions):
+            response = client.post(
+                "/mcp/",
+                headers=headers,
+                json={
+                    "jsonrpc": "2.0",
+                    "id": 1,
+                    "method": "initialize",
+                    "params": {
+                        "protocolVersion": "2025-03-26",
+                        "capabilities": {},
+                        "clientInfo": {"name": "t", "version": "1"},
+                    },
+                },
+            )
+            session_headers = {
+                **headers,
+                "mcp-session-id": response.headers["mcp-session-id"],
+            }
+            session_ids.append(session_headers["mcp-session-id"])
+            client.post(
+                "/mcp/",
+                headers=session_headers,
+                json={"jsonrpc": "2.0", "method": "notifications/initialized"},
+            )
+            client.post(
+                "/mcp/",
+                headers=session_headers,
+                json={
+                    "jsonrpc": "2.0",
+                    "id": 2,
+                    "method": "tools/call",
+                    "params": {"name": "Echo Message", "arguments": {"message": "hi"}},
+                },
+            )
+    return session_ids
+
+
+class TestCallOriginMiddleware:
+    """Test cases for identifying the session tool calls come from."""
+
+    def test_session_calls_carry_the_session_id(self):
+        """
+        Test the calls of a streamable-HTTP session are identified by its
+        mcp-session-id.
+        """
+        AppStatus.should_exit_event = None
+        mcp = _make_server()
+        seen = []
+
+        async def record(call, call_next):
+            seen.append((call.client, current_origin()))
+            return await call_next(call)
+
+        add_tool_call_middleware(mcp, record)
+        app = mcp.http_app(middleware=[Middleware(CallOriginMiddleware)])
+        session_ids = _call_in_sessions(app, {})
+        AppStatus.should_exit_event = None
+
+        assert seen == [
+            (f"session:{session_id}", f"session:{session_id}")
+            for session_id in session_ids
+        ]
+
+    def test_authenticated_calls_carry_the_api_key(self):
+        """
+        Test every session of one API key is the same client, while origins stay per
+        session.
+        """
+        AppStatus.should_exit_event = None
+        mcp = _make_server()
+        seen = []
+
+        async def record(call, call_next):
+            seen.append((call.client, current_origin()))
+            return await call_next(call)
+
+        add_tool_call_middleware(mcp, record)
+        app = mcp.http_app(
+            middleware=[
+                Middleware(CallOriginMiddleware),
+                Middleware(
+                    APIKeyAuthMiddleware,
+                    authenticator=APIKeyAuthenticator(keys={"ci": "secret"}),
+                ),
+            ]
+        )
+        session_ids = _call_in_sessions(app, {"x-api-key": "secret"})
+        AppStatus.should_exit_event = None
+
+        assert seen == [
+            ("key:ci", f"session:{session_id}") for session_id in session_ids
+        ]
@@ -1,8 +1,10 @@
 """
 Tests for utility tools.
 """
+
+from unittest.mock import MagicMock
+
 import pytest
-from unittest.mock import MagicMock, patch
 
 from src.mcp_server.tools.utility import register_utility_tools
 
@@ -15,12 +17,15 @@ class TestUtilityTools:
         # Create a mock FastMCP instance with a tool decorator that captures functions
         self.mock_mcp = MagicMock()
         self.tools = {}
+        self.tags = {}
 
         # Create a custom decorator that captures the decorated function
-        def tool_decorator(name):
+        def tool_decorator(name, tags=None):
             def decorator(func):
                 self.tools[name] = func
+                self.tags[name] = tags
                 return func
+
             return decorator
 
         # Replace the mock's tool method with our decorator factory
@@ -79,3 +84,14 @@ class TestUtilityTools:
             assert ping_func() == "pong"
         else:
             pytest.fail("Ping tool not registered correctly")
+
+    def test_resource_usage_tool(self):
+        """Test the resource usage tool reports the process readings."""
+        result = self.tools["Get Resource Usage"]()
+        assert result["rss_bytes"] > 0
+        assert result["in_flight_calls"] >= 0
+        assert result["overloaded"] == []
+
+    def test_tools_are_interactive(self):
+        """Test the utility tools declare the interactive priority class."""
+        assert all(tags == {"priority:interactive"} for tags in self.tags.values())
@@ -0,0 +1,376 @@
+"""
+Tests for request tracing.
+"""
+
+import asyncio
+import json
+
+from fastmcp import Client, FastMCP
+from sse_starlette.sse import AppStatus
+from starlette.middleware import Middleware
+from starlette.testclient import TestClient
+
+from src.mcp_server.config.config import TracingConfig
+from src.mcp_server.middleware.tool_calls import CallOriginMiddleware
+from src.mcp_server.middleware.tracing import TracingMiddleware, register_tracing
+from src.mcp_server.tools.registry import precompile_tools
+from src.mcp_server.utils.tracing import (
+    JSONLinesExporter,
+    SpanExporter,
+    Trace,
+    TraceContext,
+    Tracer,
+    parse_traceparent,
+    to_otlp,
+)
+
+LOCAL_CLIENT = ("127.0.0.1", 50000)
+TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+PARENT_ID = "00f067aa0ba902b7"
+
+
+class RecordingExporter(SpanExporter):
+    """Exporter keeping the spans it receives."""
+
+    def __init__(self):
+        self.spans = []
+
+    async def export(self, spans):
+        self.spans.extend(spans)
+
+
+def _server():
+    mcp = FastMCP("test")
+
+    @mcp.tool("Echo")
+    def echo(message: str) -> str:
+        return message
+
+    @mcp.tool("Fail")
+    async def fail() -> str:
+        raise RuntimeError("boom")
+
+    return mcp
+
+
+def _call(mcp, name, arguments):
+    async def run():
+        async with Client(mcp) as client:
+            return await client.call_tool_mcp(name, arguments)
+
+    return asyncio.run(run())
+
+
+class TestTraceparent:
+    """Test cases for parse_traceparent."""
+
+    def test_valid_header(self):
+        """Test ids and the sampled flag are read."""
+        assert parse_traceparent(f"00-{TRACE_ID}-{PARENT_ID}-01") == (
+            TRACE_ID,
+            PARENT_ID,
+            True,
+        )
+        assert parse_traceparent(f"00-{TRACE_ID}-{PARENT_ID}-00") == (
+            TRACE_ID,
+            PARENT_ID,
+            False,
+        )
+
+    def test_invalid_headers(self):
+        """Test malformed and all-zero ids are ignored."""
+        assert parse_traceparent(None) is None
+        assert parse_traceparent("garbage") is None
+        assert parse_traceparent(f"00-{'0' * 32}-{PARENT_ID}-01") is None
+        assert parse_traceparent(f"00-{TRACE_ID}-{PARENT_ID}-zz") is None
+
+
+class TestTracer:
+    """Test cases for the Tracer class."""
+
+    def _record(self, tracer, name, duration_ms, error=None):
+        trace = Trace(
+            f"tools/call {name}",
+            started=0.0,
+            start_time=100.0,
+            attributes={"mcp.tool": name},
+        )
+        spans = trace.finish(error)
+        spans[0].duration_ms = duration_ms
+        tracer.record(spans)
+        return spans[0].trace_id
+
+    def test_sampling_rate(self):
+        """Test the sample rate bounds the share of sampled calls."""
+        assert Tracer(TracingConfig(sample_rate=1.0)).should_sample() is True
+        assert Tracer(TracingConfig(sample_rate=0.0)).should_sample() is False
+
+    def test_configure_applies_new_sampling(self):
+        """Test a reloaded configuration changes the sampling of later calls."""
+        tracer = Tracer(TracingConfig(sample_rate=0.0))
+        tracer.configure(TracingConfig(sample_rate=1.0, slow_threshold_ms=50))
+        assert tracer.should_sample() is True
+        assert tracer.slow_threshold_ms == 50
+
+    def test_ring_buffer_and_queries(self):
+        """Test the buffer keeps the newest traces and filters them."""
+        tracer = Tracer(TracingConfig(buffer_size=3))
+        self._record(tracer, "A", 5)
+        self._record(tracer, "A", 50)
+        slow = self._record(tracer, "B", 500, error="boom")
+        self._record(tracer, "A", 1)
+
+        assert [t["duration_ms"] for t in tracer.traces()] == [1, 500, 50]
+        assert [t["duration_ms"] for t in tracer.traces(tool="A")] == [1, 50]
+        assert [t["trace_id"] for t in tracer.traces(min_duration_ms=100)] == [slow]
+        assert [t["error"] for t in tracer.traces(errors_only=True)] == ["boom"]
+        assert len(tracer.traces(limit=1)) == 1
+
+    def test_expected_calls_are_claimed_once(self):
+        """
+        Test contexts announced by the HTTP layer are handed out once, to the session
+        that sent them.
+        """
+        tracer = Tracer(TracingConfig())
+        context = TraceContext(
+            trace_id=TRACE_ID, parent_id=None, received=0.0, received_time=100.0
+        )
+        other = TraceContext(
+            trace_id=TRACE_ID, parent_id=None, received=0.0, received_time=100.0
+        )
+        tracer.expect("session:a", 1, "Echo", context)
+        tracer.expect("session:b", 1, "Echo", other)
+
+        assert tracer.claim("session:a", 1, "Other") is None
+        assert tracer.claim("session:a", 1, "Echo") is context
+        assert tracer.claim("session:a", 1, "Echo") is None
+        tracer.forget("session:b", 1, "Echo", context)
+        assert tracer.claim("session:b", 1, "Echo") is other
+
+    def test_flush_exports_and_survives_errors(self):
+        """Test queued spans are exported, and export failures are counted."""
+        exporter = RecordingExporter()
+        tracer = Tracer(TracingConfig(), exporter=exporter)
+
+        async def scenario():
+            self._record(tracer, "A", 5)
+            await tracer.stop()
+
+        asyncio.run(scenario())
+        assert len(exporter.spans) == 1
+
+        class Failing(SpanExporter):
+            async def export(self, spans):
+                raise OSError("collector down")
+
+        tracer = Tracer(TracingConfig(), exporter=Failing())
+
+        async def failing():
+            self._record(tracer, "A", 5)
+            await tracer.stop()
+
+        asyncio.run(failing())
+        assert tracer.export_errors == 1
+
+
+class TestExporters:
+    """Test cases for the span exporters."""
+
+    def test_json_lines_file(self, tmp_path):
+        """Test spans are appended one JSON object per line."""
+        path = tmp_path / "traces" / "spans.jsonl"
+        spans = Trace("tools/call A", attributes={"mcp.tool": "A"}).finish()
+
+        asyncio.run(JSONLinesExporter(str(path)).export(spans))
+        asyncio.run(JSONLinesExporter(str(path)).export(spans))
+
+        lines = path.read_text().splitlines()
+        assert len(lines) == 2
+        assert json.loads(lines[0])["name"] == "tools/call A"
+
+    def test_otlp_encoding(self):
+        """Test spans are encoded as an OTLP/HTTP JSON request."""
+        trace = Trace(
+            "tools/call A",
+            trace_id=TRACE_ID,
+            parent_id=PARENT_ID,
+            started=0.0,
+            start_time=1.5,
+            attributes={"mcp.tool": "A"},
+        )
+        trace.add_span("execute", 0.0, 0.25, error="boom", attempt=2)
+
+        body = to_otlp(trace.finish(), "svc")
+        resource = body["resourceSpans"][0]
+        root, child = resource["scopeSpans"][0]["spans"]
+
+        assert resource["resource"]["attributes"][0] == {
+            "key": "service.name",
+            "value": {"stringValue": "svc"},
+        }
+        assert root["traceId"] == TRACE_ID
+        assert root["parentSpanId"] == PARENT_ID
+        assert root["kind"] == 2
+        assert root["startTimeUnixNano"] == "1500000000"
+        assert child["parentSpanId"] == root["spanId"]
+        assert child["endTimeUnixNano"] == "1750000000"
+        assert child["status"] == {"code": 2, "message": "boom"}
+        assert child["attributes"] == [{"key": "attempt", "value": {"intValue": "2"}}]
+
+
+class TestRegisterTracing:
+    """Test cases for register_tracing."""
+
+    def setup_method(self):
+        self.mcp = _server()
+        self.tracer = register_tracing(self.mcp, Tracer(TracingConfig(sample_rate=1.0)))
+
+    def test_precompiled_tools_report_phases(self):
+        """Test precompiled tools record validate, execute and serialize spans."""
+        precompile_tools(self.mcp)
+        _call(self.mcp, "Echo", {"message": "hi"})
+
+        trace = self.tracer.traces()[0]
+        assert trace["name"] == "tools/call Echo"
+        assert trace["attributes"]["mcp.tool"] == "Echo"
+        assert [span["name"] for span in trace["spans"]] == [
+            "validate",
+            "execute",
+            "serialize",
+        ]
+        assert all(span["parent_id"] == trace["span_id"] for span in trace["spans"])
+
+    def test_validation_errors_are_recorded(self):
+        """Test a call with invalid arguments fails in the validate span."""
+        precompile_tools(self.mcp)
+        _call(self.mcp, "Echo", {})
+
+        trace = self.tracer.traces()[0]
+        assert trace["error"] is not None
+        assert [
+            (span["name"], span["error"] is not None) for span in trace["spans"]
+        ] == [("validate", True)]
+
+    def test_other_tools_report_a_run_span(self):
+        """
+        Test tools that are not precompiled get a single run span and their errors.
+        """
+        _call(self.mcp, "Fail", {})
+
+        trace = self.tracer.traces()[0]
+        assert "boom" in trace["error"]
+        assert [span["name"] for span in trace["spans"]] == ["run"]
+
+    def test_slow_unsampled_calls_are_recorded(self):
+        """Test calls over the slow threshold are kept without their phases."""
+        self.tracer.sample_rate = 0.0
+        _call(self.mcp, "Echo", {"message": "hi"})
+        assert self.tracer.traces() == []
+
+        self.tracer.slow_threshold_ms = 1e-9
+        _call(self.mcp, "Echo", {"message": "hi"})
+        trace = self.tracer.traces()[0]
+        assert trace["attributes"]["sampled"] is False
+        assert trace["spans"] == []
+
+    def test_traces_route(self):
+        """Test recent traces are served as JSON and filtered by query parameters."""
+        _call(self.mcp, "Echo", {"message": "hi"})
+        _call(self.mcp, "Fail", {})
+
+        with TestClient(self.mcp.http_app(), client=LOCAL_CLIENT) as client:
+            everything = client.get("/debug/traces").json()
+            errors = client.get("/debug/traces", params={"errors": "true"}).json()
+            invalid = client.get("/debug/traces", params={"limit": "many"})
+
+        assert everything["sample_rate"] == 1.0
+        assert [trace["name"] for trace in everything["traces"]] == [
+            "tools/call Fail",
+            "tools/call Echo",
+        ]
+        assert [trace["name"] for trace in errors["traces"]] == ["tools/call Fail"]
+        assert invalid.status_code == 400
+
+    def test_traces_route_is_restricted_to_administrators(self):
+        """Test remote clients are refused the traces unless they use an admin key."""
+        with TestClient(self.mcp.http_app(), client=("203.0.113.7", 50000)) as client:
+            assert client.get("/debug/traces").status_code == 403
+
+        mcp = _server()
+        register_tracing(mcp, Tracer(TracingConfig()), admin_keys=["ops"])
+        with TestClient(mcp.http_app(), client=LOCAL_CLIENT) as client:
+            assert client.get("/debug/traces").status_code == 403
+
+
+class TestTracingMiddleware:
+    """Test cases for TracingMiddleware on a streamable-HTTP server."""
+
+    def setup_method(self):
+        AppStatus.should_exit_event = None
+        self.mcp = _server()
+        self.tracer = register_tracing(self.mcp, Tracer(TracingConfig(sample_rate=0.0)))
+        precompile_tools(self.mcp)
+        self.app = self.mcp.http_app(
+            middleware=[
+                Middleware(CallOriginMiddleware),
+                Middleware(TracingMiddleware, tracer=self.tracer, paths=["/mcp"]),
+            ]
+        )
+
+    def _post_call(self, traceparent):
+        headers = {"accept": "application/json, text/event-stream"}
+        with TestClient(self.app) as client:
+            response = client.post(
+                "/mcp/",
+                headers=headers,
+                json={
+                    "jsonrpc": "2.0",
+                    "id": 1,
+                    "method": "initialize",
+                    "params": {
+                        "protocolVersion": "2025-03-26",
+                        "capabilities": {},
+                        "clientInfo": {"name": "t", "version": "1"},
+                    },
+                },
+            )
+            headers["mcp-session-id"] = response.headers["mcp-session-id"]
+            client.post(
+                "/mcp/",
+                headers=headers,
+                json={"jsonrpc": "2.0", "method": "notifications/initialized"},
+            )
+            client.post(
+                "/mcp/",
+                headers={**headers, "traceparent": traceparent},
+                json={
+                    "jsonrpc": "2.0",
+                    "id": 2,
+                    "method": "tools/call",
+                    "params": {"name": "Echo", "arguments": {"message": "hi"}},
+                },
+            )
+
+    def test_traceparent_continues_the_client_trace(self):
+        """
+        Test a sampled traceparent traces the call under the client's trace, with a
+        receive span.
+        """
+        self._post_call(f"00-{TRACE_ID}-{PARENT_ID}-01")
+
+        trace = self.tracer.traces()[0]
+        assert trace["trace_id"] == TRACE_ID
+        assert trace["parent_id"] == PARENT_ID
+        assert [span["name"] for span in trace["spans"]] == [
+            "receive",
+            "validate",
+            "execute",
+            "serialize",
+        ]
+        assert not self.tracer._expected
+
+    def test_unsampled_requests_are_not_traced(self):
+        """Test the HTTP layer's sampling decision is final."""
+        self._post_call(f"00-{TRACE_ID}-{PARENT_ID}-00")
+
+        assert self.tracer.traces() == []